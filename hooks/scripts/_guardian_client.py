@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""Thin client for the resident guardian evaluator.
+
+The PreToolUse hook scripts call forward_to_evaluator() before importing
+_guardian_utils. When a healthy evaluator is listening on the project's
+socket, the hook input is forwarded to it and its verdict is printed
+verbatim, which avoids re-importing the guardian modules, re-reading the
+config and recompiling every pattern on each tool call.
+
+This module MUST stay small and import only the standard library: it runs
+on every hook invocation while an evaluator socket exists, before the heavy
+imports it exists to avoid. Hook scripts only import it when
+.claude/guardian/evaluator.sock is present, so a disabled evaluator (the
+default) costs a single stat.
+
+Fallback contract:
+    forward_to_evaluator() returns False on ANY problem (no socket, wrong
+    owner, peer mismatch, timeout, protocol error, evaluator refusal).
+    In that case sys.stdin still yields the complete hook input (it is left
+    untouched when no evaluator is listening, and replaced with an in-memory
+    copy once it has been read), so the caller proceeds with the normal
+    in-process evaluation and its fail-closed behavior is unchanged.
+
+Wire protocol (see _guardian_evaluator.py):
+    Each message is a 4-byte big-endian length followed by UTF-8 JSON.
+"""
+
+import io
+import json
+import os
+import socket
+import stat
+import struct
+import sys
+
+PROTOCOL_VERSION = 1
+"""Wire protocol version shared with _guardian_evaluator.py."""
+
+SOCKET_NAME = "evaluator.sock"
+"""Socket filename inside $CLAUDE_PROJECT_DIR/.claude/guardian/."""
+
+CONNECT_TIMEOUT_SECONDS = 0.25
+"""How long to wait for the evaluator to accept a connection."""
+
+RESPONSE_TIMEOUT_SECONDS = 8.0
+"""How long to wait for a verdict before falling back to in-process evaluation.
+Kept below HOOK_DEFAULT_TIMEOUT_SECONDS so the fallback still has time to run."""
+
+MAX_MESSAGE_BYTES = 16 * 1024 * 1024
+"""Largest message accepted in either direction."""
+
+FORWARDED_ENV_VARS = ("CLAUDE_PROJECT_DIR", "CLAUDE_PLUGIN_ROOT", "CLAUDE_HOOK_DRY_RUN")
+"""Environment variables that influence a verdict and are sent with each request."""
+
+
+def get_socket_path(project_dir: str) -> str:
+    """Return the evaluator socket path for a project directory.
+
+    Args:
+        project_dir: Project root (normally $CLAUDE_PROJECT_DIR).
+
+    Returns:
+        Absolute socket path string.
+    """
+    return os.path.join(project_dir, ".claude", "guardian", SOCKET_NAME)
+
+
+def send_message(sock: socket.socket, payload: dict) -> None:
+    """Send one length-prefixed JSON message."""
+    data = json.dumps(payload).encode("utf-8")
+    if len(data) > MAX_MESSAGE_BYTES:
+        raise ValueError("message too large")
+    sock.sendall(struct.pack(">I", len(data)) + data)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    chunks = []
+    remaining = size
+    while remaining:
+        chunk = sock.recv(min(remaining, 65536))
+        if not chunk:
+            raise ConnectionError("connection closed mid-message")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+def recv_message(sock: socket.socket) -> dict:
+    """Receive one length-prefixed JSON message.
+
+    Raises:
+        ConnectionError, ValueError: On truncated, oversized or non-object messages.
+    """
+    (size,) = struct.unpack(">I", _recv_exact(sock, 4))
+    if size > MAX_MESSAGE_BYTES:
+        raise ValueError("message too large")
+    payload = json.loads(_recv_exact(sock, size).decode("utf-8"))
+    if not isinstance(payload, dict):
+        raise ValueError("message is not an object")
+    return payload
+
+
+def _evaluator_script_path() -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), "_guardian_evaluator.py")
+
+
+def is_trusted_socket(path: str) -> bool:
+    """Check that the socket file is a socket owned by us and not writable by others.
+
+    Args:
+        path: Socket path.
+
+    Returns:
+        True if the socket may be connected to.
+    """
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    if not stat.S_ISSOCK(st.st_mode):
+        return False
+    if hasattr(os, "getuid") and st.st_uid != os.getuid():
+        return False
+    return not (st.st_mode & (stat.S_IWGRP | stat.S_IWOTH))
+
+
+def is_trusted_peer(sock: socket.socket) -> bool:
+    """Check that the process on the other end is our own evaluator.
+
+    On Linux the peer credentials (SO_PEERCRED) must carry our uid and the
+    peer's command line must be this plugin's _guardian_evaluator.py. Other
+    platforms rely on the socket ownership check in is_trusted_socket().
+
+    Args:
+        sock: Connected Unix socket.
+
+    Returns:
+        True if the peer is trusted.
+    """
+    if not sys.platform.startswith("linux"):
+        return True
+    try:
+        creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+        pid, uid, _gid = struct.unpack("3i", creds)
+        if uid != os.getuid():
+            return False
+        with open(f"/proc/{pid}/cmdline", "rb") as f:
+            argv = f.read().split(b"\x00")
+        if len(argv) < 2:
+            return False
+        script = os.path.join(os.readlink(f"/proc/{pid}/cwd"), os.fsdecode(argv[1]))
+        return os.path.realpath(script) == os.path.realpath(_evaluator_script_path())
+    except (OSError, ValueError, struct.error):
+        return False
+
+
+def connect(project_dir: str, timeout: float = CONNECT_TIMEOUT_SECONDS) -> socket.socket | None:
+    """Connect to the project's evaluator if one is running and trusted.
+
+    Args:
+        project_dir: Project root.
+        timeout: Connect timeout in seconds.
+
+    Returns:
+        Connected socket, or None if unavailable or untrusted.
+    """
+    if not hasattr(socket, "AF_UNIX") or not project_dir:
+        return None
+    path = get_socket_path(project_dir)
+    if not is_trusted_socket(path):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(timeout)
+        sock.connect(path)
+        if not is_trusted_peer(sock):
+            sock.close()
+            return None
+        return sock
+    except (OSError, ValueError):
+        # ValueError: path too long for AF_UNIX on some platforms
+        sock.close()
+        return None
+
+
+def forward_to_evaluator(hook: str) -> bool:
+    """Forward this hook invocation to the resident evaluator.
+
+    Args:
+        hook: Hook name ("bash", "read", "edit" or "write").
+
+    Returns:
+        True if the evaluator answered and its output was printed; the caller
+        should exit. False if the caller must evaluate in-process (sys.stdin
+        is restored with the original input in that case).
+    """
+    project_dir = os.environ.get("CLAUDE_PROJECT_DIR", "")
+    sock = connect(project_dir)
+    if sock is None:
+        # Leave stdin unread: a large Write payload is not copied just to
+        # be handed back to the in-process evaluation
+        return False
+    try:
+        raw = sys.stdin.read()
+    except (OSError, ValueError, UnicodeDecodeError):
+        sock.close()
+        return False
+    sys.stdin = io.StringIO(raw)
+    try:
+        sock.settimeout(RESPONSE_TIMEOUT_SECONDS)
+        send_message(
+            sock,
+            {
+                "v": PROTOCOL_VERSION,
+                "op": "evaluate",
+                "hook": hook,
+                "stdin": raw,
+                "env": {k: os.environ[k] for k in FORWARDED_ENV_VARS if k in os.environ},
+                "cwd": os.getcwd(),
+                "scripts_dir": os.path.dirname(os.path.abspath(__file__)),
+            },
+        )
+        reply = recv_message(sock)
+    except (OSError, ValueError, ConnectionError, UnicodeDecodeError, struct.error):
+        return False
+    finally:
+        sock.close()
+
+    output = reply.get("stdout")
+    if reply.get("v") != PROTOCOL_VERSION or reply.get("ok") is not True or not isinstance(output, str):
+        return False
+    sys.stdout.write(output)
+    sys.stdout.flush()
+    return True
+
+
+def start_evaluator(project_dir: str) -> None:
+    """Spawn a detached evaluator for the project (best effort).
+
+    The evaluator serializes startup with a lock file, so concurrent calls
+    are harmless. All standard streams are detached so Claude Code does not
+    wait on the child.
+
+    Args:
+        project_dir: Project root.
+    """
+    import subprocess
+
+    env = dict(os.environ)
+    env["CLAUDE_PROJECT_DIR"] = project_dir
+    kwargs = {}
+    if os.name == "posix":
+        kwargs["start_new_session"] = True
+    subprocess.Popen(
+        [sys.executable, _evaluator_script_path(), "serve"],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        close_fds=True,
+        cwd=project_dir,
+        env=env,
+        **kwargs,
+    )
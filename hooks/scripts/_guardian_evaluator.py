@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""Resident Guardian Evaluator.
+
+Keeps the guardian modules imported, the config loaded and validated, and
+the block/ask/path patterns compiled in one long-lived process per project,
+so PreToolUse hooks do not pay the interpreter + import + config cold start
+on every tool call.
+
+Design:
+- Listens on $CLAUDE_PROJECT_DIR/.claude/guardian/evaluator.sock (mode 0600)
+- One evaluator per project, serialized by an flock on evaluator.lock
+- Forks a child per request: the child inherits the warm caches, applies the
+  forwarded environment, runs the hook's run() with stdin/stdout captured,
+  and replies with the captured output. Per-request state never leaks back
+  into the parent.
+- Reloads the config when the project/plugin config file changes
+- Exits after evaluator.idleTimeoutSeconds without requests, when the
+  evaluator is disabled in config, or when its own scripts change on disk
+- Never decides anything the in-process hook would not: it runs the same
+  code. On any doubt it closes the connection without a reply and the
+  client falls back to in-process evaluation (fail-closed).
+
+Trust boundary:
+    The socket lives in the project directory, like config.json. Clients
+    only talk to a socket owned by the current user and, on Linux, only to a
+    peer process running this script (SO_PEERCRED + /proc/<pid>/cmdline).
+    A process that can already run arbitrary code as the user could also
+    edit config.json directly, so this does not widen the attack surface.
+
+Usage:
+    python3 _guardian_evaluator.py serve    # run in the foreground
+    python3 _guardian_evaluator.py status   # exit 0 if running
+    python3 _guardian_evaluator.py stop     # ask a running evaluator to exit
+
+Phase: Resident Evaluator
+"""
+
+import io
+import os
+import select
+import signal
+import socket
+import struct
+import sys
+import time
+from pathlib import Path
+
+# Add hooks directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import _guardian_client as client  # noqa: E402
+import _guardian_utils as gu  # noqa: E402
+
+# ============================================================
+# Constants
+# ============================================================
+
+LOCK_NAME = "evaluator.lock"
+"""Lock filename inside .claude/guardian/ (held for the evaluator lifetime)."""
+
+CHILD_TIME_LIMIT_SECONDS = 120
+"""Hard limit for one forked request handler. Well above the hook timeouts;
+only reached if a handler is wedged, after the client has already fallen back."""
+
+POLL_INTERVAL_SECONDS = 1.0
+"""How often the accept loop wakes up to reap children and check idleness."""
+
+HOOK_MODULES = {
+    "bash": "bash_guardian",
+    "read": "read_guardian",
+    "edit": "edit_guardian",
+    "write": "write_guardian",
+}
+"""Hook name (as sent by the client) -> module exposing run()."""
+
+
+# ============================================================
+# Warm State
+# ============================================================
+
+
+def _stat_key(path: str) -> tuple | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+def _config_fingerprint(project_dir: str) -> tuple:
+    """Stat signature of every file the config resolution chain may read."""
+    candidates = [os.path.join(project_dir, ".claude", "guardian", "config.json")]
+    plugin_root = os.environ.get("CLAUDE_PLUGIN_ROOT", "")
+    if plugin_root:
+        candidates.append(os.path.join(plugin_root, "assets", "guardian.default.json"))
+    return tuple(_stat_key(p) for p in candidates)
+
+
+def _code_fingerprint() -> tuple:
+    """Stat signature of the guardian scripts this process has imported."""
+    scripts_dir = Path(__file__).parent
+    return tuple(
+        (p.name, _stat_key(str(p))) for p in sorted(scripts_dir.glob("*.py"))
+    )
+
+
+def _load_hook_modules() -> dict:
+    import importlib
+
+    return {name: importlib.import_module(mod) for name, mod in HOOK_MODULES.items()}
+
+
+def warm_caches(project_dir: str) -> None:
+    """(Re)load the config and exercise the matchers so compiled patterns are cached.
+
+    Args:
+        project_dir: Project root.
+    """
+    gu._config_cache = None
+    gu._using_fallback_config = False
+    gu._active_config_path = None
+    gu.load_guardian_config()
+    gu.match_block_patterns("true")
+    gu.match_ask_patterns("true")
+    probe = os.path.join(project_dir, ".guardian-evaluator-warmup")
+    gu.classify_path(probe)
+
+
+# ============================================================
+# Request Handling (runs in the forked child)
+# ============================================================
+
+
+def _peer_uid_ok(conn: socket.socket) -> bool:
+    if not sys.platform.startswith("linux"):
+        return True  # Socket mode 0600 already restricts connections
+    try:
+        creds = conn.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+        return struct.unpack("3i", creds)[1] == os.getuid()
+    except OSError:
+        return False
+
+
+def _evaluate(request: dict, project_dir: str, hooks: dict) -> dict | None:
+    """Run one forwarded hook invocation.
+
+    Returns:
+        Reply dict, or None to refuse (the client then evaluates in-process).
+    """
+    hook = request.get("hook")
+    raw = request.get("stdin")
+    env = request.get("env")
+    cwd = request.get("cwd")
+    if hook not in hooks or not isinstance(raw, str) or not isinstance(env, dict):
+        return None
+    if not isinstance(cwd, str):
+        return None
+
+    # The warm state belongs to one project and one copy of the scripts.
+    if os.path.realpath(str(env.get("CLAUDE_PROJECT_DIR", ""))) != os.path.realpath(project_dir):
+        return None
+    if str(env.get("CLAUDE_PLUGIN_ROOT", "")) != os.environ.get("CLAUDE_PLUGIN_ROOT", ""):
+        return None
+    scripts_dir = request.get("scripts_dir")
+    if not isinstance(scripts_dir, str) or os.path.realpath(scripts_dir) != os.path.realpath(
+        str(Path(__file__).parent)
+    ):
+        return None
+
+    for name in client.FORWARDED_ENV_VARS:
+        value = env.get(name)
+        if isinstance(value, str):
+            os.environ[name] = value
+        else:
+            os.environ.pop(name, None)
+    try:
+        os.chdir(cwd)
+    except OSError:
+        return None
+
+    captured = io.StringIO()
+    sys.stdin = io.StringIO(raw)
+    sys.stdout = captured
+    exit_code = 0
+    try:
+        hooks[hook].run()
+    except SystemExit as e:
+        exit_code = 0 if e.code is None else e.code if isinstance(e.code, int) else 1
+    finally:
+        sys.stdout = sys.__stdout__
+    if exit_code != 0:
+        return None
+    return {"v": client.PROTOCOL_VERSION, "ok": True, "stdout": captured.getvalue()}
+
+
+def _handle_connection(conn: socket.socket, project_dir: str, hooks: dict) -> None:
+    """Serve one connection. Runs in the forked child."""
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    if hasattr(signal, "alarm"):
+        signal.alarm(CHILD_TIME_LIMIT_SECONDS)
+    if not _peer_uid_ok(conn):
+        return
+    conn.settimeout(client.RESPONSE_TIMEOUT_SECONDS)
+    request = client.recv_message(conn)
+    if request.get("v") != client.PROTOCOL_VERSION:
+        return
+
+    op = request.get("op")
+    if op == "ping":
+        reply = {"v": client.PROTOCOL_VERSION, "ok": True, "pid": os.getppid()}
+    elif op == "shutdown":
+        os.kill(os.getppid(), signal.SIGTERM)
+        reply = {"v": client.PROTOCOL_VERSION, "ok": True}
+    elif op == "evaluate":
+        reply = _evaluate(request, project_dir, hooks)
+    else:
+        reply = None
+    if reply is not None:
+        client.send_message(conn, reply)
+
+
+# ============================================================
+# Server Loop
+# ============================================================
+
+
+def _reap_children() -> None:
+    try:
+        while True:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                return
+    except ChildProcessError:
+        return
+
+
+def serve(project_dir: str) -> int:
+    """Run the evaluator for a project until idle, disabled, or stopped.
+
+    Args:
+        project_dir: Project root.
+
+    Returns:
+        Process exit code (0 also when another evaluator already runs).
+    """
+    import fcntl
+
+    guardian_dir = Path(project_dir) / ".claude" / "guardian"
+    guardian_dir.mkdir(parents=True, exist_ok=True)
+
+    lock_fd = os.open(str(guardian_dir / LOCK_NAME), os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        os.close(lock_fd)
+        return 0  # Another evaluator owns this project
+
+    sock_path = client.get_socket_path(project_dir)
+    stopping = False
+
+    def _on_term(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, _on_term)
+    signal.signal(signal.SIGINT, _on_term)
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        try:
+            os.unlink(sock_path)
+        except FileNotFoundError:
+            pass
+        old_umask = os.umask(0o077)
+        try:
+            server.bind(sock_path)
+        finally:
+            os.umask(old_umask)
+        server.listen(64)
+
+        hooks = _load_hook_modules()
+        warm_caches(project_dir)
+        config_fp = _config_fingerprint(project_dir)
+        code_fp = _code_fingerprint()
+        last_request = time.monotonic()
+        gu.log_guardian("INFO", f"Resident evaluator listening (pid {os.getpid()})")
+
+        while not stopping:
+            _reap_children()
+            current_fp = _config_fingerprint(project_dir)
+            if current_fp != config_fp:
+                warm_caches(project_dir)
+                config_fp = current_fp
+                gu.log_guardian("INFO", "Config changed - resident evaluator reloaded")
+            settings = gu.get_evaluator_config()
+            if settings.get("enabled") is not True:
+                gu.log_guardian("INFO", "Resident evaluator disabled in config - exiting")
+                break
+            idle_limit = settings.get("idleTimeoutSeconds")
+            if isinstance(idle_limit, bool) or not isinstance(idle_limit, (int, float)) or idle_limit <= 0:
+                idle_limit = gu.EVALUATOR_DEFAULT_IDLE_TIMEOUT_SECONDS
+            if time.monotonic() - last_request > idle_limit:
+                gu.log_guardian("INFO", "Resident evaluator idle - exiting")
+                break
+
+            try:
+                ready, _, _ = select.select([server], [], [], POLL_INTERVAL_SECONDS)
+            except InterruptedError:
+                continue
+            if not ready:
+                continue
+            try:
+                conn, _ = server.accept()
+            except OSError:
+                continue
+            last_request = time.monotonic()
+
+            # Stale code would evaluate with yesterday's rules: refuse and exit.
+            if _code_fingerprint() != code_fp:
+                conn.close()
+                gu.log_guardian("INFO", "Guardian scripts changed - resident evaluator exiting")
+                break
+            current_fp = _config_fingerprint(project_dir)
+            if current_fp != config_fp:
+                warm_caches(project_dir)
+                config_fp = current_fp
+                gu.log_guardian("INFO", "Config changed - resident evaluator reloaded")
+            settings = gu.get_evaluator_config()
+            if settings.get("enabled") is not True:
+                conn.close()
+                gu.log_guardian("INFO", "Resident evaluator disabled in config - exiting")
+                break
+
+            pid = os.fork()
+            if pid == 0:
+                server.close()
+                code = 0
+                try:
+                    _handle_connection(conn, project_dir, hooks)
+                except BaseException:
+                    code = 1
+                finally:
+                    try:
+                        conn.close()
+                    finally:
+                        os._exit(code)
+            conn.close()
+    finally:
+        server.close()
+        try:
+            os.unlink(sock_path)
+        except OSError:
+            pass
+        os.close(lock_fd)
+    return 0
+
+
+def request(project_dir: str, op: str) -> dict | None:
+    """Send a control request ("ping" or "shutdown") to a running evaluator.
+
+    Returns:
+        The reply dict, or None if no trusted evaluator answered.
+    """
+    sock = client.connect(project_dir)
+    if sock is None:
+        return None
+    try:
+        sock.settimeout(client.RESPONSE_TIMEOUT_SECONDS)
+        client.send_message(sock, {"v": client.PROTOCOL_VERSION, "op": op})
+        return client.recv_message(sock)
+    except (OSError, ValueError, struct.error):
+        return None
+    finally:
+        sock.close()
+
+
+def main(argv: list[str]) -> int:
+    """Command-line entry point."""
+    command = argv[0] if argv else "status"
+    project_dir = gu.get_project_dir()
+    if not project_dir:
+        print("CLAUDE_PROJECT_DIR is not set or not a directory", file=sys.stderr)
+        return 2
+    if command == "serve":
+        return serve(project_dir)
+    if command == "status":
+        reply = request(project_dir, "ping")
+        if reply and reply.get("ok"):
+            print(f"running (pid {reply.get('pid')})")
+            return 0
+        print("not running")
+        return 1
+    if command == "stop":
+        reply = request(project_dir, "shutdown")
+        print("stopped" if reply and reply.get("ok") else "not running")
+        return 0
+    print(f"Unknown command: {command} (expected serve, status or stop)", file=sys.stderr)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
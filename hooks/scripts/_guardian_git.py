@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+"""Native .git reader for the guardian's git queries.
+
+Answers "is this path tracked?", "is HEAD detached?", "what is HEAD?" and
+"where is the git directory?" from the files under .git, without forking
+a git subprocess (5-20 ms each; bash_guardian asks once per delete target).
+
+Supported layout:
+- Repository found by walking up from the project directory, with .git a
+  directory or a "gitdir: <path>" file (worktrees, submodules); linked
+  worktrees share refs and config through <git dir>/commondir
+- HEAD, loose refs and packed-refs (symbolic refs followed)
+- The binary index, versions 2-4 (v4 prefix-compressed paths), SHA-1 or
+  SHA-256 object names. The index is memory-mapped and its path table is
+  parsed lazily, only as far as the sorted order requires for a query;
+  lookups then bisect the parsed table.
+
+Anything this reader does not model raises GitUnsupported, and the caller
+falls back to the git subprocess: GIT_* environment overrides, includes in
+the repository config, core.ignorecase, core.worktree, split or sparse
+indexes, reftable refs, unknown formats, pathspec magic characters in a
+path, a symlink or submodule in front of a path, or any malformed file.
+
+This module is pure (standard library only, no config, no logging) so any
+guardian module can import it.
+"""
+
+import bisect
+import mmap
+import os
+import re
+import struct
+
+# ============================================================
+# Repository Discovery
+# ============================================================
+
+
+class GitUnsupported(Exception):
+    """The repository uses something this reader does not model."""
+
+
+_GIT_ENV_OVERRIDES = (
+    "GIT_DIR", "GIT_WORK_TREE", "GIT_INDEX_FILE", "GIT_COMMON_DIR",
+    "GIT_CEILING_DIRECTORIES", "GIT_DISCOVERY_ACROSS_FILESYSTEM",
+    "GIT_OBJECT_DIRECTORY", "GIT_CONFIG_PARAMETERS", "GIT_CONFIG_COUNT",
+)
+
+_HEX_RE = re.compile(r"^(?:[0-9a-f]{40}|[0-9a-f]{64})$")
+
+# Per-worktree refs live in the worktree's git dir, everything else in the
+# common dir (see gitrepository-layout(5))
+_PER_WORKTREE_REF_RE = re.compile(r"^(?:[A-Z_]+|refs/(?:bisect|worktree|rewritten)/.*)$")
+
+_MAX_SYMREF_DEPTH = 5
+
+_PATHSPEC_MAGIC_RE = re.compile(r"[*?\[\\]|^:")
+
+
+def _read_text(path: str) -> str:
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def _parse_config(text: str) -> dict[str, str]:
+    """Flatten a git config file into {"section.key": value} (lowercased).
+
+    Only the subset needed here: subsections, includes and multi-line
+    values raise GitUnsupported.
+    """
+    values: dict[str, str] = {}
+    section = ""
+    for raw in text.splitlines():
+        line = raw.strip()
+        if not line or line[0] in "#;":
+            continue
+        if line.startswith("["):
+            header = line[1:line.find("]")].strip().lower()
+            if header.startswith("include") or line.find("]") < 0:
+                raise GitUnsupported(f"config section [{header}]")
+            section = header.split()[0] if header else ""
+            if '"' in header:
+                section = f"{section}.sub"  # [remote "origin"], [branch "x"]
+            continue
+        if line.endswith("\\"):
+            raise GitUnsupported("multi-line config value")
+        key, eq, value = line.partition("=")
+        value = value.split("#", 1)[0].split(";", 1)[0].strip().strip('"')
+        values[f"{section}.{key.strip().lower()}"] = value.lower() if eq else "true"
+    return values
+
+
+def _is_true(value: str | None) -> bool:
+    return value in ("true", "yes", "on", "1")
+
+
+class GitRepo:
+    """A repository's work tree and git directories, read natively.
+
+    Attributes:
+        work_tree: Resolved top-level directory of the work tree.
+        git_dir: The work tree's git directory (.git, or the worktree's
+            directory under <common dir>/worktrees/).
+        common_dir: Directory holding refs, objects and config.
+    """
+
+    __slots__ = ("work_tree", "git_dir", "common_dir", "_hash_len", "_index", "_index_key")
+
+    def __init__(self, work_tree: str, git_dir: str):
+        self.work_tree = work_tree
+        self.git_dir = git_dir
+        commondir_file = os.path.join(git_dir, "commondir")
+        if os.path.isfile(commondir_file):
+            common = _read_text(commondir_file).strip()
+            self.common_dir = os.path.normpath(os.path.join(git_dir, common))
+        else:
+            self.common_dir = git_dir
+        try:
+            config = _parse_config(_read_text(os.path.join(self.common_dir, "config")))
+        except OSError as e:
+            raise GitUnsupported(f"unreadable config: {e}") from e
+        if _is_true(config.get("core.bare")):
+            raise GitUnsupported("bare repository")
+        for key in ("core.ignorecase", "core.splitindex", "index.sparse",
+                    "extensions.worktreeconfig"):
+            if _is_true(config.get(key)):
+                raise GitUnsupported(key)
+        if "core.worktree" in config:
+            raise GitUnsupported("core.worktree")
+        if config.get("extensions.refstorage", "files") != "files":
+            raise GitUnsupported("extensions.refStorage")
+        object_format = config.get("extensions.objectformat", "sha1")
+        if object_format not in ("sha1", "sha256"):
+            raise GitUnsupported(f"object format {object_format}")
+        self._hash_len = 32 if object_format == "sha256" else 20
+        if any(name.startswith("sharedindex.") for name in os.listdir(git_dir)):
+            raise GitUnsupported("split index")
+        self._index: _IndexTable | None = None
+        self._index_key: tuple[int, int, int] | None = None
+
+    # ---------- HEAD and refs ----------
+
+    def _read_ref_file(self, name: str) -> str | None:
+        base = self.git_dir if _PER_WORKTREE_REF_RE.match(name) else self.common_dir
+        try:
+            return _read_text(os.path.join(base, name)).strip()
+        except FileNotFoundError:
+            return None
+        except NotADirectoryError:
+            return None
+        except OSError as e:
+            raise GitUnsupported(f"unreadable ref {name}: {e}") from e
+
+    def _packed_ref(self, name: str) -> str | None:
+        try:
+            text = _read_text(os.path.join(self.common_dir, "packed-refs"))
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            raise GitUnsupported(f"unreadable packed-refs: {e}") from e
+        for line in text.splitlines():
+            if not line or line[0] in "#^":
+                continue
+            sha, _, ref = line.partition(" ")
+            if ref == name:
+                if not _HEX_RE.match(sha):
+                    raise GitUnsupported(f"malformed packed ref {name}")
+                return sha
+        return None
+
+    def head_ref(self) -> str | None:
+        """Branch HEAD points at ("refs/heads/main"), or None if detached."""
+        head = self._read_ref_file("HEAD")
+        if head is None:
+            raise GitUnsupported("missing HEAD")
+        if head.startswith("ref: "):
+            return head[5:].strip()
+        if _HEX_RE.match(head):
+            return None
+        raise GitUnsupported("malformed HEAD")
+
+    def is_detached(self) -> bool:
+        """True if HEAD holds a commit id instead of a branch name."""
+        return self.head_ref() is None
+
+    def head_commit(self) -> str | None:
+        """Full commit id HEAD resolves to, or None on an unborn branch."""
+        name = "HEAD"
+        for _ in range(_MAX_SYMREF_DEPTH):
+            value = self._read_ref_file(name)
+            if value is None:
+                return self._packed_ref(name)
+            if value.startswith("ref: "):
+                name = value[5:].strip()
+                continue
+            if not _HEX_RE.match(value):
+                raise GitUnsupported(f"malformed ref {name}")
+            return value
+        raise GitUnsupported("symbolic ref loop")
+
+    # ---------- Index ----------
+
+    def _index_table(self) -> "_IndexTable":
+        path = os.path.join(self.git_dir, "index")
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return _EMPTY_INDEX
+        key = (st.st_mtime_ns, st.st_size, st.st_ino)
+        if self._index is None or self._index_key != key:
+            self._index = _IndexTable(path, self._hash_len)
+            self._index_key = key
+        return self._index
+
+    def is_tracked(self, path: str, cwd: str) -> bool:
+        """Answer `git ls-files --error-unmatch <path>` (run in cwd).
+
+        Args:
+            path: Path as given to git (absolute or relative to cwd).
+            cwd: Directory git would run in.
+
+        Returns:
+            True if path is an index entry or a directory above one.
+        """
+        if _PATHSPEC_MAGIC_RE.search(path) or path.endswith(("/", os.sep)):
+            raise GitUnsupported("pathspec magic")
+        full = os.path.abspath(os.path.join(cwd, path))
+        cwd_abs = os.path.abspath(cwd)
+        if full == cwd_abs or full.startswith(cwd_abs.rstrip(os.sep) + os.sep):
+            full = os.path.realpath(cwd_abs) + full[len(cwd_abs):]
+        parent = os.path.dirname(full)
+        if os.path.realpath(parent) != parent:
+            raise GitUnsupported("symlink in leading path")
+        rel = os.path.relpath(full, self.work_tree)
+        if rel == os.pardir or rel.startswith(os.pardir + os.sep):
+            return False  # Outside the repository: git fails
+        if rel == os.curdir:
+            return len(self._index_table()) > 0
+        name = os.fsencode(rel.replace(os.sep, "/"))
+        index = self._index_table()
+        component_end = name.find(b"/")
+        while component_end >= 0:
+            if index.contains(name[:component_end]):
+                raise GitUnsupported("path below a tracked symlink or submodule")
+            component_end = name.find(b"/", component_end + 1)
+        return index.contains(name) or index.contains_prefix(name + b"/")
+
+
+# ============================================================
+# Index Parsing
+# ============================================================
+# Header: "DIRC", version, entry count. Each entry: 40 bytes of stat data
+# (mode at offset 24), the object id, 16-bit flags (low 12 bits: name length,
+# 0x4000: extended flags follow in v3+), then the path. v2/v3 paths are
+# NUL-terminated and padded to a multiple of 8 bytes; v4 paths store a
+# varint count of bytes to drop from the previous path, then the
+# NUL-terminated suffix. Entries are sorted by path bytes.
+
+_INDEX_HEADER = struct.Struct(">4sLL")
+
+
+class _IndexTable:
+    """Sorted index paths, parsed from the mapped file on demand."""
+
+    __slots__ = ("names", "_data", "_version", "_fixed", "_offset", "_remaining", "_error")
+
+    def __init__(self, path: str, hash_len: int):
+        self.names: list[bytes] = []
+        self._data: mmap.mmap | bytes = b""
+        self._offset = 0
+        self._remaining = 0
+        self._version = 2
+        self._fixed = 40 + hash_len
+        self._error: GitUnsupported | None = None
+        if not path:
+            return
+        try:
+            with open(path, "rb") as f:
+                self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise GitUnsupported(f"unreadable index: {e}") from e
+        if len(self._data) < _INDEX_HEADER.size + hash_len:
+            raise GitUnsupported("truncated index")
+        signature, self._version, self._remaining = _INDEX_HEADER.unpack_from(self._data)
+        if signature != b"DIRC" or self._version not in (2, 3, 4):
+            raise GitUnsupported(f"index version {self._version}")
+        self._offset = _INDEX_HEADER.size
+
+    def __len__(self) -> int:
+        self._parse_until(None)
+        return len(self.names)
+
+    def _parse_until(self, bound: bytes | None) -> None:
+        """Parse entries until one sorts at or after bound (None: all)."""
+        if self._error is not None:
+            raise self._error
+        if not self._remaining or (bound is not None and self.names and self.names[-1] >= bound):
+            return
+        try:
+            self._parse(bound)
+        except GitUnsupported as e:
+            self._error = e
+            raise
+        except (struct.error, IndexError) as e:
+            self._error = GitUnsupported("truncated index")
+            raise self._error from e
+
+    def _parse(self, bound: bytes | None) -> None:
+        data = self._data
+        names = self.names
+        fixed = self._fixed
+        v4 = self._version == 4
+        extended_ok = self._version >= 3
+        offset = self._offset
+        remaining = self._remaining
+        try:
+            while remaining and (bound is None or not names or names[-1] < bound):
+                # Object type is the high nibble of the mode's third byte
+                if data[offset + 26] & 0xF0 == 0x40 and not data[offset + 24] | data[offset + 25]:
+                    raise GitUnsupported("sparse directory entry")
+                flags_hi = data[offset + fixed]
+                start = offset + fixed + 2
+                if flags_hi & 0x40:
+                    if not extended_ok:
+                        raise GitUnsupported("extended flags in v2 index")
+                    start += 2
+                if v4:
+                    drop, start = _read_varint(data, start)
+                    end = data.find(b"\0", start)
+                    previous = names[-1] if names else b""
+                    if end < 0 or drop > len(previous):
+                        raise GitUnsupported("malformed v4 entry")
+                    names.append(previous[: len(previous) - drop] + data[start:end])
+                    offset = end + 1
+                else:
+                    length = (flags_hi & 0x0F) << 8 | data[offset + fixed + 1]
+                    end = data.find(b"\0", start) if length == 0xFFF else start + length
+                    if end < 0 or data[end]:
+                        raise GitUnsupported("malformed index entry")
+                    names.append(data[start:end])
+                    offset += (end - offset + 8) & ~7
+                remaining -= 1
+        finally:
+            self._offset = offset
+            self._remaining = remaining
+        if offset > len(data):
+            raise GitUnsupported("truncated index")
+
+    def contains(self, name: bytes) -> bool:
+        self._parse_until(name + b"\0")
+        i = bisect.bisect_left(self.names, name)
+        return i < len(self.names) and self.names[i] == name
+
+    def contains_prefix(self, prefix: bytes) -> bool:
+        self._parse_until(prefix[:-1] + bytes([prefix[-1] + 1]))
+        i = bisect.bisect_left(self.names, prefix)
+        return i < len(self.names) and self.names[i].startswith(prefix)
+
+
+_EMPTY_INDEX = _IndexTable("", 20)
+
+
+def _read_varint(data: mmap.mmap | bytes, offset: int) -> tuple[int, int]:
+    """Decode git's offset varint (each continuation adds 1 before shifting)."""
+    byte = data[offset]
+    offset += 1
+    value = byte & 0x7F
+    while byte & 0x80:
+        byte = data[offset]
+        offset += 1
+        value = ((value + 1) << 7) | (byte & 0x7F)
+    return value, offset
+
+
+# ============================================================
+# Public API
+# ============================================================
+
+_repo_cache: dict[str, GitRepo | GitUnsupported] = {}
+
+
+def find_git_repo(project_dir: str) -> GitRepo:
+    """Find the repository containing project_dir, as git would from there.
+
+    Args:
+        project_dir: Directory git commands run in.
+
+    Returns:
+        GitRepo (cached per project_dir).
+
+    Raises:
+        GitUnsupported: If discovery cannot be reproduced natively, or no
+            repository was found (the caller's git fallback reports that).
+    """
+    cached = _repo_cache.get(project_dir)
+    if cached is None:
+        try:
+            cached = _discover(project_dir)
+        except GitUnsupported as e:
+            cached = e
+        except (OSError, UnicodeDecodeError, ValueError) as e:
+            cached = GitUnsupported(f"{type(e).__name__}: {e}")
+        _repo_cache[project_dir] = cached
+    if isinstance(cached, GitUnsupported):
+        raise cached
+    return cached
+
+
+def _discover(project_dir: str) -> GitRepo:
+    if any(var in os.environ for var in _GIT_ENV_OVERRIDES):
+        raise GitUnsupported("GIT_* environment override")
+    directory = os.path.realpath(project_dir)
+    device = os.stat(directory).st_dev
+    while True:
+        dot_git = os.path.join(directory, ".git")
+        if os.path.isdir(dot_git):
+            git_dir = dot_git
+            break
+        if os.path.isfile(dot_git):
+            text = _read_text(dot_git).strip()
+            if not text.startswith("gitdir: "):
+                raise GitUnsupported("malformed .git file")
+            git_dir = os.path.realpath(os.path.join(directory, text[8:].strip()))
+            break
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            raise GitUnsupported("not a git repository")
+        if os.stat(parent).st_dev != device:
+            raise GitUnsupported("discovery would cross a filesystem boundary")
+        directory = parent
+    if not os.path.isfile(os.path.join(git_dir, "HEAD")):
+        raise GitUnsupported("git directory without HEAD")
+    if hasattr(os, "geteuid") and os.stat(directory).st_uid != os.geteuid():
+        raise GitUnsupported("repository owned by another user (safe.directory)")
+    return GitRepo(directory, git_dir)
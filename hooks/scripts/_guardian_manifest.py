@@ -0,0 +1,497 @@
+#!/usr/bin/env python3
+"""Protected-File Manifest.
+
+Lists every existing file and directory in the project that matches
+zeroAccessPaths, readOnlyPaths or noDeletePaths, so hooks can answer "does
+this directory target contain protected files?" with lookups instead of
+walking the tree on every tool call.
+
+Design:
+- Stored at $CLAUDE_PROJECT_DIR/.claude/guardian/protected-manifest.json,
+  one record per directory: [mtime_ns, covered tier mask, entry count,
+  {name: tier mask} of protected entries, [subdirectory names]]
+- Tier masks are bit sets over MANIFEST_TIERS
+- A directory below a "<literal dir>/**" pattern (node_modules/**, .git/**)
+  is "covered" by that tier: its entries are counted, not listed
+- refresh(subtree) lstat()s each recorded directory below subtree and
+  rescans only directories whose mtime changed. Adding, removing or
+  renaming an entry changes its directory's mtime; file contents never
+  affect classification. Directories modified within the racy window of
+  the scan are rescanned on the next refresh.
+- New or changed directories are listed in parallel (os.scandir releases
+  the GIL); symlinked directories are not followed, and symlinks are
+  classified by their target like the hooks do
+- Keyed by the path patterns, home directory, platform and resolved
+  project dir; any change rebuilds the manifest from scratch
+- Opt-in (protectedManifest.enabled). The hooks only refresh the subtree
+  they are asked about, so the first query under a large directory pays
+  for its walk once; `build` walks the whole project ahead of time.
+  Recursive-read checks refresh within the globExpansion budget and ask
+  when it runs out; the partial refresh is saved and resumed next time.
+
+Usage:
+    python3 _guardian_manifest.py build   # build or refresh the manifest
+    python3 _guardian_manifest.py show    # print protected entries (audit)
+
+Phase: Protected Manifest
+"""
+
+import bisect
+import hashlib
+import json
+import os
+import stat
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+# Add hooks directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import _guardian_utils as gu  # noqa: E402
+
+# ============================================================
+# Constants
+# ============================================================
+
+MANIFEST_NAME = "protected-manifest.json"
+"""Manifest filename inside .claude/guardian/."""
+
+MANIFEST_FORMAT = 1
+"""Bump when the record layout changes."""
+
+MANIFEST_TIERS = ("zeroAccess", "readOnly", "noDelete")
+"""Tiers recorded in the manifest; bit i of a tier mask is MANIFEST_TIERS[i]."""
+
+SCAN_WORKERS = 8
+"""Threads listing directories during a refresh."""
+
+_MANIFEST_DIR = ".claude/guardian"
+"""Project-relative directory holding the manifest."""
+
+# Record fields
+_MTIME, _COVERED, _COUNT, _PROTECTED, _SUBDIRS = range(5)
+
+
+def tier_mask(tiers: Any) -> int:
+    """Bit set of the MANIFEST_TIERS in tiers."""
+    return sum(1 << i for i, tier in enumerate(MANIFEST_TIERS) if tier in tiers)
+
+
+def mask_tiers(mask: int) -> list[str]:
+    """MANIFEST_TIERS names set in mask."""
+    return [tier for i, tier in enumerate(MANIFEST_TIERS) if mask & (1 << i)]
+
+
+def get_manifest_config() -> dict[str, Any]:
+    """Get protectedManifest section from config.
+
+    Returns:
+        protectedManifest dict with defaults applied (disabled by default).
+    """
+    config = gu.load_guardian_config()
+    defaults = {"enabled": False}
+    section = config.get("protectedManifest", {})
+    if not isinstance(section, dict):
+        return defaults
+    return {**defaults, **section}
+
+
+# ============================================================
+# Manifest
+# ============================================================
+
+
+def _join(rel_dir: str, name: str) -> str:
+    return f"{rel_dir}/{name}" if rel_dir else name
+
+
+def _list_directory(path: str) -> tuple[list[tuple[str, bool]], list[str]] | None:
+    """Entries of one directory: ([(name, is_symlink)] non-directories, [subdirs]).
+
+    Returns:
+        None if the directory cannot be listed.
+    """
+    entries: list[tuple[str, bool]] = []
+    subdirs: list[str] = []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.name)
+                    else:
+                        entries.append((entry.name, entry.is_symlink()))
+                except OSError:
+                    entries.append((entry.name, True))  # Classify via full resolution
+    except OSError:
+        return None
+    return entries, subdirs
+
+
+class Manifest:
+    """Protected entries of one project, one record per directory (see above)."""
+
+    def __init__(self, root: str, classifier: gu.PathClassifier, header: dict[str, Any],
+                 dirs: dict[str, list] | None = None):
+        self.root = root
+        self.classifier = classifier
+        self.header = header
+        self.dirs: dict[str, list] = dirs if dirs is not None else {}
+        self.changed = False
+        self._index: tuple[list[str], list[list[int]]] | None = None
+
+    def _abs(self, rel_dir: str) -> str:
+        return os.path.join(self.root, *rel_dir.split("/")) if rel_dir else self.root
+
+    def _forget(self, rel_dir: str) -> None:
+        """Drop the record of rel_dir and everything below it."""
+        below = rel_dir + "/"
+        for key in [k for k in self.dirs if k == rel_dir or not rel_dir or k.startswith(below)]:
+            del self.dirs[key]
+            self.changed = True
+
+    def _record(self, rel_dir: str, mtime_ns: int, listing: Any) -> list:
+        path = self._abs(rel_dir)
+        if listing is None:
+            gu.log_guardian("WARN", f"Manifest: cannot list {rel_dir or '.'}")
+            return [0, 0, -1, {}, []]
+        entries, subdirs = listing
+        covered = tier_mask(self.classifier.covered_tiers(path, resolved=True))
+        wanted = [tier for tier in MANIFEST_TIERS if not tier_mask((tier,)) & covered]
+        protected: dict[str, int] = {}
+        if wanted:
+            for name, is_link in entries + [(name, False) for name in subdirs]:
+                tiers = self.classifier.classify(
+                    os.path.join(path, name), wanted, resolved=not is_link
+                )
+                mask = tier_mask(tiers)
+                if mask:
+                    protected[name] = mask
+        if time.time_ns() - mtime_ns < gu.COMPILED_CONFIG_RACY_WINDOW_NS:
+            mtime_ns = 0  # Too recent to trust: rescan next time
+        return [mtime_ns, covered, len(entries) + len(subdirs), protected, sorted(subdirs)]
+
+    def refresh(self, rel_dir: str = "", max_entries: int | None = None,
+                deadline: float | None = None) -> bool:
+        """Bring the records of rel_dir and every directory below it up to date.
+
+        Args:
+            rel_dir: Project-relative directory ("" for the whole project).
+            max_entries: Stop after this many directories were checked and
+                entries listed (None: no limit).
+            deadline: Stop once time.monotonic() passes this (None: no limit).
+
+        Returns:
+            True if the subtree is up to date; False if the budget ran out.
+            Records refreshed so far are kept, so the next refresh resumes
+            where this one stopped.
+        """
+        # Imported here: bash_guardian loads this module on every call
+        from concurrent.futures import ThreadPoolExecutor
+
+        self._index = None
+        scanned = 0
+
+        def exhausted() -> bool:
+            return ((max_entries is not None and scanned > max_entries)
+                    or (deadline is not None and time.monotonic() > deadline))
+
+        level = [rel_dir]
+        with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as pool:
+            while level:
+                next_level: list[str] = []
+                stale: list[tuple[str, int]] = []
+                for rel in level:
+                    scanned += 1
+                    if exhausted():
+                        return False
+                    try:
+                        st = os.lstat(self._abs(rel))
+                    except OSError:
+                        st = None
+                    if st is None or not stat.S_ISDIR(st.st_mode):
+                        self._forget(rel)
+                        continue
+                    record = self.dirs.get(rel)
+                    if record is not None and record[_MTIME] == st.st_mtime_ns:
+                        next_level += [_join(rel, name) for name in record[_SUBDIRS]]
+                    else:
+                        stale.append((rel, st.st_mtime_ns))
+                listings = pool.map(_list_directory, [self._abs(rel) for rel, _ in stale])
+                for (rel, mtime_ns), listing in zip(stale, listings):
+                    old = self.dirs.get(rel)
+                    record = self._record(rel, mtime_ns, listing)
+                    if old is not None:
+                        for name in set(old[_SUBDIRS]).difference(record[_SUBDIRS]):
+                            self._forget(_join(rel, name))
+                    self.dirs[rel] = record
+                    if old is None or old[_MTIME + 1 :] != record[_MTIME + 1 :]:
+                        self.changed = True
+                    elif record[_MTIME] and rel != _MANIFEST_DIR:
+                        # Saving the manifest changes its own directory's mtime;
+                        # recording that would rewrite the manifest on every refresh
+                        self.changed = True
+                    next_level += [_join(rel, name) for name in record[_SUBDIRS]]
+                    scanned += max(record[_COUNT], 0)
+                    if exhausted():
+                        pool.shutdown(wait=False, cancel_futures=True)
+                        return False
+                level = next_level
+        return True
+
+    def _totals(self) -> tuple[list[str], list[list[int]]]:
+        """Sorted record keys and per-tier prefix sums of protected entries."""
+        if self._index is None:
+            keys = sorted(self.dirs)
+            totals = [[0] * (len(MANIFEST_TIERS) + 1)]
+            for key in keys:
+                row = list(totals[-1])
+                record = self.dirs[key]
+                for i in range(len(MANIFEST_TIERS)):
+                    bit = 1 << i
+                    if record[_COVERED] & bit:
+                        row[i] += max(record[_COUNT], 0)
+                    else:
+                        row[i] += sum(1 for mask in record[_PROTECTED].values() if mask & bit)
+                row[-1] += record[_COUNT] < 0
+                totals.append(row)
+            self._index = (keys, totals)
+        return self._index
+
+    def _subtree_ranges(self, rel_dir: str) -> list[tuple[int, int]]:
+        """[lo, hi) ranges of sorted record keys for rel_dir and its descendants."""
+        keys = self._totals()[0]
+        if not rel_dir:
+            return [(0, len(keys))]
+        # Descendants share the prefix "a/" and sort together ("0" follows "/");
+        # siblings such as "a-b" may sort between "a" and "a/"
+        ranges = [(bisect.bisect_left(keys, rel_dir + "/"),
+                   bisect.bisect_left(keys, rel_dir + "0"))]
+        own = bisect.bisect_left(keys, rel_dir)
+        if own < len(keys) and keys[own] == rel_dir:
+            ranges.insert(0, (own, own + 1))
+        return ranges
+
+    def subtree_counts(self, rel_dir: str = "") -> dict[str, int]:
+        """Protected entries below rel_dir, from the records (no filesystem access).
+
+        Args:
+            rel_dir: Project-relative directory ("" for the whole project).
+
+        Returns:
+            {tier: count} for MANIFEST_TIERS, plus "unreadable": number of
+            directories that could not be listed.
+        """
+        totals = self._totals()[1]
+        sums = [0] * (len(MANIFEST_TIERS) + 1)
+        for lo, hi in self._subtree_ranges(rel_dir):
+            for i in range(len(sums)):
+                sums[i] += totals[hi][i] - totals[lo][i]
+        counts = dict(zip(MANIFEST_TIERS, sums))
+        counts["unreadable"] = sums[-1]
+        return counts
+
+    def entries(self, rel_dir: str = "") -> list[tuple[str, list[str]]]:
+        """Protected entries below rel_dir: [(relative path, tiers)].
+
+        Entries of covered directories are reported once, as "<dir>/**".
+        """
+        keys = self._totals()[0]
+        result = []
+        for key in (keys[i] for lo, hi in self._subtree_ranges(rel_dir) for i in range(lo, hi)):
+            record = self.dirs[key]
+            parent = key.rpartition("/")[0]
+            inherited = self.dirs[parent][_COVERED] if key and parent in self.dirs else 0
+            covered = record[_COVERED] & ~inherited
+            if covered:
+                result.append((_join(key, "**"), mask_tiers(covered)))
+            for name, mask in sorted(record[_PROTECTED].items()):
+                suffix = "/" if name in record[_SUBDIRS] else ""
+                result.append((_join(key, name) + suffix, mask_tiers(mask)))
+        return sorted(result)
+
+
+# ============================================================
+# Storage
+# ============================================================
+
+
+def _manifest_path(project_dir: str) -> Path:
+    return Path(project_dir, *_MANIFEST_DIR.split("/"), MANIFEST_NAME)
+
+
+def _manifest_header(project_dir: str, root: str, config: dict) -> dict[str, Any]:
+    """Everything outside the tree that the recorded classifications depend on."""
+    sections = {tier: config.get(gu.PATH_TIERS[tier], []) for tier in MANIFEST_TIERS}
+    digest = hashlib.sha256(repr(sections).encode("utf-8")).hexdigest()
+    return {
+        "format": MANIFEST_FORMAT,
+        "project": project_dir,
+        "root": root,
+        "home": os.path.expanduser("~"),
+        "platform": sys.platform,
+        "patterns": digest,
+    }
+
+
+_loaded_manifest: Manifest | None = None
+"""Per-process manifest; refresh() keeps it current between queries."""
+
+
+def load_manifest(project_dir: str | None = None) -> Manifest | None:
+    """Load the project's manifest (empty if missing or outdated).
+
+    Args:
+        project_dir: Project root (default: CLAUDE_PROJECT_DIR).
+
+    Returns:
+        Manifest, or None if no path classifier is available or a protected
+        tier has broken patterns (those tiers already match every path).
+    """
+    project_dir = project_dir or gu.get_project_dir()
+    if not project_dir:
+        return None
+    config = gu.load_guardian_config()
+    classifier = gu.get_path_classifier(config)
+    if classifier is None or classifier.broken_tiers.intersection(MANIFEST_TIERS):
+        return None
+    global _loaded_manifest
+    root = os.path.realpath(project_dir)
+    header = _manifest_header(project_dir, root, config)
+    if _loaded_manifest is not None and _loaded_manifest.header == header:
+        return _loaded_manifest
+    dirs = None
+    try:
+        with open(_manifest_path(project_dir), encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("header") == header and all(map(_valid_record, data["dirs"].values())):
+            dirs = data["dirs"]
+    except (OSError, ValueError, AttributeError, KeyError, TypeError):
+        pass  # Missing, corrupt or outdated: rebuilt on refresh
+    _loaded_manifest = Manifest(root, classifier, header, dirs)
+    return _loaded_manifest
+
+
+def _valid_record(record: Any) -> bool:
+    return (
+        isinstance(record, list)
+        and len(record) == 5
+        and all(isinstance(v, int) for v in record[:3])
+        and isinstance(record[_PROTECTED], dict)
+        and all(isinstance(v, int) for v in record[_PROTECTED].values())
+        and isinstance(record[_SUBDIRS], list)
+        and all(isinstance(v, str) for v in record[_SUBDIRS])
+    )
+
+
+def save_manifest(manifest: Manifest, project_dir: str | None = None) -> None:
+    """Atomically store the manifest if it changed (temp file + os.replace). Never raises."""
+    project_dir = project_dir or gu.get_project_dir()
+    if not manifest.changed or not project_dir:
+        return
+    path = _manifest_path(project_dir)
+    tmp_path = path.with_name(f".{MANIFEST_NAME}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"header": manifest.header, "dirs": manifest.dirs}, f,
+                      separators=(",", ":"))
+        os.replace(tmp_path, path)
+        manifest.changed = False
+    except Exception as e:
+        gu.log_guardian("WARN", f"Could not write protected manifest: {e}")
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+
+
+def protected_contents(
+    directory: str | Path, follow_symlinks: bool = False, bounded: bool = False
+) -> dict[str, int] | None:
+    """Protected entries below an existing project directory (refreshed first).
+
+    Args:
+        directory: Directory path (absolute, or relative to the project).
+        follow_symlinks: Count the target of a symlinked directory (commands
+            that traverse a symlink given as an argument, like grep -r);
+            otherwise a symlink has no contents (rm -r removes the link).
+        bounded: Refresh within the globExpansion budget (maxEntries,
+            maxMilliseconds) instead of walking whatever changed.
+
+    Returns:
+        subtree_counts() of the directory, with "incomplete": 1 if a bounded
+        refresh ran out of budget (the counts are then partial), or None if
+        the manifest is disabled or unavailable, or the path is not a
+        directory inside the project.
+    """
+    if not get_manifest_config().get("enabled"):
+        return None
+    manifest = load_manifest()
+    if manifest is None:
+        return None
+    try:
+        path = os.path.join(gu.get_project_dir(), directory)
+        if not follow_symlinks and os.path.islink(path):
+            return None
+        resolved = os.path.realpath(path)
+        rel = os.path.relpath(resolved, manifest.root)
+    except (OSError, ValueError):
+        return None
+    if rel == os.pardir or rel.startswith(os.pardir + os.sep) or not os.path.isdir(resolved):
+        return None
+    rel = "" if rel == os.curdir else rel.replace(os.sep, "/")
+    start = time.perf_counter()
+    if bounded:
+        budget = gu.get_glob_expansion_config()
+        complete = manifest.refresh(
+            rel, budget["maxEntries"], time.monotonic() + budget["maxMilliseconds"] / 1000
+        )
+    else:
+        complete = manifest.refresh(rel)
+    save_manifest(manifest)
+    counts = manifest.subtree_counts(rel)
+    if not complete:
+        counts["incomplete"] = 1
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    gu.log_guardian("DEBUG", f"Manifest refresh of {rel or '.'}: {elapsed_ms:.1f}ms {counts}")
+    return counts
+
+
+# ============================================================
+# Command Line
+# ============================================================
+
+
+def main(argv: list[str]) -> int:
+    """Command-line entry point."""
+    command = argv[0] if argv else "show"
+    project_dir = gu.get_project_dir()
+    if not project_dir:
+        print("CLAUDE_PROJECT_DIR is not set or not a directory", file=sys.stderr)
+        return 2
+    if command not in ("build", "show"):
+        print(f"Unknown command: {command} (expected build or show)", file=sys.stderr)
+        return 2
+    manifest = load_manifest(project_dir)
+    if manifest is None:
+        print("Path patterns unavailable or invalid; no manifest built", file=sys.stderr)
+        return 1
+    start = time.perf_counter()
+    manifest.refresh()
+    save_manifest(manifest, project_dir)
+    elapsed = time.perf_counter() - start
+    if command == "build":
+        counts = manifest.subtree_counts()
+        summary = ", ".join(f"{tier}={count}" for tier, count in counts.items())
+        print(f"{len(manifest.dirs)} directories in {elapsed:.2f}s: {summary}")
+        return 0
+    for rel_path, tiers in manifest.entries():
+        print(f"{','.join(tiers):<28} {rel_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
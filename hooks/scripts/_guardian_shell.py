@@ -0,0 +1,945 @@
+#!/usr/bin/env python3
+"""Shell command model for the Bash guardian.
+
+Parses a Bash command line once into a compact model that Layers 1-4 of
+bash_guardian.py read from, instead of each layer re-tokenizing the text:
+
+    ParsedCommand
+      sub_commands: [SubCommand]   one per ;, &&, ||, |, &, newline segment
+        words:         [ShellWord] argv after quote removal (shlex rules)
+        redirections:  [Redirection] fd, operator and target
+        heredocs:      [Heredoc]   delimiter and body span
+        substitutions: [Substitution] top-level $(...), `...`, <(...), (...)
+        quotes:        QuoteContext  O(1) "is offset N quoted?" lookups
+      heredocs: [Heredoc]          every heredoc body in the command
+
+Offsets:
+    SubCommand.start/end and Heredoc spans index the full command string.
+    Word, redirection and substitution offsets index SubCommand.text, which
+    is what the per-sub-command detectors match against.
+
+This module is pure (standard library only, no I/O, no config) so any
+guardian module can import it.
+"""
+
+import bisect
+import re
+
+# ============================================================
+# Command Splitting (Layer 2)
+# ============================================================
+
+# Characters that can change scanner state (or end a sub-command) outside
+# quotes. Everything else is copied verbatim, so the scanner jumps over runs
+# of it instead of visiting each character.
+_SCAN_SIGNIFICANT_RE = re.compile(r"[\\'\"`()${}\[\]?*+@!;&|#<\n]")
+# Inside "..." only a backslash or the closing quote matters.
+_SCAN_DOUBLE_QUOTE_RE = re.compile(r'[\\"]')
+# Inside `...` only a backslash or the closing backtick matters.
+_SCAN_BACKTICK_RE = re.compile(r"[\\`]")
+# Bare heredoc delimiter word: up to whitespace, newline, or shell metachar.
+_HEREDOC_BARE_DELIM_RE = re.compile(r"[^ \t\n;|&<>()]*")
+
+
+def _scan_command(
+    command: str,
+) -> tuple[list[tuple[int, int]], list[tuple[int, str, bool, int, int]],
+           list[tuple[str, int, int]]]:
+    """Scan a command once, recording everything the shell model needs.
+
+    Instead of copying the input character by character the scanner jumps
+    between state-changing characters with a compiled regex, so each
+    sub-command is always the contiguous slice command[seg_start:i].
+
+    Returns:
+        (segments, heredocs, substitutions), all as offsets into command:
+        - segments: raw (start, end) per sub-command, before whitespace
+          trimming; may be empty.
+        - heredocs: (segment_index, delimiter, strip_tabs, body_start,
+          body_end) per heredoc, where segment_index is the segment that
+          holds the << operator.
+        - substitutions: (kind, start, end) per top-level $(...), <(...),
+          >(...), `...` or bare (...) group. kind is "$(", "<(", ">(", "`"
+          or "(". Nested groups are part of their outermost group.
+    """
+    segments: list[tuple[int, int]] = []
+    heredocs: list[tuple[int, str, bool, int, int]] = []
+    substitutions: list[tuple[str, int, int]] = []
+    sub_kind = ""  # kind of the open top-level substitution
+    sub_start = 0
+    n = len(command)
+    seg_start = 0
+    depth = 0  # Track nesting: $(), <(), >()
+    in_single_quote = False
+    in_double_quote = False
+    in_backtick = False
+    i = 0
+    pending_heredocs: list[tuple[str, bool]] = []  # (delimiter, strip_tabs)
+    pending_owners: list[int] = []  # segment index of each pending heredoc
+    arithmetic_depth = 0  # tracks (( ... )) nesting for arithmetic context
+    param_expansion_depth = 0  # tracks ${ ... } nesting
+    bracket_depth = 0  # tracks [[ ... ]] nesting
+    brace_group_depth = 0  # tracks { ...; } brace groups
+    extglob_depth = 0  # tracks extglob ?() *() +() @() !() nesting
+
+    while i < n:
+        # Jump to the next character that can matter in the current state.
+        if in_single_quote:
+            i = command.find("'", i)
+            if i == -1:
+                break
+        else:
+            if in_double_quote:
+                m = _SCAN_DOUBLE_QUOTE_RE.search(command, i)
+            elif in_backtick:
+                m = _SCAN_BACKTICK_RE.search(command, i)
+            else:
+                m = _SCAN_SIGNIFICANT_RE.search(command, i)
+            if m is None:
+                break
+            i = m.start()
+        c = command[i]
+
+        # Backslash escape handling (outside single quotes)
+        # C-2 fix: \; should NOT be treated as a delimiter
+        if c == "\\" and not in_single_quote:
+            # Consume backslash + next character as literal
+            i += 2
+            continue
+
+        # Single quote tracking (not inside double quotes or backticks)
+        if c == "'" and not in_double_quote and not in_backtick and depth == 0:
+            in_single_quote = not in_single_quote
+            i += 1
+            continue
+
+        # Double quote tracking (not inside single quotes or backticks)
+        if c == '"' and not in_single_quote and not in_backtick and depth == 0:
+            in_double_quote = not in_double_quote
+            i += 1
+            continue
+
+        # Skip everything inside quotes
+        if in_single_quote or in_double_quote:
+            i += 1
+            continue
+
+        # C-2 fix: Backtick substitution tracking
+        if c == "`" and depth == 0:
+            if in_backtick:
+                substitutions.append(("`", sub_start, i + 1))
+            else:
+                sub_kind, sub_start = "`", i
+            in_backtick = not in_backtick
+            i += 1
+            continue
+
+        # Skip everything inside backticks
+        if in_backtick:
+            i += 1
+            continue
+
+        # Track nesting depth for $(), <(), >()
+        if c == "(" and i > 0 and command[i - 1] in ("$", "<", ">"):
+            if depth == 0:
+                sub_kind, sub_start = command[i - 1] + "(", i - 1
+            depth += 1
+            i += 1
+            continue
+        if c == "(" and depth > 0:
+            depth += 1
+            i += 1
+            continue
+        if c == ")" and depth > 0:
+            depth -= 1
+            if depth == 0:
+                substitutions.append((sub_kind, sub_start, i + 1))
+            i += 1
+            continue
+
+        # --- Context tracking (BEFORE separator checks) ---
+        # All context entry/exit must happen before separators so that
+        # delimiters inside these constructs are suppressed correctly.
+
+        # Track ${...} parameter expansion
+        if c == "$" and i + 1 < n and command[i + 1] == "{":
+            param_expansion_depth += 1
+            i += 2
+            continue
+
+        # Track } for parameter expansion (only when inside ${} and not
+        # inside a nested command substitution where } is literal)
+        if c == "}" and param_expansion_depth > 0 and depth == 0:
+            param_expansion_depth -= 1
+            i += 1
+            continue
+
+        # Skip everything inside ${...} (nested ${ was tracked above)
+        if param_expansion_depth > 0 and depth == 0:
+            i += 1
+            continue
+
+        # Track [[ ... ]] conditional expressions
+        if (command[i:i+2] == "[["
+                and (i == 0 or command[i-1] in " \t\n;|&(")
+                and i + 2 < n and command[i+2] in " \t"):
+            bracket_depth += 1
+            i += 2
+            continue
+
+        # V2-fix: depth == 0 guard prevents ]] inside $() from decrementing
+        if (command[i:i+2] == "]]" and bracket_depth > 0 and depth == 0):
+            bracket_depth -= 1
+            i += 2
+            continue
+
+        # Skip separators inside [[ ... ]]
+        if bracket_depth > 0:
+            i += 1
+            continue
+
+        # Track arithmetic context: (( ... ))
+        # Must come BEFORE bare-paren and separator checks.
+        # Note: $(( is already handled by the $() depth tracking.
+        if (command[i:i+2] == '(('
+                and (i == 0 or command[i-1] not in ('$', '<', '>'))):
+            arithmetic_depth += 1
+            i += 2
+            continue
+
+        if command[i:i+2] == '))' and arithmetic_depth > 0:
+            arithmetic_depth -= 1
+            i += 2
+            continue
+
+        # Skip separators inside (( ... ))
+        if arithmetic_depth > 0:
+            i += 1
+            continue
+
+        # Track extglob patterns: ?() *() +() @() !()
+        if (c in "?*+@!" and i + 1 < n and command[i + 1] == "("
+                and depth == 0):
+            extglob_depth += 1
+            i += 2
+            continue
+
+        if c == ")" and extglob_depth > 0:
+            extglob_depth -= 1
+            i += 1
+            continue
+
+        # Skip separators inside extglob
+        if extglob_depth > 0:
+            # Track nested extglob
+            if (c in "?*+@!" and i + 1 < n
+                    and command[i + 1] == "("):
+                extglob_depth += 1
+                i += 2
+                continue
+            i += 1
+            continue
+
+        # Track bare (...) subshells (not $(), <(), >(), or (())
+        if c == "(" and depth == 0:
+            # Not preceded by $, <, > (those are handled above)
+            if i == 0 or command[i - 1] not in ("$", "<", ">"):
+                sub_kind, sub_start = "(", i
+                depth += 1
+                i += 1
+                continue
+
+        # Track { ... } brace groups
+        # { is a reserved word only when it's a standalone token:
+        # preceded by whitespace/SOL and followed by whitespace
+        if (c == "{" and brace_group_depth == 0
+                and (i == 0 or command[i-1] in " \t\n;|&(")
+                and i + 1 < n and command[i+1] in " \t\n"):
+            # Make sure this is not ${ (already handled above)
+            if i == 0 or command[i-1] != "$":
+                brace_group_depth += 1
+                i += 1
+                continue
+
+        # Track nested { inside brace groups
+        if (c == "{" and brace_group_depth > 0
+                and (command[i-1] in " \t\n;|&(" if i > 0 else True)
+                and i + 1 < n and command[i+1] in " \t\n"):
+            brace_group_depth += 1
+            i += 1
+            continue
+
+        # } closes brace group when it's a standalone token
+        # V2-fix: depth == 0 guard prevents } inside $() from decrementing
+        if (c == "}" and brace_group_depth > 0 and depth == 0):
+            brace_group_depth -= 1
+            i += 1
+            continue
+
+        # Skip separators inside brace groups
+        if brace_group_depth > 0:
+            i += 1
+            continue
+
+        # --- Separator checks (only at top level, depth == 0) ---
+        if depth == 0:
+            # Semicolon
+            if c == ";":
+                segments.append((seg_start, i))
+                i += 1
+                seg_start = i
+                continue
+            # && (two ampersands)
+            if c == "&" and i + 1 < n and command[i + 1] == "&":
+                segments.append((seg_start, i))
+                i += 2
+                seg_start = i
+                continue
+            # || (two pipes)
+            if c == "|" and i + 1 < n and command[i + 1] == "|":
+                segments.append((seg_start, i))
+                i += 2
+                seg_start = i
+                continue
+            # | (single pipe, not ||)
+            if c == "|":
+                segments.append((seg_start, i))
+                i += 1
+                seg_start = i
+                continue
+            # M-4 fix: & (single ampersand = background, also a separator)
+            # Codex review fix: skip & when part of redirection (&>, >&, <&, |&)
+            if c == "&":
+                next_c = command[i + 1] if i + 1 < n else ""
+                prev_c = command[i - 1] if i > 0 else ""
+                # &> is "redirect both stdout+stderr" -- not a separator
+                # >& and <& (including n>&, e.g. 2>&1) are fd duplication
+                if next_c == ">" or prev_c in (">", "<"):
+                    i += 1
+                    continue
+                segments.append((seg_start, i))
+                i += 1
+                seg_start = i
+                continue
+            # Comment tracking: # starts a comment to end-of-line in bash.
+            # Consume the rest of the line to prevent << inside comments
+            # from being misdetected as heredoc (security: fail-closed).
+            # Only triggers when # follows whitespace/separator (bash semantics).
+            if c == '#' and (i == 0 or command[i-1] in ' \t\n;|&()'):
+                i = command.find('\n', i)
+                if i == -1:
+                    i = n
+                continue
+
+            # Detect heredoc operator: << or <<- (but NOT <<< here-string)
+            # Only detect when outside arithmetic context (arithmetic_depth == 0)
+            if (command[i:i+2] == '<<'
+                    and command[i:i+3] != '<<<'
+                    and arithmetic_depth == 0):
+
+                strip_tabs = command[i:i+3] == '<<-'
+                i += 3 if strip_tabs else 2
+
+                # Skip optional whitespace between << and delimiter
+                while i < n and command[i] in ' \t':
+                    i += 1
+
+                # Parse delimiter word: bare, 'quoted', or "quoted"
+                delim, _raw_token, i = _parse_heredoc_delimiter(command, i)
+                pending_heredocs.append((delim, strip_tabs))
+                pending_owners.append(len(segments))
+                continue
+
+            # Newline
+            if c == "\n":
+                segments.append((seg_start, i))
+                i += 1
+                # Consume heredoc bodies after newline
+                if pending_heredocs:
+                    bodies: list[tuple[int, int]] = []
+                    i = _consume_heredoc_bodies(command, i, pending_heredocs,
+                                                bodies)
+                    for owner, (delim, strip_tabs), (start, end) in zip(
+                            pending_owners, pending_heredocs, bodies):
+                        heredocs.append((owner, delim, strip_tabs, start, end))
+                    pending_heredocs = []
+                    pending_owners = []
+                seg_start = i
+                continue
+
+        i += 1
+
+    # Don't forget the last segment
+    segments.append((seg_start, n))
+
+    # Unterminated substitution runs to the end of input
+    if depth > 0 or in_backtick:
+        substitutions.append((sub_kind, sub_start, n))
+
+    return segments, heredocs, substitutions
+
+
+def _strip_span(command: str, start: int, end: int) -> tuple[int, int] | None:
+    """Trim whitespace (same as str.strip()) from a span; None if empty."""
+    segment = command[start:end]
+    stripped = segment.strip()
+    if not stripped:
+        return None
+    start += len(segment) - len(segment.lstrip())
+    return start, start + len(stripped)
+
+
+def split_command_spans(
+    command: str,
+) -> tuple[list[tuple[int, int]], list[tuple[int, int]]]:
+    """Locate sub-commands and heredoc bodies as offsets into command.
+
+    Args:
+        command: The compound bash command to scan.
+
+    Returns:
+        (sub_command_spans, heredoc_body_spans). Sub-command spans exclude
+        surrounding whitespace and empty segments, so
+        command[start:end] is exactly what split_commands() returns.
+        Heredoc body spans cover the body lines (without the terminating
+        delimiter line); an unterminated body extends to the end of input.
+    """
+    segments, heredocs, _substitutions = _scan_command(command)
+    spans = [_strip_span(command, start, end) for start, end in segments]
+    return (
+        [span for span in spans if span is not None],
+        [(start, end) for _owner, _delim, _tabs, start, end in heredocs],
+    )
+
+
+def split_commands(command: str) -> list[str]:
+    """Split compound command into sub-commands.
+
+    Handles delimiters: ;  &&  ||  |  &  newline
+
+    Does NOT split inside:
+    - Single-quoted strings ('...')
+    - Double-quoted strings ("...")
+    - Command substitution ($(...))
+    - Process substitution (<(...) or >(...))
+    - Backtick substitution (backtick...backtick)
+    - Backslash-escaped characters
+    - Parameter expansion (${...})
+    - Bare subshells ((...))
+    - Brace groups ({ ...; })
+    - Conditional expressions ([[ ... ]])
+    - Extglob patterns (?(...), *(...), +(...), @(...), !(...))
+    - Arithmetic expressions ((( ... )))
+
+    Heredoc bodies are dropped (see split_command_spans()).
+
+    Critical fixes incorporated:
+    - C-2: Backslash escapes and backtick substitution handling
+    - M-4: Single & as command separator
+
+    Args:
+        command: The compound bash command to split.
+
+    Returns:
+        List of individual sub-commands (stripped of whitespace).
+    """
+    spans, _heredoc_bodies = split_command_spans(command)
+    return [command[start:end] for start, end in spans]
+
+
+def _parse_heredoc_delimiter(command: str, i: int) -> tuple[str, str, int]:
+    """Parse heredoc delimiter word from position i.
+
+    Handles:
+      - Bare word: EOF, EOFZ, END_MARKER
+      - Single-quoted: 'EOF' (literal heredoc, no expansion)
+      - Double-quoted: "EOF" (expansion-active heredoc)
+
+    Returns: (delimiter_text, raw_token, new_position)
+    """
+    if i >= len(command):
+        return ('', '', i)
+
+    if command[i] in ("'", '"'):
+        quote_char = command[i]
+        start = i
+        i = command.find(quote_char, i + 1)
+        # Consume closing quote (or run to end if unterminated)
+        i = len(command) if i == -1 else i + 1
+        raw_token = command[start:i]
+        delim = raw_token[1:-1]  # strip quotes
+        return (delim, raw_token, i)
+
+    # Bare word: consume until whitespace, newline, or shell metachar
+    start = i
+    i = _HEREDOC_BARE_DELIM_RE.match(command, i).end()
+    raw_token = command[start:i]
+    return (raw_token, raw_token, i)
+
+
+def _consume_heredoc_bodies(command: str, i: int,
+                             pending: list[tuple[str, bool]],
+                             bodies: list[tuple[int, int]] | None = None) -> int:
+    """Consume heredoc body lines until each delimiter is matched.
+
+    For each pending heredoc, reads lines until a line matches the
+    delimiter exactly (after optional tab-stripping for <<-).
+
+    Args:
+        command: Full command string.
+        i: Position of the first body line.
+        pending: (delimiter, strip_tabs) for each heredoc opened on the line.
+        bodies: If given, receives a (start, end) span per body, excluding
+            the delimiter line.
+
+    Returns: new position after all heredoc bodies consumed.
+    """
+    n = len(command)
+    for delim, strip_tabs in pending:
+        body_start = i
+        body_end = n
+        while i < n:
+            # Find end of current line
+            line_start = i
+            i = command.find('\n', i)
+            if i == -1:
+                i = n
+            line = command[line_start:i]
+
+            # Advance past newline
+            if i < n:
+                i += 1
+
+            # Check if this line matches the delimiter
+            cmp_line = line.rstrip('\r')
+            if strip_tabs:
+                cmp_line = cmp_line.lstrip('\t')
+            if cmp_line == delim:
+                body_end = line_start
+                break
+        # If we exhaust the input without finding the delimiter,
+        # we've consumed an unterminated heredoc -- body lines
+        # won't leak to sub-commands (fail-closed behavior)
+        if bodies is not None:
+            bodies.append((body_start, body_end))
+    return i
+
+
+# ============================================================
+# Quote Context
+# ============================================================
+
+
+def _is_inside_quotes(command: str, pos: int) -> bool:
+    """Check if a position in a command string is inside a quoted region.
+
+    I-5 fix: Used to make redirection extraction quote-aware.
+
+    Args:
+        command: The command string.
+        pos: The character position to check.
+
+    Returns:
+        True if the position is inside single or double quotes.
+    """
+    in_single = False
+    in_double = False
+    i = 0
+    while i < pos:
+        c = command[i]
+        if c == "\\" and not in_single:
+            i += 2  # Skip escaped character
+            continue
+        if c == "'" and not in_double:
+            in_single = not in_single
+        elif c == '"' and not in_single:
+            in_double = not in_double
+        i += 1
+    return in_single or in_double
+
+
+# Characters that can change quote state outside quotes / inside "..."
+_QUOTE_SIGNIFICANT_RE = re.compile(r"[\\'\"]")
+_QUOTE_DOUBLE_SIGNIFICANT_RE = re.compile(r'[\\"]')
+_QUOTE_TYPES = ("", "'", '"')
+
+
+class QuoteContext:
+    """Quote state of every offset of a string, built in one linear pass.
+
+    Answers the same question as _is_inside_quotes(text, pos) for any pos
+    in 0..len(text), but in O(1) per query instead of rescanning the text
+    from offset 0. Escape handling is identical: a backslash outside single
+    quotes hides the next character, and both offsets of the pair carry the
+    state in effect before the backslash.
+    """
+
+    __slots__ = ("_states",)
+
+    UNQUOTED = 0
+    SINGLE = 1
+    DOUBLE = 2
+
+    def __init__(self, text: str):
+        n = len(text)
+        # states[pos] = quote state after processing text[:pos]
+        states = bytearray(n + 1)
+        state = self.UNQUOTED
+        i = 0
+        while i <= n:
+            if state == self.SINGLE:
+                j = text.find("'", i)
+            else:
+                regex = _QUOTE_DOUBLE_SIGNIFICANT_RE if state == self.DOUBLE else _QUOTE_SIGNIFICANT_RE
+                m = regex.search(text, i)
+                j = m.start() if m else -1
+            if j == -1:
+                if state:
+                    states[i:] = bytes((state,)) * (n + 1 - i)
+                break
+            if state:
+                states[i:j + 1] = bytes((state,)) * (j + 1 - i)
+            c = text[j]
+            i = j + 1
+            if c == "\\":
+                # Escaped character keeps the current state
+                if state and i <= n:
+                    states[i] = state
+                i += 1
+            elif c == "'" and state != self.DOUBLE:
+                state = self.UNQUOTED if state == self.SINGLE else self.SINGLE
+            elif c == '"' and state != self.SINGLE:
+                state = self.UNQUOTED if state == self.DOUBLE else self.DOUBLE
+        self._states = states
+
+    def is_quoted(self, pos: int) -> bool:
+        """True if pos is inside single or double quotes."""
+        return self._states[pos] != self.UNQUOTED
+
+    def quote_type(self, pos: int) -> str:
+        """The quote character enclosing pos ("'" or '"'), or "" if unquoted."""
+        return _QUOTE_TYPES[self._states[pos]]
+
+
+# ============================================================
+# Command Model
+# ============================================================
+
+
+class ShellWord:
+    """One argv word of a sub-command.
+
+    Attributes:
+        value: The word after quote and escape removal.
+        start: Offset of the first raw character in SubCommand.text.
+        end: Offset just past the last raw character.
+        quoted: True if any part of the word was quoted or escaped.
+    """
+
+    __slots__ = ("value", "start", "end", "quoted")
+
+    def __init__(self, value: str, start: int, end: int, quoted: bool):
+        self.value = value
+        self.start = start
+        self.end = end
+        self.quoted = quoted
+
+    def __repr__(self) -> str:
+        return f"ShellWord({self.value!r}, {self.start}, {self.end}, quoted={self.quoted})"
+
+
+class Redirection:
+    """One file redirection (>, >>, >|, <) outside quotes.
+
+    Attributes:
+        fd: Source descriptor as written: "" (default), a digit, or "&".
+        op: Operator: ">", ">|", ">>" or "<".
+        target: Raw target token, quotes not removed.
+        start: Offset of the redirection in SubCommand.text.
+        end: Offset just past the target.
+    """
+
+    __slots__ = ("fd", "op", "target", "start", "end")
+
+    def __init__(self, fd: str, op: str, target: str, start: int, end: int):
+        self.fd = fd
+        self.op = op
+        self.target = target
+        self.start = start
+        self.end = end
+
+    def __repr__(self) -> str:
+        return f"Redirection({self.fd}{self.op} {self.target!r}, {self.start}, {self.end})"
+
+
+class Heredoc:
+    """A heredoc opened by << or <<-.
+
+    Attributes:
+        delimiter: Delimiter word with quotes removed.
+        strip_tabs: True for <<- (leading tabs ignored on the delimiter line).
+        start: Offset of the body in the full command.
+        end: Offset just past the body (before the delimiter line); the end
+            of input for an unterminated heredoc.
+    """
+
+    __slots__ = ("delimiter", "strip_tabs", "start", "end")
+
+    def __init__(self, delimiter: str, strip_tabs: bool, start: int, end: int):
+        self.delimiter = delimiter
+        self.strip_tabs = strip_tabs
+        self.start = start
+        self.end = end
+
+    def __repr__(self) -> str:
+        return f"Heredoc({self.delimiter!r}, {self.start}, {self.end})"
+
+
+class Substitution:
+    """A top-level substitution or subshell group inside a sub-command.
+
+    Attributes:
+        kind: "$(" (command or arithmetic), "<(" / ">(" (process),
+            "`" (backtick) or "(" (bare subshell).
+        start: Offset of the opening token in SubCommand.text.
+        end: Offset just past the closing token (end of text if unterminated).
+    """
+
+    __slots__ = ("kind", "start", "end")
+
+    def __init__(self, kind: str, start: int, end: int):
+        self.kind = kind
+        self.start = start
+        self.end = end
+
+    def __repr__(self) -> str:
+        return f"Substitution({self.kind!r}, {self.start}, {self.end})"
+
+
+class SubCommand:
+    """One sub-command of a compound command.
+
+    Words and redirections are tokenized lazily on first access and cached.
+
+    Attributes:
+        text: Sub-command text, stripped of surrounding whitespace.
+        start: Offset of text in the full command.
+        end: Offset just past text in the full command.
+        heredocs: Heredocs whose << operator is in this sub-command.
+        substitutions: Top-level substitutions in this sub-command.
+        effect: Delete/write classification cached by bash_guardian
+            (classify_effect()), or None until first classified.
+    """
+
+    __slots__ = ("text", "start", "end", "heredocs", "substitutions", "effect",
+                 "_words", "_word_error", "_redirections", "_quotes")
+
+    def __init__(self, text: str, start: int = 0, end: int | None = None):
+        self.text = text
+        self.start = start
+        self.end = start + len(text) if end is None else end
+        self.heredocs: list[Heredoc] = []
+        self.substitutions: list[Substitution] = []
+        self.effect = None
+        self._words: list[ShellWord] | None = None
+        self._word_error: str | None = None
+        self._redirections: list[Redirection] | None = None
+        self._quotes: QuoteContext | None = None
+
+    def __repr__(self) -> str:
+        return f"SubCommand({self.text!r}, {self.start}, {self.end})"
+
+    @property
+    def words(self) -> list[ShellWord]:
+        """argv words, split with POSIX shlex.split() rules.
+
+        If the text cannot be tokenized (unclosed quote, trailing backslash)
+        the words fall back to plain whitespace splitting, and word_error
+        holds the reason.
+        """
+        if self._words is None:
+            try:
+                self._words = _split_words(self.text)
+            except ValueError as e:
+                self._word_error = str(e)
+                self._words = [
+                    ShellWord(m.group(), m.start(), m.end(), False)
+                    for m in _FALLBACK_WORD_RE.finditer(self.text)
+                ]
+        return self._words
+
+    @property
+    def word_error(self) -> str | None:
+        """Why quote-aware word splitting failed, or None."""
+        self.words  # noqa: B018 -- tokenize on demand
+        return self._word_error
+
+    @property
+    def argv(self) -> list[str]:
+        """Word values, equal to shlex.split(text) when it succeeds."""
+        return [word.value for word in self.words]
+
+    @property
+    def redirections(self) -> list[Redirection]:
+        """File redirections outside quotes, in order of appearance."""
+        if self._redirections is None:
+            self._redirections = [
+                Redirection(m.group(1) or "", m.group(2) or m.group(3),
+                            m.group(4), m.start(), m.end())
+                for m in _REDIRECTION_RE.finditer(self.text)
+                if not self.is_quoted(m.start())
+            ]
+        return self._redirections
+
+    @property
+    def quotes(self) -> QuoteContext:
+        """Quote context of text, built on first use."""
+        if self._quotes is None:
+            self._quotes = QuoteContext(self.text)
+        return self._quotes
+
+    def is_quoted(self, pos: int) -> bool:
+        """Check if offset pos of text is inside single or double quotes (O(1))."""
+        return self.quotes.is_quoted(pos)
+
+
+class ParsedCommand:
+    """A fully parsed Bash command.
+
+    Attributes:
+        command: The original command string.
+        sub_commands: Non-empty sub-commands in order.
+        heredocs: Every heredoc in the command, in order.
+    """
+
+    __slots__ = ("command", "sub_commands", "heredocs")
+
+    def __init__(self, command: str, sub_commands: list[SubCommand],
+                 heredocs: list[Heredoc]):
+        self.command = command
+        self.sub_commands = sub_commands
+        self.heredocs = heredocs
+
+    def __repr__(self) -> str:
+        return f"ParsedCommand({self.command!r}, {len(self.sub_commands)} sub-commands)"
+
+
+def parse_command(command: str) -> ParsedCommand:
+    """Parse a compound Bash command into the shell model.
+
+    Sub-command boundaries are exactly those of split_commands().
+
+    Args:
+        command: The raw bash command string.
+
+    Returns:
+        ParsedCommand for the command.
+    """
+    segments, heredoc_records, substitutions = _scan_command(command)
+
+    sub_commands: list[SubCommand] = []
+    by_segment: dict[int, SubCommand] = {}
+    for index, (start, end) in enumerate(segments):
+        span = _strip_span(command, start, end)
+        if span is None:
+            continue
+        sub = SubCommand(command[span[0]:span[1]], span[0], span[1])
+        sub_commands.append(sub)
+        by_segment[index] = sub
+
+    heredocs: list[Heredoc] = []
+    for owner, delim, strip_tabs, start, end in heredoc_records:
+        heredoc = Heredoc(delim, strip_tabs, start, end)
+        heredocs.append(heredoc)
+        if owner in by_segment:
+            by_segment[owner].heredocs.append(heredoc)
+
+    # Substitutions never cross a segment boundary; find the owner by offset
+    segment_starts = [start for start, _end in segments]
+    for kind, start, end in substitutions:
+        owner = by_segment.get(bisect.bisect_right(segment_starts, start) - 1)
+        if owner is not None:
+            owner.substitutions.append(
+                Substitution(kind, start - owner.start, end - owner.start)
+            )
+
+    return ParsedCommand(command, sub_commands, heredocs)
+
+
+# ============================================================
+# Words and Redirections
+# ============================================================
+
+# shlex (POSIX mode, whitespace_split) word separators
+_WORD_WHITESPACE = " \t\r\n"
+# Run of unquoted word characters
+_WORD_PLAIN_RE = re.compile(r"[^ \t\r\n'\"\\]+")
+# Run of double-quoted characters that need no special handling
+_WORD_DOUBLE_QUOTE_RE = re.compile(r'[^"\\]+')
+# Fallback when quote-aware splitting fails (same as str.split())
+_FALLBACK_WORD_RE = re.compile(r"\S+")
+
+# Groups: fd, output operator, input operator, target
+_REDIRECTION_RE = re.compile(
+    r"(?:((?:\d|&)?)(>\|?|>{2})|(<)(?!<))\s*([^\s;|&<>]+)"
+)
+
+
+def _split_words(text: str) -> list[ShellWord]:
+    """Split text into words exactly like shlex.split(text) (POSIX mode).
+
+    Raises:
+        ValueError: "No closing quotation" or "No escaped character", as
+            shlex would.
+    """
+    words: list[ShellWord] = []
+    n = len(text)
+    i = 0
+    while i < n:
+        if text[i] in _WORD_WHITESPACE:
+            i += 1
+            continue
+        start = i
+        parts: list[str] = []
+        quoted = False
+        while i < n and text[i] not in _WORD_WHITESPACE:
+            c = text[i]
+            if c == "'":
+                close = text.find("'", i + 1)
+                if close == -1:
+                    raise ValueError("No closing quotation")
+                parts.append(text[i + 1:close])
+                quoted = True
+                i = close + 1
+            elif c == '"':
+                quoted = True
+                i += 1
+                while True:
+                    if i >= n:
+                        raise ValueError("No closing quotation")
+                    m = _WORD_DOUBLE_QUOTE_RE.match(text, i)
+                    if m:
+                        parts.append(m.group())
+                        i = m.end()
+                        continue
+                    if text[i] == '"':
+                        i += 1
+                        break
+                    # Backslash: only escapes " and \ inside double quotes
+                    if i + 1 >= n:
+                        raise ValueError("No escaped character")
+                    nxt = text[i + 1]
+                    parts.append(nxt if nxt in '"\\' else "\\" + nxt)
+                    i += 2
+            elif c == "\\":
+                if i + 1 >= n:
+                    raise ValueError("No escaped character")
+                parts.append(text[i + 1])
+                quoted = True
+                i += 2
+            else:
+                m = _WORD_PLAIN_RE.match(text, i)
+                parts.append(m.group())
+                i = m.end()
+        words.append(ShellWord("".join(parts), start, i, quoted))
+    return words
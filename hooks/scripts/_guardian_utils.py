@@ -40,14 +40,18 @@ Design Principles:
     3. Robust Exception Handling: Never crash the hook lifecycle
 """
 
+import errno
 import fnmatch
 import json
 import os
 import re
 import shutil
+import stat
 import subprocess
 import sys
 import time
+from collections.abc import Iterator
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 from typing import Any
@@ -359,10 +363,17 @@ def clear_circuit() -> None:
 # Only the user's config file needs guarding from agent modification.
 SELF_GUARDIAN_PATHS = (
     ".claude/guardian/config.json",
+    ".claude/guardian/config.compiled.json",
+    ".claude/guardian/read-cache.json",
+    ".claude/guardian/protected-manifest.json",
 )
 """Paths that are always guarded from Edit/Write, even if not in config.
 This is a security measure to prevent guardian bypass.
-PLUGIN MIGRATION: Reduced from 6 script paths to config-only."""
+PLUGIN MIGRATION: Reduced from 6 script paths to config-only.
+The compiled config artifact is guarded like the config it is derived from,
+and the Read verdict cache because a forged entry would skip Read checks.
+The protected-file manifest is guarded so protected files cannot be hidden
+from directory-target checks."""
 
 # Hardcoded fallback config for when config.json is missing/corrupted
 # This ensures critical paths are ALWAYS protected even if config fails to load
@@ -428,6 +439,10 @@ _using_fallback_config: bool = False
 _active_config_path: str | None = None
 """Path to the config file that was actually loaded. Used for dynamic self-guarding."""
 
+_compiled_config: dict | None = None
+"""Compiled artifact for the loaded config (see compile_guardian_config()).
+Only used while its "config" entry is the very object in _config_cache."""
+
 
 def get_project_dir() -> str:
     """Get and validate project directory from environment variable.
@@ -500,13 +515,12 @@ def load_guardian_config() -> dict[str, Any]:
         config_path = Path(project_dir) / ".claude" / "guardian" / "config.json"
         if config_path.exists():
             try:
-                with open(config_path, encoding="utf-8") as f:
-                    _config_cache = json.load(f)
+                # Compiled artifact when fresh, else read + validate + compile
+                _config_cache, _validation_errors = _load_config_file(config_path)
                 _using_fallback_config = False
                 _active_config_path = str(config_path)
                 log_guardian("INFO", f"Loaded config from {config_path}")
-                # Validate config structure (warn but don't block for backwards compatibility)
-                _validation_errors = validate_guardian_config(_config_cache)
+                # Validation warnings (warn but don't block for backwards compatibility)
                 if _validation_errors:
                     for _verr in _validation_errors:
                         log_guardian("WARN", f"Config validation: {_verr}")
@@ -538,8 +552,7 @@ def load_guardian_config() -> dict[str, Any]:
         default_config_path = Path(plugin_root) / "assets" / "guardian.default.json"
         if default_config_path.exists():
             try:
-                with open(default_config_path, encoding="utf-8") as f:
-                    _config_cache = json.load(f)
+                _config_cache, _validation_errors = _load_config_file(default_config_path)
                 _using_fallback_config = False
                 _active_config_path = str(default_config_path)
                 log_guardian(
@@ -547,8 +560,7 @@ def load_guardian_config() -> dict[str, Any]:
                     f"Using plugin default config from {default_config_path}\n"
                     "  Run /guardian:init to create a custom config for this project.",
                 )
-                # Validate config structure (warn but don't block)
-                _validation_errors = validate_guardian_config(_config_cache)
+                # Validation warnings (warn but don't block)
                 if _validation_errors:
                     for _verr in _validation_errors:
                         log_guardian("WARN", f"Config validation: {_verr}")
@@ -627,6 +639,54 @@ def get_hook_behavior() -> dict[str, Any]:
     return {**defaults, **behavior}
 
 
+GLOB_EXPANSION_DEFAULT_MAX_ENTRIES = 20000
+"""Directory entries a Bash wildcard argument may scan before asking."""
+
+GLOB_EXPANSION_DEFAULT_MAX_MILLISECONDS = 1000
+"""Time a Bash wildcard argument may take to expand before asking."""
+
+
+def get_glob_expansion_config() -> dict[str, Any]:
+    """Get globExpansion section from config.
+
+    Returns:
+        globExpansion dict with defaults applied.
+    """
+    config = load_guardian_config()
+    defaults = {
+        "maxEntries": GLOB_EXPANSION_DEFAULT_MAX_ENTRIES,
+        "maxMilliseconds": GLOB_EXPANSION_DEFAULT_MAX_MILLISECONDS,
+    }
+    section = config.get("globExpansion", {})
+    if not isinstance(section, dict):
+        return defaults
+    return {**defaults, **section}
+
+
+ARCHIVE_DEFAULT_REGENERABLE_ARTIFACTS = (
+    "node_modules", ".venv", "venv", "__pycache__", "dist", "build", "target", "*.egg-info",
+    ".tox", ".nox", ".pytest_cache", ".mypy_cache", ".ruff_cache", ".next", ".nuxt",
+    ".parcel-cache", ".turbo", ".gradle", "coverage", "htmlcov",
+)
+"""Names of git-ignored paths that deletes skip archiving (can be rebuilt)."""
+
+
+def get_archive_policy_config() -> dict[str, Any]:
+    """Get archivePolicy section from config.
+
+    Returns:
+        archivePolicy dict with defaults applied.
+    """
+    config = load_guardian_config()
+    defaults = {
+        "regenerableArtifacts": list(ARCHIVE_DEFAULT_REGENERABLE_ARTIFACTS),
+    }
+    section = config.get("archivePolicy", {})
+    if not isinstance(section, dict):
+        return defaults
+    return {**defaults, **section}
+
+
 def make_hook_behavior_response(action: str, reason: str) -> dict[str, Any] | None:
     """Create a hook response based on a hookBehavior action string.
 
@@ -650,6 +710,84 @@ def make_hook_behavior_response(action: str, reason: str) -> dict[str, Any] | No
         return deny_response(reason)
 
 
+# ============================================================
+# Resident Evaluator (optional)
+# ============================================================
+
+EVALUATOR_DEFAULT_IDLE_TIMEOUT_SECONDS = 900
+"""Idle time after which the resident evaluator exits (15 minutes)."""
+
+
+def get_evaluator_config() -> dict[str, Any]:
+    """Get evaluator section from config.
+
+    Returns:
+        evaluator dict with defaults applied (disabled by default).
+    """
+    config = load_guardian_config()
+    defaults = {
+        "enabled": False,
+        "idleTimeoutSeconds": EVALUATOR_DEFAULT_IDLE_TIMEOUT_SECONDS,
+    }
+    evaluator = config.get("evaluator", {})
+    if not isinstance(evaluator, dict):
+        return defaults
+    return {**defaults, **evaluator}
+
+
+def is_evaluator_running(project_dir: str) -> bool:
+    """Check whether a resident evaluator holds the project's lock file.
+
+    Args:
+        project_dir: Project root.
+
+    Returns:
+        True if an evaluator is running (or the check is unsupported).
+    """
+    try:
+        import fcntl
+    except ImportError:
+        return True  # No flock (Windows): never try to start one
+    lock_path = Path(project_dir) / ".claude" / "guardian" / "evaluator.lock"
+    if not lock_path.exists():
+        return False
+    try:
+        fd = os.open(str(lock_path), os.O_RDWR)
+    except OSError:
+        return True
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return True  # Lock held by a live evaluator
+    finally:
+        os.close(fd)  # Closing the descriptor also releases a lock we acquired
+    return False
+
+
+def maybe_start_evaluator() -> None:
+    """Start the resident evaluator in the background if enabled and not running.
+
+    Called by the hook scripts after an in-process evaluation, so the first
+    tool call of a session pays the cold start and later calls are forwarded
+    to the warm evaluator. Never raises: a failure here must not affect the
+    verdict that was already emitted.
+    """
+    if _read_cache_hit:
+        return  # Answered without loading the config; the miss before it already tried
+    try:
+        if get_evaluator_config().get("enabled") is not True:
+            return
+        project_dir = get_project_dir()
+        if not project_dir or is_evaluator_running(project_dir):
+            return
+        from _guardian_client import start_evaluator
+
+        start_evaluator(project_dir)
+        log_guardian("INFO", "Started resident evaluator")
+    except Exception as e:
+        log_guardian("WARN", f"Could not start resident evaluator: {e}")
+
+
 def validate_guardian_config(config: dict) -> list[str]:
     """Validate guardian configuration (Phase 5).
 
@@ -702,6 +840,17 @@ def validate_guardian_config(config: dict) -> list[str]:
             if not isinstance(p, dict):
                 errors.append(f"bashToolPatterns.{category}[{i}] must be an object")
                 continue
+            if "command" in p:
+                if "pattern" in p:
+                    errors.append(
+                        f"bashToolPatterns.{category}[{i}] cannot combine 'pattern' and 'command'"
+                    )
+                    continue
+                try:
+                    normalize_command_rule(p)
+                except ValueError as e:
+                    errors.append(f"Invalid command rule in bashToolPatterns.{category}[{i}]: {e}")
+                continue
             pattern = p.get("pattern", "")
             if not pattern:
                 errors.append(f"bashToolPatterns.{category}[{i}] missing 'pattern' field")
@@ -732,6 +881,77 @@ def validate_guardian_config(config: dict) -> list[str]:
                 type_name = type(enabled).__name__
                 errors.append(f"gitIntegration.autoCommit.enabled must be boolean, got {type_name}")
 
+    # Check evaluator structure (optional)
+    evaluator = config.get("evaluator", {})
+    if not isinstance(evaluator, dict):
+        errors.append("evaluator must be an object")
+    else:
+        enabled = evaluator.get("enabled")
+        if enabled is not None and not isinstance(enabled, bool):
+            errors.append(f"evaluator.enabled must be boolean, got {type(enabled).__name__}")
+        idle_timeout = evaluator.get("idleTimeoutSeconds", EVALUATOR_DEFAULT_IDLE_TIMEOUT_SECONDS)
+        if (
+            isinstance(idle_timeout, bool)
+            or not isinstance(idle_timeout, (int, float))
+            or idle_timeout <= 0
+        ):
+            errors.append(
+                f"Invalid evaluator.idleTimeoutSeconds: {idle_timeout} (must be positive number)"
+            )
+
+    # Check readCache structure (optional)
+    read_cache = config.get("readCache", {})
+    if not isinstance(read_cache, dict):
+        errors.append("readCache must be an object")
+    else:
+        enabled = read_cache.get("enabled")
+        if enabled is not None and not isinstance(enabled, bool):
+            errors.append(f"readCache.enabled must be boolean, got {type(enabled).__name__}")
+        max_entries = read_cache.get("maxEntries", READ_CACHE_DEFAULT_MAX_ENTRIES)
+        if isinstance(max_entries, bool) or not isinstance(max_entries, int) or max_entries < 1:
+            errors.append(
+                f"Invalid readCache.maxEntries: {max_entries} (must be positive integer)"
+            )
+
+    # Check protectedManifest structure (optional)
+    protected_manifest = config.get("protectedManifest", {})
+    if not isinstance(protected_manifest, dict):
+        errors.append("protectedManifest must be an object")
+    else:
+        enabled = protected_manifest.get("enabled")
+        if enabled is not None and not isinstance(enabled, bool):
+            errors.append(
+                f"protectedManifest.enabled must be boolean, got {type(enabled).__name__}"
+            )
+
+    # Check globExpansion structure (optional)
+    glob_expansion = config.get("globExpansion", {})
+    if not isinstance(glob_expansion, dict):
+        errors.append("globExpansion must be an object")
+    else:
+        for field in ("maxEntries", "maxMilliseconds"):
+            value = glob_expansion.get(field, 1)
+            if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+                errors.append(
+                    f"Invalid globExpansion.{field}: {value} (must be positive integer)"
+                )
+
+    # Check archivePolicy structure (optional)
+    archive_policy = config.get("archivePolicy", {})
+    if not isinstance(archive_policy, dict):
+        errors.append("archivePolicy must be an object")
+    else:
+        artifacts = archive_policy.get("regenerableArtifacts", [])
+        if not isinstance(artifacts, list):
+            errors.append("archivePolicy.regenerableArtifacts must be an array")
+        else:
+            for i, name in enumerate(artifacts):
+                if not isinstance(name, str) or not name or "/" in name:
+                    errors.append(
+                        f"Invalid archivePolicy.regenerableArtifacts[{i}]: {name!r} "
+                        "(must be a non-empty name without '/')"
+                    )
+
     # Check for deprecated config key
     if "allowedExternalPaths" in config:
         errors.append(
@@ -743,6 +963,298 @@ def validate_guardian_config(config: dict) -> list[str]:
     return errors
 
 
+# ============================================================
+# Compiled Config Artifact
+# ============================================================
+#
+# Every hook process used to re-read config.json, re-run
+# validate_guardian_config() (which compiles every regex), and rebuild
+# glob translations and Layer 1 literal regexes from strings. The compile
+# step below does that work once per config change and stores the result
+# in .claude/guardian/config.compiled.json:
+#
+#   {
+#     "format": ..., "env": {...},         # compiler/runtime compatibility
+#     "source": {path, size, mtime_ns, sha256},
+#     "built_ns": ...,                     # racy-mtime detection (see below)
+#     "config": {...},                     # the parsed source config
+#     "validation_errors": [...],          # validate_guardian_config() output
+#     "rules": {"block": [...], "ask": [...]},  # [pattern, reason, literals, spec]
+#     "path_globs": {pattern: {...}},      # pre-translated glob matchers
+#     "layer1": [...]                      # bash path scan literal table
+#   }
+#
+# Freshness: size + mtime_ns must match the source. If the source was
+# modified within COMPILED_CONFIG_RACY_WINDOW_NS of the build (same idea as
+# git's "racily clean" index entries), the content hash is verified too.
+# The artifact is JSON (never pickle) and is written atomically.
+#
+# Limitation: compiled regex objects cannot be stored in JSON, so the
+# artifact saves the parse, the validation pass (which compiles every
+# pattern once to check it) and the derived tables, but not the regex
+# compiles a match needs. Those happen in each hook process, lazily and
+# only for rules that survive the literal prefilter (see PatternRuleSet).
+
+COMPILED_CONFIG_NAME = "config.compiled.json"
+"""Compiled artifact filename inside $CLAUDE_PROJECT_DIR/.claude/guardian/."""
+
+COMPILED_CONFIG_FORMAT = 4
+"""Bump when the artifact layout or any derived table changes."""
+
+COMPILED_CONFIG_RACY_WINDOW_NS = 2_000_000_000
+"""Sources modified this close to the build time are hash-verified on load
+(covers coarse filesystem timestamp granularity, e.g. 2s on FAT)."""
+
+
+def _compiled_config_path() -> Path | None:
+    project_dir = get_project_dir()
+    if not project_dir:
+        return None
+    return Path(project_dir) / ".claude" / "guardian" / COMPILED_CONFIG_NAME
+
+
+def _compile_environment() -> dict[str, Any]:
+    """Runtime facts the derived tables depend on.
+
+    fnmatch.translate() output varies across Python versions, pattern
+    normalization depends on the platform (case folding) and ~ expansion
+    depends on the home directory.
+    """
+    return {
+        "format": COMPILED_CONFIG_FORMAT,
+        "python": "%d.%d" % sys.version_info[:2],
+        "platform": sys.platform,
+        "home": os.path.expanduser("~"),
+    }
+
+
+def _sha256_hex(data: bytes) -> str:
+    import hashlib
+
+    return hashlib.sha256(data).hexdigest()
+
+
+def compile_guardian_config(
+    config: dict, source: dict[str, Any], validation_errors: list[str]
+) -> dict[str, Any]:
+    """Build the compiled artifact for a loaded config.
+
+    Derived tables that cannot be built (malformed config sections) are
+    stored as None, so the runtime falls back to deriving them from the raw
+    config with exactly the old behavior (including its failure modes).
+
+    Args:
+        config: Parsed config dict.
+        source: Source fingerprint (path, size, mtime_ns, sha256).
+        validation_errors: Output of validate_guardian_config(config).
+
+    Returns:
+        JSON-serializable artifact dict.
+    """
+    rules: dict[str, list | None] = {}
+    for category, default_reason in _PATTERN_DEFAULT_REASONS.items():
+        try:
+            entries = config.get("bashToolPatterns", {}).get(category, [])
+            rules[category] = [_compile_pattern_rule(entry, default_reason) for entry in entries]
+        except Exception:
+            rules[category] = None
+
+    path_globs: dict[str, Any] = {}
+    for section in _PATH_PATTERN_SECTIONS:
+        patterns = config.get(section, [])
+        if not isinstance(patterns, list):
+            continue
+        for pattern in patterns:
+            if isinstance(pattern, str) and pattern not in path_globs:
+                try:
+                    path_globs[pattern] = _PathGlob.build(pattern).to_json()
+                except Exception:
+                    pass
+
+    try:
+        layer1 = build_layer1_scan_table(config)
+    except Exception:
+        layer1 = None
+
+    return {
+        "format": COMPILED_CONFIG_FORMAT,
+        "env": _compile_environment(),
+        "source": source,
+        "built_ns": time.time_ns(),
+        "config": config,
+        "validation_errors": validation_errors,
+        "rules": rules,
+        "path_globs": path_globs,
+        "layer1": layer1,
+    }
+
+
+def _read_compiled_config(config_path: Path, st: os.stat_result) -> dict | None:
+    """Return the stored artifact if it is fresh for config_path, else None."""
+    artifact_path = _compiled_config_path()
+    if artifact_path is None:
+        return None
+    try:
+        with open(artifact_path, encoding="utf-8") as f:
+            artifact = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(artifact, dict) or artifact.get("env") != _compile_environment():
+        return None
+    source = artifact.get("source")
+    if not isinstance(source, dict) or not isinstance(artifact.get("config"), dict):
+        return None
+    if (
+        source.get("path") != str(config_path)
+        or source.get("size") != st.st_size
+        or source.get("mtime_ns") != st.st_mtime_ns
+    ):
+        return None
+    built_ns = artifact.get("built_ns")
+    if not isinstance(built_ns, int) or st.st_mtime_ns + COMPILED_CONFIG_RACY_WINDOW_NS >= built_ns:
+        # Racily clean: the source may have changed within one timestamp tick
+        try:
+            with open(config_path, "rb") as f:
+                if _sha256_hex(f.read()) != source.get("sha256"):
+                    return None
+        except OSError:
+            return None
+    return artifact
+
+
+def _write_compiled_config(artifact: dict[str, Any]) -> None:
+    """Atomically store the artifact (temp file + os.replace). Never raises."""
+    artifact_path = _compiled_config_path()
+    if artifact_path is None:
+        return
+    tmp_path = artifact_path.with_name(f".{COMPILED_CONFIG_NAME}.{os.getpid()}.tmp")
+    try:
+        artifact_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(artifact, f, separators=(",", ":"))
+        os.replace(tmp_path, artifact_path)
+    except Exception as e:
+        log_guardian("WARN", f"Could not write compiled config: {e}")
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+
+
+def _load_config_file(config_path: Path) -> tuple[Any, list[str]]:
+    """Load a config file through the compiled artifact.
+
+    Uses the stored artifact when its fingerprint matches; otherwise parses
+    and validates the JSON (raising exactly as json.load() would) and
+    rebuilds the artifact.
+
+    Args:
+        config_path: Config file to load.
+
+    Returns:
+        (config, validation_errors) tuple.
+    """
+    global _compiled_config
+    st = os.stat(config_path)
+    artifact = _read_compiled_config(config_path, st)
+    if artifact is not None:
+        _compiled_config = artifact
+        errors = artifact.get("validation_errors")
+        return artifact["config"], errors if isinstance(errors, list) else []
+
+    with open(config_path, "rb") as f:
+        raw = f.read()
+    config = json.loads(raw.decode("utf-8"))
+    validation_errors = validate_guardian_config(config)
+    _compiled_config = None
+    if isinstance(config, dict):
+        artifact = compile_guardian_config(
+            config,
+            {
+                "path": str(config_path),
+                "size": st.st_size,
+                "mtime_ns": st.st_mtime_ns,
+                "sha256": _sha256_hex(raw),
+            },
+            validation_errors,
+        )
+        _compiled_config = artifact
+        _write_compiled_config(artifact)
+    return config, validation_errors
+
+
+def _get_compiled_table(name: str, config: dict | None = None) -> Any:
+    """Return a derived table from the artifact of the active config.
+
+    Args:
+        name: Artifact key ("rules", "path_globs" or "layer1").
+        config: Config the caller is working with (default: the loaded one).
+
+    Returns:
+        The table, or None if no artifact applies to this config object.
+    """
+    if _compiled_config is None or _config_cache is None:
+        return None
+    if config is not None and config is not _config_cache:
+        return None
+    if _compiled_config.get("config") is not _config_cache:
+        return None
+    return _compiled_config.get(name)
+
+
+_PATTERN_DEFAULT_REASONS = {
+    "block": "Blocked by pattern",
+    "ask": "Requires confirmation",
+}
+"""Reason used for bashToolPatterns rules that omit one."""
+
+
+def _compile_pattern_rule(entry: dict, default_reason: str) -> list:
+    """Compile one bashToolPatterns entry to [pattern, reason, literals, spec].
+
+    Regex rules have spec None. Structured command rules (see
+    normalize_command_rule()) have pattern and literals None, and spec None
+    too if the rule is invalid (it then never matches, like an invalid regex).
+    """
+    reason = entry.get("reason", default_reason)
+    if is_command_rule(entry):
+        try:
+            spec = normalize_command_rule(entry)
+        except ValueError as e:
+            log_guardian("WARN", f"Ignoring invalid command rule: {e}")
+            spec = None
+        return [None, reason, None, spec]
+    pattern = entry.get("pattern", "")
+    return [pattern, reason, extract_required_literals(pattern), None]
+
+
+def _iter_pattern_rules(category: str):
+    """Yield (pattern, reason, literals, spec) for bashToolPatterns[category] in config order.
+
+    Uses the compiled rule list when available. Otherwise walks the raw
+    config lazily, so a malformed entry fails at the same point as before;
+    literals is then None (extracted on demand by PatternRuleSet).
+    """
+    config = load_guardian_config()
+    compiled = _get_compiled_table("rules")
+    rules = compiled.get(category) if isinstance(compiled, dict) else None
+    if rules is not None:
+        for pattern, reason, literals, spec in rules:
+            yield pattern, reason, literals, spec
+        return
+    default_reason = _PATTERN_DEFAULT_REASONS[category]
+    for pattern_config in config.get("bashToolPatterns", {}).get(category, []):
+        if is_command_rule(pattern_config):
+            yield tuple(_compile_pattern_rule(pattern_config, default_reason))
+            continue
+        yield (
+            pattern_config.get("pattern", ""),
+            pattern_config.get("reason", default_reason),
+            None,
+            None,
+        )
+
+
 # ============================================================
 # Dry-Run Mode
 # ============================================================
@@ -813,13 +1325,7 @@ def safe_regex_search(
                 raise
 
         # Strategy 2: Fallback - no timeout defense (standard re module)
-        if not getattr(safe_regex_search, "_warned_no_timeout", False):
-            log_guardian(
-                "WARN",
-                "No regex timeout defense available. "
-                "Install 'regex' package for ReDoS defense: pip install regex",
-            )
-            safe_regex_search._warned_no_timeout = True
+        _warn_no_regex_timeout()
 
         return re.search(pattern, text, flags)
 
@@ -831,96 +1337,1236 @@ def safe_regex_search(
         return None
 
 
+def _warn_no_regex_timeout() -> None:
+    """Log (once per process) that regexes run without a timeout."""
+    if not getattr(safe_regex_search, "_warned_no_timeout", False):
+        log_guardian(
+            "WARN",
+            "No regex timeout defense available. "
+            "Install 'regex' package for ReDoS defense: pip install regex",
+        )
+        safe_regex_search._warned_no_timeout = True
+
+
 # ============================================================
-# Pattern Matching (Bash Commands)
+# Pattern Rule Sets (Bash Commands)
 # ============================================================
+# match_block_patterns()/match_ask_patterns() used to run one
+# safe_regex_search() per rule, so a command that matches nothing paid for
+# every pattern over its full length. PatternRuleSet merges the rules of a
+# category into one alternation:
+#
+#   (?:pattern0)|(?:pattern1)|...
+#
+# A miss is then a single scan. On a hit at offset p, the rule that matched
+# is found by trying each merged rule anchored at p (no rule matches before
+# p). That rule matches leftmost, which is not necessarily first in config
+# order, so only the rules before it are re-checked over the whole command;
+# the first match in config order still wins (reasons and precedence are
+# unchanged). The alternatives are deliberately not named groups: capture
+# bookkeeping makes Python's re several times slower on long commands.
+#
+# Rules that cannot be merged without changing their meaning (backrefs,
+# named groups, conditionals, inline flags other than a leading (?i)/(?s),
+# or patterns that do not compile on their own) are evaluated individually
+# through safe_regex_search(), as before.
+
+PATTERN_RULE_FLAGS = re.IGNORECASE | re.DOTALL
+"""Flags every bashToolPatterns rule is matched with."""
+
+_LEADING_GLOBAL_FLAGS_RE = re.compile(r"\A\(\?[is]+\)")
+"""Leading inline flags that PATTERN_RULE_FLAGS already implies."""
+
+_UNMERGEABLE_RULE_RE = re.compile(
+    r"\\(?:[1-9]|g<)"  # numbered or \g<...> backreferences
+    r"|\(\?P[<=>]|\(\?<[^=!]"  # named groups / named backrefs
+    r"|\(\?\("  # conditionals
+    r"|\(\?[a-zA-Z]*\)"  # inline global flags
+    r"|\(\?[R0-9&+-]"  # recursion (regex module)
+)
+"""Constructs whose meaning depends on group numbering or pattern scope.
+Over-matching (e.g. an escaped backslash before a digit) only means the
+rule is evaluated individually."""
 
 
-def match_block_patterns(command: str) -> tuple[bool, str]:
-    """Check if command matches any block pattern.
+# Required-literal prefilter: most rules can only match if some literal
+# appears in the command ("git", "shred", ".git", "curl" or "wget", ...).
+# extract_required_literals() finds, per rule, a set of lowercase ASCII
+# strings at least one of which every match must contain. When none of them
+# occurs in the lowercased command the rule's regex is skipped. The test is
+# only applied to ASCII commands: under re.IGNORECASE some ASCII letters also
+# match non-ASCII characters (k/KELVIN SIGN, s/LONG S, i/DOTTED I), which a
+# plain lower() comparison would miss. Rules without an extractable literal
+# always run.
+
+_prefilter_stats = {"rules": 0, "skipped": 0}
+"""Rule regex executions considered/avoided by the prefilter (this process)."""
+
+
+def get_pattern_prefilter_stats() -> dict[str, int]:
+    """Return prefilter counters for this process.
+
+    Returns:
+        {"rules": rule checks requested, "skipped": regex runs avoided}.
+    """
+    return dict(_prefilter_stats)
 
-    Block patterns are for catastrophic/dangerous commands
-    that should be unconditionally denied.
+
+def extract_required_literals(pattern: Any) -> list[str]:
+    """Extract literals one of which every match of pattern must contain.
 
     Args:
-        command: The bash command to check.
+        pattern: A bashToolPatterns regex (matched with PATTERN_RULE_FLAGS).
 
     Returns:
-        (matched, reason) tuple. If matched is True, reason
-        contains the block reason.
+        Sorted lowercase ASCII literals, or [] if none can be derived (the
+        rule then always runs). Never raises.
     """
-    # F-02 FIX: Fail-CLOSE on oversized commands (padding attack prevention)
-    # An attacker could pad a dangerous command to exceed MAX_COMMAND_LENGTH,
-    # bypassing all pattern checks. Deny oversized commands unconditionally.
-    if len(command) > MAX_COMMAND_LENGTH:
-        log_guardian(
-            "WARN",
-            f"Command exceeds size limit ({len(command)} > {MAX_COMMAND_LENGTH} bytes), "
-            "blocking (fail-close for security)",
-        )
-        return True, f"Command too large ({len(command)} bytes) - blocked for security"
+    if not isinstance(pattern, str):
+        return []
+    try:
+        try:
+            from re import _parser as sre_parse  # Python 3.11+
+        except ImportError:
+            import sre_parse  # type: ignore[no-redef]
+        parsed = sre_parse.parse(pattern, PATTERN_RULE_FLAGS)
+        return sorted(_required_literals(list(parsed), sre_parse) or [])
+    except Exception:
+        return []
 
-    config = load_guardian_config()
-    pattern_configs = config.get("bashToolPatterns", {}).get("block", [])
-
-    for pattern_config in pattern_configs:
-        pattern = pattern_config.get("pattern", "")
-        reason = pattern_config.get("reason", "Blocked by pattern")
-        # Use safe_regex_search with timeout defense
-        match = safe_regex_search(pattern, command, re.IGNORECASE | re.DOTALL)
-        if match:
-            return True, reason
 
-    return False, ""
+def _literal_score(literals: list[str]) -> tuple[int, int]:
+    """Selectivity of a literal set: longer shortest literal, then fewer literals."""
+    return min(len(lit) for lit in literals), -len(literals)
 
 
-def match_ask_patterns(command: str) -> tuple[bool, str]:
-    """Check if command matches any ask pattern.
+def _required_literals(items: list, sre_parse: Any) -> list[str] | None:
+    """Walk a parsed sequence; return the most selective required literal set."""
+    repeats = {
+        getattr(sre_parse, name)
+        for name in ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT")
+        if hasattr(sre_parse, name)
+    }
+    atomic = getattr(sre_parse, "ATOMIC_GROUP", None)
+    best: list[str] | None = None
+    run: list[str] = []
+
+    def consider(candidates: list[str] | None) -> None:
+        nonlocal best
+        if candidates and (best is None or _literal_score(candidates) > _literal_score(best)):
+            best = candidates
+
+    for op, av in items:
+        if op is sre_parse.LITERAL and av < 128:
+            run.append(chr(av).lower())
+            continue
+        if run:
+            consider(["".join(run)])
+            run = []
+        if op is sre_parse.SUBPATTERN:
+            consider(_required_literals(list(av[-1]), sre_parse))
+        elif op is sre_parse.BRANCH:
+            alternatives = [_required_literals(list(alt), sre_parse) for alt in av[1]]
+            if alternatives and all(alternatives):
+                union = {lit for alt in alternatives for lit in alt}
+                # "/bin/bash" is implied by "/bin/": keep the shortest
+                consider(sorted(
+                    lit for lit in union if not any(o != lit and o in lit for o in union)
+                ))
+        elif op in repeats and av[0] >= 1:
+            consider(_required_literals(list(av[2]), sre_parse))
+        elif atomic is not None and op is atomic:
+            consider(_required_literals(list(av), sre_parse))
+    if run:
+        consider(["".join(run)])
+    return best
+
+
+class PatternRuleSet:
+    """All rules of one bashToolPatterns category, matched in one scan.
+
+    Nothing is compiled up front: the literal prefilter usually leaves a
+    few rules, which are compiled on first use through safe_regex_search().
+    The combined regex is only built the first time a command reaches the
+    combined path (no rule skipped, or a non-ASCII command).
+
+    Attributes:
+        patterns: Rule patterns in config order.
+        literals: Required literals per rule ([] = always run).
+    """
 
-    Ask patterns are for dangerous but potentially legitimate
-    commands that require user confirmation.
+    __slots__ = ("patterns", "literals", "_combined", "_anchored", "_unmerged", "_built")
+
+    def __init__(self, patterns: list[str], literals: list[list[str]] | None = None):
+        self.patterns = list(patterns)
+        if literals is None or len(literals) != len(self.patterns):
+            literals = [extract_required_literals(pattern) for pattern in self.patterns]
+        self.literals = [list(lits) for lits in literals]
+        self._combined = None
+        self._anchored: list[tuple[int, Any]] = []
+        self._unmerged: list[int] = list(range(len(self.patterns)))
+        self._built = False
+
+    @property
+    def merged(self) -> frozenset[int]:
+        """Indices of the rules covered by the combined regex."""
+        self._build_combined()
+        return frozenset(index for index, _ in self._anchored)
+
+    def _build_combined(self) -> None:
+        """Compile the combined regex (once, on first use).
+
+        Each mergeable rule is compiled once on its own, which both checks
+        that it is valid and gives the anchored matcher used to tell which
+        rule the combined regex hit.
+        """
+        if self._built:
+            return
+        self._built = True
+        engine = _regex_module if _HAS_REGEX_TIMEOUT else re
+        parts = []
+        anchored = []
+        for index, pattern in enumerate(self.patterns):
+            body = _LEADING_GLOBAL_FLAGS_RE.sub("", pattern, count=1)
+            if _UNMERGEABLE_RULE_RE.search(body):
+                continue
+            try:
+                compiled = engine.compile(pattern, PATTERN_RULE_FLAGS)
+            except Exception:
+                continue
+            parts.append(f"(?:{body})")
+            anchored.append((index, compiled))
+        if parts:
+            try:
+                self._combined = engine.compile("|".join(parts), PATTERN_RULE_FLAGS)
+            except Exception:
+                anchored = []
+        if self._combined is None:
+            anchored = []
+        self._anchored = anchored
+        merged = {index for index, _ in anchored}
+        self._unmerged = [i for i in range(len(self.patterns)) if i not in merged]
+
+    def _leftmost_rule(self, text: str) -> tuple[bool, int | None]:
+        """Find the merged rule the combined regex matches leftmost.
+
+        Returns:
+            (ok, index): index is None on a miss; ok is False if the regex
+            engine gave up (timeout), in which case nothing is known.
+        """
+        try:
+            if _HAS_REGEX_TIMEOUT:
+                match = self._combined.search(text, timeout=REGEX_TIMEOUT_SECONDS)
+            else:
+                _warn_no_regex_timeout()
+                match = self._combined.search(text)
+            if match is None:
+                return True, None
+            start = match.start()
+            for index, compiled in self._anchored:
+                if _HAS_REGEX_TIMEOUT:
+                    found = compiled.match(text, start, timeout=REGEX_TIMEOUT_SECONDS)
+                else:
+                    found = compiled.match(text, start)
+                if found:
+                    return True, index
+        except Exception as e:
+            log_guardian("WARN", f"Combined rule regex failed ({e}), matching rules one by one")
+        return False, None
+
+    def first_match(self, text: str) -> int | None:
+        """Return the index of the first rule (in config order) matching text.
+
+        Args:
+            text: Command to check.
+
+        Returns:
+            Rule index, or None if no rule matches.
+        """
+        _prefilter_stats["rules"] += len(self.patterns)
+        if text.isascii():
+            lowered = text.lower()
+            possible = [
+                index
+                for index, literals in enumerate(self.literals)
+                if not literals or any(lit in lowered for lit in literals)
+            ]
+            skipped = len(self.patterns) - len(possible)
+            if skipped:
+                # Only a handful of rules left: run them directly in order
+                _prefilter_stats["skipped"] += skipped
+                for index in possible:
+                    if safe_regex_search(self.patterns[index], text, PATTERN_RULE_FLAGS):
+                        return index
+                return None
+
+        self._build_combined()
+        hit = None
+        candidates: Any = self._unmerged
+        if self._combined is not None:
+            ok, hit = self._leftmost_rule(text)
+            if not ok:
+                candidates = range(len(self.patterns))
+            elif hit is not None:
+                candidates = range(hit)
+        for index in candidates:
+            if hit is not None and index >= hit:
+                break
+            if safe_regex_search(self.patterns[index], text, PATTERN_RULE_FLAGS):
+                return index
+        return hit
+
+
+_pattern_rule_set_cache: dict[tuple[str, ...], PatternRuleSet] = {}
+
+
+def get_pattern_rule_set(
+    patterns: list[str], literals: list[list[str]] | None = None
+) -> PatternRuleSet:
+    """Return the (cached) PatternRuleSet for a list of rule patterns.
 
     Args:
-        command: The bash command to check.
+        patterns: Rule patterns in config order.
+        literals: Precomputed required literals per rule (compiled config);
+            extracted from the patterns when omitted.
 
     Returns:
-        (matched, reason) tuple. If matched is True, reason
-        contains the ask reason.
+        PatternRuleSet over the patterns.
     """
-    # F-02 FIX: Fail-CLOSE on oversized commands (consistent with match_block_patterns)
-    if len(command) > MAX_COMMAND_LENGTH:
-        log_guardian(
-            "WARN",
-            f"Command exceeds size limit ({len(command)} > {MAX_COMMAND_LENGTH} bytes), "
-            "requesting confirmation (fail-close for security)",
-        )
-        return True, f"Command too large ({len(command)} bytes) - requires confirmation"
-
-    config = load_guardian_config()
-    pattern_configs = config.get("bashToolPatterns", {}).get("ask", [])
-
-    for pattern_config in pattern_configs:
-        pattern = pattern_config.get("pattern", "")
-        reason = pattern_config.get("reason", "Requires confirmation")
-        # Use safe_regex_search with timeout defense
-        match = safe_regex_search(pattern, command, re.IGNORECASE | re.DOTALL)
-        if match:
-            return True, reason
-
-    return False, ""
+    key = tuple(patterns)
+    rule_set = _pattern_rule_set_cache.get(key)
+    if rule_set is None:
+        if len(_pattern_rule_set_cache) >= 8:
+            _pattern_rule_set_cache.clear()
+        rule_set = PatternRuleSet(list(key), literals)
+        _pattern_rule_set_cache[key] = rule_set
+    return rule_set
 
 
 # ============================================================
-# Path Matching (File Paths)
+# Structured Command Rules (Bash Commands)
 # ============================================================
+# Besides {"pattern": ...} regexes, bashToolPatterns entries may describe
+# the parsed command:
+#
+#   {"command": "git", "subcommand": "push", "flags": ["--force", "-f"],
+#    "reason": "Force push"}
+#
+# They are matched against the argv of every simple command the string
+# would run (iter_command_argvs()): each sub-command of
+# _guardian_shell.parse_command(), after leading reserved words (if, then,
+# do, !, ...), VAR=value assignments and wrapper commands (sudo, env,
+# timeout, xargs, ...) are skipped, plus the commands inside brace groups,
+# subshells, command/process substitutions and `bash -c` strings.
+# CommandRuleTable indexes the rules by command name, so only the rules for
+# the executables actually invoked are evaluated. Both forms can be mixed
+# in one list; the first matching rule in config order wins.
+
+_COMMAND_WRAPPERS: dict[str, frozenset[str]] = {
+    "sudo": frozenset({"-u", "-g", "-h", "-p", "-C", "-D", "-r", "-t", "-U", "-T"}),
+    "env": frozenset({"-u", "-C", "-S", "--unset", "--chdir", "--split-string"}),
+    "command": frozenset(),
+    "builtin": frozenset(),
+    "exec": frozenset({"-a"}),
+    "nohup": frozenset(),
+    "time": frozenset({"-f", "-o", "--format", "--output"}),
+    "nice": frozenset({"-n", "--adjustment"}),
+    "timeout": frozenset({"-s", "--signal", "-k", "--kill-after"}),
+    "xargs": frozenset({"-a", "--arg-file", "-d", "--delimiter", "-E", "-I", "-L",
+                        "--max-lines", "-n", "--max-args", "-P", "--max-procs", "-s",
+                        "--max-chars", "--process-slot-var"}),
+    "watch": frozenset({"-n", "--interval", "-d", "-q", "--equexit", "--shell"}),
+    "stdbuf": frozenset({"-i", "-o", "-e", "--input", "--output", "--error"}),
+    "ionice": frozenset({"-c", "--class", "-n", "--classdata"}),
+}
+"""Wrapper commands skipped to find the real argv[0], mapped to their
+options that take a separate value argument."""
+
+_WRAPPER_OPERANDS = {"timeout": 1}
+"""Wrappers with operands before the command (timeout DURATION command)."""
+
+_SHELL_STRING_WRAPPERS = frozenset({"watch"})
+"""Wrappers that join the command words and run them with `sh -c`."""
+
+_SHELL_COMMANDS = frozenset({"sh", "bash", "dash", "zsh", "ksh", "ash"})
+"""Shells whose -c script is checked like a command of its own."""
+
+_SHELL_VALUE_OPTIONS = frozenset({"-o", "+o", "-O", "+O", "--rcfile", "--init-file"})
+"""Shell options that take a separate value argument (before -c)."""
+
+_SHELL_RESERVED_WORDS = frozenset({"if", "then", "else", "elif", "do", "while", "until", "!"})
+"""Reserved words that may precede a command in a sub-command."""
+
+_MAX_NESTED_COMMAND_DEPTH = 8
+"""Nesting levels (groups, substitutions, -c strings) searched for commands."""
+
+_QUOTED_SUBSTITUTION_RE = re.compile(r"\$\(|`")
+
+_GLOBAL_VALUE_OPTIONS: dict[str, frozenset[str]] = {
+    "git": frozenset({"-C", "-c", "--git-dir", "--work-tree", "--namespace",
+                      "--super-prefix", "--config-env", "--exec-path", "--list-cmds"}),
+    "npm": frozenset({"-C", "--prefix", "-w", "--workspace", "--registry", "--userconfig",
+                      "--globalconfig", "--cache", "--loglevel", "--tag", "--otp"}),
+    "pnpm": frozenset({"-C", "--dir", "-F", "--filter"}),
+    "yarn": frozenset({"--cwd"}),
+    "docker": frozenset({"-H", "--host", "-c", "--context", "--config", "-l", "--log-level",
+                         "--tlscacert", "--tlscert", "--tlskey"}),
+    "kubectl": frozenset({"-n", "--namespace", "--context", "--cluster", "--kubeconfig",
+                          "-s", "--server", "--user", "--token", "--as", "--as-group",
+                          "--request-timeout", "--cache-dir"}),
+    "helm": frozenset({"-n", "--namespace", "--kube-context", "--kubeconfig"}),
+}
+"""Options that take a separate value when given before the subcommand
+(git -C dir push), so the value is not mistaken for the subcommand."""
 
+_ENV_ASSIGNMENT_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*\+?=")
 
-def normalize_path(path: str) -> str:
-    """Normalize path for consistent comparison.
 
-    Applies:
-    - expanduser for ~ expansion
-    - normpath for consistent separators
+def is_command_rule(entry: Any) -> bool:
+    """True if a bashToolPatterns entry uses the structured command form."""
+    return isinstance(entry, dict) and "command" in entry and "pattern" not in entry
+
+
+def command_name(word: str) -> str:
+    """Executable name as rules see it: basename, leading backslash removed."""
+    return word.lstrip("\\").rsplit("/", 1)[-1]
+
+
+def normalize_command_rule(entry: dict) -> dict[str, Any]:
+    """Validate a structured rule and normalize its fields to lists.
+
+    Fields: "command" (required), "subcommand", "flags", "args"; each a
+    non-empty string or list of non-empty strings. All given fields must
+    match:
+      - command: executable name (basename of argv[0] after wrappers)
+      - subcommand: first non-option argument (values of global options
+        such as git -C <dir> are skipped, see _GLOBAL_VALUE_OPTIONS)
+      - flags: any of these options present ("-f" also matches "-rf";
+        "--force" also matches "--force=...")
+      - args: any remaining non-option argument matches any of these globs
+
+    Args:
+        entry: bashToolPatterns entry.
+
+    Returns:
+        {"commands", "subcommands", "flags", "args"} (optional ones None).
+
+    Raises:
+        ValueError: If a field has the wrong type.
+    """
+
+    def strings(field: str) -> list[str] | None:
+        value = entry.get(field)
+        if value is None:
+            return None
+        if isinstance(value, str):
+            value = [value]
+        if not isinstance(value, list) or not value or not all(
+            isinstance(item, str) and item for item in value
+        ):
+            raise ValueError(f"'{field}' must be a non-empty string or list of non-empty strings")
+        return list(value)
+
+    commands = strings("command")
+    if commands is None:
+        raise ValueError("'command' is required")
+    flags = strings("flags")
+    if flags is not None and not all(flag.startswith("-") for flag in flags):
+        raise ValueError("'flags' entries must start with '-'")
+    return {
+        "commands": [command_name(name) for name in commands],
+        "subcommands": strings("subcommand"),
+        "flags": flags,
+        "args": strings("args"),
+    }
+
+
+def resolve_command_argv(argv: list[str]) -> list[str]:
+    """Strip assignments and wrapper commands from argv.
+
+    Args:
+        argv: Words of one sub-command.
+
+    Returns:
+        argv starting at the real command (argv[0] reduced to command_name()),
+        or [] if there is none (e.g. only assignments).
+    """
+    i = 0
+    while i < len(argv):
+        word = argv[i]
+        if _ENV_ASSIGNMENT_RE.match(word):
+            i += 1
+            continue
+        name = command_name(word)
+        value_options = _COMMAND_WRAPPERS.get(name)
+        if value_options is None:
+            return [name] + argv[i + 1 :]
+        i += 1
+        while i < len(argv) and argv[i].startswith("-") and argv[i] != "-":
+            option = argv[i]
+            i += 1
+            if option == "--":
+                break
+            if option in value_options:
+                i += 1
+        i += _WRAPPER_OPERANDS.get(name, 0)
+        if name in _SHELL_STRING_WRAPPERS and i < len(argv):
+            return ["sh", "-c", " ".join(argv[i:])]
+    return []
+
+
+def _shell_script(argv: list[str]) -> str | None:
+    """The -c script of a resolved shell argv (bash -lc 'cmd'), or None."""
+    i = 1
+    while i < len(argv) and argv[i][:1] in ("-", "+") and argv[i] not in ("-", "--"):
+        option = argv[i]
+        i += 1
+        if option in _SHELL_VALUE_OPTIONS:
+            i += 1
+        elif option[0] == "-" and not option.startswith("--") and "c" in option[1:]:
+            return argv[i] if i < len(argv) else None
+    return None
+
+
+def _nested_commands(sub: Any) -> Iterator[str]:
+    """Bodies of the substitutions and subshells in one sub-command.
+
+    The shell scanner records unquoted $(...), <(...), >(...), `...` and
+    bare (...) groups; $(...) and `...` inside double quotes run too, so
+    they are located here.
+    """
+    text = sub.text
+    for substitution in sub.substitutions:
+        start = substitution.start + len(substitution.kind)
+        end = substitution.end
+        if end > start and text[end - 1] == ("`" if substitution.kind == "`" else ")"):
+            end -= 1
+        yield text[start:end]
+    if '"' not in text:
+        return
+    for m in _QUOTED_SUBSTITUTION_RE.finditer(text):
+        if sub.quotes.quote_type(m.start()) != '"':
+            continue
+        start = m.end()
+        if m.group() == "`":
+            end = text.find("`", start)
+        else:
+            end, depth = start, 1
+            while end < len(text):
+                depth += {"(": 1, ")": -1}.get(text[end], 0)
+                if not depth:
+                    break
+                end += 1
+        yield text[start:end] if end >= 0 else text[start:]
+
+
+def iter_command_argvs(command: str, _depth: int = 0) -> Iterator[list[str]]:
+    """Resolved argv of every simple command a Bash string would run.
+
+    Covers the top-level sub-commands (after reserved words such as
+    if/then/do/!, assignments and wrappers) and, recursively, the commands
+    in brace groups, subshells, command/process substitutions and the
+    script of `bash -c` / `sh -c` (also `watch 'cmd'`). Structured rules
+    see exactly these argvs, so `if true; then docker rm x; fi`,
+    `( docker rm x )` and `bash -c "docker rm x"` match like `docker rm x`.
+
+    Args:
+        command: Bash command string.
+
+    Yields:
+        argv lists as returned by resolve_command_argv() (never empty).
+    """
+    if _depth > _MAX_NESTED_COMMAND_DEPTH:
+        return
+    from _guardian_shell import SubCommand, parse_command
+
+    for sub in parse_command(command).sub_commands:
+        for body in _nested_commands(sub):
+            yield from iter_command_argvs(body, _depth + 1)
+        if sub.substitutions:
+            # Blank out the bodies checked above, so `x=$(docker rm y)` is an
+            # assignment rather than the command `rm y)`
+            text = sub.text
+            for substitution in sub.substitutions:
+                start, end = substitution.start, substitution.end
+                text = text[:start] + "_" * (end - start) + text[end:]
+            sub = SubCommand(text)
+        words = sub.words
+        i = 0
+        while i < len(words) and not words[i].quoted and words[i].value in _SHELL_RESERVED_WORDS:
+            i += 1
+        if i < len(words) and not words[i].quoted and words[i].value == "{":
+            end = len(sub.text)
+            if len(words) > i + 1 and not words[-1].quoted and words[-1].value == "}":
+                end = words[-1].start
+            yield from iter_command_argvs(sub.text[words[i].end:end], _depth + 1)
+            continue
+        argv = resolve_command_argv([word.value for word in words[i:]])
+        if not argv:
+            continue
+        yield argv
+        if argv[0] in _SHELL_COMMANDS:
+            script = _shell_script(argv)
+            if script is not None:
+                yield from iter_command_argvs(script, _depth + 1)
+
+
+def _flag_present(flag: str, options: list[str]) -> bool:
+    for option in options:
+        if option == flag or option.startswith(flag + "="):
+            return True
+        if (
+            len(flag) == 2
+            and flag[1] != "-"
+            and not option.startswith("--")
+            and flag[1] in option[1:]
+        ):
+            return True  # bundled short options: -f in -rf
+    return False
+
+
+def _command_rule_matches(spec: dict[str, Any], argv: list[str]) -> bool:
+    """Check a normalized rule against a resolved argv (argv[0] already matched)."""
+    options: list[str] = []
+    positional: list[str] = []
+    end_of_options = False
+    global_value_options = _GLOBAL_VALUE_OPTIONS.get(argv[0], frozenset())
+    skip_value = False
+    for word in argv[1:]:
+        if skip_value:
+            skip_value = False  # Value of a global option (git -C <dir>)
+        elif not end_of_options and word == "--":
+            end_of_options = True
+        elif not end_of_options and word.startswith("-") and word != "-":
+            options.append(word)
+            skip_value = not positional and word in global_value_options
+        else:
+            positional.append(word)
+
+    if spec["subcommands"] is not None:
+        if not positional or positional[0] not in spec["subcommands"]:
+            return False
+        positional = positional[1:]
+    if spec["flags"] is not None and not any(_flag_present(f, options) for f in spec["flags"]):
+        return False
+    if spec["args"] is not None and not any(
+        fnmatch.fnmatchcase(arg, glob) for arg in positional for glob in spec["args"]
+    ):
+        return False
+    return True
+
+
+class CommandRuleTable:
+    """Structured rules of one category, dispatched by command name.
+
+    Attributes:
+        by_command: {command name: [(config index, spec), ...]} in config order.
+    """
+
+    __slots__ = ("by_command",)
+
+    def __init__(self, rules: list[tuple[int, dict[str, Any]]]):
+        self.by_command: dict[str, list[tuple[int, dict[str, Any]]]] = {}
+        for index, spec in rules:
+            for name in dict.fromkeys(spec["commands"]):
+                self.by_command.setdefault(name, []).append((index, spec))
+
+    def first_match(self, command: str, limit: int | None = None) -> int | None:
+        """Return the lowest config index of a rule matching any sub-command.
+
+        Args:
+            command: Full bash command.
+            limit: Only report indices below this (a regex rule already matched).
+
+        Returns:
+            Config index, or None.
+        """
+        if not self.by_command:
+            return None
+        best = limit
+        for argv in iter_command_argvs(command):
+            for index, spec in self.by_command.get(argv[0], ()):
+                if best is not None and index >= best:
+                    break
+                if _command_rule_matches(spec, argv):
+                    best = index
+                    break
+        return None if best == limit else best
+
+
+_command_rule_table_cache: dict[str, CommandRuleTable] = {}
+
+
+def get_command_rule_table(rules: list[tuple[int, dict[str, Any]]]) -> CommandRuleTable:
+    """Return the (cached) CommandRuleTable for (config index, spec) pairs."""
+    key = json.dumps(rules, sort_keys=True)
+    table = _command_rule_table_cache.get(key)
+    if table is None:
+        if len(_command_rule_table_cache) >= 8:
+            _command_rule_table_cache.clear()
+        table = CommandRuleTable(rules)
+        _command_rule_table_cache[key] = table
+    return table
+
+
+def _match_pattern_rules(category: str, command: str) -> tuple[bool, str]:
+    """Return (matched, reason) for the first rule of category matching command."""
+    try:
+        rules = list(_iter_pattern_rules(category))
+    except Exception:
+        rules = None
+    if rules is None or not all(rule[0] is None or isinstance(rule[0], str) for rule in rules):
+        # Malformed config: keep the lazy rule-by-rule walk so it fails (or
+        # matches) at exactly the same point as before
+        for pattern, reason, _literals, spec in _iter_pattern_rules(category):
+            if pattern is None:
+                if spec is not None and CommandRuleTable([(0, spec)]).first_match(command) == 0:
+                    return True, reason
+            elif safe_regex_search(pattern, command, PATTERN_RULE_FLAGS):
+                return True, reason
+        return False, ""
+
+    regex_indices = [i for i, rule in enumerate(rules) if rule[0] is not None]
+    index = None
+    if regex_indices:
+        literals = [rules[i][2] for i in regex_indices]
+        rule_set = get_pattern_rule_set(
+            [rules[i][0] for i in regex_indices],
+            literals if all(isinstance(lits, list) for lits in literals) else None,
+        )
+        hit = rule_set.first_match(command)
+        if hit is not None:
+            index = regex_indices[hit]
+    structured = [(i, rule[3]) for i, rule in enumerate(rules) if rule[0] is None and rule[3]]
+    if structured:
+        hit = get_command_rule_table(structured).first_match(command, limit=index)
+        if hit is not None:
+            index = hit
+    if index is None:
+        return False, ""
+    return True, rules[index][1]
+
+
+# ============================================================
+# Pattern Matching (Bash Commands)
+# ============================================================
+
+
+def match_block_patterns(command: str) -> tuple[bool, str]:
+    """Check if command matches any block pattern.
+
+    Block patterns are for catastrophic/dangerous commands
+    that should be unconditionally denied.
+
+    Args:
+        command: The bash command to check.
+
+    Returns:
+        (matched, reason) tuple. If matched is True, reason
+        contains the block reason.
+    """
+    # F-02 FIX: Fail-CLOSE on oversized commands (padding attack prevention)
+    # An attacker could pad a dangerous command to exceed MAX_COMMAND_LENGTH,
+    # bypassing all pattern checks. Deny oversized commands unconditionally.
+    if len(command) > MAX_COMMAND_LENGTH:
+        log_guardian(
+            "WARN",
+            f"Command exceeds size limit ({len(command)} > {MAX_COMMAND_LENGTH} bytes), "
+            "blocking (fail-close for security)",
+        )
+        return True, f"Command too large ({len(command)} bytes) - blocked for security"
+
+    # One combined scan; first matching rule in config order wins
+    return _match_pattern_rules("block", command)
+
+
+def match_ask_patterns(command: str) -> tuple[bool, str]:
+    """Check if command matches any ask pattern.
+
+    Ask patterns are for dangerous but potentially legitimate
+    commands that require user confirmation.
+
+    Args:
+        command: The bash command to check.
+
+    Returns:
+        (matched, reason) tuple. If matched is True, reason
+        contains the ask reason.
+    """
+    # F-02 FIX: Fail-CLOSE on oversized commands (consistent with match_block_patterns)
+    if len(command) > MAX_COMMAND_LENGTH:
+        log_guardian(
+            "WARN",
+            f"Command exceeds size limit ({len(command)} > {MAX_COMMAND_LENGTH} bytes), "
+            "requesting confirmation (fail-close for security)",
+        )
+        return True, f"Command too large ({len(command)} bytes) - requires confirmation"
+
+    # One combined scan; first matching rule in config order wins
+    return _match_pattern_rules("ask", command)
+
+
+# ============================================================
+# Layer 1 Literal Tables (bash_guardian.scan_protected_paths)
+# ============================================================
+
+_SCAN_TIER_CONFIG_KEYS = {
+    "zeroAccess": "zeroAccessPaths",
+    "readOnly": "readOnlyPaths",
+    "noDelete": "noDeletePaths",
+}
+"""bashPathScan.scanTiers name -> config key."""
+
+
+def glob_to_literals(pattern: str) -> list[str]:
+    """Convert a glob pattern to literal search strings for raw command scanning.
+
+    Only converts patterns where the literal is distinctive enough to be
+    meaningful as a substring search. Returns empty list for patterns that
+    are too generic.
+
+    Critical fix C-3: Returns [] for generic patterns like *.env to avoid
+    false positives. Only exact matches, prefix patterns, and specific
+    suffix patterns are converted.
+
+    Examples:
+        ".env"       -> [".env"]       (exact match)
+        ".env.*"     -> [".env."]      (prefix match)
+        "id_rsa"     -> ["id_rsa"]     (exact match)
+        "id_rsa.*"   -> ["id_rsa."]    (prefix match)
+        "*.pem"      -> [".pem"]       (suffix match)
+        "*.tfstate"  -> [".tfstate"]   (suffix match)
+        "*.env"      -> []             (too generic)
+        "*credentials*.json" -> []     (too generic)
+
+    Args:
+        pattern: A glob pattern from zeroAccessPaths config.
+
+    Returns:
+        List of literal strings to search for, or [] if too generic.
+    """
+    # Exact match (no wildcards)
+    if "*" not in pattern and "?" not in pattern:
+        return [pattern]
+
+    # Prefix match: "name.*" -> search for "name."
+    if pattern.endswith(".*"):
+        prefix = pattern[:-1]  # "name."
+        # Only if the prefix itself has no wildcards
+        if "*" not in prefix and "?" not in prefix:
+            return [prefix]
+
+    # Suffix match: "*.ext" -> search for ".ext"
+    # C-3 fix: Only if the extension is distinctive enough
+    if pattern.startswith("*.") and "*" not in pattern[1:] and "?" not in pattern[1:]:
+        suffix = pattern[1:]  # ".ext"
+        # Skip short/generic suffixes that cause excessive false positives
+        if len(suffix) >= 4:
+            bare = suffix[1:]  # strip leading dot
+            generic_words = {"env", "key", "log"}
+            if bare.lower() not in generic_words:
+                return [suffix]
+
+    # Wildcard patterns like "*credentials*" -- too generic, skip
+    return []
+
+
+def build_layer1_scan_table(config: dict) -> list[dict[str, Any]]:
+    """Build the Layer 1 literal table for the configured scan tiers.
+
+    One entry per literal, in config order, with the boundary-aware search
+    regex and its glob-?-aware variant already built.
+
+    I-4 fix: Include / in word-boundary character set.
+    Gemini review fix: Include {, }, , for brace expansion.
+    For exact matches: strict word boundaries on both sides.
+    For prefix patterns (e.g. ".env." from ".env.*"): strict before, relaxed after.
+    For suffix patterns (e.g. ".pem" from "*.pem"): relaxed before, strict after.
+
+    Args:
+        config: Guardian configuration dict.
+
+    Returns:
+        List of {"literal", "exact", "before", "after", "regex",
+        "glob_q_regex"} dicts. "before"/"after" tell whether the literal
+        needs a boundary character on that side (see layer1_boundary_ok()).
+    """
+    scan_config = config.get("bashPathScan", {})
+    # Read scanTiers from config; default to ["zeroAccess"] (preserves current behavior)
+    scan_tiers = scan_config.get("scanTiers", ["zeroAccess"])
+
+    # Collect all path patterns from configured tiers
+    all_scan_paths: list[str] = []
+    for tier in scan_tiers:
+        config_key = _SCAN_TIER_CONFIG_KEYS.get(tier)
+        if config_key:
+            all_scan_paths.extend(config.get(config_key, []))
+
+    boundary_before = r"(?:^|[\s;|&<>(\"`'=/,{\[:\]])"
+    boundary_after = r"(?:$|[\s;|&<>)\"`'/,}\[:\]])"
+
+    table: list[dict[str, Any]] = []
+    for pattern in all_scan_paths:
+        # Skip directory patterns -- too noisy for raw string scan
+        if "**" in pattern or pattern.endswith("/"):
+            continue
+
+        is_exact = "*" not in pattern and "?" not in pattern
+        is_prefix_pattern = pattern.endswith(".*")
+        is_suffix_pattern = pattern.startswith("*.")
+
+        for literal in glob_to_literals(pattern):
+            if is_suffix_pattern:
+                # ".pem" can be preceded by any word char (server.pem)
+                regex = re.escape(literal) + boundary_after
+            elif is_prefix_pattern:
+                # ".env." can be followed by any word char (.env.local)
+                regex = boundary_before + re.escape(literal)
+            else:
+                # Exact match: strict boundaries both sides
+                regex = boundary_before + re.escape(literal) + boundary_after
+
+            # Build a glob-?-aware regex: for each char in the literal,
+            # also allow ? as a substitute (catches .en? -> .env evasion).
+            # Uses a capturing group per position to verify post-match that
+            # at least one position matched a concrete character (not all ?).
+            glob_q_literal = "".join(f"({re.escape(ch)}|\\?)" for ch in literal)
+            if is_suffix_pattern:
+                glob_q_regex = glob_q_literal + boundary_after
+            elif is_prefix_pattern:
+                glob_q_regex = boundary_before + glob_q_literal
+            else:
+                glob_q_regex = boundary_before + glob_q_literal + boundary_after
+
+            table.append({
+                "literal": literal,
+                "exact": is_exact,
+                "before": not is_suffix_pattern,
+                "after": not is_prefix_pattern or is_suffix_pattern,
+                "regex": regex,
+                "glob_q_regex": glob_q_regex,
+            })
+    return table
+
+
+def get_layer1_scan_table(config: dict) -> list[dict[str, Any]]:
+    """Return the Layer 1 literal table, from the compiled artifact when it applies.
+
+    Args:
+        config: Guardian configuration dict (any dict; tests pass their own).
+
+    Returns:
+        Same result as build_layer1_scan_table(config).
+    """
+    table = _get_compiled_table("layer1", config)
+    if table is not None:
+        return table
+    return build_layer1_scan_table(config)
+
+
+# Boundary characters of the Layer 1 regexes (besides whitespace, which is
+# tested with str.isspace() to match the regexes' \s exactly)
+_LAYER1_BOUNDARY_BEFORE = frozenset(";|&<>(\"`'=/,{[:]")
+_LAYER1_BOUNDARY_AFTER = frozenset(";|&<>)\"`'/,}[:]")
+
+
+def layer1_boundary_ok(text: str, start: int, end: int, before: bool, after: bool) -> bool:
+    """Check the Layer 1 boundary rules for a literal found at text[start:end].
+
+    Equivalent to the entry's "regex" matching at that occurrence.
+
+    Args:
+        text: Scanned text.
+        start: Occurrence start.
+        end: Occurrence end.
+        before: A boundary (or start of text) is required before start.
+        after: A boundary (or end of text) is required at end.
+
+    Returns:
+        True if the occurrence satisfies the boundary rules.
+    """
+    if before and start > 0:
+        ch = text[start - 1]
+        if not (ch.isspace() or ch in _LAYER1_BOUNDARY_BEFORE):
+            return False
+    if after and end < len(text):
+        ch = text[end]
+        if not (ch.isspace() or ch in _LAYER1_BOUNDARY_AFTER):
+            return False
+    return True
+
+
+class Layer1LiteralMatcher:
+    """Multi-literal matcher for the Layer 1 scan.
+
+    Finds every occurrence of every literal in a single pass over the text.
+    A compiled lookahead alternation of all literals jumps (in C) to the
+    positions where at least one literal starts; a trie walk from each such
+    position then reports every literal that occurs there, including
+    literals that are prefixes of others (".env" and ".env.").
+    """
+
+    __slots__ = ("_finder", "_trie")
+
+    _END = ""  # trie key holding the literal that ends at a node
+
+    def __init__(self, literals: list[str]):
+        unique = sorted(set(literals), key=len, reverse=True)
+        self._finder = re.compile("(?=" + "|".join(re.escape(lit) for lit in unique) + ")")
+        self._trie: dict[str, Any] = {}
+        for literal in unique:
+            node = self._trie
+            for ch in literal:
+                node = node.setdefault(ch, {})
+            node[self._END] = literal
+
+    def find_all(self, text: str) -> dict[str, list[int]]:
+        """Return {literal: [start offsets]} for every occurrence in text."""
+        hits: dict[str, list[int]] = {}
+        end_key = self._END
+        for m in self._finder.finditer(text):
+            pos = m.start()
+            node = self._trie
+            i = pos
+            while True:
+                literal = node.get(end_key)
+                if literal is not None:
+                    hits.setdefault(literal, []).append(pos)
+                if i >= len(text):
+                    break
+                node = node.get(text[i])
+                if node is None:
+                    break
+                i += 1
+        return hits
+
+
+_layer1_matcher_cache: dict[tuple[str, ...], Layer1LiteralMatcher] = {}
+
+
+def get_layer1_literal_matcher(table: list[dict[str, Any]]) -> Layer1LiteralMatcher:
+    """Return the (cached) literal matcher for a Layer 1 table.
+
+    Args:
+        table: Result of get_layer1_scan_table().
+
+    Returns:
+        Layer1LiteralMatcher over all literals of the table.
+    """
+    key = tuple(entry["literal"] for entry in table)
+    matcher = _layer1_matcher_cache.get(key)
+    if matcher is None:
+        if len(_layer1_matcher_cache) >= 8:
+            _layer1_matcher_cache.clear()
+        matcher = Layer1LiteralMatcher(list(key))
+        _layer1_matcher_cache[key] = matcher
+    return matcher
+
+
+# ============================================================
+# Filesystem Fact Cache
+# ============================================================
+# One hook invocation checks every path against is_symlink_escape(), the
+# project boundary and each path tier, and each of those used to call
+# Path.resolve() (an lstat per path component) on the path and again on the
+# project dir. Inside fs_fact_scope() the lstat/stat/realpath answers are
+# memoized: realpath reuses the resolved parent directory, so resolving N
+# files in one directory costs O(N) syscalls instead of O(N x depth x checks).
+# Facts are only cached for the duration of one invocation (the resident
+# evaluator forks a fresh child per request), never across requests.
+
+# Errors Path.is_symlink()/exists() report as False instead of raising
+_FS_IGNORED_ERRNOS = frozenset({errno.ENOENT, errno.ENOTDIR, errno.EBADF, errno.ELOOP})
+
+
+class FsFacts:
+    """Memoized stat/lstat/realpath results for one hook invocation."""
+
+    __slots__ = ("_lstat", "_stat", "_real", "counts")
+
+    def __init__(self):
+        self._lstat: dict[str, Any] = {}
+        self._stat: dict[str, Any] = {}
+        self._real: dict[str, str] = {}
+        self.counts = {"lstat": 0, "stat": 0, "realpath": 0}
+
+    def lstat(self, path: str) -> Any:
+        """os.lstat(path), or the OSError it raised."""
+        try:
+            return self._lstat[path]
+        except KeyError:
+            pass
+        self.counts["lstat"] += 1
+        try:
+            result = os.lstat(path)
+        except OSError as e:
+            result = e
+        self._lstat[path] = result
+        return result
+
+    def stat(self, path: str) -> Any:
+        """os.stat(path), or the OSError it raised."""
+        try:
+            return self._stat[path]
+        except KeyError:
+            pass
+        self.counts["stat"] += 1
+        try:
+            result = os.stat(path)
+        except OSError as e:
+            result = e
+        self._stat[path] = result
+        return result
+
+    def realpath(self, path: str) -> str:
+        """os.path.realpath() of an absolute path, one lstat per new component."""
+        return self._realpath(path)[0]
+
+    def _realpath(self, path: str) -> tuple[str, bool]:
+        """(realpath, complete); complete is False after a symlink loop."""
+        cached = self._real.get(path)
+        if cached is not None:
+            return cached
+        head, name = os.path.split(path)
+        parent = None if head == path else self._realpath(head)
+        if os.name != "posix" or parent is None:
+            # Drive/UNC semantics or the root itself: no per-component walk
+            result = self._full_realpath(path)
+        elif not parent[1]:
+            # realpath() gave up on a prefix (symlink loop) and normalized
+            # the rest lexically; so does every path below it
+            result = (self._full_realpath(path)[0], False)
+        elif name in ("", "."):
+            result = parent
+        elif name == "..":
+            result = (os.path.dirname(parent[0]), True)
+        else:
+            newpath = os.path.join(parent[0], name)
+            st = self.lstat(newpath)
+            if not isinstance(st, OSError) and stat.S_ISLNK(st.st_mode):
+                # Symlinks are rare: let realpath() follow the chain
+                result = self._full_realpath(newpath)
+            else:
+                result = (newpath, True)
+        self._real[path] = result
+        return result
+
+    def _full_realpath(self, path: str) -> tuple[str, bool]:
+        self.counts["realpath"] += 1
+        resolved = os.path.realpath(path)
+        # A complete resolution contains no symlinks; realpath() leaves the
+        # rest of the path unresolved when it meets a loop
+        complete = os.name != "posix" or not any(
+            not isinstance(st, OSError) and stat.S_ISLNK(st.st_mode)
+            for st in map(self.lstat, _path_prefixes(resolved))
+        )
+        return resolved, complete
+
+    def summary(self) -> str:
+        return ", ".join(f"{key}={value}" for key, value in self.counts.items())
+
+
+def _path_prefixes(path: str) -> list[str]:
+    """"/a/b/c" -> ["/a", "/a/b", "/a/b/c"]."""
+    prefixes = []
+    while True:
+        head, name = os.path.split(path)
+        if not name:
+            break
+        prefixes.append(path)
+        path = head
+    return prefixes[::-1]
+
+
+_fs_facts: FsFacts | None = None
+
+
+@contextmanager
+def fs_fact_scope():
+    """Memoize filesystem facts for the duration of one hook invocation.
+
+    Syscall counts are written to guardian.log at DEBUG level on exit.
+    """
+    global _fs_facts
+    previous, _fs_facts = _fs_facts, FsFacts()
+    facts = _fs_facts
+    try:
+        yield facts
+    finally:
+        _fs_facts = previous
+        if any(facts.counts.values()):
+            log_guardian("DEBUG", f"Filesystem facts: {facts.summary()}")
+
+
+def _raise_unless_ignored(error: OSError) -> bool:
+    if error.errno in _FS_IGNORED_ERRNOS:
+        return False
+    raise error
+
+
+def fs_resolve(path: str | Path) -> Path:
+    """Path(path).resolve(), memoized inside fs_fact_scope().
+
+    Raises:
+        RuntimeError: On a symlink loop (like Path.resolve()).
+        OSError: If path resolution fails.
+    """
+    path = Path(path)
+    facts = _fs_facts
+    if facts is None or not path.is_absolute():
+        return path.resolve()
+    resolved = facts.realpath(str(path))
+    # Path.resolve() stats the result to turn symlink loops into errors
+    st = facts.stat(resolved)
+    if isinstance(st, OSError) and st.errno == errno.ELOOP:
+        raise RuntimeError(f"Symlink loop from {resolved!r}")
+    return Path(resolved)
+
+
+def fs_stat(path: str | Path) -> os.stat_result:
+    """os.stat(path), memoized inside fs_fact_scope().
+
+    Raises:
+        OSError: Like os.stat().
+    """
+    facts = _fs_facts
+    if facts is None:
+        return os.stat(path)
+    st = facts.stat(str(Path(path)))
+    if isinstance(st, OSError):
+        raise st
+    return st
+
+
+def fs_exists(path: str | Path) -> bool:
+    """Path(path).exists(), memoized inside fs_fact_scope()."""
+    facts = _fs_facts
+    if facts is None:
+        return Path(path).exists()
+    st = facts.stat(str(Path(path)))
+    return _raise_unless_ignored(st) if isinstance(st, OSError) else True
+
+
+def fs_is_symlink(path: str | Path) -> bool:
+    """Path(path).is_symlink(), memoized inside fs_fact_scope()."""
+    facts = _fs_facts
+    if facts is None:
+        return Path(path).is_symlink()
+    st = facts.lstat(str(Path(path)))
+    return _raise_unless_ignored(st) if isinstance(st, OSError) else stat.S_ISLNK(st.st_mode)
+
+
+# ============================================================
+# Path Matching (File Paths)
+# ============================================================
+
+
+def normalize_path(path: str) -> str:
+    """Normalize path for consistent comparison.
+
+    Applies:
+    - expanduser for ~ expansion
+    - normpath for consistent separators
     - abspath for absolute path
     - lowercase on Windows for case-insensitivity
 
@@ -968,7 +2614,7 @@ def expand_path(path: str) -> Path:
         project_dir = get_project_dir()
         if project_dir:
             p = Path(project_dir) / p
-    return p.resolve()
+    return fs_resolve(p)
 
 
 def is_symlink_escape(path: str) -> bool:
@@ -998,12 +2644,12 @@ def is_symlink_escape(path: str) -> bool:
             p = Path(project_dir) / p
 
         # Check if it's a symlink
-        if not p.is_symlink():
+        if not fs_is_symlink(p):
             return False
 
         # Resolve the symlink target
-        resolved = p.resolve()
-        project_resolved = Path(project_dir).resolve()
+        resolved = fs_resolve(p)
+        project_resolved = fs_resolve(project_dir)
 
         # Check if resolved path is within project
         try:
@@ -1043,7 +2689,7 @@ def is_path_within_project(path: str) -> bool:
 
     try:
         resolved = expand_path(path)
-        project_resolved = Path(project_dir).resolve()
+        project_resolved = fs_resolve(project_dir)
 
         try:
             resolved.relative_to(project_resolved)
@@ -1056,137 +2702,606 @@ def is_path_within_project(path: str) -> bool:
         return False  # Fail-closed
 
 
-def normalize_path_for_matching(path: str) -> str:
-    """Normalize path for pattern matching.
+def normalize_path_for_matching(path: str) -> str:
+    """Normalize path for pattern matching.
+
+    - Expands ~
+    - Resolves to absolute
+    - Normalizes separators to /
+    - Lowercases on Windows
+
+    Args:
+        path: Path to normalize.
+
+    Returns:
+        Normalized path string with forward slashes.
+
+    Raises:
+        OSError: If path expansion/resolution fails.
+    """
+    return _match_form(str(expand_path(path)))
+
+
+def _match_form(expanded: str) -> str:
+    """normalize_path_for_matching() of an already resolved path."""
+    # Always use forward slashes for pattern matching
+    normalized = expanded.replace("\\", "/")
+
+    # Case-insensitive on Windows and macOS (HFS+ is case-insensitive)
+    if sys.platform != "linux":
+        normalized = normalized.lower()
+
+    return normalized
+
+
+_PATH_PATTERN_SECTIONS = (
+    "zeroAccessPaths",
+    "readOnlyPaths",
+    "noDeletePaths",
+    "allowedExternalReadPaths",
+    "allowedExternalWritePaths",
+)
+"""Config sections holding glob path patterns."""
+
+
+class _PathGlob:
+    """Pre-translated form of one path pattern, used by match_path_pattern().
+
+    Regex sources come from fnmatch.translate() applied to the normcase'd
+    pattern, so matching is identical to fnmatch.fnmatch(). Sources are
+    stored in the compiled config artifact; regexes compile lazily.
+    """
+
+    __slots__ = ("norm_pattern", "filename_only", "recursive", "full_source", "part_sources",
+                 "_full", "_parts")
+
+    def __init__(self, norm_pattern: str, filename_only: bool, recursive: bool,
+                 full_source: str, part_sources: list[str | None]):
+        self.norm_pattern = norm_pattern
+        self.filename_only = filename_only
+        self.recursive = recursive
+        self.full_source = full_source
+        self.part_sources = part_sources
+        self._full = None
+        self._parts = None
+
+    @classmethod
+    def build(cls, pattern: str) -> "_PathGlob":
+        """Translate a config pattern (raises like the old inline code on bad input)."""
+        norm_pattern = str(Path(pattern).expanduser()).replace("\\", "/")
+        # Case-insensitive on Windows and macOS (HFS+ is case-insensitive)
+        if sys.platform != "linux":
+            norm_pattern = norm_pattern.lower()
+        recursive = "**" in norm_pattern
+        part_sources = []
+        if recursive:
+            part_sources = [
+                None if part == "**" else fnmatch.translate(os.path.normcase(part))
+                for part in norm_pattern.split("/")
+            ]
+        return cls(
+            norm_pattern,
+            # Filename-only matching is skipped for directory patterns
+            "/" not in pattern and "**" not in pattern,
+            recursive,
+            fnmatch.translate(os.path.normcase(norm_pattern)),
+            part_sources,
+        )
+
+    def to_json(self) -> list:
+        return [self.norm_pattern, self.filename_only, self.recursive,
+                self.full_source, self.part_sources]
+
+    @classmethod
+    def from_json(cls, data: list) -> "_PathGlob":
+        return cls(*data)
+
+    def matches(self, name: str) -> bool:
+        """Equivalent of fnmatch.fnmatch(name, self.norm_pattern)."""
+        if self._full is None:
+            self._full = re.compile(self.full_source)
+        return self._full.match(os.path.normcase(name)) is not None
+
+    def matches_parts(self, path_parts: list[str]) -> bool:
+        """Equivalent of _match_recursive_glob(path_parts, norm_pattern.split("/"))."""
+        if self._parts is None:
+            self._parts = [None if src is None else re.compile(src) for src in self.part_sources]
+        return _match_compiled_parts(path_parts, self._parts)
+
+
+def _match_compiled_parts(path_parts: list[str], pattern_parts: list) -> bool:
+    """Match path components against compiled pattern components (None = **).
+
+    Simulates the component-level NFA instead of backtracking: `active`
+    marks every pattern position reachable after the components consumed
+    so far (a ** position may also be skipped, matching zero components).
+    Each (component, position) pair is tested at most once, so the cost is
+    O(len(path_parts) * len(pattern_parts)) component matches however many
+    ** segments the pattern has.
+    """
+    n = len(pattern_parts)
+    active = [False] * (n + 1)
+    active[0] = True
+    for q in range(n):  # ascending, so chained ** propagate in one pass
+        if active[q] and pattern_parts[q] is None:
+            active[q + 1] = True
+
+    for part in path_parts:
+        name = os.path.normcase(part)
+        following = [False] * (n + 1)
+        alive = False
+        for q in range(n):
+            if not active[q]:
+                continue
+            matcher = pattern_parts[q]
+            if matcher is None:
+                following[q] = True  # ** consumes this component
+                alive = True
+            elif matcher.match(name) is not None:
+                following[q + 1] = True
+                alive = True
+        if not alive:
+            return False
+        for q in range(n):
+            if following[q] and pattern_parts[q] is None:
+                following[q + 1] = True
+        active = following
+    return active[n]
+
+
+_path_glob_cache: dict[Any, _PathGlob] = {}
+"""Per-process _PathGlob cache. ~ patterns are keyed with the home directory."""
+
+
+def _get_path_glob(pattern: str) -> _PathGlob:
+    """Return the translated matcher for a pattern (artifact, cache, or fresh build)."""
+    home_dependent = pattern.startswith("~")
+    key = (pattern, os.path.expanduser("~")) if home_dependent else pattern
+    glob_entry = _path_glob_cache.get(key)
+    if glob_entry is not None:
+        return glob_entry
+    compiled = _get_compiled_table("path_globs")
+    stored = compiled.get(pattern) if isinstance(compiled, dict) else None
+    if stored is not None and (
+        not home_dependent or _compiled_config.get("env", {}).get("home") == key[1]
+    ):
+        glob_entry = _PathGlob.from_json(stored)
+    else:
+        glob_entry = _PathGlob.build(pattern)
+    _path_glob_cache[key] = glob_entry
+    return glob_entry
+
+
+def _match_recursive_glob(path_parts: list[str], pattern_parts: list[str]) -> bool:
+    """Internal function to match path parts against pattern parts with ** support.
+
+    ** matches zero or more components; other components match like
+    fnmatch.fnmatch(). Runs in O(len(path_parts) * len(pattern_parts))
+    component matches (see _match_compiled_parts()).
+
+    Args:
+        path_parts: List of path components (e.g., ['src', 'main.py'])
+        pattern_parts: List of pattern components (e.g., ['src', '**', '*.py'])
+
+    Returns:
+        True if path matches pattern.
+    """
+    compiled = [
+        None if part == "**" else re.compile(fnmatch.translate(os.path.normcase(part)))
+        for part in pattern_parts
+    ]
+    return _match_compiled_parts(path_parts, compiled)
+
+
+def match_path_pattern(path: str, pattern: str, *, default_on_error: bool = False) -> bool:
+    """Match a path against a glob pattern.
+
+    Handles:
+    - ~ expansion in both path and pattern
+    - ** for recursive matching (proper implementation)
+    - * for single-level matching
+    - Case-insensitive on Windows
+
+    Args:
+        path: The path to check.
+        pattern: The glob pattern to match against.
+        default_on_error: Value to return on error. Use True for deny-list
+            checks (fail-closed) and False for allow-list checks (fail-closed).
+
+    Returns:
+        True if path matches pattern.
+    """
+    try:
+        # Normalize path; the pattern is pre-translated (see _PathGlob)
+        norm_path = normalize_path_for_matching(path)
+        glob_entry = _get_path_glob(pattern)
+        return _match_normalized(glob_entry, norm_path, _project_relative(norm_path))
+    except Exception as e:
+        log_guardian("WARN", f"Error matching path {path} against {pattern}: {e}")
+        return default_on_error
+
+
+def _project_relative(norm_path: str) -> str | None:
+    """Project-relative form of a normalize_path_for_matching() result.
+
+    Returns:
+        Relative path ("" for the project root), or None if outside the
+        project or no project dir is set.
+    """
+    project_dir = get_project_dir()
+    if not project_dir:
+        return None
+    project_normalized = project_dir.replace("\\", "/")
+    # Case-insensitive on Windows and macOS (HFS+ is case-insensitive)
+    if sys.platform != "linux":
+        project_normalized = project_normalized.lower()
+
+    # Use + "/" to ensure exact prefix match
+    # (avoid E:\ops matching E:\ops-2)
+    if norm_path.startswith(project_normalized + "/") or norm_path == project_normalized:
+        return norm_path[len(project_normalized) :].lstrip("/")
+    return None
+
+
+def _match_normalized(glob_entry: "_PathGlob", norm_path: str, rel_path: str | None) -> bool:
+    """match_path_pattern() for an already normalized path."""
+    # Try direct match with fnmatch first (for simple patterns)
+    if glob_entry.matches(norm_path):
+        return True
+
+    # Try matching filename only (for simple patterns like ".env", "*.pem")
+    # Skip this for patterns containing "/" or "**" (directory patterns)
+    if glob_entry.filename_only:
+        filename = Path(norm_path).name
+        if glob_entry.matches(filename):
+            return True
+
+    # Try matching relative to project
+    if rel_path is not None:
+        # Use recursive glob matching for ** patterns
+        if glob_entry.recursive:
+            path_parts = rel_path.split("/") if rel_path else []
+            if glob_entry.matches_parts(path_parts):
+                return True
+        else:
+            if glob_entry.matches(rel_path):
+                return True
+            # Also try with leading ./
+            if glob_entry.matches("./" + rel_path):
+                return True
+
+    return False
+
+
+# ============================================================
+# Tiered Path Classifier
+# ============================================================
+# match_zero_access() and friends used to call match_path_pattern() once
+# per configured pattern, re-normalizing (and resolving) the path each time
+# and trying up to four fnmatch variants per pattern. PathClassifier indexes
+# every path-pattern section once per config so one classify() call
+# normalizes the path once and returns every tier it belongs to:
+#
+#   exact     literal filename-only patterns ("id_rsa", ".gitignore"):
+#             one dict lookup on the basename
+#   suffix    "*<literal>" filename-only patterns ("*.pem", "*.lock"):
+#             one dict lookup per distinct suffix length
+#   residual  everything else, grouped by literal prefix (the text before
+#             the first wildcard; for ** patterns, up to the last "/"
+#             before it). A group is only evaluated if some form of the
+#             path starts with its prefix, then with the exact
+#             match_path_pattern() logic.
+#
+# The exact and suffix buckets are equivalent to match_path_pattern() for
+# those patterns: without "/" in the pattern, every candidate string can
+# only match through its last path component, which is the basename.
+#
+# Subtree summaries keep residual globs off the common path. Most paths an
+# agent touches (src/components/Button.tsx) live in directories no
+# protected pattern can reach, so each residual group is summarized by a
+# necessary condition that is checked with lookups instead of globs:
+#
+#   anchored  non-empty literal prefix: a candidate string "<dir>/<name>"
+#             can only start with the prefix if the prefix starts with
+#             "<dir>/" (and stops inside <name>) or "<dir>/" starts with
+#             it. The prefixes compatible with each directory are derived
+#             once and memoized, so a path under a subtree that no pattern
+#             can reach costs one dict lookup per candidate form.
+#   floating  empty prefix ("**/x.key", "*credentials*.json"): fnmatch and
+#             the last ** component are anchored at the end, so every
+#             candidate must end with the pattern's literal tail (the text
+#             after its last wildcard or "/"). Indexed like the suffix
+#             bucket; a tail of "" means the group is always evaluated.
+
+PATH_TIERS = {
+    "zeroAccess": "zeroAccessPaths",
+    "readOnly": "readOnlyPaths",
+    "noDelete": "noDeletePaths",
+    "allowedExternalWrite": "allowedExternalWritePaths",
+    "allowedExternalRead": "allowedExternalReadPaths",
+}
+"""Classifier tier -> config section."""
+
+_EXTERNAL_TIERS = frozenset({"allowedExternalWrite", "allowedExternalRead"})
+"""Allow-list tiers: non-string patterns are skipped, errors never match."""
+
+_GLOB_WILDCARDS_RE = re.compile(r"[*?[]")
+
+
+class PathClassifier:
+    """Index of all path-pattern tiers of one config (see above)."""
+
+    __slots__ = ("_exact", "_suffixes", "_suffix_lengths", "_anchored", "_floating",
+                 "_floating_lengths", "_subtrees", "_covering", "_tiers", "_broken")
+
+    _SUBTREE_CACHE_LIMIT = 4096
+    """Memoized directories per classifier (long-lived evaluator processes)."""
+
+    def __init__(self, sections: dict[str, list]):
+        self._exact: dict[str, set[str]] = {}
+        self._suffixes: dict[str, set[str]] = {}
+        self._anchored: dict[str, list[tuple[str, _PathGlob]]] = {}
+        self._floating: dict[str, list[tuple[str, _PathGlob]]] = {}
+        self._subtrees: dict[str, tuple[str, ...]] = {}
+        self._covering: dict[str, set[str]] = {}
+        self._tiers: set[str] = set()
+        self._broken: dict[str, list[str]] = {}
+        for tier, patterns in sections.items():
+            for pattern in patterns:
+                if tier in _EXTERNAL_TIERS and not isinstance(pattern, str):
+                    continue
+                self._tiers.add(tier)
+                try:
+                    glob_entry = _get_path_glob(pattern)
+                except Exception as e:
+                    self._broken.setdefault(tier, []).append(f"{pattern}: {e}")
+                    continue
+                self._add(tier, glob_entry)
+        self._suffix_lengths = sorted({len(suffix) for suffix in self._suffixes})
+        self._floating_lengths = sorted({len(tail) for tail in self._floating})
+
+    def _add(self, tier: str, glob_entry: "_PathGlob") -> None:
+        norm_pattern = glob_entry.norm_pattern
+        wildcard = _GLOB_WILDCARDS_RE.search(norm_pattern)
+        first = wildcard.start() if wildcard else len(norm_pattern)
+        if glob_entry.filename_only and "/" not in norm_pattern:
+            if wildcard is None:
+                key = os.path.normcase(norm_pattern)
+                self._exact.setdefault(key, set()).add(tier)
+                return
+            if first == 0 and norm_pattern[0] == "*" and not _GLOB_WILDCARDS_RE.search(
+                norm_pattern, 1
+            ):
+                key = os.path.normcase(norm_pattern[1:])
+                self._suffixes.setdefault(key, set()).add(tier)
+                return
+        if glob_entry.recursive:
+            prefix = norm_pattern[: norm_pattern.rfind("/", 0, first) + 1]
+        else:
+            prefix = norm_pattern[:first]
+        if prefix:
+            self._anchored.setdefault(os.path.normcase(prefix), []).append((tier, glob_entry))
+            if glob_entry.recursive and norm_pattern == prefix + "**":
+                # "<literal dir>/**" matches everything below that directory
+                self._covering.setdefault(os.path.normcase(prefix), set()).add(tier)
+            return
+        # "]" closes a bracket class; cutting at a literal "]" only shortens the tail
+        cut = max(norm_pattern.rfind(c) for c in "*?[]/")
+        tail = os.path.normcase(norm_pattern[cut + 1 :])
+        self._floating.setdefault(tail, []).append((tier, glob_entry))
+
+    def _subtree_prefixes(self, directory: str) -> tuple[str, ...]:
+        """Anchored prefixes some "<directory><name>" string can start with.
+
+        Args:
+            directory: normcase'd directory part of a candidate, ending
+                with "/" ("" for a bare name).
+        """
+        prefixes = self._subtrees.get(directory)
+        if prefixes is None:
+            prefixes = tuple(
+                prefix for prefix in self._anchored
+                if directory.startswith(prefix)
+                or (prefix.startswith(directory) and "/" not in prefix[len(directory) :])
+            )
+            if len(self._subtrees) >= self._SUBTREE_CACHE_LIMIT:
+                self._subtrees.clear()
+            self._subtrees[directory] = prefixes
+        return prefixes
+
+    @property
+    def broken_tiers(self) -> frozenset[str]:
+        """Tiers with patterns that failed to compile (they match everything)."""
+        return frozenset(self._broken)
+
+    def covered_tiers(self, directory: str, resolved: bool = False) -> frozenset[str]:
+        """Tiers that match every path below directory ("<literal dir>/**").
+
+        Args:
+            directory: Directory path.
+            resolved: directory is already absolute and symlink-free.
+
+        Returns:
+            Frozenset of tier names (empty if the path cannot be normalized).
+        """
+        try:
+            norm_path = _match_form(directory) if resolved else normalize_path_for_matching(
+                directory
+            )
+            rel_path = _project_relative(norm_path)
+        except Exception:
+            return frozenset()
+        # ** matches anything after the prefix in the full-path fnmatch; the
+        # project-relative form goes through matches_parts(), where the
+        # literal prefix components must equal the leading path components
+        candidates = [os.path.normcase(norm_path.rstrip("/")) + "/"]
+        if rel_path:
+            candidates.append(os.path.normcase(rel_path) + "/")
+        covered: set[str] = set()
+        for prefix, tiers in self._covering.items():
+            if any(c.startswith(prefix) for c in candidates):
+                covered |= tiers
+        return frozenset(covered)
+
+    def classify(self, path: str, tiers: Any = None, resolved: bool = False) -> frozenset[str]:
+        """Return every tier (see PATH_TIERS) whose patterns match path.
+
+        Same answers as match_path_pattern() per pattern: deny-list tiers
+        match on errors (fail-closed), allow-list tiers do not.
+
+        Args:
+            path: Path to classify.
+            tiers: Only evaluate these tiers (default: all).
+            resolved: path is already absolute and symlink-free (skips
+                resolving it again, e.g. for entries of a directory walk).
+
+        Returns:
+            Frozenset of matched tier names.
+        """
+        wanted = PATH_TIERS.keys() if tiers is None else tiers
+        matched: set[str] = set()
+        for tier in wanted:
+            if tier in self._broken and tier not in _EXTERNAL_TIERS:
+                for problem in self._broken[tier]:
+                    log_guardian("WARN", f"Error matching path {path} against {problem}")
+                matched.add(tier)
+
+        try:
+            norm_path = _match_form(path) if resolved else normalize_path_for_matching(path)
+            rel_path = _project_relative(norm_path)
+        except Exception as e:
+            log_guardian("WARN", f"Error matching path {path}: {e}")
+            for tier in wanted:
+                if tier not in _EXTERNAL_TIERS and tier in self._tiers:
+                    matched.add(tier)
+            return frozenset(matched)
+
+        basename = os.path.normcase(Path(norm_path).name)
+        matched |= self._exact.get(basename, set()).intersection(wanted)
+        for length in self._suffix_lengths:
+            if length <= len(basename):
+                tiers_here = self._suffixes.get(basename[len(basename) - length :])
+                if tiers_here:
+                    matched |= tiers_here.intersection(wanted)
+
+        groups = []
+        candidates = [os.path.normcase(norm_path), basename]
+        if rel_path is not None:
+            rel = os.path.normcase(rel_path)
+            candidates += [rel, "./" + rel]
+            # rel + "/" only adds a prefix equal to itself ("node_modules/")
+            if rel + "/" in self._anchored:
+                groups.append(rel + "/")
+        for candidate in candidates:
+            directory = candidate[: candidate.rfind("/") + 1]
+            for prefix in self._subtree_prefixes(directory):
+                if prefix not in groups and candidate.startswith(prefix):
+                    groups.append(prefix)
+        entries = [entry for prefix in groups for entry in self._anchored[prefix]]
+
+        last = os.path.normcase(norm_path[norm_path.rfind("/") + 1 :])
+        for length in self._floating_lengths:
+            if length <= len(last):
+                entries += self._floating.get(last[len(last) - length :], ())
+
+        for tier, glob_entry in entries:
+            if tier in matched or tier not in wanted:
+                continue
+            try:
+                if _match_normalized(glob_entry, norm_path, rel_path):
+                    matched.add(tier)
+            except Exception as e:
+                log_guardian(
+                    "WARN", f"Error matching path {path} against {glob_entry.norm_pattern}: {e}"
+                )
+                if tier not in _EXTERNAL_TIERS:
+                    matched.add(tier)
+        return frozenset(matched)
+
+
+_path_classifier_cache: dict[tuple, PathClassifier] = {}
 
-    - Expands ~
-    - Resolves to absolute
-    - Normalizes separators to /
-    - Lowercases on Windows
+
+def get_path_classifier(config: dict | None = None) -> PathClassifier | None:
+    """Return the (cached) PathClassifier for a config.
 
     Args:
-        path: Path to normalize.
+        config: Guardian config (default: the loaded one).
 
     Returns:
-        Normalized path string with forward slashes.
-
-    Raises:
-        OSError: If path expansion/resolution fails.
+        PathClassifier, or None if a path section is not a list (callers
+        then fall back to the per-pattern match_path_pattern() loop).
     """
-    expanded = str(expand_path(path))
-    # Always use forward slashes for pattern matching
-    normalized = expanded.replace("\\", "/")
-
-    # Case-insensitive on Windows and macOS (HFS+ is case-insensitive)
-    if sys.platform != "linux":
-        normalized = normalized.lower()
-
-    return normalized
+    if config is None:
+        config = load_guardian_config()
+    sections = {tier: config.get(section, []) for tier, section in PATH_TIERS.items()}
+    if not all(isinstance(patterns, list) for patterns in sections.values()):
+        return None
+    # ~ patterns depend on the home directory (see _get_path_glob())
+    key = (repr(sections), os.path.expanduser("~"))
+    classifier = _path_classifier_cache.get(key)
+    if classifier is None:
+        if len(_path_classifier_cache) >= 8:
+            _path_classifier_cache.clear()
+        try:
+            classifier = PathClassifier(sections)
+        except Exception as e:
+            log_guardian("WARN", f"Could not build path classifier: {e}")
+            return None
+        _path_classifier_cache[key] = classifier
+    return classifier
 
 
-def _match_recursive_glob(path_parts: list[str], pattern_parts: list[str]) -> bool:
-    """Internal function to match path parts against pattern parts with ** support.
+def classify_path(path: str, tiers: Any = None) -> frozenset[str]:
+    """Return every PATH_TIERS tier path belongs to (one normalization).
 
     Args:
-        path_parts: List of path components (e.g., ['src', 'main.py'])
-        pattern_parts: List of pattern components (e.g., ['src', '**', '*.py'])
+        path: Path to classify.
+        tiers: Only evaluate these tiers (default: all).
 
     Returns:
-        True if path matches pattern.
+        Frozenset of matched tier names.
     """
-    if not pattern_parts:
-        return not path_parts
-
-    if not path_parts:
-        # Path exhausted - pattern must be empty or all **
-        return all(p == "**" for p in pattern_parts)
-
-    if pattern_parts[0] == "**":
-        # ** can match zero or more path components
-        # Try matching zero components (skip **)
-        if _match_recursive_glob(path_parts, pattern_parts[1:]):
-            return True
-        # Try matching one component and continue with same pattern
-        if _match_recursive_glob(path_parts[1:], pattern_parts):
-            return True
-        return False
-
-    # Regular component - must match
-    if fnmatch.fnmatch(path_parts[0], pattern_parts[0]):
-        return _match_recursive_glob(path_parts[1:], pattern_parts[1:])
-
-    return False
-
+    classifier = get_path_classifier()
+    if classifier is not None:
+        return classifier.classify(path, tiers)
+    config = load_guardian_config()
+    matched = set()
+    for tier in PATH_TIERS if tiers is None else tiers:
+        patterns = config.get(PATH_TIERS[tier], [])
+        if tier in _EXTERNAL_TIERS:
+            if any(match_path_pattern(path, p) for p in patterns if isinstance(p, str)):
+                matched.add(tier)
+        elif any(match_path_pattern(path, p, default_on_error=True) for p in patterns):
+            matched.add(tier)
+    return frozenset(matched)
 
-def match_path_pattern(path: str, pattern: str, *, default_on_error: bool = False) -> bool:
-    """Match a path against a glob pattern.
 
-    Handles:
-    - ~ expansion in both path and pattern
-    - ** for recursive matching (proper implementation)
-    - * for single-level matching
-    - Case-insensitive on Windows
+def classify_paths(paths: Any, tiers: Any = None) -> dict[str, frozenset[str]]:
+    """Batch form of classify_path(): each distinct path is classified once.
 
     Args:
-        path: The path to check.
-        pattern: The glob pattern to match against.
-        default_on_error: Value to return on error. Use True for deny-list
-            checks (fail-closed) and False for allow-list checks (fail-closed).
+        paths: Iterable of paths (str or Path).
+        tiers: Only evaluate these tiers (default: all).
 
     Returns:
-        True if path matches pattern.
+        {str(path): matched tiers}.
     """
-    try:
-        # Normalize both path and pattern
-        norm_path = normalize_path_for_matching(path)
-
-        # Expand pattern
-        norm_pattern = str(Path(pattern).expanduser()).replace("\\", "/")
-        # Case-insensitive on Windows and macOS (HFS+ is case-insensitive)
-        if sys.platform != "linux":
-            norm_pattern = norm_pattern.lower()
-
-        # Try direct match with fnmatch first (for simple patterns)
-        if fnmatch.fnmatch(norm_path, norm_pattern):
-            return True
-
-        # Try matching filename only (for simple patterns like ".env", "*.pem")
-        # Skip this for patterns containing "/" or "**" (directory patterns)
-        if "/" not in pattern and "**" not in pattern:
-            filename = Path(norm_path).name
-            if fnmatch.fnmatch(filename, norm_pattern):
-                return True
+    result: dict[str, frozenset[str]] = {}
+    for path in paths:
+        key = str(path)
+        if key not in result:
+            result[key] = classify_path(key, tiers)
+    return result
 
-        # Try matching relative to project
-        project_dir = get_project_dir()
-        if project_dir:
-            project_normalized = project_dir.replace("\\", "/")
-            # Case-insensitive on Windows and macOS (HFS+ is case-insensitive)
-            if sys.platform != "linux":
-                project_normalized = project_normalized.lower()
-
-            # Use + "/" to ensure exact prefix match
-            # (avoid E:\ops matching E:\ops-2)
-            if norm_path.startswith(project_normalized + "/") or norm_path == project_normalized:
-                rel_path = norm_path[len(project_normalized) :].lstrip("/")
-
-                # Use recursive glob matching for ** patterns
-                if "**" in norm_pattern:
-                    path_parts = rel_path.split("/") if rel_path else []
-                    pattern_parts = norm_pattern.split("/")
-                    if _match_recursive_glob(path_parts, pattern_parts):
-                        return True
-                else:
-                    if fnmatch.fnmatch(rel_path, norm_pattern):
-                        return True
-                    # Also try with leading ./
-                    if fnmatch.fnmatch("./" + rel_path, norm_pattern):
-                        return True
 
-        return False
-    except Exception as e:
-        log_guardian("WARN", f"Error matching path {path} against {pattern}: {e}")
-        return default_on_error
+def external_path_mode(tiers: frozenset[str]) -> str | None:
+    """match_allowed_external_path() result for a classify_path() result."""
+    if "allowedExternalWrite" in tiers:
+        return "readwrite"
+    if "allowedExternalRead" in tiers:
+        return "read"
+    return None
 
 
 def match_zero_access(path: str) -> bool:
@@ -1198,9 +3313,7 @@ def match_zero_access(path: str) -> bool:
     Returns:
         True if path is in zeroAccessPaths.
     """
-    config = load_guardian_config()
-    patterns = config.get("zeroAccessPaths", [])
-    return any(match_path_pattern(path, p, default_on_error=True) for p in patterns)
+    return "zeroAccess" in classify_path(path, ("zeroAccess",))
 
 
 def match_read_only(path: str) -> bool:
@@ -1212,9 +3325,7 @@ def match_read_only(path: str) -> bool:
     Returns:
         True if path is in readOnlyPaths.
     """
-    config = load_guardian_config()
-    patterns = config.get("readOnlyPaths", [])
-    return any(match_path_pattern(path, p, default_on_error=True) for p in patterns)
+    return "readOnly" in classify_path(path, ("readOnly",))
 
 
 def match_no_delete(path: str) -> bool:
@@ -1226,9 +3337,7 @@ def match_no_delete(path: str) -> bool:
     Returns:
         True if path is in noDeletePaths.
     """
-    config = load_guardian_config()
-    patterns = config.get("noDeletePaths", [])
-    return any(match_path_pattern(path, p, default_on_error=True) for p in patterns)
+    return "noDelete" in classify_path(path, ("noDelete",))
 
 
 def match_allowed_external_path(path: str) -> str | None:
@@ -1247,16 +3356,8 @@ def match_allowed_external_path(path: str) -> str | None:
         - "read" if path matches allowedExternalReadPaths
         - None if not matched
     """
-    config = load_guardian_config()
-    # Check write paths first (more permissive — also grants read)
-    write_patterns = config.get("allowedExternalWritePaths", [])
-    if any(match_path_pattern(path, p) for p in write_patterns if isinstance(p, str)):
-        return "readwrite"
-    # Check read paths
-    read_patterns = config.get("allowedExternalReadPaths", [])
-    if any(match_path_pattern(path, p) for p in read_patterns if isinstance(p, str)):
-        return "read"
-    return None
+    # Write paths win (more permissive — also grants read)
+    return external_path_mode(classify_path(path, _EXTERNAL_TIERS))
 
 
 # ============================================================
@@ -1473,6 +3574,33 @@ def evaluate_rules(command: str) -> tuple[str, str]:
 # ============================================================
 # Git Integration (Basic)
 # ============================================================
+# Read-only queries (tracked path, detached HEAD, HEAD commit, git dir) are
+# answered by the native .git reader in _guardian_git.py; each falls back to
+# its git subprocess whenever the reader raises GitUnsupported (or anything
+# else), so results never depend on the reader covering every layout.
+
+_native_git_fallback_logged = False
+
+
+def _native_git_repo() -> Any:
+    """The project's repository for the native reader, or None (use git).
+
+    Returns:
+        _guardian_git.GitRepo, or None if the reader cannot model it.
+    """
+    global _native_git_fallback_logged
+    project_dir = get_project_dir()
+    if not project_dir:
+        return None
+    try:
+        from _guardian_git import find_git_repo
+
+        return find_git_repo(project_dir)
+    except Exception as e:
+        if not _native_git_fallback_logged:
+            _native_git_fallback_logged = True
+            log_guardian("DEBUG", f"Native git reader unavailable ({e}), using git subprocess")
+        return None
 
 
 def git_is_tracked(path: str) -> bool:
@@ -1497,6 +3625,13 @@ def git_is_tracked(path: str) -> bool:
     if not project_dir:
         return False
 
+    repo = _native_git_repo()
+    if repo is not None:
+        try:
+            return repo.is_tracked(str(path), project_dir)
+        except Exception as e:
+            log_guardian("DEBUG", f"Native tracked check fell back to git for {path}: {e}")
+
     try:
         result = subprocess.run(
             ["git", "ls-files", "--error-unmatch", str(path)],
@@ -1519,6 +3654,169 @@ def git_is_tracked(path: str) -> bool:
         return False
 
 
+def git_untracked_units(paths: list[str]) -> dict[str, list[str]] | None:
+    """Untracked parts of each delete target, from at most one `git ls-files` call.
+
+    Targets the native index reader can settle -- files, and directories
+    with nothing tracked below them -- are answered without a subprocess.
+    The remaining (partly tracked) directories go to one
+    `git ls-files -t --cached --others` restricted to them, so every file
+    below them is classified in a single subprocess (ignored files count
+    as untracked: git cannot restore them). For each target the result
+    lists what has to be archived:
+      - [] if everything below it is tracked
+      - [target] if nothing below it is tracked (or git does not list it)
+      - otherwise the untracked files, each collapsed to the topmost
+        directory below the target that holds no tracked file, so a mixed
+        directory is archived minimally instead of in full
+
+    Args:
+        paths: Existing delete targets inside the project (absolute).
+
+    Returns:
+        {path: [paths to archive]}, or None if the batched query failed
+        (callers then check each target with git_is_tracked()).
+    """
+    if not paths or not is_git_available():
+        return None
+    project_dir = get_project_dir()
+    if not project_dir:
+        return None
+    targets: dict[str, str] = {}
+    for path in paths:
+        rel = os.path.relpath(path, project_dir)
+        if rel == os.pardir or rel.startswith(os.pardir + os.sep) or os.path.isabs(rel):
+            return None  # Outside the project: keep the per-path check
+        targets[path] = rel.replace(os.sep, "/")
+
+    units: dict[str, list[str]] = {}
+    repo = _native_git_repo()
+    if repo is not None:
+        for path in list(targets):
+            try:
+                tracked = repo.is_tracked(path, project_dir)
+            except Exception as e:
+                log_guardian("DEBUG", f"Native tracked check deferred to git for {path}: {e}")
+                continue
+            if not tracked:
+                units[path] = [path]
+            elif os.path.islink(path) or not os.path.isdir(path):
+                units[path] = []
+            else:
+                continue  # Tracked directory: may hold untracked files
+            del targets[path]
+        if not targets:
+            return units
+
+    try:
+        result = subprocess.run(
+            ["git", "--literal-pathspecs", "ls-files", "-z", "-t", "--cached", "--others",
+             "--", *dict.fromkeys(targets.values())],
+            capture_output=True,
+            cwd=project_dir,
+            env=_get_git_env(),
+            timeout=10,
+        )
+    except (OSError, subprocess.TimeoutExpired) as e:
+        log_guardian("WARN", f"Batched git ls-files failed ({e}), checking paths one by one")
+        return None
+    if result.returncode != 0:
+        stderr = result.stderr.decode("utf-8", "replace").strip()
+        log_guardian("DEBUG", f"Batched git ls-files rc={result.returncode}: {stderr[:200]}")
+        return None
+
+    tracked: list[str] = []
+    others: list[str] = []
+    for record in result.stdout.split(b"\0"):
+        if len(record) < 3:
+            continue
+        name = os.fsdecode(record[2:])
+        (others if record[:1] == b"?" else tracked).append(name)
+
+    def below(names: list[str], rel_dir: str) -> list[str]:
+        if rel_dir == ".":
+            return names
+        return [n for n in names if n == rel_dir or n.startswith(rel_dir + "/")]
+
+    for path, rel in targets.items():
+        tracked_below = below(tracked, rel)
+        others_below = below(others, rel)
+        if not tracked_below:
+            units[path] = [path]
+            continue
+        if not others_below:
+            units[path] = []
+            continue
+        # Directories (below the target) that hold a tracked file
+        holding = set()
+        for name in tracked_below:
+            parent = name.rpartition("/")[0]
+            while parent and parent not in holding:
+                holding.add(parent)
+                parent = parent.rpartition("/")[0]
+        collapsed: dict[str, None] = {}
+        for name in others_below:
+            unit = name
+            parent = name.rpartition("/")[0]
+            while parent and parent != rel and parent not in holding:
+                unit = parent
+                parent = parent.rpartition("/")[0]
+            collapsed[unit] = None
+        units[path] = [os.path.join(project_dir, unit) for unit in collapsed]
+    return units
+
+
+def git_ignored_paths(paths: list[str]) -> set[str]:
+    """Subset of paths that git ignores, from one `git check-ignore` call.
+
+    Tracked paths are never reported as ignored. Used to confirm that a
+    regenerable artifact (node_modules, .venv, ...) is really a build
+    output before its delete skips the archive.
+
+    Args:
+        paths: Existing paths inside the project (absolute).
+
+    Returns:
+        The ignored paths (as passed in). Empty on any failure, so callers
+        archive as usual (fail-closed).
+    """
+    if not paths or not is_git_available():
+        return set()
+    project_dir = get_project_dir()
+    if not project_dir:
+        return set()
+    by_rel: dict[str, str] = {}
+    for path in paths:
+        rel = os.path.relpath(path, project_dir)
+        if rel == os.pardir or rel.startswith(os.pardir + os.sep) or os.path.isabs(rel):
+            continue
+        by_rel[rel] = path
+    if not by_rel:
+        return set()
+
+    try:
+        result = subprocess.run(
+            ["git", "check-ignore", "--stdin", "-z"],
+            input=b"".join(os.fsencode(rel) + b"\0" for rel in by_rel),
+            capture_output=True,
+            cwd=project_dir,
+            env=_get_git_env(),
+            timeout=5,
+        )
+    except (OSError, subprocess.TimeoutExpired) as e:
+        log_guardian("WARN", f"git check-ignore failed: {e}")
+        return set()
+    if result.returncode not in (0, 1):  # 1 = nothing ignored
+        stderr = result.stderr.decode("utf-8", "replace").strip()
+        log_guardian("DEBUG", f"git check-ignore rc={result.returncode}: {stderr[:200]}")
+        return set()
+    return {
+        by_rel[name]
+        for name in map(os.fsdecode, result.stdout.split(b"\0"))
+        if name in by_rel
+    }
+
+
 # ============================================================
 # Git Integration Functions (Phase 4)
 # ============================================================
@@ -2004,7 +4302,7 @@ def git_get_last_commit_hash() -> str:
     Works correctly in both normal and detached HEAD states.
 
     Returns:
-        Short commit hash (7 chars) or empty string on error.
+        Full commit hash or empty string on error.
         Returns empty string for repos with no commits yet.
     """
     # Check git availability first
@@ -2015,9 +4313,20 @@ def git_get_last_commit_hash() -> str:
     if not project_dir:
         return ""
 
+    repo = _native_git_repo()
+    if repo is not None:
+        try:
+            commit = repo.head_commit()
+            if commit is None:
+                log_guardian("INFO", "Repository has no commits yet")
+                return ""
+            return commit
+        except Exception as e:
+            log_guardian("DEBUG", f"Native HEAD lookup fell back to git: {e}")
+
     try:
         result = subprocess.run(
-            ["git", "rev-parse", "--short", "HEAD"],
+            ["git", "rev-parse", "HEAD"],
             capture_output=True,
             encoding="utf-8",
             errors="replace",
@@ -2064,6 +4373,13 @@ def is_detached_head() -> bool:
     if not project_dir:
         return False
 
+    repo = _native_git_repo()
+    if repo is not None:
+        try:
+            return repo.is_detached()
+        except Exception as e:
+            log_guardian("DEBUG", f"Native HEAD check fell back to git: {e}")
+
     try:
         result = subprocess.run(
             ["git", "symbolic-ref", "-q", "HEAD"],
@@ -2100,7 +4416,10 @@ def is_rebase_or_merge_in_progress() -> bool:
     if not project_dir:
         return False
 
-    git_dir = Path(project_dir) / ".git"
+    # Worktrees and submodules keep their state in the directory a .git
+    # file points to
+    repo = _native_git_repo()
+    git_dir = Path(repo.git_dir) if repo is not None else Path(project_dir) / ".git"
 
     state_indicators = [
         git_dir / "rebase-merge",
@@ -2118,6 +4437,436 @@ def is_rebase_or_merge_in_progress() -> bool:
     return False
 
 
+# ============================================================
+# Read Verdict Cache (optional)
+# ============================================================
+# Agents Read the same files over and over. With readCache.enabled, a Read
+# allow verdict is stored in .claude/guardian/read-cache.json (keyed by the
+# tool's file_path) and a later Read of the same path returns before the
+# config is even loaded. An entry only applies while everything the verdict
+# was derived from is unchanged:
+#   - the config file that would be loaded (path, size, mtime, device/inode)
+#     and the compile environment (Python, platform, home directory)
+#   - the guardian code: name, size and mtime of every hooks/scripts/*.py,
+#     so verdicts cached by an older plugin version die with the upgrade
+#   - the resolved project directory
+#   - the resolved path (a changed symlink anywhere along it changes it)
+#     and whether file_path itself is a symlink
+#   - the file's device, inode and mtime
+# Only allows are cached, only for configs older than the racy window (see
+# COMPILED_CONFIG_RACY_WINDOW_NS), and the cache file is self-guarded.
+
+READ_CACHE_NAME = "read-cache.json"
+"""Cache filename inside $CLAUDE_PROJECT_DIR/.claude/guardian/."""
+
+READ_CACHE_FORMAT = 2
+"""Bump when the cache layout or the entry signature changes."""
+
+READ_CACHE_DEFAULT_MAX_ENTRIES = 512
+"""Entries kept before least-recently-used eviction."""
+
+READ_CACHE_TOUCH_INTERVAL_SECONDS = 60
+"""Hits refresh an entry's LRU timestamp at most this often (saves writes)."""
+
+_read_cache_hit = False
+"""Set when this invocation was answered from the cache."""
+
+
+def get_read_cache_config() -> dict[str, Any]:
+    """Get readCache section from config.
+
+    Returns:
+        readCache dict with defaults applied (disabled by default).
+    """
+    config = load_guardian_config()
+    defaults = {
+        "enabled": False,
+        "maxEntries": READ_CACHE_DEFAULT_MAX_ENTRIES,
+    }
+    read_cache = config.get("readCache", {})
+    if not isinstance(read_cache, dict):
+        return defaults
+    return {**defaults, **read_cache}
+
+
+def _read_cache_path() -> Path | None:
+    project_dir = get_project_dir()
+    if not project_dir:
+        return None
+    return Path(project_dir) / ".claude" / "guardian" / READ_CACHE_NAME
+
+
+def _guardian_code_signature() -> list[list]:
+    """Name, size and mtime_ns of each guardian script (changes on upgrade)."""
+    signature = []
+    with os.scandir(os.path.dirname(os.path.abspath(__file__))) as it:
+        for entry in it:
+            if entry.name.endswith(".py"):
+                st = entry.stat()
+                signature.append([entry.name, st.st_size, st.st_mtime_ns])
+    return sorted(signature)
+
+
+def _read_cache_header() -> dict[str, Any] | None:
+    """Everything outside the file itself that a cached Read verdict depends on.
+
+    Returns:
+        Header dict, or None if no config file would be loaded.
+    """
+    project_dir = get_project_dir()
+    if not project_dir:
+        return None
+    # Same resolution order as load_guardian_config(), without reading it
+    candidates = [Path(project_dir) / ".claude" / "guardian" / "config.json"]
+    plugin_root = _get_plugin_root()
+    if plugin_root:
+        candidates.append(Path(plugin_root) / "assets" / "guardian.default.json")
+    for config_path in candidates:
+        try:
+            st = os.stat(config_path)
+        except OSError:
+            continue
+        return {
+            "format": READ_CACHE_FORMAT,
+            "env": _compile_environment(),
+            "code": _guardian_code_signature(),
+            "project": str(fs_resolve(project_dir)),
+            "config": [str(config_path), st.st_size, st.st_mtime_ns, st.st_dev, st.st_ino],
+        }
+    return None
+
+
+def _read_cache_signature(file_path: str, resolved: Path) -> list:
+    """Per-path facts a cached verdict depends on (see section comment)."""
+    # Same symlink test as is_symlink_escape()
+    raw = Path(file_path).expanduser()
+    if not raw.is_absolute():
+        raw = Path(get_project_dir()) / raw
+    try:
+        st = fs_stat(resolved)
+        identity = [st.st_dev, st.st_ino, st.st_mtime_ns]
+    except FileNotFoundError:
+        identity = None
+    return [str(resolved), fs_is_symlink(raw), identity]
+
+
+def _read_cache_file() -> dict[str, Any] | None:
+    """The stored cache, or None if there is none (or it is unreadable)."""
+    cache_path = _read_cache_path()
+    if cache_path is None:
+        return None
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return cache if isinstance(cache, dict) else None
+
+
+def _read_cache_entries(cache: dict[str, Any] | None, header: dict[str, Any]) -> dict[str, Any]:
+    """Stored entries if the cache was written under this header, else {}."""
+    if cache is None or cache.get("header") != header:
+        return {}
+    entries = cache.get("entries")
+    return entries if isinstance(entries, dict) else {}
+
+
+def _write_read_cache(header: dict[str, Any], entries: dict[str, Any]) -> None:
+    """Atomically store the cache (temp file + os.replace). Never raises."""
+    cache_path = _read_cache_path()
+    if cache_path is None:
+        return
+    tmp_path = cache_path.with_name(f".{READ_CACHE_NAME}.{os.getpid()}.tmp")
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"header": header, "entries": entries}, f, separators=(",", ":"))
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        log_guardian("WARN", f"Could not write read cache: {e}")
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+
+
+def read_cache_lookup(file_path: str, resolved: Path) -> bool:
+    """Check for a still-valid cached Read allow. Never raises.
+
+    Args:
+        file_path: file_path from the tool input.
+        resolved: resolve_tool_path(file_path).
+
+    Returns:
+        True if Read of file_path was allowed and nothing it depended on
+        has changed since.
+    """
+    try:
+        cache = _read_cache_file()
+        if cache is None:
+            return False  # Disabled, or nothing stored yet
+        header = _read_cache_header()
+        if header is None:
+            return False
+        entries = _read_cache_entries(cache, header)
+        entry = entries.get(file_path)
+        if not isinstance(entry, dict):
+            return False
+        if entry.get("sig") != _read_cache_signature(file_path, resolved):
+            return False
+        now = int(time.time())
+        used = entry.get("used")
+        if not isinstance(used, int) or now - used >= READ_CACHE_TOUCH_INTERVAL_SECONDS:
+            entry["used"] = now
+            _write_read_cache(header, entries)
+        return True
+    except Exception as e:
+        log_guardian("WARN", f"Read cache lookup failed: {e}")
+        return False
+
+
+def read_cache_store(file_path: str, resolved: Path) -> None:
+    """Remember that Read of file_path was allowed (if enabled). Never raises.
+
+    Args:
+        file_path: file_path from the tool input.
+        resolved: resolve_tool_path(file_path).
+    """
+    try:
+        settings = get_read_cache_config()
+        if settings.get("enabled") is not True or is_using_fallback_config():
+            return
+        header = _read_cache_header()
+        if header is None or header["config"][0] != get_active_config_path():
+            return
+        if time.time_ns() - header["config"][2] <= COMPILED_CONFIG_RACY_WINDOW_NS:
+            return  # The config may still change within one timestamp tick
+        max_entries = settings.get("maxEntries")
+        if isinstance(max_entries, bool) or not isinstance(max_entries, int) or max_entries < 1:
+            max_entries = READ_CACHE_DEFAULT_MAX_ENTRIES
+
+        entries = _read_cache_entries(_read_cache_file(), header)
+        entries.pop(file_path, None)
+        entries[file_path] = {
+            "sig": _read_cache_signature(file_path, resolved),
+            "used": int(time.time()),
+        }
+        if len(entries) > max_entries:
+            ranked = sorted(
+                entries,
+                key=lambda k: entries[k].get("used", 0) if isinstance(entries[k], dict) else 0,
+            )
+            for key in ranked[: len(entries) - max_entries]:
+                del entries[key]
+        _write_read_cache(header, entries)
+    except Exception as e:
+        log_guardian("WARN", f"Read cache store failed: {e}")
+
+
+# ============================================================
+# Hook Input Parsing
+# ============================================================
+# The path guardians only read tool_name and tool_input.file_path, but a
+# Write/Edit payload also carries the whole file content or new_string,
+# which json.load() would decode into Python strings just to discard them.
+# parse_path_hook_input() walks the document instead: every value is
+# validated by the json module's rules, but only the values the hook reads
+# are kept. Strings are checked by the json module's own (C) scanstring()
+# in windows of at most _JSON_STRING_WINDOW characters, so a 20 MB content
+# value never exists as a second 20 MB string.
+
+_JSON_WS_RE = re.compile(r"[ \t\n\r]*")
+# Windows grow from the first size to the limit, so short strings stay cheap
+_JSON_STRING_FIRST_WINDOW = 256
+_JSON_STRING_WINDOW = 1 << 20
+_JSON_NUMBER_RE = re.compile(r"-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?")
+# Literals json.loads() accepts, including its NaN/Infinity extensions
+_JSON_CONSTANTS = ("true", "false", "null", "NaN", "Infinity", "-Infinity")
+# Longer keys are validated but never compared (no hook key is this long)
+_JSON_MAX_KEY_LENGTH = 64
+
+
+class _JsonCursor:
+    """Validating position in a JSON document; decodes nothing by itself."""
+
+    __slots__ = ("text", "pos")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.pos = 0
+
+    def error(self, message: str) -> json.JSONDecodeError:
+        return json.JSONDecodeError(message, self.text, self.pos)
+
+    def peek(self) -> str:
+        """Skip whitespace; return the next character ("" at the end)."""
+        self.pos = _JSON_WS_RE.match(self.text, self.pos).end()
+        return self.text[self.pos : self.pos + 1]
+
+    def members(self):
+        """Yield the keys of the object at the cursor.
+
+        The caller must consume each member's value (value() or members())
+        before asking for the next key.
+        """
+        if self.peek() != "{":
+            raise self.error("Expecting '{'")
+        self.pos += 1
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            yield self._key()
+            char = self.peek()
+            if char == "}":
+                self.pos += 1
+                return
+            if char != ",":
+                raise self.error("Expecting ',' delimiter")
+            self.pos += 1
+
+    def value(self) -> tuple[int, int]:
+        """Skip the value at the cursor; return its span."""
+        start = self.pos
+        char = self.peek()
+        if char == "{" or char == "[":
+            self._skip_container()
+            return start, self.pos
+        return self._scalar()
+
+    def _key(self) -> str | None:
+        if self.peek() != '"':
+            raise self.error("Expecting property name enclosed in double quotes")
+        start, end = self._string()
+        if self.peek() != ":":
+            raise self.error("Expecting ':' delimiter")
+        self.pos += 1
+        if end - start > _JSON_MAX_KEY_LENGTH:
+            return None
+        raw = self.text[start + 1 : end - 1]
+        return json.loads(self.text[start:end]) if "\\" in raw else raw
+
+    def _string(self) -> tuple[int, int]:
+        text = self.text
+        start = self.pos
+        pos = start + 1
+        window = _JSON_STRING_FIRST_WINDOW
+        while True:
+            end = min(pos + window, len(text))
+            if end < len(text):
+                # Never cut inside an escape: end the window before the
+                # backslash run that starts any escape near the cut
+                cut = text.rfind("\\", max(pos, end - 6), end)
+                if cut != -1:
+                    while cut > pos and text[cut - 1] == "\\":
+                        cut -= 1
+                    end = cut
+            if end <= pos:
+                # A window-sized run of backslashes: check the rest in one go
+                chunk, offset = text, 0
+            else:
+                chunk, offset = '"' + text[pos:end] + '"', pos - 1
+            try:
+                stop = json.decoder.scanstring(chunk, pos - offset, True)[1]
+            except ValueError:
+                raise self.error("Invalid string") from None
+            if stop < len(chunk) or offset == 0:
+                self.pos = stop + offset  # the real closing quote was in the chunk
+                return start, self.pos
+            if end >= len(text):
+                raise self.error("Unterminated string")
+            pos = end
+            window = min(window * 4, _JSON_STRING_WINDOW)
+
+    def _scalar(self) -> tuple[int, int]:
+        start = self.pos
+        if self.text.startswith('"', start):
+            return self._string()
+        for constant in _JSON_CONSTANTS:
+            if self.text.startswith(constant, start):
+                self.pos = start + len(constant)
+                return start, self.pos
+        match = _JSON_NUMBER_RE.match(self.text, start)
+        if match is None:
+            raise self.error("Expecting value")
+        self.pos = match.end()
+        return start, self.pos
+
+    def _skip_container(self) -> None:
+        # Iterative, so deeply nested content cannot exhaust the stack
+        closers: list[str] = []
+        while True:
+            char = self.peek()
+            if char == "{" or char == "[":
+                self.pos += 1
+                closer = "}" if char == "{" else "]"
+                if self.peek() == closer:
+                    self.pos += 1  # empty container: one complete value
+                else:
+                    closers.append(closer)
+                    if closer == "}":
+                        self._key()
+                    continue
+            else:
+                self._scalar()
+            # A value is complete: ',' starts the next member, closers end containers
+            while closers:
+                char = self.peek()
+                if char == ",":
+                    self.pos += 1
+                    if closers[-1] == "}":
+                        self._key()
+                    break
+                if char != closers[-1]:
+                    raise self.error("Expecting ',' delimiter")
+                self.pos += 1
+                closers.pop()
+            if not closers:
+                return
+
+
+def parse_path_hook_input(text: str) -> Any:
+    """Parse a PreToolUse payload for the Read/Edit/Write guardians.
+
+    Validates the whole document like json.loads() but only decodes
+    tool_name and tool_input.file_path; other tool_input members (file
+    content, old_string/new_string) are skipped in place.
+
+    Args:
+        text: Raw hook input.
+
+    Returns:
+        {"tool_name": ..., "tool_input": {"file_path": ...}} holding the
+        members present in the input (a non-object tool_input is decoded
+        as-is). Inputs that are not JSON objects are returned by
+        json.loads() unchanged.
+
+    Raises:
+        json.JSONDecodeError: On malformed input.
+    """
+    cursor = _JsonCursor(text)
+    if cursor.peek() != "{":
+        return json.loads(text)
+
+    result: dict[str, Any] = {}
+    for key in cursor.members():
+        if key == "tool_input" and cursor.peek() == "{":
+            # Duplicate keys: the last one wins, as with json.loads()
+            tool_input = result["tool_input"] = {}
+            for field in cursor.members():
+                start, end = cursor.value()
+                if field == "file_path":
+                    tool_input["file_path"] = json.loads(text[start:end])
+        elif key in ("tool_name", "tool_input"):
+            start, end = cursor.value()
+            result[key] = json.loads(text[start:end])
+        else:
+            cursor.value()
+    if cursor.peek():
+        raise cursor.error("Extra data")
+    return result
+
+
 # ============================================================
 # Path Guardian Hook Runner (Shared Edit/Write Logic)
 # ============================================================
@@ -2236,7 +4985,7 @@ def resolve_tool_path(file_path: str) -> Path:
         if project_dir:
             path = Path(project_dir) / path
 
-    return path.resolve()
+    return fs_resolve(path)
 
 
 def run_path_guardian_hook(tool_name: str) -> None:
@@ -2252,11 +5001,19 @@ def run_path_guardian_hook(tool_name: str) -> None:
     Args:
         tool_name: The tool name to check for ("Read", "Edit", or "Write").
     """
+    with fs_fact_scope():
+        _run_path_guardian_checks(tool_name)
+
+
+def _run_path_guardian_checks(tool_name: str) -> None:
+    """Body of run_path_guardian_hook() (inside the filesystem fact scope)."""
+    global _read_cache_hit
     import json as _json  # Local import to avoid circular dependency issues
 
     # Parse input - FAIL-CLOSE on invalid JSON
     try:
-        input_data = _json.load(sys.stdin)
+        # Only tool_name/file_path are decoded (Write/Edit content is skipped)
+        input_data = parse_path_hook_input(sys.stdin.read())
     except _json.JSONDecodeError as e:
         # SECURITY FIX: Fail-close on malformed input
         log_guardian("ERROR", f"Malformed JSON input: {e}")
@@ -2308,8 +5065,18 @@ def run_path_guardian_hook(tool_name: str) -> None:
     path_str = str(resolved)
     path_preview = truncate_path(file_path)
 
+    # Repeated Read of an unchanged file under an unchanged config
+    is_read = tool_name.lower() == "read"
+    if is_read and read_cache_lookup(file_path, resolved):
+        _read_cache_hit = True
+        log_guardian("ALLOW", f"{tool_name} (cached): {path_preview}")
+        sys.exit(0)
+
     log_guardian("INFO", f"{tool_name} check: {path_preview}")
 
+    # Every path tier in one pass (see PathClassifier)
+    path_tiers = classify_path(path_str)
+
     # ========== Check: Symlink Escape ==========
     if is_symlink_escape(file_path):
         log_guardian("BLOCK", f"Symlink escape detected ({tool_name}): {path_preview}")
@@ -2322,7 +5089,7 @@ def run_path_guardian_hook(tool_name: str) -> None:
     # ========== Check: Path Within Project ==========
     if not is_path_within_project(path_str):
         # Check if path is in allowedExternalReadPaths/WritePaths before blocking
-        ext_mode = match_allowed_external_path(path_str)
+        ext_mode = external_path_mode(path_tiers)
         if ext_mode is not None:
             # Mode check: read-only external paths block Write/Edit
             if ext_mode == "read" and tool_name.lower() in ("write", "edit"):
@@ -2358,7 +5125,7 @@ def run_path_guardian_hook(tool_name: str) -> None:
         sys.exit(0)
 
     # ========== Check: Zero Access ==========
-    if match_zero_access(path_str):
+    if "zeroAccess" in path_tiers:
         log_guardian("BLOCK", f"Zero access path ({tool_name}): {path_preview}")
         if is_dry_run():
             log_guardian("DRY-RUN", f"Would DENY {tool_name}")
@@ -2372,7 +5139,7 @@ def run_path_guardian_hook(tool_name: str) -> None:
 
     # ========== Check: Read Only ==========
     # Skip readOnly check for Read tool — reading read-only files is allowed
-    if tool_name.lower() != "read" and match_read_only(path_str):
+    if tool_name.lower() != "read" and "readOnly" in path_tiers:
         log_guardian("BLOCK", f"Read-only path ({tool_name}): {path_preview}")
         if is_dry_run():
             log_guardian("DRY-RUN", f"Would DENY {tool_name}")
@@ -2385,7 +5152,7 @@ def run_path_guardian_hook(tool_name: str) -> None:
         sys.exit(0)
 
     # ========== Check: No Delete (Write tool — content destruction prevention) ==========
-    if tool_name.lower() == "write" and match_no_delete(path_str):
+    if tool_name.lower() == "write" and "noDelete" in path_tiers:
         # SECURITY: Fail-closed on exists() error (assume file exists if check fails)
         try:
             nodelete_resolved = expand_path(file_path)
@@ -2406,6 +5173,8 @@ def run_path_guardian_hook(tool_name: str) -> None:
             sys.exit(0)
 
     # ========== Allow ==========
+    if is_read:
+        read_cache_store(file_path, resolved)
     log_guardian("ALLOW", f"{tool_name}: {path_preview}")
     sys.exit(0)
 
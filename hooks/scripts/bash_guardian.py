@@ -16,16 +16,43 @@ Protects against dangerous bash commands by:
 Phase: 3 (Bash Bypass Protection)
 """
 
+import os
+import sys
+
+# Fast path: hand the request to a warm resident evaluator when one is running,
+# before paying for the imports below. Any failure falls through to the
+# in-process evaluation (fail-closed). Without an evaluator socket (the
+# default, evaluator.enabled=false) this costs one stat and no imports.
+if __name__ == "__main__" and os.path.exists(
+    os.path.join(os.environ.get("CLAUDE_PROJECT_DIR") or "/nonexistent",
+                 ".claude", "guardian", "evaluator.sock")
+):
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    try:
+        from _guardian_client import forward_to_evaluator
+
+        if forward_to_evaluator("bash"):
+            sys.exit(0)
+    except Exception:
+        pass
+
+import bisect
+import errno
+import fnmatch
 import glob
 import json
-import os
 import re
 import secrets
 import shlex
 import shutil
-import sys
+import time
+from collections.abc import Callable, Iterator
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from concurrent.futures import ThreadPoolExecutor
 
 # Add hooks directory to path
 sys.path.insert(0, str(Path(__file__).parent))
@@ -34,30 +61,58 @@ try:
     from _guardian_utils import (
         COMMIT_MESSAGE_MAX_LENGTH,  # Import constant for message length
         ask_response,
+        classify_path,
+        classify_paths,  # Tiered path classifier (Layer 3)
         deny_response,
+        external_path_mode,
+        extract_required_literals,  # Layer 4 rule prefilter
+        fs_exists,  # Filesystem fact cache (one stat per path)
+        fs_fact_scope,
+        fs_resolve,
+        get_glob_expansion_config,  # Wildcard expansion budget (Layer 3)
         get_hook_behavior,  # hookBehavior config support
+        get_layer1_literal_matcher,  # Layer 1 multi-literal matcher
+        get_layer1_scan_table,  # Layer 1 literal table (compiled config)
         get_project_dir,
         git_add_tracked,
         git_commit,
         git_has_changes,
         git_has_staged_changes,  # FIX: Check staged changes before commit
+        get_archive_policy_config,
+        git_ignored_paths,
         git_is_tracked,
+        git_untracked_units,  # Batched tracked/untracked split (archive step)
+        glob_to_literals,  # noqa: F401 -- Re-exported: moved to _guardian_utils
         is_dry_run,
         is_rebase_or_merge_in_progress,  # Phase 5: Fragile state check
         is_symlink_escape,
+        layer1_boundary_ok,  # Layer 1 boundary rules per literal hit
         load_guardian_config,
         log_guardian,
         make_hook_behavior_response,  # hookBehavior response helper
+        maybe_start_evaluator,  # Resident evaluator lazy start
         match_allowed_external_path,
         match_ask_patterns,
         match_block_patterns,
-        match_no_delete,
-        match_read_only,
-        match_zero_access,
+        resolve_command_argv,  # argv after wrappers (recursive-read detection)
         set_circuit_open,  # Phase 4 Fix: Circuit Breaker
         truncate_command,
         validate_commit_prefix,  # m3 FIX: centralized prefix validation
     )
+    from _guardian_manifest import protected_contents  # Protected-file manifest
+    from _guardian_shell import (  # Shell model (Layer 2 split + parse)
+        SubCommand,
+        parse_command,
+    )
+    # Re-exported: moved to _guardian_shell, still imported from here by tests
+    from _guardian_shell import (  # noqa: F401
+        ParsedCommand,
+        _consume_heredoc_bodies,
+        _is_inside_quotes,
+        _parse_heredoc_delimiter,
+        split_command_spans,
+        split_commands,
+    )
 except ImportError as e:
     # Fail-close: guardian system unavailable = block all
     print(
@@ -79,489 +134,105 @@ except ImportError as e:
 # ============================================================
 
 
-def split_commands(command: str) -> list[str]:
-    """Split compound command into sub-commands.
+# Command splitting lives in _guardian_shell (shared shell model); the
+# scanner functions are re-exported here for existing callers.
 
-    Handles delimiters: ;  &&  ||  |  &  newline
 
-    Does NOT split inside:
-    - Single-quoted strings ('...')
-    - Double-quoted strings ("...")
-    - Command substitution ($(...))
-    - Process substitution (<(...) or >(...))
-    - Backtick substitution (backtick...backtick)
-    - Backslash-escaped characters
-    - Parameter expansion (${...})
-    - Bare subshells ((...))
-    - Brace groups ({ ...; })
-    - Conditional expressions ([[ ... ]])
-    - Extglob patterns (?(...), *(...), +(...), @(...), !(...))
-    - Arithmetic expressions ((( ... )))
-
-    Critical fixes incorporated:
-    - C-2: Backslash escapes and backtick substitution handling
-    - M-4: Single & as command separator
-
-    Args:
-        command: The compound bash command to split.
+def _as_sub_command(command: str | SubCommand) -> SubCommand:
+    """Accept a raw sub-command string or an already-parsed SubCommand.
 
-    Returns:
-        List of individual sub-commands (stripped of whitespace).
+    main() passes the SubCommand objects from parse_command() so words and
+    redirections are tokenized once; direct callers may pass plain strings.
     """
-    sub_commands: list[str] = []
-    current: list[str] = []
-    depth = 0  # Track nesting: $(), <(), >()
-    in_single_quote = False
-    in_double_quote = False
-    in_backtick = False
-    i = 0
-    pending_heredocs: list[tuple[str, bool]] = []  # (delimiter, strip_tabs)
-    arithmetic_depth = 0  # tracks (( ... )) nesting for arithmetic context
-    param_expansion_depth = 0  # tracks ${ ... } nesting
-    bracket_depth = 0  # tracks [[ ... ]] nesting
-    brace_group_depth = 0  # tracks { ...; } brace groups
-    extglob_depth = 0  # tracks extglob ?() *() +() @() !() nesting
-
-    while i < len(command):
-        c = command[i]
-
-        # Backslash escape handling (outside single quotes)
-        # C-2 fix: \; should NOT be treated as a delimiter
-        if c == "\\" and not in_single_quote:
-            # Consume backslash + next character as literal
-            current.append(c)
-            if i + 1 < len(command):
-                i += 1
-                current.append(command[i])
-            i += 1
-            continue
-
-        # Single quote tracking (not inside double quotes or backticks)
-        if c == "'" and not in_double_quote and not in_backtick and depth == 0:
-            in_single_quote = not in_single_quote
-            current.append(c)
-            i += 1
-            continue
-
-        # Double quote tracking (not inside single quotes or backticks)
-        if c == '"' and not in_single_quote and not in_backtick and depth == 0:
-            in_double_quote = not in_double_quote
-            current.append(c)
-            i += 1
-            continue
-
-        # Skip everything inside quotes
-        if in_single_quote or in_double_quote:
-            current.append(c)
-            i += 1
-            continue
-
-        # C-2 fix: Backtick substitution tracking
-        if c == "`" and depth == 0:
-            in_backtick = not in_backtick
-            current.append(c)
-            i += 1
-            continue
-
-        # Skip everything inside backticks
-        if in_backtick:
-            current.append(c)
-            i += 1
-            continue
-
-        # Track nesting depth for $(), <(), >()
-        if c == "(" and i > 0 and command[i - 1] in ("$", "<", ">"):
-            depth += 1
-            current.append(c)
-            i += 1
-            continue
-        if c == "(" and depth > 0:
-            depth += 1
-            current.append(c)
-            i += 1
-            continue
-        if c == ")" and depth > 0:
-            depth -= 1
-            current.append(c)
-            i += 1
-            continue
-
-        # --- Context tracking (BEFORE separator checks) ---
-        # All context entry/exit must happen before separators so that
-        # delimiters inside these constructs are suppressed correctly.
-
-        # Track ${...} parameter expansion
-        if c == "$" and i + 1 < len(command) and command[i + 1] == "{":
-            param_expansion_depth += 1
-            current.append("${")
-            i += 2
-            continue
+    if isinstance(command, SubCommand):
+        return command
+    return SubCommand(command)
 
-        # Track } for parameter expansion (only when inside ${} and not
-        # inside a nested command substitution where } is literal)
-        if c == "}" and param_expansion_depth > 0 and depth == 0:
-            param_expansion_depth -= 1
-            current.append(c)
-            i += 1
-            continue
-
-        # Skip everything inside ${...} (but still track nested ${} and $())
-        if param_expansion_depth > 0 and depth == 0:
-            # Track nested ${ inside parameter expansion
-            if c == "$" and i + 1 < len(command) and command[i + 1] == "{":
-                param_expansion_depth += 1
-                current.append("${")
-                i += 2
-                continue
-            current.append(c)
-            i += 1
-            continue
 
-        # Track [[ ... ]] conditional expressions
-        if (command[i:i+2] == "[["
-                and (i == 0 or command[i-1] in " \t\n;|&(")
-                and i + 2 < len(command) and command[i+2] in " \t"):
-            bracket_depth += 1
-            current.append("[[")
-            i += 2
-            continue
-
-        # V2-fix: depth == 0 guard prevents ]] inside $() from decrementing
-        if (command[i:i+2] == "]]" and bracket_depth > 0 and depth == 0):
-            bracket_depth -= 1
-            current.append("]]")
-            i += 2
-            continue
-
-        # Skip separators inside [[ ... ]]
-        if bracket_depth > 0:
-            current.append(c)
-            i += 1
-            continue
-
-        # Track arithmetic context: (( ... ))
-        # Must come BEFORE bare-paren and separator checks.
-        # Note: $(( is already handled by the $() depth tracking.
-        if (command[i:i+2] == '(('
-                and (i == 0 or command[i-1] not in ('$', '<', '>'))):
-            arithmetic_depth += 1
-            current.append('((')
-            i += 2
-            continue
+# ============================================================
+# Layer 1: Protected Path Scan
+# ============================================================
 
-        if command[i:i+2] == '))' and arithmetic_depth > 0:
-            arithmetic_depth -= 1
-            current.append('))')
-            i += 2
-            continue
 
-        # Skip separators inside (( ... ))
-        if arithmetic_depth > 0:
-            current.append(c)
-            i += 1
-            continue
+# $'...' ANSI-C quoted string; group 1 is the raw content
+_ANSI_C_STRING_RE = re.compile(r"""\$'((?:[^'\\]|\\.)*)'""")
+# [x] or [\x] single-character glob class; group 1 is the character
+_GLOB_CHAR_CLASS_RE = re.compile(r'\[\\?([^\]\[\\])\]')
 
-        # Track extglob patterns: ?() *() +() @() !()
-        if (c in "?*+@!" and i + 1 < len(command) and command[i + 1] == "("
-                and depth == 0):
-            extglob_depth += 1
-            current.append(c)
-            current.append("(")
-            i += 2
-            continue
 
-        if c == ")" and extglob_depth > 0:
-            extglob_depth -= 1
-            current.append(c)
-            i += 1
-            continue
-
-        # Skip separators inside extglob
-        if extglob_depth > 0:
-            # Track nested extglob
-            if (c in "?*+@!" and i + 1 < len(command)
-                    and command[i + 1] == "("):
-                extglob_depth += 1
-                current.append(c)
-                current.append("(")
+def _decode_ansi_c_content(content: str) -> str:
+    """Decode the content of one $'...' string (without $' and ')."""
+    result: list[str] = []
+    i = 0
+    while i < len(content):
+        if content[i] == '\\' and i + 1 < len(content):
+            nc = content[i + 1]
+            if nc == 'x' and i + 3 < len(content):
+                hex_str = content[i + 2:i + 4]
+                try:
+                    val = int(hex_str, 16)
+                    # V2-fix: \x00 (null byte) terminates C strings in bash;
+                    # replace with space (boundary char) for scan matching
+                    result.append(' ' if val == 0 else chr(val))
+                    i += 4
+                    continue
+                except ValueError:
+                    pass
+            elif nc == 'u' and i + 5 < len(content):
+                # \uHHHH — 16-bit Unicode
+                hex_str = content[i + 2:i + 6]
+                if len(hex_str) == 4:
+                    try:
+                        result.append(chr(int(hex_str, 16)))
+                        i += 6
+                        continue
+                    except ValueError:
+                        pass
+            elif nc == 'U' and i + 9 < len(content):
+                # \UHHHHHHHH — 32-bit Unicode
+                hex_str = content[i + 2:i + 10]
+                if len(hex_str) == 8:
+                    try:
+                        cp = int(hex_str, 16)
+                        if cp <= 0x10FFFF:
+                            result.append(chr(cp))
+                            i += 10
+                            continue
+                    except ValueError:
+                        pass
+            elif nc in '01234567':
+                # Octal: \NNN (1-3 octal digits, with or without leading 0)
+                j = i + 1
+                oct_str = ''
+                while j < len(content) and content[j] in '01234567' and len(oct_str) < 3:
+                    oct_str += content[j]
+                    j += 1
+                if oct_str:
+                    try:
+                        result.append(chr(int(oct_str, 8)))
+                        i = j
+                        continue
+                    except ValueError:
+                        pass
+            elif nc == 'c':
+                # V2-fix: \c terminates ANSI-C string (bash discards rest)
+                break
+            elif nc in ('n', 't', 'r', 'a', 'b', 'f', 'v', 'e', 'E', '\\', "'"):
+                escape_map = {
+                    'n': '\n', 't': '\t', 'r': '\r', 'a': '\a',
+                    'b': '\b', 'f': '\f', 'v': '\v', 'e': '\x1b',
+                    'E': '\x1b',  # V2-fix: uppercase \E is ESC, same as \e
+                    '\\': '\\', "'": "'",
+                }
+                result.append(escape_map[nc])
                 i += 2
                 continue
-            current.append(c)
+            result.append(content[i])
             i += 1
-            continue
-
-        # Track bare (...) subshells (not $(), <(), >(), or (())
-        if c == "(" and depth == 0:
-            # Not preceded by $, <, > (those are handled above)
-            if i == 0 or command[i - 1] not in ("$", "<", ">"):
-                depth += 1
-                current.append(c)
-                i += 1
-                continue
-
-        # Track { ... } brace groups
-        # { is a reserved word only when it's a standalone token:
-        # preceded by whitespace/SOL and followed by whitespace
-        if (c == "{" and brace_group_depth == 0
-                and (i == 0 or command[i-1] in " \t\n;|&(")
-                and i + 1 < len(command) and command[i+1] in " \t\n"):
-            # Make sure this is not ${ (already handled above)
-            if i == 0 or command[i-1] != "$":
-                brace_group_depth += 1
-                current.append(c)
-                i += 1
-                continue
-
-        # Track nested { inside brace groups
-        if (c == "{" and brace_group_depth > 0
-                and (command[i-1] in " \t\n;|&(" if i > 0 else True)
-                and i + 1 < len(command) and command[i+1] in " \t\n"):
-            brace_group_depth += 1
-            current.append(c)
-            i += 1
-            continue
-
-        # } closes brace group when it's a standalone token
-        # V2-fix: depth == 0 guard prevents } inside $() from decrementing
-        if (c == "}" and brace_group_depth > 0 and depth == 0):
-            brace_group_depth -= 1
-            current.append(c)
-            i += 1
-            continue
-
-        # Skip separators inside brace groups
-        if brace_group_depth > 0:
-            current.append(c)
-            i += 1
-            continue
-
-        # --- Separator checks (only at top level, depth == 0) ---
-        if depth == 0:
-            # Semicolon
-            if c == ";":
-                sub_commands.append("".join(current).strip())
-                current = []
-                i += 1
-                continue
-            # && (two ampersands)
-            if c == "&" and i + 1 < len(command) and command[i + 1] == "&":
-                sub_commands.append("".join(current).strip())
-                current = []
-                i += 2
-                continue
-            # || (two pipes)
-            if c == "|" and i + 1 < len(command) and command[i + 1] == "|":
-                sub_commands.append("".join(current).strip())
-                current = []
-                i += 2
-                continue
-            # | (single pipe, not ||)
-            if c == "|":
-                sub_commands.append("".join(current).strip())
-                current = []
-                i += 1
-                continue
-            # M-4 fix: & (single ampersand = background, also a separator)
-            # Codex review fix: skip & when part of redirection (&>, >&, <&, |&)
-            if c == "&":
-                next_c = command[i + 1] if i + 1 < len(command) else ""
-                prev_c = command[i - 1] if i > 0 else ""
-                # &> is "redirect both stdout+stderr" -- not a separator
-                if next_c == ">":
-                    current.append(c)
-                    i += 1
-                    continue
-                # >& and <& are fd duplication -- not a separator
-                if prev_c in (">", "<"):
-                    current.append(c)
-                    i += 1
-                    continue
-                # n>& where n is a digit (e.g., 2>&1)
-                if prev_c.isdigit() and len(current) >= 2 and current[-1] == ">":
-                    current.append(c)
-                    i += 1
-                    continue
-                sub_commands.append("".join(current).strip())
-                current = []
-                i += 1
-                continue
-            # Comment tracking: # starts a comment to end-of-line in bash.
-            # Consume the rest of the line to prevent << inside comments
-            # from being misdetected as heredoc (security: fail-closed).
-            # Only triggers when # follows whitespace/separator (bash semantics).
-            if c == '#' and (i == 0 or command[i-1] in ' \t\n;|&()'):
-                while i < len(command) and command[i] != '\n':
-                    current.append(command[i])
-                    i += 1
-                continue
-
-            # Detect heredoc operator: << or <<- (but NOT <<< here-string)
-            # Only detect when outside arithmetic context (arithmetic_depth == 0)
-            if (command[i:i+2] == '<<'
-                    and command[i:i+3] != '<<<'
-                    and arithmetic_depth == 0):
-
-                strip_tabs = command[i:i+3] == '<<-'
-                op_len = 3 if strip_tabs else 2
-                current.append(command[i:i+op_len])
-                i += op_len
-
-                # Skip optional whitespace between << and delimiter
-                while i < len(command) and command[i] in ' \t':
-                    current.append(command[i])
-                    i += 1
-
-                # Parse delimiter word: bare, 'quoted', or "quoted"
-                delim, raw_token, i = _parse_heredoc_delimiter(command, i)
-                current.append(raw_token)
-                pending_heredocs.append((delim, strip_tabs))
-                continue
-
-            # Newline
-            if c == "\n":
-                sub_commands.append("".join(current).strip())
-                current = []
-                i += 1
-                # Consume heredoc bodies after newline
-                if pending_heredocs:
-                    i = _consume_heredoc_bodies(command, i, pending_heredocs)
-                    pending_heredocs = []
-                continue
-
-        current.append(c)
-        i += 1
-
-    # Don't forget the last segment
-    remaining = "".join(current).strip()
-    if remaining:
-        sub_commands.append(remaining)
-
-    # Filter empty strings
-    return [cmd for cmd in sub_commands if cmd]
-
-
-def _parse_heredoc_delimiter(command: str, i: int) -> tuple[str, str, int]:
-    """Parse heredoc delimiter word from position i.
-
-    Handles:
-      - Bare word: EOF, EOFZ, END_MARKER
-      - Single-quoted: 'EOF' (literal heredoc, no expansion)
-      - Double-quoted: "EOF" (expansion-active heredoc)
-
-    Returns: (delimiter_text, raw_token, new_position)
-    """
-    if i >= len(command):
-        return ('', '', i)
-
-    if command[i] in ("'", '"'):
-        quote_char = command[i]
-        start = i
-        i += 1
-        while i < len(command) and command[i] != quote_char:
+        else:
+            result.append(content[i])
             i += 1
-        if i < len(command):
-            i += 1  # consume closing quote
-        raw_token = command[start:i]
-        delim = raw_token[1:-1]  # strip quotes
-        return (delim, raw_token, i)
-
-    # Bare word: consume until whitespace, newline, or shell metachar
-    start = i
-    while i < len(command) and command[i] not in ' \t\n;|&<>()':
-        i += 1
-    raw_token = command[start:i]
-    return (raw_token, raw_token, i)
-
-
-def _consume_heredoc_bodies(command: str, i: int,
-                             pending: list[tuple[str, bool]]) -> int:
-    """Consume heredoc body lines until each delimiter is matched.
-
-    For each pending heredoc, reads lines until a line matches the
-    delimiter exactly (after optional tab-stripping for <<-).
-
-    Returns: new position after all heredoc bodies consumed.
-    """
-    for delim, strip_tabs in pending:
-        while i < len(command):
-            # Find end of current line
-            line_start = i
-            while i < len(command) and command[i] != '\n':
-                i += 1
-            line = command[line_start:i]
-
-            # Advance past newline
-            if i < len(command):
-                i += 1
-
-            # Check if this line matches the delimiter
-            cmp_line = line.rstrip('\r')
-            if strip_tabs:
-                cmp_line = cmp_line.lstrip('\t')
-            if cmp_line == delim:
-                break
-        # If we exhaust the input without finding the delimiter,
-        # we've consumed an unterminated heredoc -- body lines
-        # won't leak to sub-commands (fail-closed behavior)
-    return i
-
-
-# ============================================================
-# Layer 1: Protected Path Scan
-# ============================================================
-
-
-def glob_to_literals(pattern: str) -> list[str]:
-    """Convert a glob pattern to literal search strings for raw command scanning.
-
-    Only converts patterns where the literal is distinctive enough to be
-    meaningful as a substring search. Returns empty list for patterns that
-    are too generic.
-
-    Critical fix C-3: Returns [] for generic patterns like *.env to avoid
-    false positives. Only exact matches, prefix patterns, and specific
-    suffix patterns are converted.
-
-    Examples:
-        ".env"       -> [".env"]       (exact match)
-        ".env.*"     -> [".env."]      (prefix match)
-        "id_rsa"     -> ["id_rsa"]     (exact match)
-        "id_rsa.*"   -> ["id_rsa."]    (prefix match)
-        "*.pem"      -> [".pem"]       (suffix match)
-        "*.tfstate"  -> [".tfstate"]   (suffix match)
-        "*.env"      -> []             (too generic)
-        "*credentials*.json" -> []     (too generic)
-
-    Args:
-        pattern: A glob pattern from zeroAccessPaths config.
-
-    Returns:
-        List of literal strings to search for, or [] if too generic.
-    """
-    # Exact match (no wildcards)
-    if "*" not in pattern and "?" not in pattern:
-        return [pattern]
-
-    # Prefix match: "name.*" -> search for "name."
-    if pattern.endswith(".*"):
-        prefix = pattern[:-1]  # "name."
-        # Only if the prefix itself has no wildcards
-        if "*" not in prefix and "?" not in prefix:
-            return [prefix]
-
-    # Suffix match: "*.ext" -> search for ".ext"
-    # C-3 fix: Only if the extension is distinctive enough
-    if pattern.startswith("*.") and "*" not in pattern[1:] and "?" not in pattern[1:]:
-        suffix = pattern[1:]  # ".ext"
-        # Skip short/generic suffixes that cause excessive false positives
-        if len(suffix) >= 4:
-            bare = suffix[1:]  # strip leading dot
-            generic_words = {"env", "key", "log"}
-            if bare.lower() not in generic_words:
-                return [suffix]
-
-    # Wildcard patterns like "*credentials*" -- too generic, skip
-    return []
+    return ''.join(result)
 
 
 def _decode_ansi_c_strings(command: str) -> str:
@@ -577,81 +248,7 @@ def _decode_ansi_c_strings(command: str) -> str:
     Returns:
         Command with $'...' sequences replaced by their decoded content.
     """
-    def _decode_escape(m: re.Match) -> str:
-        content = m.group(1)
-        result: list[str] = []
-        i = 0
-        while i < len(content):
-            if content[i] == '\\' and i + 1 < len(content):
-                nc = content[i + 1]
-                if nc == 'x' and i + 3 < len(content):
-                    hex_str = content[i + 2:i + 4]
-                    try:
-                        val = int(hex_str, 16)
-                        # V2-fix: \x00 (null byte) terminates C strings in bash;
-                        # replace with space (boundary char) for scan matching
-                        result.append(' ' if val == 0 else chr(val))
-                        i += 4
-                        continue
-                    except ValueError:
-                        pass
-                elif nc == 'u' and i + 5 < len(content):
-                    # \uHHHH — 16-bit Unicode
-                    hex_str = content[i + 2:i + 6]
-                    if len(hex_str) == 4:
-                        try:
-                            result.append(chr(int(hex_str, 16)))
-                            i += 6
-                            continue
-                        except ValueError:
-                            pass
-                elif nc == 'U' and i + 9 < len(content):
-                    # \UHHHHHHHH — 32-bit Unicode
-                    hex_str = content[i + 2:i + 10]
-                    if len(hex_str) == 8:
-                        try:
-                            cp = int(hex_str, 16)
-                            if cp <= 0x10FFFF:
-                                result.append(chr(cp))
-                                i += 10
-                                continue
-                        except ValueError:
-                            pass
-                elif nc in '01234567':
-                    # Octal: \NNN (1-3 octal digits, with or without leading 0)
-                    j = i + 1
-                    oct_str = ''
-                    while j < len(content) and content[j] in '01234567' and len(oct_str) < 3:
-                        oct_str += content[j]
-                        j += 1
-                    if oct_str:
-                        try:
-                            result.append(chr(int(oct_str, 8)))
-                            i = j
-                            continue
-                        except ValueError:
-                            pass
-                elif nc == 'c':
-                    # V2-fix: \c terminates ANSI-C string (bash discards rest)
-                    break
-                elif nc in ('n', 't', 'r', 'a', 'b', 'f', 'v', 'e', 'E', '\\', "'"):
-                    escape_map = {
-                        'n': '\n', 't': '\t', 'r': '\r', 'a': '\a',
-                        'b': '\b', 'f': '\f', 'v': '\v', 'e': '\x1b',
-                        'E': '\x1b',  # V2-fix: uppercase \E is ESC, same as \e
-                        '\\': '\\', "'": "'",
-                    }
-                    result.append(escape_map[nc])
-                    i += 2
-                    continue
-                result.append(content[i])
-                i += 1
-            else:
-                result.append(content[i])
-                i += 1
-        return ''.join(result)
-
-    return re.sub(r"""\$'((?:[^'\\]|\\.)*)'""", _decode_escape, command)
+    return _ANSI_C_STRING_RE.sub(lambda m: _decode_ansi_c_content(m.group(1)), command)
 
 
 def _expand_glob_chars(command: str) -> str:
@@ -671,7 +268,211 @@ def _expand_glob_chars(command: str) -> str:
         Command with single-char bracket classes expanded.
     """
     # Match [x] or [\x] (single char, optionally backslash-escaped)
-    return re.sub(r'\[\\?([^\]\[\\])\]', r'\1', command)
+    return _GLOB_CHAR_CLASS_RE.sub(r'\1', command)
+
+
+# A piece maps text[start:end] of a normalized copy to command[orig_start:orig_end].
+# Identity pieces are unchanged text of equal length; rewritten pieces may
+# have any length on either side (including zero).
+_Piece = tuple[int, int, int, int, bool]  # (start, end, orig_start, orig_end, identity)
+
+
+class _ScanVariant:
+    """One text variant scanned by Layer 1, with a map back to the command."""
+
+    __slots__ = ("text", "pieces")
+
+    def __init__(self, text: str, pieces: list[_Piece]):
+        self.text = text
+        self.pieces = pieces
+
+    def dirty_windows(self, margin: int) -> list[tuple[int, int]]:
+        """Merged text ranges within margin of a rewritten piece."""
+        windows: list[tuple[int, int]] = []
+        for start, end, _os, _oe, identity in self.pieces:
+            if identity:
+                continue
+            lo, hi = max(0, start - margin), min(len(self.text), end + margin)
+            if windows and lo <= windows[-1][1]:
+                windows[-1] = (windows[-1][0], max(windows[-1][1], hi))
+            else:
+                windows.append((lo, hi))
+        return windows
+
+    def to_original(self, start: int, end: int) -> tuple[int, int]:
+        """Map text[start:end] to the covering range of the original command."""
+        return _map_to_original(self.pieces, start, end)
+
+
+def _map_to_original(pieces: list[_Piece], start: int, end: int) -> tuple[int, int]:
+    """Map [start, end) through a piece map to the covering original range."""
+    starts = [piece[0] for piece in pieces]
+    first = pieces[max(0, bisect.bisect_right(starts, start) - 1)]
+    last = pieces[max(0, bisect.bisect_right(starts, max(start, end - 1)) - 1)]
+    orig_start = first[2] + (start - first[0]) if first[4] else first[2]
+    orig_end = last[2] + (end - last[0]) if last[4] else last[3]
+    return orig_start, orig_end
+
+
+def _apply_rewrites(text: str, rewrites: list[tuple[int, int, str]]) -> tuple[str, list[_Piece]]:
+    """Apply non-overlapping (start, end, replacement) rewrites in order."""
+    out: list[str] = []
+    pieces: list[_Piece] = []
+    pos = 0
+    out_pos = 0
+    for start, end, replacement in rewrites:
+        if start > pos:
+            out.append(text[pos:start])
+            pieces.append((out_pos, out_pos + start - pos, pos, start, True))
+            out_pos += start - pos
+        out.append(replacement)
+        pieces.append((out_pos, out_pos + len(replacement), start, end, False))
+        out_pos += len(replacement)
+        pos = end
+    if pos < len(text) or not pieces:
+        out.append(text[pos:])
+        pieces.append((out_pos, out_pos + len(text) - pos, pos, len(text), True))
+    return "".join(out), pieces
+
+
+def _compose_pieces(outer: list[_Piece], inner: list[_Piece]) -> list[_Piece]:
+    """Compose maps out->mid (outer) and mid->orig (inner) into out->orig."""
+    inner_starts = [piece[0] for piece in inner]
+    composed: list[_Piece] = []
+    for start, end, mid_start, mid_end, identity in outer:
+        if not identity:
+            orig_start, orig_end = _map_to_original(inner, mid_start, mid_end)
+            composed.append((start, end, orig_start, orig_end, False))
+            continue
+        k = max(0, bisect.bisect_right(inner_starts, mid_start) - 1)
+        while k < len(inner) and inner[k][0] <= mid_end:
+            i_start, i_end, o_start, o_end, i_identity = inner[k]
+            lo, hi = max(mid_start, i_start), min(mid_end, i_end)
+            k += 1
+            if lo > hi or (lo == hi and i_start != i_end):
+                continue
+            out_lo, out_hi = start + (lo - mid_start), start + (hi - mid_start)
+            if i_identity:
+                composed.append((out_lo, out_hi, o_start + (lo - i_start),
+                                 o_start + (hi - i_start), True))
+            else:
+                composed.append((out_lo, out_hi, o_start, o_end, False))
+    return composed
+
+
+def _scan_variants(command: str) -> list[_ScanVariant]:
+    """Build the Layer 1 text variants of a command in one normalization step.
+
+    Variants (deduplicated, original first):
+    - the command itself
+    - single-char glob classes expanded ([v] -> v)
+    - ANSI-C strings decoded, then glob classes expanded
+
+    Each variant carries a piece map back to the command, so scanning can
+    skip the parts that are unchanged from the original and hits can be
+    reported at their original location.
+    """
+    n = len(command)
+    variants = [_ScanVariant(command, [(0, n, 0, n, True)])]
+    if "[" not in command and "$'" not in command:
+        return variants  # Nothing to normalize
+
+    def glob_rewrites(text: str) -> list[tuple[int, int, str]]:
+        return [(m.start(), m.end(), m.group(1)) for m in _GLOB_CHAR_CLASS_RE.finditer(text)]
+
+    expanded, expanded_pieces = _apply_rewrites(command, glob_rewrites(command))
+    decoded, decoded_pieces = _apply_rewrites(command, [
+        (m.start(), m.end(), _decode_ansi_c_content(m.group(1)))
+        for m in _ANSI_C_STRING_RE.finditer(command)
+    ])
+    normalized, outer_pieces = _apply_rewrites(decoded, glob_rewrites(decoded))
+
+    if expanded != command:
+        variants.append(_ScanVariant(expanded, expanded_pieces))
+    if all(normalized != variant.text for variant in variants):
+        variants.append(_ScanVariant(normalized, _compose_pieces(outer_pieces, decoded_pieces)))
+    return variants
+
+
+def find_protected_path_references(
+    command: str, config: dict
+) -> list[tuple[dict[str, Any], int, int]]:
+    """Find protected path references in a command (Layer 1 core).
+
+    Every configured literal is searched in the original command and in
+    its normalized variants (see _scan_variants()). The original is
+    scanned in full; a variant is only scanned around its rewritten parts,
+    since everywhere else it is identical to the original.
+
+    Args:
+        command: The raw bash command string.
+        config: Guardian configuration dict.
+
+    Returns:
+        (entry, start, end) per Layer 1 table entry that is referenced, in
+        table order. command[start:end] is the first reference found; for a
+        reference that only appears after normalization it covers the
+        original text that was decoded or expanded.
+    """
+    scan_config = config.get("bashPathScan", {})
+    if not scan_config.get("enabled", True):
+        return []
+
+    # Literal table comes from the config artifact when available
+    table = get_layer1_scan_table(config)
+    if not table:
+        return []
+
+    # One multi-literal pass finds every occurrence of every literal;
+    # boundary rules are then applied per hit.
+    matcher = get_layer1_literal_matcher(table)
+    margin = max(len(entry["literal"]) for entry in table) + 1
+    variants = _scan_variants(command)
+    variant_hits: list[tuple[_ScanVariant, dict[str, list[int]]]] = []
+    for index, variant in enumerate(variants):
+        if index == 0:
+            variant_hits.append((variant, matcher.find_all(variant.text)))
+            continue
+        hits: dict[str, list[int]] = {}
+        for lo, hi in variant.dirty_windows(margin):
+            for literal, starts in matcher.find_all(variant.text[lo:hi]).items():
+                hits.setdefault(literal, []).extend(lo + start for start in starts)
+        variant_hits.append((variant, hits))
+
+    references: list[tuple[dict[str, Any], int, int]] = []
+    for entry in table:
+        literal = entry["literal"]
+        location: tuple[int, int] | None = None
+
+        # Check all text variants (original + normalized)
+        for variant, hits in variant_hits:
+            for start in hits.get(literal, ()):
+                if layer1_boundary_ok(variant.text, start, start + len(literal),
+                                      entry["before"], entry["after"]):
+                    location = variant.to_original(start, start + len(literal))
+                    break
+            if location:
+                break
+
+        # Only try glob-? regex if command contains ? chars
+        # V2-fix: Use finditer (not search) to check ALL matches,
+        # so a leading ???? doesn't shadow a later .en? match
+        if location is None:
+            for variant in variants:
+                if '?' not in variant.text:
+                    continue
+                for gm in re.finditer(entry["glob_q_regex"], variant.text):
+                    # Require at least one non-? character match
+                    # to prevent all-? tokens like ???? from matching
+                    if any(g != '?' for g in gm.groups() if g):
+                        location = variant.to_original(gm.start(1), gm.end(len(literal)))
+                        break
+                if location:
+                    break
+
+        if location is not None:
+            references.append((entry, location[0], location[1]))
+    return references
 
 
 def scan_protected_paths(command: str, config: dict) -> tuple[str, str]:
@@ -700,119 +501,46 @@ def scan_protected_paths(command: str, config: dict) -> tuple[str, str]:
     Returns:
         Tuple of (verdict, reason) where verdict is "deny", "ask", or "allow".
     """
-    scan_config = config.get("bashPathScan", {})
-    if not scan_config.get("enabled", True):
-        return "allow", ""
+    verdict, reason, _offset = _layer1_decision(
+        find_protected_path_references(command, config), config
+    )
+    return verdict, reason
 
-    exact_action = scan_config.get("exactMatchAction", "ask")
-    pattern_action = scan_config.get("patternMatchAction", "ask")
 
-    # Read scanTiers from config; default to ["zeroAccess"] (preserves current behavior)
-    scan_tiers = scan_config.get("scanTiers", ["zeroAccess"])
+def _layer1_decision(
+    references: list[tuple[dict[str, Any], int, int]], config: dict
+) -> tuple[str, str, int]:
+    """Turn find_protected_path_references() output into a Layer 1 verdict.
 
-    # Map tier names to config keys
-    tier_to_config_key = {
-        "zeroAccess": "zeroAccessPaths",
-        "readOnly": "readOnlyPaths",
-        "noDelete": "noDeletePaths",
-    }
+    Args:
+        references: (entry, start, end) per referenced table entry.
+        config: Guardian configuration dict.
 
-    # Collect all path patterns from configured tiers
-    all_scan_paths: list[str] = []
-    for tier in scan_tiers:
-        config_key = tier_to_config_key.get(tier)
-        if config_key:
-            all_scan_paths.extend(config.get(config_key, []))
-
-    # Build normalized variants of the command to catch evasion attempts.
-    normalized = _decode_ansi_c_strings(command)
-    normalized = _expand_glob_chars(normalized)
-    expanded_orig = _expand_glob_chars(command)
-
-    # Collect all text variants to scan (deduplicated)
-    scan_texts = [command]
-    if expanded_orig != command:
-        scan_texts.append(expanded_orig)
-    if normalized not in scan_texts:
-        scan_texts.append(normalized)
+    Returns:
+        (verdict, reason, offset): verdict is "deny", "ask", or "allow";
+        offset is where the reference named in reason starts (-1 if none).
+    """
+    scan_config = config.get("bashPathScan", {})
+    exact_action = scan_config.get("exactMatchAction", "ask")
+    pattern_action = scan_config.get("patternMatchAction", "ask")
 
     strongest_verdict = "allow"
     strongest_reason = ""
+    strongest_offset = -1
+    for entry, start, _end in references:
+        action = exact_action if entry["exact"] else pattern_action
+        reason = f"Protected path reference detected: {entry['literal']}"
 
-    for pattern in all_scan_paths:
-        # Skip directory patterns -- too noisy for raw string scan
-        if "**" in pattern or pattern.endswith("/"):
-            continue
+        if action == "deny":
+            strongest_verdict = "deny"
+            strongest_reason = reason
+            strongest_offset = start
+        elif action == "ask" and strongest_verdict != "deny":
+            strongest_verdict = "ask"
+            strongest_reason = reason
+            strongest_offset = start
 
-        is_exact = "*" not in pattern and "?" not in pattern
-        literals = glob_to_literals(pattern)
-
-        for literal in literals:
-            # I-4 fix: Include / in word-boundary character set
-            # Gemini review fix: Include {, }, , for brace expansion
-            # For exact matches: strict word boundaries on both sides
-            # For prefix patterns (e.g. ".env." from ".env.*"): strict before, relaxed after
-            # For suffix patterns (e.g. ".pem" from "*.pem"): relaxed before, strict after
-            boundary_before = r"(?:^|[\s;|&<>(\"`'=/,{\[:\]])"
-            boundary_after = r"(?:$|[\s;|&<>)\"`'/,}\[:\]])"
-
-            is_prefix_pattern = pattern.endswith(".*")
-            is_suffix_pattern = pattern.startswith("*.")
-
-            if is_suffix_pattern:
-                # ".pem" can be preceded by any word char (server.pem)
-                regex = re.escape(literal) + boundary_after
-            elif is_prefix_pattern:
-                # ".env." can be followed by any word char (.env.local)
-                regex = boundary_before + re.escape(literal)
-            else:
-                # Exact match: strict boundaries both sides
-                regex = boundary_before + re.escape(literal) + boundary_after
-
-            # Build a glob-?-aware regex: for each char in the literal,
-            # also allow ? as a substitute (catches .en? -> .env evasion).
-            # Uses a capturing group per position to verify post-match that
-            # at least one position matched a concrete character (not all ?).
-            glob_q_parts = []
-            for ch in literal:
-                glob_q_parts.append(f'({re.escape(ch)}|\\?)')
-            glob_q_literal = ''.join(glob_q_parts)
-            if is_suffix_pattern:
-                glob_q_regex = glob_q_literal + boundary_after
-            elif is_prefix_pattern:
-                glob_q_regex = boundary_before + glob_q_literal
-            else:
-                glob_q_regex = boundary_before + glob_q_literal + boundary_after
-
-            # Check all text variants (original + normalized)
-            found = False
-            for scan_text in scan_texts:
-                if re.search(regex, scan_text):
-                    found = True
-                    break
-                # Only try glob-? regex if command contains ? chars
-                # V2-fix: Use finditer (not search) to check ALL matches,
-                # so a leading ???? doesn't shadow a later .en? match
-                if '?' in scan_text:
-                    for gm in re.finditer(glob_q_regex, scan_text):
-                        # Require at least one non-? character match
-                        # to prevent all-? tokens like ???? from matching
-                        if any(g != '?' for g in gm.groups() if g):
-                            found = True
-                            break
-
-            if found:
-                action = exact_action if is_exact else pattern_action
-                reason = f"Protected path reference detected: {literal}"
-
-                if action == "deny":
-                    strongest_verdict = "deny"
-                    strongest_reason = reason
-                elif action == "ask" and strongest_verdict != "deny":
-                    strongest_verdict = "ask"
-                    strongest_reason = reason
-
-    return strongest_verdict, strongest_reason
+    return strongest_verdict, strongest_reason, strongest_offset
 
 
 # ============================================================
@@ -820,35 +548,7 @@ def scan_protected_paths(command: str, config: dict) -> tuple[str, str]:
 # ============================================================
 
 
-def _is_inside_quotes(command: str, pos: int) -> bool:
-    """Check if a position in a command string is inside a quoted region.
-
-    I-5 fix: Used to make redirection extraction quote-aware.
-
-    Args:
-        command: The command string.
-        pos: The character position to check.
-
-    Returns:
-        True if the position is inside single or double quotes.
-    """
-    in_single = False
-    in_double = False
-    i = 0
-    while i < pos:
-        c = command[i]
-        if c == "\\" and not in_single:
-            i += 2  # Skip escaped character
-            continue
-        if c == "'" and not in_double:
-            in_single = not in_single
-        elif c == '"' and not in_single:
-            in_double = not in_double
-        i += 1
-    return in_single or in_double
-
-
-def extract_redirection_targets(command: str, project_dir: Path) -> list[Path]:
+def extract_redirection_targets(command: str | SubCommand, project_dir: Path) -> list[Path]:
     """Extract file paths from shell redirections (>, >>, <).
 
     Handles: echo x > file.txt, echo x >> file.txt, cat < input.txt,
@@ -857,21 +557,17 @@ def extract_redirection_targets(command: str, project_dir: Path) -> list[Path]:
     I-5 fix: Quote-aware -- skips > inside quoted regions.
 
     Args:
-        command: The bash sub-command to parse.
+        command: The bash sub-command to parse (string or SubCommand).
         project_dir: Project directory for resolving relative paths.
 
     Returns:
         List of Path objects found as redirection targets.
     """
     targets: list[Path] = []
-    redir_pattern = r'(?:(?:\d|&)?(?:>\|?|>{2})|<(?!<))\s*([^\s;|&<>]+)'
-
-    for match in re.finditer(redir_pattern, command):
-        # I-5 fix: Skip redirections inside quoted regions
-        if _is_inside_quotes(command, match.start()):
-            continue
 
-        target = match.group(1).strip("'\"")
+    # I-5 fix: SubCommand.redirections excludes redirections inside quotes
+    for redirection in _as_sub_command(command).redirections:
+        target = redirection.target.strip("'\"")
 
         # F6: Skip process substitutions — >(cmd) and <(cmd) are not file paths
         if target.startswith("("):
@@ -895,30 +591,114 @@ def extract_redirection_targets(command: str, project_dir: Path) -> list[Path]:
     return targets
 
 
+# Wildcard arguments are expanded lazily: matches stream from os.scandir()
+# and are classified as they arrive, so `rm *.log` in a directory with
+# hundreds of thousands of entries never materializes the full list.
+# Expansion of one argument stops early once a match in a deny tier is found
+# (the command is denied whatever the other matches are) and gives up with
+# an "ask" once globExpansion.maxEntries entries were scanned or
+# globExpansion.maxMilliseconds passed.
+
+_GLOB_MAGIC_RE = re.compile(r"[*?[]")
+
+
+class _GlobBudgetExceeded(Exception):
+    """Wildcard expansion scanned too many entries or took too long."""
+
+
+def _iter_glob(
+    pattern: str, budget: list[int], deadline: float, dironly: bool = False
+) -> Iterator[str]:
+    """Stream glob.glob(pattern) results (non-recursive, same hidden-file rules).
+
+    Args:
+        pattern: Absolute wildcard pattern.
+        budget: One-element list of directory entries still allowed.
+        deadline: time.monotonic() value after which expansion gives up.
+        dironly: Only yield directories (intermediate components).
+
+    Raises:
+        _GlobBudgetExceeded: If the entry or time budget runs out.
+    """
+    dirname, basename = os.path.split(pattern)
+    if not _GLOB_MAGIC_RE.search(pattern):
+        if basename:
+            if os.path.lexists(pattern):
+                yield pattern
+        elif os.path.isdir(dirname):
+            yield pattern  # Trailing slash: directories only
+        return
+    if dirname != pattern and _GLOB_MAGIC_RE.search(dirname):
+        dirs: Iterator[str] | list[str] = _iter_glob(dirname, budget, deadline, True)
+    else:
+        dirs = [dirname]
+    for directory in dirs:
+        if not _GLOB_MAGIC_RE.search(basename):
+            if (os.path.lexists if basename else os.path.isdir)(os.path.join(directory, basename)):
+                yield os.path.join(directory, basename)
+            continue
+        match = re.compile(fnmatch.translate(os.path.normcase(basename))).match
+        hidden_ok = basename.startswith(".")
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    budget[0] -= 1
+                    if budget[0] < 0 or time.monotonic() > deadline:
+                        raise _GlobBudgetExceeded()
+                    name = entry.name
+                    if (name.startswith(".") and not hidden_ok) or not match(
+                        os.path.normcase(name)
+                    ):
+                        continue
+                    try:
+                        if dironly and not entry.is_dir():
+                            continue
+                    except OSError:
+                        continue
+                    yield os.path.join(directory, name)
+        except OSError:
+            continue
+
+
 def extract_paths(
-    command: str, project_dir: Path, allow_nonexistent: bool = False
+    command: str | SubCommand,
+    project_dir: Path,
+    allow_nonexistent: bool = False,
+    deny_tiers: frozenset[str] = frozenset(),
+    verdicts: list[tuple[str, str]] | None = None,
 ) -> list[Path]:
     """Extract file paths from command arguments.
 
     Args:
-        command: The bash command to parse.
+        command: The bash command to parse (string or SubCommand).
         project_dir: Project directory for resolving relative paths.
         allow_nonexistent: If True, include paths that don't exist on disk
             (for write/delete context where the target may not exist yet).
+        deny_tiers: Path tiers that deny this command; wildcard expansion
+            stops at the first match in one of them.
+        verdicts: Receives ("ask", reason) when a wildcard exceeds the
+            globExpansion budget (its matches so far are still returned).
 
     Returns:
         List of Path objects found in the command.
     """
-    try:
-        parts = shlex.split(command, posix=(sys.platform != "win32"))
-    except ValueError as e:
-        log_guardian("DEBUG", f"shlex.split failed ({e}), falling back to simple split")
-        parts = command.split()
-
-    # COMPAT-03 FIX: shlex.split(posix=False) keeps surrounding quotes on Windows.
+    sub = _as_sub_command(command)
     if sys.platform == "win32":
+        try:
+            parts = shlex.split(sub.text, posix=False)
+        except ValueError as e:
+            log_guardian("DEBUG", f"shlex.split failed ({e}), falling back to simple split")
+            parts = sub.text.split()
+        # COMPAT-03 FIX: shlex.split(posix=False) keeps surrounding quotes on Windows.
         parts = [p.strip("'\"") for p in parts]
         parts = [p for p in parts if p]
+    else:
+        # SubCommand.argv follows shlex.split() (POSIX) rules
+        parts = sub.argv
+        if sub.word_error:
+            log_guardian(
+                "DEBUG", f"shlex.split failed ({sub.word_error}), falling back to simple split"
+            )
 
     if not parts:
         return []
@@ -935,7 +715,7 @@ def extract_paths(
                         suffix_path = Path(flag_suffix)
                         if not suffix_path.is_absolute():
                             suffix_path = project_dir / suffix_path
-                        if suffix_path.exists() and is_within_project(suffix_path, project_dir):
+                        if fs_exists(suffix_path) and is_within_project(suffix_path, project_dir):
                             paths.append(suffix_path)
                         elif allow_nonexistent and _is_within_project_or_would_be(suffix_path, project_dir):
                             paths.append(suffix_path)
@@ -968,15 +748,28 @@ def extract_paths(
 
             # Expand wildcards (including character classes like [v])
             if "*" in str(path) or "?" in str(path) or "[" in str(path):
-                expanded = glob.glob(str(path))
-                for exp in expanded:
-                    p = Path(exp)
-                    if p.exists() and is_within_project(p, project_dir):
-                        paths.append(p)
-                    elif match_allowed_external_path(str(p)):
-                        paths.append(p)
+                expansion = get_glob_expansion_config()
+                budget = [expansion["maxEntries"]]
+                deadline = time.monotonic() + expansion["maxMilliseconds"] / 1000
+                try:
+                    for exp in _iter_glob(str(path), budget, deadline):
+                        p = Path(exp)
+                        if fs_exists(p) and is_within_project(p, project_dir):
+                            paths.append(p)
+                        elif match_allowed_external_path(str(p)):
+                            paths.append(p)
+                        else:
+                            continue
+                        if deny_tiers and classify_path(exp, tuple(deny_tiers)):
+                            break  # Denied whatever the remaining matches are
+                except _GlobBudgetExceeded:
+                    log_guardian("SCAN", f"Wildcard expansion budget exceeded: {part}")
+                    if verdicts is not None:
+                        verdicts.append(
+                            ("ask", f"Too many entries to check for wildcard: {part}")
+                        )
             else:
-                if path.exists() and is_within_project(path, project_dir):
+                if fs_exists(path) and is_within_project(path, project_dir):
                     paths.append(path)
                 elif allow_nonexistent and _is_within_project_or_would_be(path, project_dir):
                     paths.append(path)
@@ -1003,8 +796,8 @@ def _is_within_project_or_would_be(path: Path, project_dir: Path) -> bool:
     """
     try:
         # F7: Use resolve() to canonicalize, preventing ../traversal attacks
-        resolved = path.resolve(strict=False)
-        resolved_project = project_dir.resolve(strict=False)
+        resolved = fs_resolve(path)
+        resolved_project = fs_resolve(project_dir)
         resolved.relative_to(resolved_project)
         return True
     except (OSError, ValueError):
@@ -1016,7 +809,7 @@ def _is_within_project_or_would_be(path: Path, project_dir: Path) -> bool:
 # ============================================================
 
 
-def is_delete_command(command: str) -> bool:
+def is_delete_command(command: str | SubCommand) -> bool:
     """Check if command is a delete operation.
 
     Detects shell delete commands and interpreter-mediated deletions.
@@ -1027,69 +820,335 @@ def is_delete_command(command: str) -> bool:
     Returns:
         True if command appears to be a delete operation.
     """
-    delete_patterns = [
-        # Shell delete commands
-        # V1-fix: Added ({ to alternation so commands inside { } and ( ) are detected
-        r"(?:^|[;&|({]\s*)rm\s+",
-        r"(?:^|[;&|({]\s*)del\s+",
-        r"(?:^|[;&|({]\s*)rmdir\s+",
-        r"(?:^|[;&|({]\s*)Remove-Item\s+",
-        r"(?:^|[;&|({]\s*)ri\s+",
-        # P1-1: git rm (deletes files from working tree and index)
-        # F8: Allow optional git global flags before subcommand (e.g., git -C dir rm)
-        r"(?:^|[;&|({]\s*)git\s+(?:-[A-Za-z]\s+\S+\s+|--[a-z][-a-z]*(?:=\S+|\s+(?!rm\b)\S+)?\s+)*rm\s+",
-        # mv to /dev/null (effective deletion)
-        r"\bmv\s+\S+\s+/dev/null\b",
-        # P1-2: Standalone redirect truncation (> file, : > file, >| file)
-        # Destroys content by truncating to zero bytes
-        r"^\s*(?::)?\s*>(?!>)\|?\s*\S+",
-        # Interpreter-mediated deletions (python/node/perl/ruby)
-        # F4: Split pathlib.Path pattern to avoid ReDoS (O(N^2) backtracking)
-        r"(?:py|python[23]?|python\d[\d.]*)\s[^|&\n]*(?:os\.remove|os\.unlink|shutil\.rmtree|shutil\.move|os\.rmdir)",
-        r"(?:py|python[23]?|python\d[\d.]*)\s[^|&\n]*pathlib\.Path\([^)]*\)\.unlink",
-        r"(?:node|deno|bun)\s[^|&\n]*(?:unlinkSync|rmSync|rmdirSync|fs\.unlink|fs\.rm\b|promises\.unlink)",
-        r"(?:perl|ruby)\s[^|&\n]*(?:\bunlink\b|File\.delete|FileUtils\.rm)",
-    ]
-    return any(re.search(p, command, re.IGNORECASE) for p in delete_patterns)
-
-
-def is_write_command(command: str) -> bool:
+    return classify_effect(command).is_delete
+
+
+# Delete and write detection rules. Both sets are evaluated together by
+# classify_effect(), each rule compiled only when its literals appear; the result
+# is cached on the SubCommand so each sub-command is classified once.
+_DELETE_RULES = [
+    # Shell delete commands
+    # V1-fix: Added ({ to alternation so commands inside { } and ( ) are detected
+    r"(?:^|[;&|({]\s*)rm\s+",
+    r"(?:^|[;&|({]\s*)del\s+",
+    r"(?:^|[;&|({]\s*)rmdir\s+",
+    r"(?:^|[;&|({]\s*)Remove-Item\s+",
+    r"(?:^|[;&|({]\s*)ri\s+",
+    # P1-1: git rm (deletes files from working tree and index)
+    # F8: Allow optional git global flags before subcommand (e.g., git -C dir rm)
+    r"(?:^|[;&|({]\s*)git\s+(?:-[A-Za-z]\s+\S+\s+|--[a-z][-a-z]*(?:=\S+|\s+(?!rm\b)\S+)?\s+)*rm\s+",
+    # mv to /dev/null (effective deletion)
+    r"\bmv\s+\S+\s+/dev/null\b",
+    # P1-2: Standalone redirect truncation (> file, : > file, >| file)
+    # Destroys content by truncating to zero bytes
+    r"^\s*(?::)?\s*>(?!>)\|?\s*\S+",
+    # Interpreter-mediated deletions (python/node/perl/ruby)
+    # F4: Split pathlib.Path pattern to avoid ReDoS (O(N^2) backtracking)
+    r"(?:py|python[23]?|python\d[\d.]*)\s[^|&\n]*(?:os\.remove|os\.unlink|shutil\.rmtree|shutil\.move|os\.rmdir)",
+    r"(?:py|python[23]?|python\d[\d.]*)\s[^|&\n]*pathlib\.Path\([^)]*\)\.unlink",
+    r"(?:node|deno|bun)\s[^|&\n]*(?:unlinkSync|rmSync|rmdirSync|fs\.unlink|fs\.rm\b|promises\.unlink)",
+    r"(?:perl|ruby)\s[^|&\n]*(?:\bunlink\b|File\.delete|FileUtils\.rm)",
+]
+
+# Critical fix I-2: Does NOT include 'install' to avoid breaking
+# npm/pip/cargo/brew/apt commands.
+_WRITE_RULES = [
+    (r">\s*['\"]?[^|&;>]+", True),   # Redirection -- needs quote check
+    (r"\btee\s+", False),
+    (r"\bmv\s+", False),
+    (r"(?<![A-Za-z-])ln\s+", False),
+    (r"\bsed\s+.*-[^-]*i", False),
+    (r"\bcp\s+", False),
+    (r"\bdd\s+", False),
+    (r"\bpatch\b", False),
+    (r"\brsync\s+", False),
+    (r":\s*>", True),                  # Truncation -- needs quote check
+    (r"\bchmod\s+", False),
+    (r"\btouch\s+", False),
+    (r"\bchown\s+", False),
+    (r"\bchgrp\s+", False),
+]
+
+
+def is_write_command(command: str | SubCommand) -> bool:
     """Check if command is a write/modify operation.
 
     Enhanced with additional write vectors: sed -i, cp, dd, rsync,
     patch, and colon truncation (: >).
 
-    Critical fix I-2: Does NOT include 'install' to avoid breaking
-    npm/pip/cargo/brew/apt commands.
-
     Args:
         command: The bash command (or sub-command) to check.
 
     Returns:
         True if command appears to write or modify files.
     """
-    write_patterns = [
-        (r">\s*['\"]?[^|&;>]+", True),   # Redirection -- needs quote check
-        (r"\btee\s+", False),
-        (r"\bmv\s+", False),
-        (r"(?<![A-Za-z-])ln\s+", False),
-        (r"\bsed\s+.*-[^-]*i", False),
-        (r"\bcp\s+", False),
-        (r"\bdd\s+", False),
-        (r"\bpatch\b", False),
-        (r"\brsync\s+", False),
-        (r":\s*>", True),                  # Truncation -- needs quote check
-        (r"\bchmod\s+", False),
-        (r"\btouch\s+", False),
-        (r"\bchown\s+", False),
-        (r"\bchgrp\s+", False),
-    ]
-    for pattern, needs_quote_check in write_patterns:
-        for match in re.finditer(pattern, command, re.IGNORECASE):
-            if needs_quote_check and _is_inside_quotes(command, match.start()):
-                continue  # Skip this occurrence: > is inside a quoted string
-            return True
-    return False
+    return classify_effect(command).is_write
+
+
+class CommandEffect:
+    """What a sub-command does to files, as detected by Layer 4.
+
+    Attributes:
+        is_delete: A delete rule matched.
+        is_write: A write rule matched (quote-checked rules only count
+            occurrences outside quotes).
+        matched_rule: First matching rule pattern (delete rules before
+            write rules), or None.
+    """
+
+    __slots__ = ("is_delete", "is_write", "matched_rule")
+
+    def __init__(self, is_delete: bool, is_write: bool, matched_rule: str | None):
+        self.is_delete = is_delete
+        self.is_write = is_write
+        self.matched_rule = matched_rule
+
+    def __repr__(self) -> str:
+        return f"CommandEffect({self.is_delete}, {self.is_write}, {self.matched_rule!r})"
+
+
+_EffectRule = tuple[str, list[str], bool, bool]
+"""(pattern, required literals, is_delete, needs_quote_check)"""
+
+_effect_rules: list[_EffectRule] | None = None
+
+
+def _get_effect_rules() -> list[_EffectRule]:
+    global _effect_rules
+    if _effect_rules is None:
+        rules = [(p, True, False) for p in _DELETE_RULES]
+        rules += [(p, False, q) for p, q in _WRITE_RULES]
+        _effect_rules = [
+            (p, extract_required_literals(p), deletes, q) for p, deletes, q in rules
+        ]
+    return _effect_rules
+
+
+def classify_effect(command: str | SubCommand) -> CommandEffect:
+    """Classify a sub-command as delete and/or write in one pass.
+
+    Each rule only runs (and is only compiled, on first use) if the
+    lowercased command contains one of its required literals, rules of a
+    category stop at the first hit, and a quote-checked write rule only
+    counts occurrences outside quotes.
+
+    Args:
+        command: The bash command (or sub-command) to check.
+
+    Returns:
+        CommandEffect (cached on SubCommand arguments).
+    """
+    if isinstance(command, SubCommand) and command.effect is not None:
+        return command.effect
+    sub = _as_sub_command(command)
+    text = sub.text
+    # Literal prefilter is only exact for ASCII (IGNORECASE folds e.g. U+212A)
+    lowered = text.lower() if text.isascii() else None
+    is_delete = is_write = False
+    matched_rule = None
+    for pattern, literals, deletes, needs_quote_check in _get_effect_rules():
+        if is_delete if deletes else is_write:
+            continue
+        if lowered is not None and literals and not any(lit in lowered for lit in literals):
+            continue
+        compiled = re.compile(pattern, re.IGNORECASE)  # re's cache: compiled once
+        if needs_quote_check:
+            # Skip occurrences inside a quoted string (e.g. echo "a > b")
+            found = any(not sub.is_quoted(m.start()) for m in compiled.finditer(text))
+        else:
+            found = compiled.search(text) is not None
+        if not found:
+            continue
+        if deletes:
+            is_delete = True
+        else:
+            is_write = True
+        if matched_rule is None:
+            matched_rule = pattern
+        if is_delete and is_write:
+            break
+    effect = CommandEffect(is_delete, is_write, matched_rule)
+    if isinstance(command, SubCommand):
+        command.effect = effect
+    return effect
+
+
+# Recursive readers: commands that read every file below a directory argument
+# without naming the files. Per command: options that make it recursive,
+# options taking a separate value (skipped when collecting roots), and which
+# positional arguments are roots:
+#   "pattern": the first is the search pattern unless -e/-f gives one
+#   "archive": the first is the archive being written
+#   "sources": all but the last (the destination)
+# rg/ag are not listed: they skip hidden and gitignored files by default.
+_RECURSIVE_READERS: dict[str, tuple[tuple[str, ...], frozenset[str], str]] = {
+    "grep": (
+        ("-r", "-R", "--recursive", "--dereference-recursive", "-d=recurse",
+         "--directories=recurse"),
+        frozenset({"-e", "-f", "-m", "-A", "-B", "-C", "-d", "-D", "--regexp", "--file"}),
+        "pattern",
+    ),
+    "tar": (
+        ("-c", "--create"),
+        frozenset({"-f", "-C", "-T", "-X", "-b", "-g", "-K", "-N", "-V", "-L", "-H",
+                   "--file", "--directory", "--files-from", "--exclude-from"}),
+        "all",
+    ),
+    "zip": (
+        ("-r", "-R", "--recurse-paths"),
+        frozenset({"-b", "-n", "-t", "-O", "-P", "-Z"}),
+        "archive",
+    ),
+    "cp": (
+        ("-r", "-R", "-a", "--recursive", "--archive"),
+        frozenset({"-t", "-S", "--target-directory", "--suffix"}),
+        "sources",
+    ),
+    "rsync": (
+        ("-r", "-a", "--recursive", "--archive"),
+        frozenset({"-e", "-f", "-T", "-B", "--rsh", "--filter", "--exclude", "--include"}),
+        "sources",
+    ),
+    "scp": (
+        ("-r",),
+        frozenset({"-P", "-i", "-o", "-F", "-l", "-c", "-S", "-J"}),
+        "sources",
+    ),
+}
+_RECURSIVE_READERS["egrep"] = _RECURSIVE_READERS["fgrep"] = _RECURSIVE_READERS["grep"]
+
+
+def _split_options(
+    args: list[str], value_options: frozenset[str]
+) -> tuple[list[tuple[str, str | None]], list[str]]:
+    """Split arguments into (option, value) pairs and positional arguments.
+
+    Bundled short options ("-rnA3", "-czf out.tgz") are split into single
+    options; a value option takes the rest of the bundle or the next word.
+    """
+    options: list[tuple[str, str | None]] = []
+    positional: list[str] = []
+    i = 0
+    while i < len(args):
+        word = args[i]
+        i += 1
+        if word == "--":
+            positional.extend(args[i:])
+            break
+        if not word.startswith("-") or word == "-":
+            positional.append(word)
+        elif word.startswith("--"):
+            name, eq, value = word.partition("=")
+            if not eq and name in value_options and i < len(args):
+                value = args[i]
+                i += 1
+            options.append((name, value if (eq or name in value_options) else None))
+        else:
+            for j, char in enumerate(word[1:], 2):
+                option = "-" + char
+                if option not in value_options:
+                    options.append((option, None))
+                    continue
+                if j < len(word):
+                    options.append((option, word[j:]))
+                elif i < len(args):
+                    options.append((option, args[i]))
+                    i += 1
+                break
+    return options, positional
+
+
+def recursive_read_roots(command: str | SubCommand) -> list[str]:
+    """Directory arguments a recursive reader would traverse.
+
+    Covers grep -r, tar c, zip -r, cp -r/-a, rsync -r/-a and scp -r; remote
+    rsync/scp sources ("host:path") are left out.
+
+    Args:
+        command: The bash command (or sub-command) to check.
+
+    Returns:
+        Root arguments as written ("." when grep -r names none), or [] if
+        the command is not a recursive read.
+    """
+    argv = resolve_command_argv(_as_sub_command(command).argv)
+    spec = _RECURSIVE_READERS.get(argv[0]) if argv else None
+    if spec is None:
+        return []
+    flags, value_options, roots_from = spec
+    args = argv[1:]
+    if argv[0] == "tar" and args and not args[0].startswith("-"):
+        args = ["-" + args[0]] + args[1:]  # Old-style bundle: tar czf out.tgz .
+    options, positional = _split_options(args, value_options)
+    names = {name for name, _ in options}
+    given = names | {f"{name}={value}" for name, value in options if value is not None}
+    if not given.intersection(flags):
+        return []
+    if roots_from == "pattern":
+        if not names.intersection({"-e", "-f", "--regexp", "--file"}):
+            positional = positional[1:]
+        return positional or ["."]
+    if roots_from == "archive":
+        return positional[1:]
+    if roots_from == "sources":
+        if not names.intersection({"-t", "--target-directory"}):
+            positional = positional[:-1]
+        return [p for p in positional if not re.match(r"^(?:[^/]*:|rsync://)", p)]
+    base = next((v for n, v in reversed(options) if n in ("-C", "--directory") and v), "")
+    return [os.path.join(base, p) for p in positional if p != "-"]
+
+
+def _traversal_roots(roots: list[str], project_dir: Path) -> list[Path]:
+    """Resolve recursive_read_roots() words to existing directories."""
+    paths: list[Path] = []
+    for root in roots:
+        if not _is_path_candidate(root):
+            continue
+        path = Path(os.path.expandvars(root))
+        if root.startswith("~"):
+            try:
+                path = path.expanduser()
+            except (RuntimeError, KeyError):
+                pass
+        if not path.is_absolute():
+            path = project_dir / path
+        if "*" in str(path) or "?" in str(path) or "[" in str(path):
+            paths.extend(Path(p) for p in sorted(glob.glob(str(path))))
+        else:
+            paths.append(path)
+    return [p for p in paths if os.path.isdir(p)]
+
+
+def _recursive_read_verdict(root: Path) -> tuple[str, str] | None:
+    """Ask before a recursive read of a directory that holds zeroAccess files.
+
+    Answered from the protected-file manifest (opt-in); the traversal root
+    is followed if it is a symlink, as grep -r and tar do for command-line
+    arguments. Unlike _directory_delete_verdict(), the manifest refresh
+    stays within the globExpansion budget: recursive reads are frequent,
+    so a root whose records are missing or stale beyond the budget asks
+    instead of being walked at hook time.
+
+    Args:
+        root: Traversal root.
+
+    Returns:
+        ("ask", reason), or None if the root holds no zeroAccess entries, is
+        not a project directory, or the manifest is disabled.
+    """
+    try:
+        counts = protected_contents(root, follow_symlinks=True, bounded=True)
+    except Exception as e:
+        log_guardian("WARN", f"Protected manifest lookup failed for {root.name}: {e}")
+        return None
+    if counts and counts.get("incomplete") and not counts["zeroAccess"]:
+        log_guardian("SCAN", f"Protected manifest refresh budget exceeded: {root.name or root}")
+        return ("ask", f"Too many entries to check for protected files: {root.name or root}")
+    if not counts or not counts["zeroAccess"]:
+        return None
+    summary = f"{root.name or root} ({counts['zeroAccess']} zeroAccess)"
+    log_guardian("SCAN", f"Recursive read covers protected entries: {summary}")
+    return ("ask", f"Recursive read would include protected files: {summary}")
 
 
 def is_within_project(path: Path, project_dir: Path) -> bool:
@@ -1103,12 +1162,43 @@ def is_within_project(path: Path, project_dir: Path) -> bool:
         True if path is within project_dir.
     """
     try:
-        path.resolve().relative_to(project_dir.resolve())
+        fs_resolve(path).relative_to(fs_resolve(project_dir))
         return True
     except ValueError:
         return False
 
 
+def _directory_delete_verdict(path: Path) -> tuple[str, str] | None:
+    """Ask before deleting a directory that contains protected entries.
+
+    Answered from the protected-file manifest (opt-in), so the directory is
+    not walked at hook time once the manifest is built.
+
+    Args:
+        path: Delete target.
+
+    Returns:
+        ("ask", reason), or None if the target is not a directory, holds no
+        zeroAccess/noDelete entries, or the manifest is disabled.
+    """
+    try:
+        counts = protected_contents(path)
+    except Exception as e:
+        log_guardian("WARN", f"Protected manifest lookup failed for {path.name}: {e}")
+        return None  # The per-path checks above still apply
+    if not counts:
+        return None
+    if counts["unreadable"]:
+        log_guardian("SCAN", f"Directory delete with unreadable subdirectories: {path.name}")
+        return ("ask", f"Cannot list everything under {path.name} to check for protected files")
+    found = [f"{counts[tier]} {tier}" for tier in ("zeroAccess", "noDelete") if counts[tier]]
+    if not found:
+        return None
+    summary = f"{path.name} ({', '.join(found)})"
+    log_guardian("SCAN", f"Directory delete contains protected entries: {summary}")
+    return ("ask", f"Directory contains protected files: {summary}")
+
+
 def _is_path_candidate(s: str) -> bool:
     """Check if a string is a plausible filesystem path.
 
@@ -1164,23 +1254,294 @@ def generate_archive_title(files: list[Path]) -> str:
         return f"{sanitized}_and_{len(files) - 1}_more"
 
 
+def regenerable_artifacts(paths: list[Path], project_dir: Path) -> list[Path]:
+    """Delete targets that are rebuildable git-ignored artifacts.
+
+    A path qualifies when one of its components (relative to the project)
+    matches an archivePolicy.regenerableArtifacts name (fnmatch, e.g.
+    "node_modules", "*.egg-info") AND git reports it as ignored. Such
+    deletes skip the archive: sizing and copying node_modules or .venv
+    costs seconds and usually hits the archive limits anyway.
+
+    Args:
+        paths: Existing delete targets.
+        project_dir: Project root.
+
+    Returns:
+        The qualifying paths, in input order.
+    """
+    names = get_archive_policy_config().get("regenerableArtifacts", [])
+    if not names or not isinstance(names, list):
+        return []
+    names = [n for n in names if isinstance(n, str) and n]
+    candidates = []
+    for path in paths:
+        try:
+            parts = path.relative_to(project_dir).parts
+        except ValueError:
+            continue
+        if any(fnmatch.fnmatchcase(part, name) for part in parts for name in names):
+            candidates.append(path)
+    if not candidates:
+        return []
+    ignored = git_ignored_paths([str(p) for p in candidates])
+    return [p for p in candidates if str(p) in ignored]
+
+
 # Archive constraints
 ARCHIVE_MAX_FILE_SIZE_MB = 100  # Skip files larger than this
 ARCHIVE_MAX_TOTAL_SIZE_MB = 500  # Stop archiving if total exceeds this
 ARCHIVE_MAX_FILES = 50  # Maximum number of files to archive
+ARCHIVE_MAX_TREE_ENTRIES = 10000  # Skip directories holding more entries than this
+
+
+class TreeScan:
+    """Listing of a directory to archive, from one bounded os.scandir walk.
+
+    Attributes:
+        dirs: Subdirectories (relative paths, parents before children).
+        files: (relative path, size) of regular files.
+        links: Symbolic links (relative paths), copied as links.
+        size: Total bytes of the regular files seen.
+        entries: Directory entries seen.
+        complete: False if the walk stopped at a limit (listing partial).
+    """
+
+    __slots__ = ("dirs", "files", "links", "size", "entries", "complete")
+
+    def __init__(self):
+        self.dirs: list[str] = []
+        self.files: list[tuple[str, int]] = []
+        self.links: list[str] = []
+        self.size = 0
+        self.entries = 0
+        self.complete = True
+
+
+def scan_tree(root: Path, max_bytes: int, max_entries: int) -> TreeScan:
+    """Size a directory with os.scandir, stopping at the first exceeded limit.
+
+    Symlinks below root are recorded but never followed or sized; sockets,
+    FIFOs and devices are skipped. The listing is reused by the copy, so
+    an archived directory is traversed once.
+
+    Args:
+        root: Directory to walk.
+        max_bytes: Stop once the regular files total more than this.
+        max_entries: Stop once more than this many entries are seen.
+
+    Returns:
+        The listing; check `complete` before using it for a copy.
+    """
+    scan = TreeScan()
+    stack = [""]
+    while stack:
+        rel_dir = stack.pop()
+        with os.scandir(os.path.join(root, rel_dir)) as it:
+            for entry in it:
+                scan.entries += 1
+                if scan.entries > max_entries:
+                    scan.complete = False
+                    return scan
+                rel = os.path.join(rel_dir, entry.name)
+                if entry.is_symlink():
+                    scan.links.append(rel)
+                elif entry.is_dir(follow_symlinks=False):
+                    scan.dirs.append(rel)
+                    stack.append(rel)
+                elif entry.is_file(follow_symlinks=False):
+                    size = entry.stat(follow_symlinks=False).st_size
+                    scan.files.append((rel, size))
+                    scan.size += size
+                    if scan.size > max_bytes:
+                        scan.complete = False
+                        return scan
+    return scan
+
+
+def scan_units(root: Path, units: list[Path], max_bytes: int, max_entries: int) -> TreeScan:
+    """Listing of only some paths below a directory, for a filtered copy.
+
+    Used for a partly tracked directory: units are its untracked files
+    and directories (git_untracked_units()), the parent directories
+    between root and each unit are listed too, and directory units are
+    walked with scan_tree(). The limits apply to all units together.
+
+    Args:
+        root: Directory the units are below.
+        units: Paths below root to include.
+        max_bytes: Stop once the regular files total more than this.
+        max_entries: Stop once more than this many entries are seen.
+
+    Returns:
+        The listing, relative to root; check `complete` as for scan_tree().
+    """
+    scan = TreeScan()
+    listed_dirs: set[str] = set()
+
+    def add_dir(rel_dir: str) -> None:
+        if rel_dir and rel_dir not in listed_dirs:
+            add_dir(os.path.dirname(rel_dir))
+            listed_dirs.add(rel_dir)
+            scan.dirs.append(rel_dir)
+
+    for unit in units:
+        rel = os.path.relpath(unit, root)
+        add_dir(os.path.dirname(rel))
+        scan.entries += 1
+        if os.path.islink(unit):
+            scan.links.append(rel)
+        elif os.path.isdir(unit):
+            add_dir(rel)
+            sub = scan_tree(unit, max_bytes - scan.size, max_entries - scan.entries)
+            scan.dirs += [os.path.join(rel, d) for d in sub.dirs]
+            scan.files += [(os.path.join(rel, f), size) for f, size in sub.files]
+            scan.links += [os.path.join(rel, link) for link in sub.links]
+            scan.size += sub.size
+            scan.entries += sub.entries
+            scan.complete = sub.complete
+        elif os.path.isfile(unit):
+            size = os.lstat(unit).st_size
+            scan.files.append((rel, size))
+            scan.size += size
+        if scan.entries > max_entries or scan.size > max_bytes:
+            scan.complete = False
+        if not scan.complete:
+            return scan
+    return scan
+
+
+def _copy_file(src: Path, dst: Path) -> None:
+    """Copy one regular file with its metadata (like shutil.copy2).
+
+    Uses os.copy_file_range where available, which lets the kernel copy
+    in place (reflinks, server-side NFS/SMB copies); otherwise, or if the
+    filesystem refuses it, falls back to shutil.copy2 (sendfile on Linux).
+    """
+    if hasattr(os, "copy_file_range"):
+        try:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                remaining = os.fstat(fsrc.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+            if remaining <= 0:
+                shutil.copystat(src, dst, follow_symlinks=False)
+                return
+        except OSError as e:
+            if e.errno not in _COPY_FILE_RANGE_UNSUPPORTED:
+                raise
+    shutil.copy2(src, dst, follow_symlinks=False)
+
+
+_COPY_FILE_RANGE_UNSUPPORTED = frozenset(
+    getattr(errno, name)
+    for name in ("EXDEV", "ENOSYS", "EINVAL", "EOPNOTSUPP", "ENOTSUP", "EBADF", "EPERM")
+    if hasattr(errno, name)
+)
+
+ARCHIVE_COPY_WORKERS = 8  # Threads copying file contents into the archive
+
+
+def _queue_tree_copy(
+    pool: "ThreadPoolExecutor", root: Path, target: Path, scan: TreeScan
+) -> Callable[[], None]:
+    """Start copying a directory from its scan_tree() listing.
+
+    Same result as shutil.copytree(root, target, symlinks=True,
+    dirs_exist_ok=True) without walking the tree again: directories and
+    links (F5: recreated as links) are made here, file contents are
+    copied by the pool.
+
+    Returns:
+        A function that waits for the copy, applies directory metadata and
+        raises shutil.Error with all failures, like copytree.
+    """
+    errors = []
+    target.mkdir(parents=True, exist_ok=True)
+    for rel in scan.dirs:
+        os.makedirs(target / rel, exist_ok=True)
+    for rel in scan.links:
+        try:
+            os.symlink(os.readlink(root / rel), target / rel)
+        except OSError as e:
+            errors.append((str(root / rel), str(target / rel), str(e)))
+    copies = [(rel, pool.submit(_copy_file, root / rel, target / rel)) for rel, _ in scan.files]
+
+    def finish() -> None:
+        for rel, future in copies:
+            try:
+                future.result()
+            except OSError as e:
+                errors.append((str(root / rel), str(target / rel), str(e)))
+        # After the contents, so writing files does not reset directory mtimes
+        for rel in [*reversed(scan.dirs), ""]:
+            try:
+                shutil.copystat(root / rel, target / rel)
+            except OSError as e:
+                errors.append((str(root / rel), str(target / rel), str(e)))
+        if errors:
+            raise shutil.Error(errors)
+
+    return finish
+
+
+def _log_archive_error(file_path: Path, e: Exception) -> None:
+    """Log why one archive item could not be copied."""
+    if isinstance(e, PermissionError):
+        log_guardian(
+            "WARN",
+            f"Archive PERMISSION DENIED for {file_path.name}: {e}\n"
+            "  Check file permissions or run with elevated privileges.",
+        )
+    elif isinstance(e, OSError):
+        is_disk_full = e.errno == 28 or getattr(e, "winerror", None) == 112
+        error_type = "DISK FULL" if is_disk_full else "FILESYSTEM ERROR"
+        log_guardian(
+            "WARN",
+            f"Archive {error_type} for {file_path.name}: {e}\n  errno={e.errno}",
+        )
+    else:
+        log_guardian(
+            "WARN",
+            f"Archive UNEXPECTED ERROR for {file_path.name}: {type(e).__name__}: {e}",
+        )
 
 
 def archive_files(
-    files: list[Path], project_dir: Path
+    files: list[Path],
+    project_dir: Path,
+    parts: dict[Path, list[Path]] | None = None,
+    skipped: list[tuple[Path, str]] | None = None,
 ) -> tuple[Path | None, list[tuple[Path, Path]]]:
     """Archive files before deletion.
 
     Applies safety limits:
-    - Max file size: 100MB per file
+    - Max file size: 100MB per file (or per directory)
     - Max total size: 500MB total
-    - Max files: 50 files
+    - Max files: 50 files (delete targets; a partly tracked directory is one)
+    - Max entries: 10000 per directory
+
+    Directories are sized with one bounded scan_tree() walk whose listing
+    is reused for the copy; file contents are copied by a pool of
+    ARCHIVE_COPY_WORKERS threads while later items are still being
+    checked. Timing and throughput are logged per archive.
 
     Files exceeding limits are logged and skipped.
+
+    Args:
+        files: Paths to archive.
+        project_dir: Project root (archive paths mirror it).
+        parts: For directories in files that are only partly untracked, the
+            paths below them to archive (scan_units()); the rest is skipped.
+        skipped: If given, receives (path, reason) for every item that was
+            not archived, so the caller can name them in its prompt.
+
+    Returns:
+        (archive directory, [(original, archived path)]); a partly archived
+        directory contributes one pair per archived part.
     """
     if not files:
         return None, []
@@ -1193,93 +1554,132 @@ def archive_files(
     archived = []
     total_size = 0
     skipped_count = 0
-    start_time = datetime.now()
-
-    for file_path in files:
-        if len(archived) >= ARCHIVE_MAX_FILES:
-            log_guardian(
-                "WARN", f"Archive file limit reached ({ARCHIVE_MAX_FILES}), skipping rest"
-            )
-            skipped_count += len(files) - len(archived)
-            break
+    start_time = time.monotonic()
+    parts = parts or {}
+    if skipped is None:
+        skipped = []
+    # (source, [(original, archive path)], bytes, wait-for-copy) per item being copied
+    pending: list[tuple[Path, list[tuple[Path, Path]], int, Callable[[], Any]]] = []
+
+    # Imported here: costs ~10ms and almost no command archives anything
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=ARCHIVE_COPY_WORKERS) as pool:
+        for index, file_path in enumerate(files):
+            if len(pending) >= ARCHIVE_MAX_FILES:
+                log_guardian(
+                    "WARN", f"Archive file limit reached ({ARCHIVE_MAX_FILES}), skipping rest"
+                )
+                skipped_count += len(files) - len(pending)
+                skipped += [(p, f"over {ARCHIVE_MAX_FILES} files") for p in files[index:]]
+                break
 
-        try:
-            file_size = 0
-            if file_path.is_file():
-                file_size = file_path.stat().st_size
-            elif file_path.is_dir():
-                file_size = sum(f.stat().st_size for f in file_path.rglob("*") if f.is_file())
+            try:
+                file_size = 0
+                scan = None
+                if file_path.is_file():
+                    file_size = file_path.stat().st_size
+                elif file_path.is_dir():
+                    # Bounded walk: stops as soon as the directory is over a limit
+                    max_bytes = ARCHIVE_MAX_FILE_SIZE_MB * 1024 * 1024
+                    if file_path in parts:
+                        scan = scan_units(
+                            file_path, parts[file_path], max_bytes, ARCHIVE_MAX_TREE_ENTRIES
+                        )
+                    else:
+                        scan = scan_tree(file_path, max_bytes, ARCHIVE_MAX_TREE_ENTRIES)
+                    if scan.entries > ARCHIVE_MAX_TREE_ENTRIES:
+                        log_guardian(
+                            "WARN",
+                            f"Skipping large directory {file_path.name} "
+                            f"(more than {ARCHIVE_MAX_TREE_ENTRIES} entries)",
+                        )
+                        skipped_count += 1
+                        skipped.append(
+                            (file_path, f"more than {ARCHIVE_MAX_TREE_ENTRIES} entries")
+                        )
+                        continue
+                    file_size = scan.size
 
-            file_size_mb = file_size / (1024 * 1024)
+                file_size_mb = file_size / (1024 * 1024)
 
-            if file_size_mb > ARCHIVE_MAX_FILE_SIZE_MB:
-                max_mb = ARCHIVE_MAX_FILE_SIZE_MB
-                log_guardian(
-                    "WARN",
-                    f"Skipping large file {file_path.name} ({file_size_mb:.1f}MB > {max_mb}MB)",
-                )
-                skipped_count += 1
-                continue
+                if file_size_mb > ARCHIVE_MAX_FILE_SIZE_MB:
+                    max_mb = ARCHIVE_MAX_FILE_SIZE_MB
+                    log_guardian(
+                        "WARN",
+                        f"Skipping large file {file_path.name} ({file_size_mb:.1f}MB > {max_mb}MB)",
+                    )
+                    skipped_count += 1
+                    skipped.append((file_path, f"over {max_mb}MB"))
+                    continue
 
-            if (total_size + file_size) / (1024 * 1024) > ARCHIVE_MAX_TOTAL_SIZE_MB:
-                limit_mb = ARCHIVE_MAX_TOTAL_SIZE_MB
-                log_guardian(
-                    "WARN",
-                    f"Archive total size limit reached ({limit_mb}MB), skipping rest",
-                )
-                skipped_count += len(files) - len(archived)
-                break
+                if (total_size + file_size) / (1024 * 1024) > ARCHIVE_MAX_TOTAL_SIZE_MB:
+                    limit_mb = ARCHIVE_MAX_TOTAL_SIZE_MB
+                    log_guardian(
+                        "WARN",
+                        f"Archive total size limit reached ({limit_mb}MB), skipping rest",
+                    )
+                    skipped_count += len(files) - len(pending)
+                    skipped += [(p, f"archive over {limit_mb}MB") for p in files[index:]]
+                    break
 
-            rel_path = file_path.relative_to(project_dir)
-            target_dir = archive_dir / rel_path.parent
-            target_dir.mkdir(parents=True, exist_ok=True)
-
-            target_path = target_dir / file_path.name
-            if target_path.exists():
-                suffix = secrets.token_hex(3)
-                stem = file_path.stem
-                ext = file_path.suffix
-                target_path = target_dir / f"{stem}_{suffix}{ext}"
-
-            if file_path.is_file():
-                # F5: Symlink safety — preserve symlinks instead of dereferencing
-                if os.path.islink(file_path):
-                    link_target = os.readlink(file_path)
-                    os.symlink(link_target, target_path)
+                rel_path = file_path.relative_to(project_dir)
+                target_dir = archive_dir / rel_path.parent
+                target_dir.mkdir(parents=True, exist_ok=True)
+
+                target_path = target_dir / file_path.name
+                if target_path.exists() or os.path.islink(target_path):
+                    suffix = secrets.token_hex(3)
+                    stem = file_path.stem
+                    ext = file_path.suffix
+                    target_path = target_dir / f"{stem}_{suffix}{ext}"
+
+                if file_path.is_file():
+                    # F5: Symlink safety — preserve symlinks instead of dereferencing
+                    if os.path.islink(file_path):
+                        link_target = os.readlink(file_path)
+                        os.symlink(link_target, target_path)
+                        wait = _copy_done
+                    else:
+                        wait = pool.submit(_copy_file, file_path, target_path).result
+                elif scan is not None:
+                    # F5: Symlink safety — preserve symlinks as symlinks (the
+                    # walk above never follows them)
+                    wait = _queue_tree_copy(pool, file_path, target_path, scan)
                 else:
-                    shutil.copy2(file_path, target_path)
-            elif file_path.is_dir():
-                # F5: Symlink safety — preserve symlinks as symlinks
-                shutil.copytree(file_path, target_path, symlinks=True, dirs_exist_ok=True)
+                    wait = _copy_done
 
-            archived.append((file_path, target_path))
-            total_size += file_size
+                pairs = [(file_path, target_path)]
+                if file_path in parts:
+                    pairs = [(unit, target_path / unit.relative_to(file_path))
+                             for unit in parts[file_path]]
+                pending.append((file_path, pairs, file_size, wait))
+                total_size += file_size
 
-        except PermissionError as e:
-            log_guardian(
-                "WARN",
-                f"Archive PERMISSION DENIED for {file_path.name}: {e}\n"
-                "  Check file permissions or run with elevated privileges.",
-            )
-            skipped_count += 1
-        except OSError as e:
-            is_disk_full = e.errno == 28 or getattr(e, "winerror", None) == 112
-            error_type = "DISK FULL" if is_disk_full else "FILESYSTEM ERROR"
-            log_guardian(
-                "WARN",
-                f"Archive {error_type} for {file_path.name}: {e}\n  errno={e.errno}",
-            )
-            skipped_count += 1
-        except Exception as e:
-            log_guardian(
-                "WARN",
-                f"Archive UNEXPECTED ERROR for {file_path.name}: {type(e).__name__}: {e}",
-            )
-            skipped_count += 1
+            except Exception as e:
+                _log_archive_error(file_path, e)
+                skipped_count += 1
+                skipped.append((file_path, "copy failed"))
 
-    elapsed = (datetime.now() - start_time).total_seconds()
-    if elapsed > 5:
-        log_guardian("INFO", f"Archive completed in {elapsed:.1f}s ({len(archived)} files)")
+        copied_bytes = 0
+        for file_path, pairs, file_size, wait in pending:
+            try:
+                wait()
+            except Exception as e:
+                _log_archive_error(file_path, e)
+                skipped_count += 1
+                skipped.append((file_path, "copy failed"))
+                continue
+            archived.extend(pairs)
+            copied_bytes += file_size
+
+    elapsed = time.monotonic() - start_time
+    copied_mb = copied_bytes / (1024 * 1024)
+    log_guardian(
+        "INFO",
+        f"Archive copied {len(archived)} item(s), {copied_mb:.1f}MB in {elapsed:.2f}s "
+        f"({copied_mb / max(elapsed, 1e-6):.1f}MB/s, {ARCHIVE_COPY_WORKERS} workers)",
+    )
 
     if skipped_count > 0:
         log_guardian("WARN", f"Skipped {skipped_count} file(s) during archive")
@@ -1287,6 +1687,10 @@ def archive_files(
     return archive_dir, archived
 
 
+def _copy_done() -> None:
+    """Wait function for items copied synchronously (symlinks)."""
+
+
 def create_deletion_log(archive_dir: Path, archived: list[tuple[Path, Path]], command: str):
     """Create metadata JSON in archive directory."""
     truncated_command = command[:200] + "..." if len(command) > 200 else command
@@ -1431,7 +1835,8 @@ def main() -> None:
         final_verdict = _stronger_verdict(final_verdict, ("ask", ask_reason))
 
     # ========== Layer 2: Command Decomposition (moved before Layer 1) ==========
-    sub_commands = split_commands(command)
+    # One parse feeds Layers 1, 3 and 4 (words, redirections, heredoc spans)
+    sub_commands = parse_command(command).sub_commands
 
     # ========== Layer 1: Protected Path Scan ==========
     # Scan joined sub-commands instead of raw command string.
@@ -1439,23 +1844,48 @@ def main() -> None:
     # so .env/.pem in heredoc bodies no longer trigger false positives.
     # Also filter out comment-only sub-commands to prevent false positives
     # from e.g. "# .env" appearing in scan text.
-    scan_text = ' '.join(
-        sub for sub in sub_commands if not sub.lstrip().startswith('#')
+    scan_subs = [sub for sub in sub_commands if not sub.text.startswith('#')]
+    scan_text = ' '.join(sub.text for sub in scan_subs)
+    scan_verdict, scan_reason, scan_offset = _layer1_decision(
+        find_protected_path_references(scan_text, config), config
     )
-    scan_verdict, scan_reason = scan_protected_paths(scan_text, config)
     if scan_verdict != "allow":
         final_verdict = _stronger_verdict(final_verdict, (scan_verdict, scan_reason))
-        log_guardian("SCAN", f"Layer 1 {scan_verdict}: {scan_reason}")
+        # Point at the reference in the original command (scan_text joins
+        # the sub-commands with single spaces)
+        location = ""
+        sub_offset = 0
+        for sub in scan_subs:
+            if scan_offset < sub_offset + len(sub.text):
+                location = f" (command offset {sub.start + max(0, scan_offset - sub_offset)})"
+                break
+            sub_offset += len(sub.text) + 1
+        log_guardian("SCAN", f"Layer 1 {scan_verdict}: {scan_reason}{location}")
 
     # ========== Layer 3+4: Per-Sub-Command Analysis ==========
     all_paths: list[Path] = []  # Collect all paths for archive step
+    path_tiers: dict[str, frozenset[str]] = {}  # Layer 3 classification memo
+    has_delete = False  # Any sub-command is a delete (archive step)
+    contents_notes: list[str] = []  # Protected directory contents (delete prompt)
 
     for sub_cmd in sub_commands:
-        is_write = is_write_command(sub_cmd)
-        is_delete = is_delete_command(sub_cmd)
+        effect = classify_effect(sub_cmd)  # Layer 4, one scan per sub-command
+        is_write = effect.is_write
+        is_delete = effect.is_delete
+        has_delete = has_delete or is_delete
 
         # Layer 3: Extract paths from arguments (enhanced with allow_nonexistent)
-        paths = extract_paths(sub_cmd, project_dir, allow_nonexistent=(is_write or is_delete))
+        deny_tiers = frozenset(
+            {"zeroAccess"} | ({"readOnly"} if is_write else set())
+            | ({"noDelete"} if is_delete else set())
+        )
+        expansion_verdicts: list[tuple[str, str]] = []
+        paths = extract_paths(
+            sub_cmd, project_dir, allow_nonexistent=(is_write or is_delete),
+            deny_tiers=deny_tiers, verdicts=expansion_verdicts,
+        )
+        for expansion_verdict in expansion_verdicts:
+            final_verdict = _stronger_verdict(final_verdict, expansion_verdict)
 
         # Layer 3: Extract paths from redirections
         redir_paths = extract_redirection_targets(sub_cmd, project_dir)
@@ -1463,6 +1893,13 @@ def main() -> None:
         sub_paths = paths + redir_paths
         all_paths.extend(sub_paths)
 
+        # Layer 3: Recursive readers (grep -r, tar c, cp -r, ...) read protected
+        # files below their roots without naming them (protectedManifest)
+        for root in _traversal_roots(recursive_read_roots(sub_cmd), project_dir):
+            read_verdict = _recursive_read_verdict(root)
+            if read_verdict is not None:
+                final_verdict = _stronger_verdict(final_verdict, read_verdict)
+
         # F1: Fail-closed safety net — if write/delete detected but no paths resolved,
         # escalate to "ask" instead of silently allowing (fail-closed)
         if (is_write or is_delete) and not sub_paths:
@@ -1472,8 +1909,12 @@ def main() -> None:
                 ("ask", f"Detected {op_type} but could not resolve target paths"),
             )
 
+        # Classify each distinct path once per command (all tiers at once)
+        path_tiers.update(classify_paths(p for p in map(str, sub_paths) if p not in path_tiers))
+
         for path in sub_paths:
             path_str = str(path)
+            tiers = path_tiers[path_str]
 
             # Symlink escape check
             if is_symlink_escape(path_str):
@@ -1484,7 +1925,7 @@ def main() -> None:
                 continue
 
             # Zero access check (applies to ALL operations)
-            if match_zero_access(path_str):
+            if "zeroAccess" in tiers:
                 log_guardian("BLOCK", f"Zero access path: {path.name}")
                 final_verdict = _stronger_verdict(
                     final_verdict, ("deny", f"Protected path: {path.name}")
@@ -1492,7 +1933,7 @@ def main() -> None:
                 continue
 
             # Read-only check (for write commands in this sub-command)
-            if is_write and match_read_only(path_str):
+            if is_write and "readOnly" in tiers:
                 log_guardian("BLOCK", f"Read-only path: {path.name}")
                 final_verdict = _stronger_verdict(
                     final_verdict, ("deny", f"Read-only path: {path.name}")
@@ -1501,8 +1942,7 @@ def main() -> None:
 
             # External read-only check (for write commands targeting allowedExternalReadPaths)
             if is_write or is_delete:
-                ext_mode = match_allowed_external_path(path_str)
-                if ext_mode == "read":
+                if external_path_mode(tiers) == "read":
                     log_guardian("BLOCK", f"Read-only external path (bash write): {path.name}")
                     final_verdict = _stronger_verdict(
                         final_verdict, ("deny", f"External path is read-only: {path.name}")
@@ -1510,13 +1950,20 @@ def main() -> None:
                     continue
 
             # No-delete check (for delete commands in this sub-command)
-            if is_delete and match_no_delete(path_str):
+            if is_delete and "noDelete" in tiers:
                 log_guardian("BLOCK", f"No-delete path: {path.name}")
                 final_verdict = _stronger_verdict(
                     final_verdict, ("deny", f"Protected from deletion: {path.name}")
                 )
                 continue
 
+            # Directory delete: protected entries anywhere below (protectedManifest)
+            if is_delete:
+                contents_verdict = _directory_delete_verdict(path)
+                if contents_verdict is not None:
+                    final_verdict = _stronger_verdict(final_verdict, contents_verdict)
+                    contents_notes.append(contents_verdict[1])
+
     # ========== Emit final verdict ==========
     # C-1 fix: Now ALL layers have been evaluated
 
@@ -1529,25 +1976,78 @@ def main() -> None:
         sys.exit(0)
 
     # ========== Handle Deletions with Archive ==========
-    if any(is_delete_command(sub) for sub in sub_commands):
+    if has_delete:
         if not all_paths:
             cmd_short = truncate_command(command, 80)
             log_guardian("DEBUG", f"Delete cmd, no paths extracted: {cmd_short}")
         else:
-            existing_paths = [p for p in all_paths if p.exists()]
-            untracked = [p for p in existing_paths if not git_is_tracked(str(p))]
-
-            if not untracked and existing_paths:
+            # Keep protected directory contents visible in the delete prompt
+            notice = "".join(f"{note}\n" for note in dict.fromkeys(contents_notes))
+            existing_paths = list(dict.fromkeys(p for p in all_paths if fs_exists(p)))
+            # Git-ignored build outputs (node_modules, .venv, ...) are not archived
+            regenerable = regenerable_artifacts(existing_paths, project_dir)
+            to_check = [p for p in existing_paths if p not in regenerable]
+            # One batched git query for all targets; only untracked parts of
+            # a partly tracked directory are archived
+            units = git_untracked_units([str(p) for p in to_check])
+            untracked_parts: dict[Path, list[Path]] = {}
+            if units is None:
+                untracked = [p for p in to_check if not git_is_tracked(str(p))]
+            else:
+                # A partly tracked directory stays one archive item (one slot
+                # of ARCHIVE_MAX_FILES) that copies only its untracked parts
+                untracked = []
+                for p in dict.fromkeys(to_check):
+                    parts = [Path(u) for u in units[str(p)]]
+                    if parts and parts != [p]:
+                        untracked_parts[p] = parts
+                    if parts:
+                        untracked.append(p)
+                # The untracked parts of a partly tracked directory (web/ ->
+                # web/node_modules) get the same policy as delete targets
+                part_paths = [u for parts in untracked_parts.values() for u in parts]
+                regenerable_parts = set(regenerable_artifacts(part_paths, project_dir))
+                if regenerable_parts:
+                    regenerable += [u for u in part_paths if u in regenerable_parts]
+                    for p in list(untracked_parts):
+                        kept = [u for u in untracked_parts[p] if u not in regenerable_parts]
+                        if kept:
+                            untracked_parts[p] = kept
+                        else:
+                            del untracked_parts[p]
+                            untracked.remove(p)
+            if regenerable:
+                names = ", ".join(p.name for p in regenerable[:3])
+                if len(regenerable) > 3:
+                    names += f", ... (+{len(regenerable) - 3} more)"
+                log_guardian("ARCHIVE", f"Skipping archive of regenerable path(s): {names}")
+                notice += f"Not archived (git-ignored, regenerable): {names}\n"
+            # A target below another archived target is covered by it
+            archiving = set(untracked)
+            untracked = [p for p in untracked if archiving.isdisjoint(p.parents)]
+
+            if not untracked and to_check:
                 log_guardian(
                     "DEBUG",
-                    f"All {len(existing_paths)} path(s) are git-tracked, no archive needed",
+                    f"All {len(to_check)} path(s) are git-tracked, no archive needed",
                 )
 
             if untracked:
                 if is_dry_run():
                     log_guardian("DRY-RUN", f"Would archive: {[p.name for p in untracked]}")
                 else:
-                    archive_dir, archived = archive_files(untracked, project_dir)
+                    not_archived: list[tuple[Path, str]] = []
+                    archive_dir, archived = archive_files(
+                        untracked, project_dir, untracked_parts, not_archived
+                    )
+                    by_reason: dict[str, list[str]] = {}
+                    for path, reason in not_archived:
+                        by_reason.setdefault(reason, []).append(path.name)
+                    for reason, names in by_reason.items():
+                        skipped_list = ", ".join(names[:3])
+                        if len(names) > 3:
+                            skipped_list += f", ... (+{len(names) - 3} more)"
+                        notice += f"Not archived ({reason}): {skipped_list}\n"
                     if archived:
                         create_deletion_log(archive_dir, archived, command)
                         log_guardian(
@@ -1562,6 +2062,7 @@ def main() -> None:
                         print(
                             json.dumps(
                                 ask_response(
+                                    f"{notice}"
                                     f"Archived {len(archived)} file(s) to {archive_dir.name}/\n"
                                     f"Files: {file_list}\n"
                                     "Proceed with deletion?"
@@ -1581,6 +2082,7 @@ def main() -> None:
                         print(
                             json.dumps(
                                 ask_response(
+                                    f"{notice}"
                                     f"ARCHIVE FAILED for {len(untracked)} file(s)!\n"
                                     f"Files: {file_list}\n"
                                     f"Data will be PERMANENTLY LOST if deleted.\n"
@@ -1601,7 +2103,7 @@ def main() -> None:
                 print(
                     json.dumps(
                         ask_response(
-                            f"Delete {len(existing_paths)} file(s): {file_list}?"
+                            f"{notice}Delete {len(existing_paths)} file(s): {file_list}?"
                         )
                     )
                 )
@@ -1687,7 +2189,11 @@ def main() -> None:
     sys.exit(0)
 
 
-if __name__ == "__main__":
+def run() -> None:
+    """Run the hook with fail-closed error handling.
+
+    Also called by the resident evaluator for each forwarded request.
+    """
     # TODO: Consider wrapping main() with with_timeout() using hookBehavior.timeoutSeconds.
     # Currently SKIPPED because:
     # 1. SIGALRM on Unix can interrupt git subprocess calls mid-execution, risking git state corruption
@@ -1696,7 +2202,8 @@ if __name__ == "__main__":
     # 4. A blanket timeout could race with archive file operations, causing partial archives
     # If implemented, the HookTimeoutError should follow hookBehavior.onTimeout (default: "deny").
     try:
-        main()
+        with fs_fact_scope():  # stat/realpath answers are shared by all layers
+            main()
     except Exception as e:
         log_guardian("ERROR", f"Unhandled exception: {e}")
         set_circuit_open(f"bash_guardian crashed: {type(e).__name__}")
@@ -1722,3 +2229,10 @@ if __name__ == "__main__":
             except Exception:
                 pass
         sys.exit(0)
+
+
+if __name__ == "__main__":
+    try:
+        run()
+    finally:
+        maybe_start_evaluator()
@@ -19,8 +19,27 @@ Design Principles:
 - Thin wrapper: All logic in run_path_guardian_hook()
 """
 
-import json
+import os
 import sys
+
+# Fast path: hand the request to a warm resident evaluator when one is running,
+# before paying for the imports below. Any failure falls through to the
+# in-process evaluation (fail-closed). Without an evaluator socket (the
+# default, evaluator.enabled=false) this costs one stat and no imports.
+if __name__ == "__main__" and os.path.exists(
+    os.path.join(os.environ.get("CLAUDE_PROJECT_DIR") or "/nonexistent",
+                 ".claude", "guardian", "evaluator.sock")
+):
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    try:
+        from _guardian_client import forward_to_evaluator
+
+        if forward_to_evaluator("edit"):
+            sys.exit(0)
+    except Exception:
+        pass
+
+import json
 from pathlib import Path
 
 # Add hooks directory to path
@@ -31,6 +50,7 @@ try:
         get_hook_behavior,  # hookBehavior config support
         log_guardian,
         make_hook_behavior_response,  # hookBehavior response helper
+        maybe_start_evaluator,  # Resident evaluator lazy start
         run_path_guardian_hook,
         set_circuit_open,  # Phase 4 Fix: Circuit Breaker
     )
@@ -55,7 +75,11 @@ def main() -> None:
     run_path_guardian_hook("Edit")
 
 
-if __name__ == "__main__":
+def run() -> None:
+    """Run the hook with fail-closed error handling.
+
+    Also called by the resident evaluator for each forwarded request.
+    """
     try:
         main()
     except Exception as e:
@@ -84,3 +108,10 @@ if __name__ == "__main__":
                 )
             )
         sys.exit(0)
+
+
+if __name__ == "__main__":
+    try:
+        run()
+    finally:
+        maybe_start_evaluator()
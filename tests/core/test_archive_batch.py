@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""Tests for batched tracked/untracked classification of delete targets.
+
+Covers:
+  - git_untracked_units() splits every target with one git call: fully
+    tracked, fully untracked and mixed directories (minimal archive units);
+    targets the native index reader settles need no subprocess
+  - Failure of the batched query returns None (per-path fallback)
+  - `rm -rf` of a partly tracked directory archives only its untracked files,
+    as one archive item (ARCHIVE_MAX_FILES counts targets, not files), and
+    nested targets are archived once
+  - Items skipped by the archive limits are named in the ask prompt
+  - Git-ignored regenerable artifacts (archivePolicy) skip the archive,
+    also when they are the untracked part of a partly tracked directory
+  - Directory archives are sized by a bounded scan_tree() walk that stops
+    at the first exceeded limit and is reused for the copy
+  - Parallel copy: copy_file_range fallback, worker failures, throughput log;
+    the thread pool module is only imported when something is archived
+
+Run:
+    python -m pytest tests/core/test_archive_batch.py -v
+    python3 tests/core/test_archive_batch.py
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import _bootstrap  # noqa: F401, E402
+
+import _guardian_git as gg
+import _guardian_utils as gu
+import bash_guardian as bg
+
+SCRIPTS_DIR = Path(_bootstrap._SCRIPTS_DIR)
+REPO_ROOT = SCRIPTS_DIR.parent.parent
+
+
+def _git(cwd, *args):
+    env = {**os.environ, "GIT_AUTHOR_NAME": "t", "GIT_AUTHOR_EMAIL": "t@t",
+           "GIT_COMMITTER_NAME": "t", "GIT_COMMITTER_EMAIL": "t@t"}
+    subprocess.run(["git", *args], cwd=cwd, env=env, capture_output=True, check=True)
+
+
+@unittest.skipUnless(shutil.which("git") and os.name == "posix", "requires git on POSIX")
+class TestGitUntrackedUnits(unittest.TestCase):
+
+    def setUp(self):
+        self.project = os.path.realpath(tempfile.mkdtemp(prefix="archive_batch_"))
+        root = Path(self.project)
+        for rel in ("build/keep", "build/out/deep", "src", "tmp", "mixed [1]"):
+            (root / rel).mkdir(parents=True)
+        for rel in ("build/README", "build/keep/a.txt", "src/main.py", "mixed [1]/t"):
+            (root / rel).write_text("tracked")
+        _git(self.project, "init", "-q")
+        _git(self.project, "add", "-A")
+        _git(self.project, "commit", "-qm", "init")
+        for rel in ("build/keep/b.txt", "build/out/x.o", "build/out/deep/y.o", "build/new.log",
+                    "tmp/scratch", "mixed [1]/u", "notes.txt"):
+            (root / rel).write_text("untracked")
+        self._saved_env = os.environ.get("CLAUDE_PROJECT_DIR")
+        os.environ["CLAUDE_PROJECT_DIR"] = self.project
+        gg._repo_cache.clear()
+
+    def tearDown(self):
+        if self._saved_env is None:
+            os.environ.pop("CLAUDE_PROJECT_DIR", None)
+        else:
+            os.environ["CLAUDE_PROJECT_DIR"] = self._saved_env
+        gg._repo_cache.clear()
+        shutil.rmtree(self.project, ignore_errors=True)
+
+    def _abs(self, rel):
+        return os.path.join(self.project, rel)
+
+    def test_units(self):
+        targets = [self._abs(rel) for rel in ("build", "src", "tmp", "notes.txt",
+                                              "src/main.py", "mixed [1]")]
+        with mock.patch.object(gu.subprocess, "run", wraps=subprocess.run) as spy:
+            units = gu.git_untracked_units(targets)
+        self.assertEqual(spy.call_count, 1)
+        self.assertEqual(sorted(units[self._abs("build")]),
+                         sorted(map(self._abs, ("build/keep/b.txt", "build/out",
+                                                "build/new.log"))))
+        self.assertEqual(units[self._abs("src")], [])
+        self.assertEqual(units[self._abs("src/main.py")], [])
+        self.assertEqual(units[self._abs("tmp")], [self._abs("tmp")])
+        self.assertEqual(units[self._abs("notes.txt")], [self._abs("notes.txt")])
+        self.assertEqual(units[self._abs("mixed [1]")], [self._abs("mixed [1]/u")])
+
+    def test_native_index_settles_simple_targets(self):
+        targets = [self._abs(rel) for rel in ("tmp", "notes.txt", "src/main.py")]
+        with mock.patch.object(gu.subprocess, "run", side_effect=AssertionError("forked")):
+            units = gu.git_untracked_units(targets)
+        self.assertEqual(units, {self._abs("tmp"): [self._abs("tmp")],
+                                 self._abs("notes.txt"): [self._abs("notes.txt")],
+                                 self._abs("src/main.py"): []})
+
+    def test_project_root(self):
+        units = gu.git_untracked_units([self.project])
+        self.assertIn(self._abs("build/out"), units[self.project])
+        self.assertIn(self._abs("notes.txt"), units[self.project])
+        self.assertNotIn(self._abs("build"), units[self.project])
+
+    def test_failure_returns_none(self):
+        self.assertIsNone(gu.git_untracked_units(["/elsewhere/file"]))
+        with mock.patch.object(gu.subprocess, "run", side_effect=OSError("no git")):
+            self.assertIsNone(gu.git_untracked_units([self._abs("build")]))
+
+    def _rm(self, command):
+        """Run the Bash hook on a delete; return (ask reason, archived files)."""
+        env = os.environ.copy()
+        env["CLAUDE_PLUGIN_ROOT"] = str(REPO_ROOT)
+        env.pop("CLAUDE_HOOK_DRY_RUN", None)
+        payload = {"tool_name": "Bash", "tool_input": {"command": command}}
+        result = subprocess.run(
+            [sys.executable, str(SCRIPTS_DIR / "bash_guardian.py")],
+            input=json.dumps(payload), capture_output=True, text=True, timeout=30, env=env,
+        )
+        output = json.loads(result.stdout)["hookSpecificOutput"]
+        self.assertEqual(output["permissionDecision"], "ask")
+        (archive_dir,) = Path(self.project, "_archive").iterdir()
+        archived = sorted(str(p.relative_to(archive_dir)) for p in archive_dir.rglob("*")
+                          if p.is_file() and p.name != "_deletion_log.json")
+        return output["permissionDecisionReason"], archived
+
+    def test_rm_archives_only_untracked(self):
+        reason, archived = self._rm("rm -rf build")
+        self.assertIn("Archived 3 file(s)", reason)
+        self.assertEqual(archived, ["build/keep/b.txt", "build/new.log", "build/out/deep/y.o",
+                                    "build/out/x.o"])
+
+    def test_nested_targets_archived_once(self):
+        reason, archived = self._rm("rm -rf build build/out")
+        self.assertIn("Archived 3 file(s)", reason)
+        self.assertEqual(archived, ["build/keep/b.txt", "build/new.log", "build/out/deep/y.o",
+                                    "build/out/x.o"])
+
+    def test_skipped_directory_named_in_prompt(self):
+        cache = Path(self.project, "cache")
+        cache.mkdir()
+        for i in range(bg.ARCHIVE_MAX_TREE_ENTRIES + 1):
+            (cache / str(i)).touch()
+        reason, archived = self._rm("rm -rf cache notes.txt")
+        self.assertIn(
+            f"Not archived (more than {bg.ARCHIVE_MAX_TREE_ENTRIES} entries): cache", reason
+        )
+        self.assertIn("Archived 1 file(s)", reason)
+        self.assertEqual(archived, ["notes.txt"])
+
+    def test_many_untracked_files_in_tracked_directory(self):
+        names = [f"u{i:02d}" for i in range(bg.ARCHIVE_MAX_FILES + 10)]
+        for name in names:
+            Path(self.project, "src", name).write_text("untracked")
+        reason, archived = self._rm("rm -rf src")
+        self.assertIn(f"Archived {len(names)} file(s)", reason)
+        self.assertEqual(archived, [f"src/{name}" for name in names])
+
+
+@unittest.skipUnless(shutil.which("git") and os.name == "posix", "requires git on POSIX")
+class TestRegenerableArtifacts(unittest.TestCase):
+
+    def setUp(self):
+        self.project = os.path.realpath(tempfile.mkdtemp(prefix="archive_policy_"))
+        root = Path(self.project)
+        (root / ".gitignore").write_text("node_modules/\ndist\nbuild/\n")
+        _git(self.project, "init", "-q")
+        _git(self.project, "add", "-A")
+        _git(self.project, "commit", "-qm", "init")
+        for rel in ("node_modules/lodash", "dist", "build", "src/node_modules"):
+            (root / rel).mkdir(parents=True)
+        for rel in ("node_modules/lodash/index.js", "dist/app.js", "build/notes.txt",
+                    "src/node_modules/x.js"):
+            (root / rel).write_text("x")
+        self.guardian_dir = root / ".claude" / "guardian"
+        self.guardian_dir.mkdir(parents=True)
+        self.config = json.loads((REPO_ROOT / "assets" / "guardian.default.json").read_text())
+        self._write_config()
+        self._saved_env = os.environ.get("CLAUDE_PROJECT_DIR")
+        os.environ["CLAUDE_PROJECT_DIR"] = self.project
+        gu._config_cache = None
+
+    def tearDown(self):
+        if self._saved_env is None:
+            os.environ.pop("CLAUDE_PROJECT_DIR", None)
+        else:
+            os.environ["CLAUDE_PROJECT_DIR"] = self._saved_env
+        gu._config_cache = None
+        shutil.rmtree(self.project, ignore_errors=True)
+
+    def _write_config(self):
+        (self.guardian_dir / "config.json").write_text(json.dumps(self.config))
+
+    def _run(self, command):
+        env = os.environ.copy()
+        env["CLAUDE_PLUGIN_ROOT"] = str(REPO_ROOT)
+        env.pop("CLAUDE_HOOK_DRY_RUN", None)
+        payload = {"tool_name": "Bash", "tool_input": {"command": command}}
+        result = subprocess.run(
+            [sys.executable, str(SCRIPTS_DIR / "bash_guardian.py")],
+            input=json.dumps(payload), capture_output=True, text=True, timeout=30, env=env,
+        )
+        return json.loads(result.stdout)["hookSpecificOutput"]
+
+    def test_ignored_paths(self):
+        paths = [os.path.join(self.project, rel)
+                 for rel in ("node_modules", "dist", ".gitignore", "src/node_modules")]
+        self.assertEqual(gu.git_ignored_paths(paths), set(paths[:2] + paths[3:]))
+        self.assertEqual(gu.git_ignored_paths(["/elsewhere"]), set())
+
+    def test_skips_archive(self):
+        output = self._run("rm -rf node_modules dist")
+        self.assertEqual(output["permissionDecision"], "ask")
+        reason = output["permissionDecisionReason"]
+        self.assertIn("Not archived (git-ignored, regenerable): node_modules, dist", reason)
+        self.assertNotIn("Archived", reason)
+        self.assertFalse(Path(self.project, "_archive").exists())
+
+    def test_regenerable_part_of_tracked_directory(self):
+        web = Path(self.project, "web")
+        (web / "node_modules" / "react").mkdir(parents=True)
+        (web / "node_modules" / "react" / "index.js").write_text("x")
+        (web / "src").mkdir()
+        (web / "src" / "a.js").write_text("tracked")
+        _git(self.project, "add", "web/src/a.js")
+        _git(self.project, "commit", "-qm", "web")
+        (web / "src" / "b.js").write_text("untracked")
+        reason = self._run("rm -rf web")["permissionDecisionReason"]
+        self.assertIn("Not archived (git-ignored, regenerable): node_modules", reason)
+        self.assertIn("Archived 1 file(s)", reason)
+        archived = [p.name for p in Path(self.project, "_archive").rglob("*") if p.is_file()]
+        self.assertEqual(sorted(archived), ["_deletion_log.json", "b.js"])
+
+        shutil.rmtree(Path(self.project, "_archive"))
+        (web / "src" / "b.js").unlink()
+        reason = self._run("rm -rf web")["permissionDecisionReason"]
+        self.assertIn("Not archived (git-ignored, regenerable): node_modules", reason)
+        self.assertNotIn("Archived", reason)
+        self.assertFalse(Path(self.project, "_archive").exists())
+
+    def test_unlisted_ignored_path_archived(self):
+        self.config["archivePolicy"] = {"regenerableArtifacts": ["node_modules"]}
+        self._write_config()
+        reason = self._run("rm -rf build node_modules")["permissionDecisionReason"]
+        self.assertIn("Not archived (git-ignored, regenerable): node_modules", reason)
+        self.assertIn("Archived 1 file(s)", reason)
+        self.assertTrue(any(Path(self.project, "_archive").rglob("notes.txt")))
+
+    def test_validation(self):
+        base = {"bashToolPatterns": {"block": [], "ask": []}, "zeroAccessPaths": []}
+        for section, count in (({"regenerableArtifacts": ["dist"]}, 0),
+                               ({"regenerableArtifacts": "dist"}, 1),
+                               ({"regenerableArtifacts": ["", "a/b"]}, 2), ([], 1)):
+            with self.subTest(section=section):
+                errors = gu.validate_guardian_config({**base, "archivePolicy": section})
+                self.assertEqual(len([e for e in errors if "archivePolicy" in e]), count)
+
+
+def _listing(root):
+    found = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        for name in dirnames + filenames:
+            path = os.path.join(dirpath, name)
+            rel = os.path.relpath(path, root)
+            if os.path.islink(path):
+                found[rel] = ("link", os.readlink(path))
+            elif os.path.isdir(path):
+                found[rel] = ("dir",)
+            else:
+                found[rel] = ("file", Path(path).read_bytes())
+    return found
+
+
+@unittest.skipUnless(os.name == "posix", "requires POSIX symlinks")
+class TestScanTree(unittest.TestCase):
+
+    def setUp(self):
+        self.project = Path(os.path.realpath(tempfile.mkdtemp(prefix="archive_scan_")))
+        self.tree = self.project / "tree"
+        for rel in ("a/b/c", "empty", "d"):
+            (self.tree / rel).mkdir(parents=True)
+        for i, rel in enumerate(("top.txt", "a/one", "a/b/two", "a/b/c/three", "d/four")):
+            (self.tree / rel).write_bytes(b"x" * (i + 1))
+        (self.tree / "a" / "to_file").symlink_to("../top.txt")
+        (self.tree / "to_dir").symlink_to("a")
+        (self.tree / "broken").symlink_to("/nonexistent/target")
+        (self.tree / "outside").symlink_to("/etc/passwd")
+
+    def tearDown(self):
+        shutil.rmtree(self.project, ignore_errors=True)
+
+    def test_copy_matches_copytree(self):
+        expected = self.project / "expected"
+        shutil.copytree(self.tree, expected, symlinks=True)
+        with mock.patch.object(bg.os, "scandir", wraps=os.scandir) as spy:
+            archive_dir, archived = bg.archive_files([self.tree], self.project)
+        self.assertEqual(len(archived), 1)
+        self.assertEqual(_listing(archived[0][1]), _listing(expected))
+        self.assertEqual(spy.call_count, 6)  # tree, a, a/b, a/b/c, empty, d: once each
+        self.assertEqual(len(bg.scan_tree(self.tree, 10**9, 10**9).files), 5)
+
+    def test_stops_at_limits(self):
+        scan = bg.scan_tree(self.tree, 2, 10**9)
+        self.assertFalse(scan.complete)
+        self.assertGreater(scan.size, 2)
+        scan = bg.scan_tree(self.tree, 10**9, 3)
+        self.assertFalse(scan.complete)
+        self.assertEqual(scan.entries, 4)
+
+        with mock.patch.object(bg, "ARCHIVE_MAX_TREE_ENTRIES", 3):
+            archive_dir, archived = bg.archive_files([self.tree, self.tree / "top.txt"],
+                                                     self.project)
+        self.assertEqual([orig for orig, _ in archived], [self.tree / "top.txt"])
+
+        skipped = []
+        with mock.patch.object(bg, "ARCHIVE_MAX_FILES", 1):
+            bg.archive_files([self.tree / "top.txt", self.tree / "d"], self.project,
+                             skipped=skipped)
+        self.assertEqual(skipped, [(self.tree / "d", "over 1 files")])
+
+    def test_partial_directory_copies_only_parts(self):
+        parts = [self.tree / "a" / "b", self.tree / "top.txt", self.tree / "a" / "to_file"]
+        archive_dir, archived = bg.archive_files([self.tree], self.project, {self.tree: parts})
+        self.assertEqual([orig for orig, _ in archived], parts)
+        copied = archive_dir / "tree"
+        self.assertEqual(sorted(str(p.relative_to(copied)) for p in copied.rglob("*")),
+                         ["a", "a/b", "a/b/c", "a/b/c/three", "a/b/two", "a/to_file", "top.txt"])
+        self.assertTrue(os.path.islink(copied / "a" / "to_file"))
+        self.assertFalse(bg.scan_units(self.tree, parts, 10**9, 3).complete)
+
+    def test_copy_file_range_fallback(self):
+        err = OSError(bg.errno.EXDEV, "cross-device")
+        with mock.patch.object(bg.os, "copy_file_range", side_effect=err, create=True):
+            archive_dir, archived = bg.archive_files([self.tree], self.project)
+        self.assertEqual(_listing(archived[0][1]), _listing(self.tree))
+
+    def test_worker_failure_drops_item(self):
+        real_copy = bg._copy_file
+
+        def failing(src, dst):
+            if src.name == "two":
+                raise PermissionError(13, "denied", str(src))
+            real_copy(src, dst)
+
+        with mock.patch.object(bg, "_copy_file", side_effect=failing), \
+                mock.patch.object(bg, "log_guardian") as log:
+            archive_dir, archived = bg.archive_files([self.tree, self.tree / "top.txt"],
+                                                     self.project)
+        self.assertEqual([orig for orig, _ in archived], [self.tree / "top.txt"])
+
+        skipped = []
+        with mock.patch.object(bg, "ARCHIVE_MAX_FILES", 1):
+            bg.archive_files([self.tree / "top.txt", self.tree / "d"], self.project,
+                             skipped=skipped)
+        self.assertEqual(skipped, [(self.tree / "d", "over 1 files")])
+        messages = [call.args[1] for call in log.call_args_list]
+        self.assertTrue(any("FILESYSTEM ERROR for tree" in m for m in messages))
+        self.assertTrue(any(m.startswith("Archive copied 1 item(s)") and "MB/s" in m
+                            for m in messages))
+
+
+    def test_thread_pool_not_imported_by_hook(self):
+        code = ("import sys; sys.path.insert(0, sys.argv[1]); import bash_guardian; "
+                "print('concurrent.futures' in sys.modules)")
+        result = subprocess.run([sys.executable, "-c", code, str(SCRIPTS_DIR)],
+                                capture_output=True, text=True, timeout=30)
+        self.assertEqual(result.stdout.strip(), "False")
+
+
+if __name__ == "__main__":
+    unittest.main()
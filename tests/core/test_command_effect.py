@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Tests for the merged Layer 4 delete/write classifier (classify_effect).
+
+Covers:
+  - is_delete / is_write / matched_rule for representative commands
+  - Quote-checked write rules ignore > inside quotes, per occurrence
+  - The result is cached on the SubCommand (one classification each)
+  - Rules ruled out by the literal prefilter are never compiled
+
+Run:
+    python -m pytest tests/core/test_command_effect.py -v
+    python3 tests/core/test_command_effect.py
+"""
+
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import _bootstrap  # noqa: F401, E402
+
+import bash_guardian as bg
+from _guardian_shell import SubCommand
+
+
+class TestClassifyEffect(unittest.TestCase):
+
+    def test_effects(self):
+        cases = {
+            "rm -rf build": (True, False),
+            "git -C repo rm file": (True, False),
+            "mv a.txt /dev/null": (True, True),  # mv is also a write
+            "> out.log": (True, True),
+            "cp a b": (False, True),
+            "sed -i s/a/b/ f": (False, True),
+            "python3 -c 'import shutil; shutil.rmtree(\"x\")'": (True, False),
+            "RM -r build": (True, False),
+            "ls -la": (False, False),
+            "git status": (False, False),
+        }
+        for command, expected in cases.items():
+            with self.subTest(command=command):
+                effect = bg.classify_effect(command)
+                self.assertEqual((effect.is_delete, effect.is_write), expected)
+                self.assertEqual(effect.matched_rule is not None, any(expected))
+
+    def test_quoted_redirection(self):
+        self.assertFalse(bg.is_write_command('echo "a > b"'))
+        self.assertFalse(bg.is_write_command("echo 'x >y' \"z > w\""))
+        self.assertTrue(bg.is_write_command('echo "a > b" > out.txt'))
+        self.assertTrue(bg.is_write_command("echo 'a' : > f"))
+
+    def test_matched_rule_prefers_delete(self):
+        effect = bg.classify_effect("rm a && cp b c")
+        self.assertIn("rm", effect.matched_rule)
+
+    def test_cached_on_sub_command(self):
+        sub = SubCommand("rm -rf build > log")
+        with mock.patch.object(bg, "_get_effect_rules", wraps=bg._get_effect_rules) as spy:
+            self.assertTrue(bg.is_delete_command(sub))
+            self.assertTrue(bg.is_write_command(sub))
+            self.assertTrue(bg.is_delete_command(sub))
+        self.assertEqual(spy.call_count, 1)
+        self.assertIs(bg.classify_effect(sub), sub.effect)
+
+
+    def test_prefiltered_rules_not_compiled(self):
+        bg._get_effect_rules()
+        with mock.patch.object(bg.re, "compile", wraps=bg.re.compile) as spy:
+            self.assertFalse(bg.classify_effect("npm test").is_write)
+            self.assertEqual(spy.call_count, 0)
+            self.assertTrue(bg.classify_effect("cp a b").is_write)
+        self.assertEqual([c.args[0] for c in spy.call_args_list], [r"\bcp\s+"])
+
+
+if __name__ == "__main__":
+    unittest.main()
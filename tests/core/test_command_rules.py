@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""Tests for structured bashToolPatterns rules ({"command": ...}).
+
+Covers:
+  - Wrapper and assignment stripping (sudo, env, command, timeout, xargs,
+    watch, stdbuf, ionice, VAR=value)
+  - command / subcommand / flags / args matching on parsed argv
+  - Commands behind reserved words (if/then/do/!), in brace groups,
+    subshells, command substitutions and bash -c / sh -c strings
+  - Dispatch by command name across sub-commands
+  - Mixed regex and structured rules: first match in config order wins
+  - Validation and the compiled artifact
+
+Run:
+    python -m pytest tests/core/test_command_rules.py -v
+    python3 tests/core/test_command_rules.py
+"""
+
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import _bootstrap  # noqa: F401, E402
+
+import _guardian_utils as gu
+
+FORCE_PUSH = {"command": "git", "subcommand": "push", "flags": ["--force", "-f"],
+              "reason": "Force push"}
+
+
+def _table(*entries):
+    return gu.CommandRuleTable(
+        [(i, gu.normalize_command_rule(entry)) for i, entry in enumerate(entries)]
+    )
+
+
+class TestResolveArgv(unittest.TestCase):
+
+    def test_wrappers_and_assignments(self):
+        cases = [
+            (["git", "status"], ["git", "status"]),
+            (["/usr/bin/git", "push"], ["git", "push"]),
+            (["\\rm", "-rf", "x"], ["rm", "-rf", "x"]),
+            (["FOO=1", "BAR+=2", "make"], ["make"]),
+            (["sudo", "-u", "root", "-E", "rm", "x"], ["rm", "x"]),
+            (["env", "-i", "-u", "C", "A=b", "python3"], ["python3"]),
+            (["command", "-p", "nice", "-n", "5", "nohup", "time", "-p", "ls"], ["ls"]),
+            (["sudo", "--", "rm"], ["rm"]),
+            (["timeout", "5", "docker", "rm", "x"], ["docker", "rm", "x"]),
+            (["timeout", "-k", "1", "--signal", "KILL", "5s", "rm"], ["rm"]),
+            (["xargs", "-n", "1", "-P", "4", "docker", "rm"], ["docker", "rm"]),
+            (["stdbuf", "-o", "L", "-eL", "rm", "x"], ["rm", "x"]),
+            (["ionice", "-c", "3", "-n", "7", "rm", "x"], ["rm", "x"]),
+            (["watch", "-n", "5", "docker rm x"], ["sh", "-c", "docker rm x"]),
+            (["watch", "docker", "rm", "x"], ["sh", "-c", "docker rm x"]),
+            (["FOO=1"], []),
+            ([], []),
+        ]
+        for argv, expected in cases:
+            with self.subTest(argv=argv):
+                self.assertEqual(gu.resolve_command_argv(argv), expected)
+
+
+class TestCommandRuleMatching(unittest.TestCase):
+
+    def test_subcommand_and_flags(self):
+        table = _table(FORCE_PUSH)
+        for command, expected in [
+            ("git push -f origin main", 0),
+            ("git push --force=true", 0),
+            ("cd repo && sudo git push --force", 0),
+            ("git push origin main", None),
+            ("git status -f", None),
+            ("echo git push -f", None),
+            ("git push origin -- -f", None),
+            ("git -C . push --force", 0),
+            ("git -c a=b push -f", 0),
+            ("git --git-dir .git --work-tree . push -f", 0),
+            ("git --namespace ns push --force", 0),
+            ("git -C push status -f", None),
+            ("git -C. push -f", 0),
+        ]:
+            with self.subTest(command=command):
+                self.assertEqual(table.first_match(command), expected)
+
+    def test_global_value_options(self):
+        for entry, command in [
+            ({"command": "npm", "subcommand": "publish"}, "npm --prefix pkg publish"),
+            ({"command": "docker", "subcommand": "rm"}, "docker -H tcp://h:2375 rm -f c"),
+            ({"command": "kubectl", "subcommand": "delete"}, "kubectl -n prod delete pod x"),
+        ]:
+            with self.subTest(command=command):
+                self.assertEqual(_table(entry).first_match(command), 0)
+        # Unlisted options keep the old reading (no value assumed)
+        self.assertIsNone(_table({"command": "npm", "subcommand": "publish"})
+                          .first_match("npm --dry-run pkg publish"))
+
+    def test_nested_and_wrapped_commands(self):
+        table = _table({"command": "docker", "subcommand": "rm"})
+        for command in [
+            "if true; then docker rm x; fi",
+            "if docker rm x; then :; fi",
+            "while true; do docker rm x; done",
+            "{ docker rm x; }",
+            "{ echo a; docker rm x; }",
+            "( docker rm x )",
+            "(cd a && docker rm x)",
+            "! docker rm x",
+            "timeout 5 docker rm x",
+            "xargs docker rm <ids",
+            "watch -n 5 'docker rm x'",
+            "stdbuf -oL docker rm x",
+            "ionice -c 3 docker rm x",
+            'bash -c "docker rm x"',
+            "sh -c 'docker ps; docker rm x'",
+            "bash -lc 'docker rm x'",
+            "bash -o pipefail -c 'docker rm x'",
+            "sudo timeout 5 bash -c 'docker rm x'",
+            "echo $(docker rm x)",
+            'echo "$(docker rm x)"',
+            "ids=`docker rm x`",
+            "cat <(docker rm x)",
+        ]:
+            with self.subTest(command=command):
+                self.assertEqual(table.first_match(command), 0)
+        for command in [
+            "echo 'docker rm x'",
+            'echo "docker rm x"',
+            "echo '$(docker rm x)'",
+            "bash script.sh docker rm x",
+            "docker ps",
+        ]:
+            with self.subTest(command=command):
+                self.assertIsNone(table.first_match(command))
+
+    def test_substitution_is_not_the_outer_command(self):
+        table = _table({"command": "rm"})
+        self.assertIsNone(table.first_match("x=$(docker rm y)"))
+        self.assertIsNone(table.first_match("x=`docker rm y`"))
+        self.assertEqual(table.first_match("rm $(cat list)"), 0)
+
+    def test_nesting_depth_is_bounded(self):
+        table = _table({"command": "docker", "subcommand": "rm"})
+        self.assertEqual(table.first_match("( " * 8 + "docker rm x" + " )" * 8), 0)
+        self.assertIsNone(table.first_match("( " * 20 + "docker rm x" + " )" * 20))
+
+    def test_bundled_short_flags(self):
+        table = _table({"command": "rm", "flags": ["-r", "-R", "--recursive"]})
+        self.assertEqual(table.first_match("rm -rf build"), 0)
+        self.assertEqual(table.first_match("rm -f build"), None)
+
+    def test_argument_globs(self):
+        table = _table({"command": ["rm", "rmdir"], "args": [".git", ".git/*"]})
+        self.assertEqual(table.first_match("rm -rf .git/objects"), 0)
+        self.assertEqual(table.first_match("rmdir .git"), 0)
+        self.assertEqual(table.first_match("rm src/.gitignore"), None)
+
+    def test_only_rules_for_invoked_command_are_evaluated(self):
+        table = _table(FORCE_PUSH, {"command": "docker", "subcommand": "rm"})
+        self.assertEqual(set(table.by_command), {"git", "docker"})
+        with mock.patch.object(gu, "_command_rule_matches", wraps=gu._command_rule_matches) as m:
+            self.assertIsNone(table.first_match("npm test && ls -la"))
+            self.assertEqual(m.call_count, 0)
+            self.assertEqual(table.first_match("docker rm x"), 1)
+            self.assertEqual(m.call_count, 1)
+
+    def test_limit(self):
+        table = _table(FORCE_PUSH, {"command": "git"})
+        self.assertEqual(table.first_match("git push -f"), 0)
+        self.assertIsNone(table.first_match("git push -f", limit=0))
+        self.assertEqual(table.first_match("git status", limit=5), 1)
+
+
+class TestMixedRules(unittest.TestCase):
+    """Structured and regex rules share one list and one precedence order."""
+
+    def _match(self, block):
+        config = {"bashToolPatterns": {"block": block, "ask": []}, "zeroAccessPaths": []}
+
+        def match(command):
+            with mock.patch.object(gu, "load_guardian_config", return_value=config), \
+                    mock.patch.object(gu, "_get_compiled_table", return_value=None):
+                return gu.match_block_patterns(command)
+
+        return match
+
+    def test_first_rule_in_config_order_wins(self):
+        match = self._match([
+            {"pattern": r"origin\s+main", "reason": "regex"},
+            FORCE_PUSH,
+        ])
+        self.assertEqual(match("git push -f origin main"), (True, "regex"))
+        self.assertEqual(match("git push -f origin dev"), (True, "Force push"))
+        self.assertEqual(match("git status"), (False, ""))
+
+        match = self._match([FORCE_PUSH, {"pattern": r"origin\s+main", "reason": "regex"}])
+        self.assertEqual(match("git push -f origin main"), (True, "Force push"))
+
+    def test_keyword_and_wrapper_forms_blocked(self):
+        match = self._match([{"command": "docker", "subcommand": "rm", "reason": "docker rm"}])
+        for command in ["if true; then docker rm x; fi", "{ docker rm x; }",
+                        "( docker rm x )", "! docker rm x", "timeout 5 docker rm x",
+                        "xargs docker rm <ids", 'bash -c "docker rm x"']:
+            with self.subTest(command=command):
+                self.assertEqual(match(command), (True, "docker rm"))
+
+    def test_invalid_command_rule_never_matches(self):
+        match = self._match([{"command": 5, "reason": "bad"}])
+        self.assertEqual(match("git status"), (False, ""))
+
+
+class TestValidationAndArtifact(unittest.TestCase):
+
+    BASE = {"zeroAccessPaths": []}
+
+    def _errors(self, entry):
+        config = {**self.BASE, "bashToolPatterns": {"block": [entry], "ask": []}}
+        return [e for e in gu.validate_guardian_config(config) if "bashToolPatterns" in e]
+
+    def test_valid_rule(self):
+        self.assertEqual(self._errors(FORCE_PUSH), [])
+        self.assertEqual(self._errors({"command": ["rm"], "args": ["/"], "reason": "x"}), [])
+
+    def test_invalid_rules(self):
+        for entry in [
+            {"command": "", "reason": "x"},
+            {"command": "git", "flags": ["force"], "reason": "x"},
+            {"command": "git", "subcommand": [], "reason": "x"},
+            {"command": "git", "pattern": "git", "reason": "x"},
+        ]:
+            with self.subTest(entry=entry):
+                self.assertEqual(len(self._errors(entry)), 1)
+
+    def test_artifact_stores_normalized_spec(self):
+        config = {"bashToolPatterns": {"block": [FORCE_PUSH], "ask": []}}
+        artifact = gu.compile_guardian_config(config, {}, [])
+        self.assertEqual(
+            artifact["rules"]["block"],
+            [[None, "Force push", None, {
+                "commands": ["git"], "subcommands": ["push"],
+                "flags": ["--force", "-f"], "args": None,
+            }]],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
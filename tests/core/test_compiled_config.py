@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+"""Tests for the compiled config artifact (.claude/guardian/config.compiled.json).
+
+Covers:
+  - Artifact is built on first load and reused while the source is unchanged
+  - Fingerprint invalidation (content change, racy same-size/same-mtime edit,
+    corrupt artifact, compiler environment change)
+  - Derived tables (rules, path globs, Layer 1 literals) behave exactly like
+    the uncompiled code paths; ** globs match in linear time
+  - The Layer 1 multi-literal matcher agrees with the per-literal regexes
+  - Normalized scan variants map references back to original offsets
+  - Block/ask rule sets report the first matching rule in config order
+  - The required-literal prefilter never skips a rule that would match
+  - The artifact is self-guarded like config.json
+
+Run:
+    python -m pytest tests/core/test_compiled_config.py -v
+    python3 tests/core/test_compiled_config.py
+"""
+
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import _bootstrap  # noqa: F401, E402
+
+import _guardian_utils as gu
+from bash_guardian import (
+    _scan_variants,
+    find_protected_path_references,
+    glob_to_literals,
+    scan_protected_paths,
+)
+
+REPO_ROOT = Path(_bootstrap._REPO_ROOT)
+
+
+def _reset_config_cache():
+    gu._config_cache = None
+    gu._using_fallback_config = False
+    gu._active_config_path = None
+    gu._compiled_config = None
+    gu._path_glob_cache.clear()
+
+
+class CompiledConfigTestBase(unittest.TestCase):
+    """Temp project with the recommended config and CLAUDE_PROJECT_DIR set."""
+
+    def setUp(self):
+        self.project = tempfile.mkdtemp(prefix="compiled_cfg_")
+        (Path(self.project) / ".git").mkdir()
+        self.guardian_dir = Path(self.project) / ".claude" / "guardian"
+        self.guardian_dir.mkdir(parents=True)
+        self.config_path = self.guardian_dir / "config.json"
+        self.artifact_path = self.guardian_dir / gu.COMPILED_CONFIG_NAME
+        self.config = json.loads((REPO_ROOT / "assets" / "guardian.recommended.json").read_text())
+        self._write_config(self.config)
+        self._saved_env = os.environ.get("CLAUDE_PROJECT_DIR")
+        os.environ["CLAUDE_PROJECT_DIR"] = self.project
+        _reset_config_cache()
+
+    def tearDown(self):
+        os.environ["CLAUDE_PROJECT_DIR"] = self._saved_env
+        _reset_config_cache()
+        shutil.rmtree(self.project, ignore_errors=True)
+
+    def _write_config(self, config):
+        self.config_path.write_text(json.dumps(config, indent=2))
+
+    def _age_source(self, seconds=60):
+        """Backdate the source so the artifact is not considered racy."""
+        st = os.stat(self.config_path)
+        old = st.st_mtime_ns - seconds * 1_000_000_000
+        os.utime(self.config_path, ns=(old, old))
+
+    def _load(self):
+        _reset_config_cache()
+        return gu.load_guardian_config()
+
+
+class TestArtifactLifecycle(CompiledConfigTestBase):
+
+    def test_artifact_written_with_fingerprint(self):
+        self._age_source()
+        config = self._load()
+        self.assertEqual(config, self.config)
+        artifact = json.loads(self.artifact_path.read_text())
+        st = os.stat(self.config_path)
+        self.assertEqual(artifact["source"]["path"], str(self.config_path))
+        self.assertEqual(artifact["source"]["size"], st.st_size)
+        self.assertEqual(artifact["source"]["mtime_ns"], st.st_mtime_ns)
+        self.assertEqual(len(artifact["source"]["sha256"]), 64)
+        self.assertEqual(artifact["config"], self.config)
+        self.assertEqual(len(artifact["rules"]["block"]), len(self.config["bashToolPatterns"]["block"]))
+
+    def test_fresh_artifact_skips_parse_and_validation(self):
+        self._age_source()
+        self._load()
+        with mock.patch.object(gu, "validate_guardian_config", side_effect=AssertionError):
+            config = self._load()
+        self.assertEqual(config, self.config)
+        self.assertIs(gu._compiled_config["config"], config)
+
+    def test_content_change_rebuilds(self):
+        self._age_source()
+        self._load()
+        self.config["zeroAccessPaths"].append("*.topsecret")
+        self._write_config(self.config)
+        config = self._load()
+        self.assertIn("*.topsecret", config["zeroAccessPaths"])
+        self.assertTrue(gu.match_zero_access(os.path.join(self.project, "a.topsecret")))
+
+    def test_racy_same_size_same_mtime_edit_is_detected(self):
+        self._load()
+        st = os.stat(self.config_path)
+        text = self.config_path.read_text()
+        swapped = text.replace('"id_rsa"', '"id_rsb"', 1)
+        self.assertEqual(len(swapped), len(text))
+        self.config_path.write_text(swapped)
+        os.utime(self.config_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+        config = self._load()
+        self.assertIn("id_rsb", config["zeroAccessPaths"])
+
+    def test_corrupt_artifact_is_ignored(self):
+        self._age_source()
+        self._load()
+        self.artifact_path.write_text("{not json")
+        self.assertEqual(self._load(), self.config)
+        json.loads(self.artifact_path.read_text())  # rebuilt
+
+    def test_environment_change_rebuilds(self):
+        self._age_source()
+        self._load()
+        artifact = json.loads(self.artifact_path.read_text())
+        artifact["env"]["format"] = -1
+        artifact["config"]["zeroAccessPaths"] = []
+        self.artifact_path.write_text(json.dumps(artifact))
+        self.assertEqual(self._load()["zeroAccessPaths"], self.config["zeroAccessPaths"])
+
+    def test_invalid_json_still_falls_back(self):
+        self.config_path.write_text("{broken")
+        self._load()
+        self.assertTrue(gu.is_using_fallback_config())
+
+    def test_validation_warnings_are_kept(self):
+        self.config["hookBehavior"]["onError"] = "explode"
+        self._write_config(self.config)
+        self._age_source()
+        self._load()
+        artifact = json.loads(self.artifact_path.read_text())
+        self.assertTrue(any("onError" in e for e in artifact["validation_errors"]))
+
+    def test_artifact_is_self_guarded(self):
+        self.assertTrue(gu.is_self_guardian_path(str(self.artifact_path)))
+
+
+class TestCompiledTablesMatchUncompiled(CompiledConfigTestBase):
+    """Compiled and uncompiled code paths must give identical answers."""
+
+    PATHS = [
+        ".env", ".env.local", "src/app.py", "config/secrets.yaml", "keys/server.pem",
+        "node_modules/pkg/index.js", ".git/config", "deep/dir/id_rsa", "README.md",
+        "./CLAUDE.md", "dist/bundle.min.js", "terraform.tfstate", "a/b/.aws/credentials",
+    ]
+
+    def _answers(self):
+        results = []
+        for rel in self.PATHS:
+            path = os.path.join(self.project, rel)
+            results.append((
+                gu.match_zero_access(path),
+                gu.match_read_only(path),
+                gu.match_no_delete(path),
+                gu.match_allowed_external_path(path),
+            ))
+        return results
+
+    def test_path_matching(self):
+        self._age_source()
+        self._load()
+        self._load()
+        self.assertIsNotNone(gu._compiled_config)
+        compiled = self._answers()
+        with mock.patch.object(gu, "_get_compiled_table", return_value=None):
+            gu._path_glob_cache.clear()
+            uncompiled = self._answers()
+        self.assertEqual(compiled, uncompiled)
+
+    def test_path_glob_matches_fnmatch(self):
+        import fnmatch
+
+        for pattern in ["*.pem", ".env.*", "[._]env", "dir/?x", "a/**/b", "~/.ssh/**"]:
+            glob_entry = gu._PathGlob.build(pattern)
+            for name in ["x.pem", ".env.prod", "_env", "dir/ax", "a/c/b", ".ssh", "nope"]:
+                self.assertEqual(
+                    glob_entry.matches(name), fnmatch.fnmatch(name, glob_entry.norm_pattern),
+                    (pattern, name),
+                )
+
+    def test_recursive_glob_semantics(self):
+        cases = [
+            (["src", "a", "b.py"], "src/**/*.py", True),
+            (["src", "b.py"], "src/**/*.py", True),
+            (["b.py"], "src/**/*.py", False),
+            (["a", "b"], "a/**", True),
+            (["a"], "a/**", True),
+            ([], "**/**", True),
+            (["x", "node_modules", "y"], "**/node_modules/**", True),
+            (["x", "node_module", "y"], "**/node_modules/**", False),
+            (["a", "b"], "a", False),
+        ]
+        for parts, pattern, expected in cases:
+            with self.subTest(parts=parts, pattern=pattern):
+                self.assertEqual(gu._match_recursive_glob(parts, pattern.split("/")), expected)
+                self.assertEqual(gu._PathGlob.build(pattern).matches_parts(parts), expected)
+
+    def test_many_double_stars_on_deep_path_is_linear(self):
+        """Backtracking over each ** blew up combinatorially on a deep non-matching path."""
+        import time
+
+        path_parts = ["d%d" % i for i in range(30)] + ["file.js"]
+        glob_entry = gu._PathGlob.build("**/*/**/*/**/*/**/*/**/*/**/z")
+        start = time.perf_counter()
+        self.assertFalse(glob_entry.matches_parts(path_parts))
+        self.assertLess(time.perf_counter() - start, 0.5)
+
+    def test_pattern_rules(self):
+        self._age_source()
+        self._load()
+        commands = ["rm -rf /", "git push --force origin main", "git reset --hard", "ls -la"]
+        compiled = [(gu.match_block_patterns(c), gu.match_ask_patterns(c)) for c in commands]
+        with mock.patch.object(gu, "_get_compiled_table", return_value=None):
+            uncompiled = [(gu.match_block_patterns(c), gu.match_ask_patterns(c)) for c in commands]
+        self.assertEqual(compiled, uncompiled)
+        self.assertTrue(compiled[0][0][0])
+
+    def test_layer1_table(self):
+        self.config["bashPathScan"]["scanTiers"] = ["zeroAccess", "readOnly", "noDelete"]
+        self._write_config(self.config)
+        self._age_source()
+        config = self._load()
+        self.assertEqual(gu.get_layer1_scan_table(config), gu.build_layer1_scan_table(config))
+        self.assertIs(gu.get_layer1_scan_table(config), gu._compiled_config["layer1"])
+        for command in ["cat .env", "cat server.pem", "cat .en?", "echo ok"]:
+            with mock.patch.object(gu, "_get_compiled_table", return_value=None):
+                expected = scan_protected_paths(command, config)
+            self.assertEqual(scan_protected_paths(command, config), expected)
+
+    def test_foreign_config_dict_is_not_served_from_artifact(self):
+        self._age_source()
+        self._load()
+        other = {"bashPathScan": {"scanTiers": ["zeroAccess"]}, "zeroAccessPaths": ["only.me"]}
+        self.assertEqual(
+            [e["literal"] for e in gu.get_layer1_scan_table(other)], ["only.me"]
+        )
+
+    def test_glob_to_literals_reexported(self):
+        self.assertIs(glob_to_literals, gu.glob_to_literals)
+
+
+class TestLayer1LiteralMatcher(unittest.TestCase):
+    """One-pass literal matching must agree with the per-literal regexes."""
+
+    CONFIG = {
+        "bashPathScan": {"scanTiers": ["zeroAccess", "readOnly"]},
+        "zeroAccessPaths": [".env", ".env.*", "*.pem", "id_rsa", "id_rsa.*", "*.tfstate"],
+        "readOnlyPaths": [".env", "package-lock.json", "*.lock"],
+    }
+    TEXTS = [
+        "cat .env", "cat .env.local", "cat ./.env", "cat x.env", "cat .envrc",
+        "cp server.pem /tmp", "cat a.pem.bak", "ssh -i id_rsa.pub", "echo id_rsa",
+        "a=.env; b={.env,x}", "cat [.env]", "cat .env\n", "x.tfstate:", "package-lock.json",
+        "id_rsa.id_rsa.", "", "\u00a0.env\u00a0",
+    ]
+
+    def test_find_all_reports_overlapping_literals(self):
+        matcher = gu.Layer1LiteralMatcher([".env", ".env.", "env"])
+        self.assertEqual(
+            matcher.find_all("cat .env.local .env"),
+            {".env": [4, 15], ".env.": [4], "env": [5, 16]},
+        )
+
+    def test_boundary_rules_match_entry_regex(self):
+        table = gu.build_layer1_scan_table(self.CONFIG)
+        matcher = gu.get_layer1_literal_matcher(table)
+        for text in self.TEXTS:
+            hits = matcher.find_all(text)
+            for entry in table:
+                with self.subTest(text=text, literal=entry["literal"]):
+                    literal = entry["literal"]
+                    found = any(
+                        gu.layer1_boundary_ok(text, start, start + len(literal),
+                                              entry["before"], entry["after"])
+                        for start in hits.get(literal, ())
+                    )
+                    self.assertEqual(found, bool(re.search(entry["regex"], text)))
+
+    def test_matcher_is_cached_per_table(self):
+        table = gu.build_layer1_scan_table(self.CONFIG)
+        self.assertIs(
+            gu.get_layer1_literal_matcher(table),
+            gu.get_layer1_literal_matcher(gu.build_layer1_scan_table(self.CONFIG)),
+        )
+
+    def test_glob_question_mark_evasion_still_detected(self):
+        self.assertEqual(scan_protected_paths("cat .en?", self.CONFIG)[0], "ask")
+        self.assertEqual(scan_protected_paths("cat ????", self.CONFIG)[0], "allow")
+
+
+class TestLayer1Normalization(unittest.TestCase):
+    """ANSI-C decoding and glob-class expansion keep an offset map."""
+
+    CONFIG = {"bashPathScan": {"scanTiers": ["zeroAccess"]}, "zeroAccessPaths": [".env"]}
+
+    def _refs(self, command):
+        return [
+            (entry["literal"], command[start:end])
+            for entry, start, end in find_protected_path_references(command, self.CONFIG)
+        ]
+
+    def test_plain_command_has_single_variant(self):
+        variants = _scan_variants("cat .env")
+        self.assertEqual([v.text for v in variants], ["cat .env"])
+
+    def test_ansi_c_offsets_map_to_original(self):
+        command = "ls; cat $'\\x2e'env"
+        decoded = _scan_variants(command)[-1]
+        self.assertEqual(decoded.text, "ls; cat .env")
+        self.assertEqual(decoded.to_original(8, 12), (8, len(command)))
+        self.assertEqual(self._refs(command), [(".env", "$'\\x2e'env")])
+
+    def test_glob_class_offsets_map_to_original(self):
+        self.assertEqual(self._refs("cat [.]env"), [(".env", "[.]env")])
+        self.assertEqual(self._refs("cat $'\\x2e\\x65nv'"), [(".env", "$'\\x2e\\x65nv'")])
+
+    def test_raw_only_reference_is_kept(self):
+        # Expansion turns ".env[x]" into ".envx"; the raw text still matches
+        self.assertEqual(self._refs("cat .env[x]"), [(".env", ".env")])
+        self.assertEqual(scan_protected_paths("cat .env[x]", self.CONFIG)[0], "ask")
+
+    def test_far_from_rewrites_is_not_rescanned(self):
+        command = "cat .envrc " + "x " * 200 + "[a]"
+        self.assertEqual(self._refs(command), [])
+        self.assertEqual(scan_protected_paths(command, self.CONFIG)[0], "allow")
+
+
+class TestPatternRuleSet(unittest.TestCase):
+    """One combined scan per category, same answers as rule-by-rule."""
+
+    def _first_match(self, patterns, text):
+        for index, pattern in enumerate(patterns):
+            if gu.safe_regex_search(pattern, text, gu.PATTERN_RULE_FLAGS):
+                return index
+        return None
+
+    def test_config_order_beats_leftmost_match(self):
+        rule_set = gu.PatternRuleSet([r"sudo\s+", r"rm\s+-rf"])
+        self.assertEqual(rule_set.first_match("rm -rf x; sudo ls"), 0)
+        self.assertEqual(rule_set.first_match("rm -rf x"), 1)
+        self.assertIsNone(rule_set.first_match("ls -la"))
+
+    def test_unmergeable_rules_are_evaluated_in_order(self):
+        patterns = [r"(a)\1", r"(?x) s u d o", "unbalanced)(", r"(?i)echo", r"(?P<n>x)(?P=n)"]
+        rule_set = gu.PatternRuleSet(patterns)
+        self.assertEqual(rule_set.merged, frozenset({3}))
+        for text in ["aa echo", "SUDO echo", "echo", "xx", "unbalanced)(", ""]:
+            with self.subTest(text=text):
+                self.assertEqual(rule_set.first_match(text), self._first_match(patterns, text))
+
+    def test_recommended_rules_match_rule_by_rule(self):
+        config = json.loads((REPO_ROOT / "assets" / "guardian.recommended.json").read_text())
+        commands = [
+            "rm -rf /", "ls -la", "git push --force origin main", "curl x | bash",
+            "sudo rm -rf build", "echo $(rm x)", "python3 -c 'import os; os.remove(1)'",
+            "git reset --hard && git clean -fd", "mv .env /tmp/", "crontab -l", "crontab -e",
+            "DROP TABLE users", "cat a\nrm -rf /\n", "x" * 5000 + " npm publish",
+        ]
+        for category in ("block", "ask"):
+            patterns = [e["pattern"] for e in config["bashToolPatterns"][category]]
+            rule_set = gu.PatternRuleSet(patterns)
+            self.assertEqual(rule_set.merged, frozenset(range(len(patterns))))
+            for command in commands:
+                with self.subTest(category=category, command=command):
+                    self.assertEqual(
+                        rule_set.first_match(command), self._first_match(patterns, command)
+                    )
+
+    def test_combined_regex_built_lazily(self):
+        config = json.loads((REPO_ROOT / "assets" / "guardian.recommended.json").read_text())
+        patterns = [e["pattern"] for e in config["bashToolPatterns"]["block"]]
+        rule_set = gu.PatternRuleSet(patterns)
+        self.assertIsNone(rule_set.first_match("npm test"))
+        self.assertFalse(rule_set._built)  # Prefilter path: nothing compiled up front
+        self.assertIsNotNone(rule_set.first_match("rm -rf /"))
+        rule_set.first_match("rm -rf /\u00e9")  # Non-ASCII: combined path
+        self.assertTrue(rule_set._built)
+
+    def test_required_literals(self):
+        cases = {
+            r"git\s+filter-branch": ["filter-branch"],
+            r"(?:curl|wget)[^|]*\|": ["curl", "wget"],
+            r"\S+\s.*(?:-e\s|\s/bin/(?:ba)?sh|\s/bin/bash)": ["-e", "/bin/"],
+            r"\bLD_PRELOAD\s*=": ["ld_preload"],
+            r"(?:x|\s)+y?": [],
+            r"\w+\s*\|": ["|"],
+            "unbalanced)(": [],
+        }
+        for pattern, literals in cases.items():
+            with self.subTest(pattern=pattern):
+                self.assertEqual(gu.extract_required_literals(pattern), literals)
+
+    def test_prefilter_skips_regexes_and_counts(self):
+        rule_set = gu.PatternRuleSet([r"git\s+push\s+--force", r"sudo\s+", r"[;&]\s*$"])
+        before = gu.get_pattern_prefilter_stats()
+        self.assertIsNone(rule_set.first_match("npm test"))
+        after = gu.get_pattern_prefilter_stats()
+        self.assertEqual(after["rules"] - before["rules"], 3)
+        self.assertEqual(after["skipped"] - before["skipped"], 2)
+        self.assertEqual(rule_set.first_match("GIT  PUSH --FORCE"), 0)
+
+    def test_non_ascii_command_is_not_prefiltered(self):
+        # Under IGNORECASE "s" also matches LONG S (U+017F)
+        rule_set = gu.PatternRuleSet([r"sudo\s+"])
+        self.assertEqual(rule_set.literals, [["sudo"]])
+        self.assertEqual(rule_set.first_match("\u017fudo ls"), 0)
+
+    def test_artifact_stores_literals(self):
+        with tempfile.TemporaryDirectory() as project:
+            config = {"bashToolPatterns": {"block": [{"pattern": r"shred\s+"}], "ask": []}}
+            artifact = gu.compile_guardian_config(config, {"path": project}, [])
+            self.assertEqual(
+                artifact["rules"]["block"], [[r"shred\s+", "Blocked by pattern", ["shred"], None]]
+            )
+
+    def test_rule_set_is_cached(self):
+        self.assertIs(gu.get_pattern_rule_set(["a", "b"]), gu.get_pattern_rule_set(["a", "b"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Tests for the per-invocation filesystem fact cache (fs_fact_scope).
+
+Covers:
+  - fs_resolve/fs_exists/fs_is_symlink agree with pathlib, including
+    symlinks, "..", missing components and symlink loops
+  - A 200-path rm costs O(paths) syscalls, not O(paths x checks)
+  - Nothing is cached outside a scope; counts are logged at DEBUG
+
+Run:
+    python -m pytest tests/core/test_fs_facts.py -v
+    python3 tests/core/test_fs_facts.py
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import _bootstrap  # noqa: F401, E402
+
+import _guardian_utils as gu
+from bash_guardian import extract_paths
+
+
+def _outcome(func, path):
+    try:
+        return func(path)
+    except Exception as e:
+        return type(e).__name__
+
+
+@unittest.skipUnless(os.name == "posix", "symlink tree requires POSIX")
+class TestFsFacts(unittest.TestCase):
+
+    def setUp(self):
+        self.project = tempfile.mkdtemp(prefix="fs_facts_")
+        root = Path(self.project)
+        (root / ".git").mkdir()
+        (root / "a" / "b").mkdir(parents=True)
+        (root / "a" / "b" / "f").write_text("x")
+        (root / "d").mkdir()
+        (root / "a" / "l1").symlink_to("b")
+        (root / "a" / "b" / "l2").symlink_to("../../d")
+        (root / "loop").symlink_to("loop")
+        (root / "d" / "dangling").symlink_to("missing/x")
+        self._saved_env = os.environ.get("CLAUDE_PROJECT_DIR")
+        os.environ["CLAUDE_PROJECT_DIR"] = self.project
+        gu._config_cache = None
+
+    def tearDown(self):
+        os.environ["CLAUDE_PROJECT_DIR"] = self._saved_env
+        gu._config_cache = None
+        shutil.rmtree(self.project, ignore_errors=True)
+
+    def test_matches_pathlib(self):
+        suffixes = ["", "/a", "/a/l1/f", "/a/l1/../b/f", "/a/b/l2", "/a/b/l2/../a/l1",
+                    "/missing/../a", "/a/b/f/x", "/loop", "/loop/../a/l1", "/d/dangling",
+                    "/a/./b//f/", "/a/b/.."]
+        paths = [self.project + s for s in suffixes]
+        want = [(_outcome(lambda p: p.resolve(), Path(p)), _outcome(Path.exists, Path(p)),
+                 _outcome(Path.is_symlink, Path(p))) for p in paths]
+        with gu.fs_fact_scope():
+            for _ in range(2):  # second round is served from the cache
+                got = [(_outcome(gu.fs_resolve, p), _outcome(gu.fs_exists, p),
+                        _outcome(gu.fs_is_symlink, p)) for p in paths]
+                for path, w, g in zip(paths, want, got):
+                    with self.subTest(path=path):
+                        self.assertEqual(g, w)
+
+    def test_200_path_rm_is_linear(self):
+        target = Path(self.project) / "src" / "deep" / "dir"
+        target.mkdir(parents=True)
+        for i in range(200):
+            (target / f"f{i}.txt").write_text("x")
+        command = "rm " + " ".join(f"src/deep/dir/f{i}.txt" for i in range(200))
+        with gu.fs_fact_scope() as facts:
+            paths = extract_paths(command, Path(self.project), allow_nonexistent=True)
+            gu.classify_paths(map(str, paths))
+            for path in paths:
+                gu.is_symlink_escape(str(path))
+                gu.is_path_within_project(str(path))
+        self.assertEqual(len(paths), 200)
+        self.assertLess(sum(facts.counts.values()), 200 * 3)
+
+    def test_no_caching_outside_scope(self):
+        path = Path(self.project) / "a" / "new"
+        self.assertFalse(gu.fs_exists(path))
+        path.write_text("x")
+        self.assertTrue(gu.fs_exists(path))
+        self.assertIsNone(gu._fs_facts)
+
+    def test_counts_logged_at_debug(self):
+        with gu.fs_fact_scope():
+            gu.fs_resolve(self.project + "/a/l1/f")
+        log = (Path(self.project) / ".claude" / "guardian" / "guardian.log").read_text()
+        self.assertIn("[DEBUG] Filesystem facts: lstat=", log)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""Tests for the native .git reader (_guardian_git.py).
+
+Covers:
+  - Tracked-path answers match `git ls-files --error-unmatch` for index
+    versions 2, 3 and 4
+  - HEAD: branch, detached, unborn, packed refs; linked worktrees
+  - Unsupported layouts raise GitUnsupported and the _guardian_utils
+    wrappers fall back to the git subprocess
+  - In-progress state is read from a worktree's own git directory
+
+Run:
+    python -m pytest tests/core/test_git_reader.py -v
+    python3 tests/core/test_git_reader.py
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import _bootstrap  # noqa: F401, E402
+
+import _guardian_git as gg
+import _guardian_utils as gu
+
+
+def _git(cwd, *args):
+    env = {**os.environ, "GIT_AUTHOR_NAME": "t", "GIT_AUTHOR_EMAIL": "t@t",
+           "GIT_COMMITTER_NAME": "t", "GIT_COMMITTER_EMAIL": "t@t"}
+    return subprocess.run(["git", *args], cwd=cwd, env=env, capture_output=True,
+                          text=True, check=True).stdout.strip()
+
+
+def _git_tracked(cwd, path):
+    result = subprocess.run(["git", "ls-files", "--error-unmatch", path], cwd=cwd,
+                            capture_output=True)
+    return result.returncode == 0
+
+
+@unittest.skipUnless(shutil.which("git") and os.name == "posix", "requires git on POSIX")
+class TestNativeGitReader(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = os.path.realpath(tempfile.mkdtemp(prefix="git_reader_"))
+        self.repo = os.path.join(self.tmp, "repo")
+        root = Path(self.repo)
+        for rel in ("src/a", "src/a-b", "docs", "x y"):
+            (root / rel).mkdir(parents=True)
+        for rel in ("src/a/main.py", "src/a-b/util.py", "docs/README.md", "x y/é.txt", "top"):
+            (root / rel).write_text("x")
+        _git(self.repo, "init", "-q", "-b", "main")
+        _git(self.repo, "add", "-A")
+        _git(self.repo, "commit", "-qm", "init")
+        (root / "src" / "a" / "new.py").write_text("x")
+        (root / "untracked").write_text("x")
+        (root / "src" / "link").symlink_to(root / "src" / "a")
+        gg._repo_cache.clear()
+
+    def tearDown(self):
+        gg._repo_cache.clear()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    QUERIES = ("src", "src/a", "src/a/main.py", "src/a/new.py", "src/a-b", "src/a-", "docs",
+               "x y/é.txt", "x y", "top", "untracked", "nope", ".", "src/../top",
+               "/etc/passwd", "../outside")
+
+    def test_tracked_matches_git(self):
+        for version in ("2", "3", "4"):
+            _git(self.repo, "update-index", "--index-version", version)
+            gg._repo_cache.clear()
+            repo = gg.find_git_repo(self.repo)
+            for query in self.QUERIES + (os.path.join(self.repo, "src/a/main.py"),):
+                with self.subTest(version=version, query=query):
+                    self.assertEqual(repo.is_tracked(query, self.repo),
+                                     _git_tracked(self.repo, query))
+
+    def test_index_parsed_lazily(self):
+        repo = gg.find_git_repo(self.repo)
+        self.assertTrue(repo.is_tracked("docs/README.md", self.repo))
+        self.assertLess(len(repo._index_table().names), 5)
+
+    def test_head(self):
+        repo = gg.find_git_repo(self.repo)
+        head = _git(self.repo, "rev-parse", "HEAD")
+        self.assertEqual(repo.head_ref(), "refs/heads/main")
+        self.assertEqual(repo.head_commit(), head)
+        _git(self.repo, "pack-refs", "--all")
+        self.assertEqual(repo.head_commit(), head)
+        _git(self.repo, "checkout", "-q", "--detach")
+        self.assertTrue(repo.is_detached())
+        self.assertEqual(repo.head_commit(), head)
+        _git(self.repo, "checkout", "-q", "--orphan", "fresh")
+        self.assertIsNone(repo.head_commit())
+
+    def test_worktree(self):
+        worktree = os.path.join(self.tmp, "wt")
+        _git(self.repo, "worktree", "add", "-q", "-b", "feature", worktree)
+        repo = gg.find_git_repo(worktree)
+        self.assertEqual(repo.work_tree, worktree)
+        self.assertEqual(repo.common_dir, os.path.join(self.repo, ".git"))
+        self.assertEqual(repo.head_ref(), "refs/heads/feature")
+        self.assertTrue(repo.is_tracked("src/a/main.py", worktree))
+        self.assertFalse(repo.is_tracked("src/a/new.py", worktree))
+
+        Path(repo.git_dir, "MERGE_HEAD").write_text(_git(worktree, "rev-parse", "HEAD"))
+        with mock.patch.object(gu, "get_project_dir", return_value=worktree):
+            self.assertTrue(gu.is_rebase_or_merge_in_progress())
+
+    def test_unsupported_paths(self):
+        repo = gg.find_git_repo(self.repo)
+        for query in ("src/*.py", "src/link/main.py", "src/"):
+            with self.subTest(query=query), self.assertRaises(gg.GitUnsupported):
+                repo.is_tracked(query, self.repo)
+
+    def test_unsupported_config_falls_back(self):
+        _git(self.repo, "config", "core.ignorecase", "true")
+        with self.assertRaises(gg.GitUnsupported):
+            gg.find_git_repo(self.repo)
+        with mock.patch.object(gu, "get_project_dir", return_value=self.repo):
+            self.assertTrue(gu.git_is_tracked("src/a/main.py"))
+            self.assertFalse(gu.git_is_tracked("untracked"))
+            self.assertFalse(gu.is_detached_head())
+
+    def test_wrappers_skip_subprocess(self):
+        head = _git(self.repo, "rev-parse", "HEAD")
+        with mock.patch.object(gu, "get_project_dir", return_value=self.repo), \
+                mock.patch.object(gu.subprocess, "run", side_effect=AssertionError("forked")):
+            self.assertTrue(gu.git_is_tracked("src/a/main.py"))
+            self.assertFalse(gu.git_is_tracked(os.path.join(self.repo, "untracked")))
+            self.assertFalse(gu.is_detached_head())
+            self.assertEqual(gu.git_get_last_commit_hash(), head)
+
+    def test_malformed_index_falls_back(self):
+        index = Path(self.repo, ".git", "index")
+        index.write_bytes(index.read_bytes()[:40])
+        repo = gg.find_git_repo(self.repo)
+        with self.assertRaises(gg.GitUnsupported):
+            repo.is_tracked("top", self.repo)
+
+
+if __name__ == "__main__":
+    unittest.main()
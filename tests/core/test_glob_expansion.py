@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""Tests for bounded lazy wildcard expansion in bash_guardian.extract_paths().
+
+Covers:
+  - _iter_glob() yields exactly what glob.glob() returns (hidden files,
+    trailing slashes, character classes, symlinks)
+  - Expansion stops at the first match in a deny tier
+  - Exceeding globExpansion.maxEntries asks instead of expanding further
+  - globExpansion config validation
+
+Run:
+    python -m pytest tests/core/test_glob_expansion.py -v
+    python3 tests/core/test_glob_expansion.py
+"""
+
+import glob
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import _bootstrap  # noqa: F401, E402
+
+import _guardian_utils as gu
+import bash_guardian as bg
+
+SCRIPTS_DIR = Path(_bootstrap._SCRIPTS_DIR)
+REPO_ROOT = SCRIPTS_DIR.parent.parent
+
+
+def _reset_config_cache():
+    gu._config_cache = None
+    gu._using_fallback_config = False
+    gu._active_config_path = None
+    gu._compiled_config = None
+    gu._path_classifier_cache.clear()
+
+
+class TestGlobExpansion(unittest.TestCase):
+
+    def setUp(self):
+        self.project = os.path.realpath(tempfile.mkdtemp(prefix="glob_expansion_"))
+        root = Path(self.project)
+        for rel in ("logs", "sub", ".hid"):
+            (root / rel).mkdir()
+        for rel in ("a.log", "b.log", ".h.log", "main.py", "a[1]", "sub/c.o", "sub/.e",
+                    ".hid/d.o", ".env", "key.pem"):
+            (root / rel).write_text("x")
+        for i in range(50):
+            (root / "logs" / f"{i}.log").write_text("x")
+        if os.name == "posix":
+            (root / "link").symlink_to(root / "sub")
+        self.guardian_dir = root / ".claude" / "guardian"
+        self.guardian_dir.mkdir(parents=True)
+        self.config = json.loads((REPO_ROOT / "assets" / "guardian.default.json").read_text())
+        self._write_config()
+        self._saved_env = os.environ.get("CLAUDE_PROJECT_DIR")
+        os.environ["CLAUDE_PROJECT_DIR"] = self.project
+        _reset_config_cache()
+
+    def tearDown(self):
+        os.environ["CLAUDE_PROJECT_DIR"] = self._saved_env
+        _reset_config_cache()
+        shutil.rmtree(self.project, ignore_errors=True)
+
+    def _write_config(self):
+        (self.guardian_dir / "config.json").write_text(json.dumps(self.config))
+
+    def test_matches_glob(self):
+        patterns = ["*.log", "*", "*/*", "*/", "*/*.o", ".*", "[ab].log", "a[[]1]",
+                    "s*/c.o", "link/*", "sub/", "nope/*", "*/.e"]
+        for pattern in patterns:
+            full = os.path.join(self.project, pattern)
+            with self.subTest(pattern=pattern):
+                self.assertEqual(sorted(bg._iter_glob(full, [10**6], float("inf"))),
+                                 sorted(glob.glob(full)))
+
+    def test_stops_at_deny(self):
+        with mock.patch.object(bg, "classify_path", wraps=bg.classify_path) as spy:
+            paths = bg.extract_paths("rm .e*", Path(self.project),
+                                     deny_tiers=frozenset({"zeroAccess"}))
+        self.assertEqual(paths, [Path(self.project) / ".env"])
+        self.assertEqual(spy.call_count, 1)
+
+    def test_budget_exceeded(self):
+        self.config["globExpansion"] = {"maxEntries": 10}
+        self._write_config()
+        _reset_config_cache()
+        verdicts = []
+        paths = bg.extract_paths("rm logs/*.log", Path(self.project), verdicts=verdicts)
+        self.assertLessEqual(len(paths), 10)
+        self.assertEqual(verdicts, [("ask", "Too many entries to check for wildcard: logs/*.log")])
+
+        env = os.environ.copy()
+        env["CLAUDE_PLUGIN_ROOT"] = str(REPO_ROOT)
+        env.pop("CLAUDE_HOOK_DRY_RUN", None)
+        payload = {"tool_name": "Bash", "tool_input": {"command": "ls logs/*.log"}}
+        result = subprocess.run(
+            [sys.executable, str(SCRIPTS_DIR / "bash_guardian.py")],
+            input=json.dumps(payload), capture_output=True, text=True, timeout=30, env=env,
+        )
+        output = json.loads(result.stdout)["hookSpecificOutput"]
+        self.assertEqual(output["permissionDecision"], "ask")
+        self.assertIn("Too many entries", output["permissionDecisionReason"])
+
+    def test_within_budget_allows(self):
+        verdicts = []
+        paths = bg.extract_paths("ls logs/*.log", Path(self.project), verdicts=verdicts)
+        self.assertEqual(len(paths), 50)
+        self.assertEqual(verdicts, [])
+
+
+class TestGlobExpansionConfigValidation(unittest.TestCase):
+
+    BASE = {"bashToolPatterns": {"block": [], "ask": []}, "zeroAccessPaths": []}
+
+    def _errors(self, section):
+        return [e for e in gu.validate_guardian_config({**self.BASE, "globExpansion": section})
+                if "globExpansion" in e]
+
+    def test_validation(self):
+        self.assertEqual(self._errors({"maxEntries": 5000, "maxMilliseconds": 200}), [])
+        self.assertEqual(len(self._errors({"maxEntries": 0})), 1)
+        self.assertEqual(len(self._errors({"maxMilliseconds": True})), 1)
+        self.assertEqual(len(self._errors([])), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
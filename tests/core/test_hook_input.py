@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Tests for the path guardians' hook input parser (parse_path_hook_input).
+
+Covers:
+  - Same tool_name / tool_input.file_path as json.loads(), including
+    duplicate keys, escaped keys and non-object tool_input
+  - Malformed input raises JSONDecodeError (fail-closed in the hook)
+  - Escapes split across string windows are validated correctly
+  - A large Write payload is never copied as a whole
+
+Run:
+    python -m pytest tests/core/test_hook_input.py -v
+    python3 tests/core/test_hook_input.py
+"""
+
+import json
+import sys
+import tracemalloc
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import _bootstrap  # noqa: F401, E402
+
+import _guardian_utils as gu
+from _guardian_utils import parse_path_hook_input
+
+
+def _needed_fields(data):
+    """What the hook reads from json.loads() output."""
+    if not isinstance(data, dict):
+        return data
+    result = {k: data[k] for k in ("tool_name", "tool_input") if k in data}
+    if isinstance(result.get("tool_input"), dict):
+        tool_input = result["tool_input"]
+        result["tool_input"] = {k: tool_input[k] for k in ("file_path",) if k in tool_input}
+    return result
+
+
+class TestParsePathHookInput(unittest.TestCase):
+
+    VALID = [
+        '{"tool_name": "Write", "tool_input": {"file_path": "/p/a.py", "content": "x\\n\\"y\\""}}',
+        '{"tool_input": {"content": [1, {"a": [true, null, -1.5e3]}], "file_path": 7}}',
+        '{"tool_name": "Read", "tool_name": "Edit", "tool_input": {"file_path": "a"},'
+        ' "tool_input": {"old_string": "s"}}',
+        '{"tool_\\u006eame": "Read", "tool_input": "not-a-dict", "x": NaN, "y": -Infinity}',
+        '{"tool_input": {"file_path": "\\ud83d\\ude00 caf\\u00e9"}, "nested": [[[{}]]]}',
+        ' {} ',
+        '[1, 2]',
+        '"text"',
+    ]
+
+    MALFORMED = [
+        "",
+        "{",
+        '{"tool_name": "Write",}',
+        '{"tool_name" "Write"}',
+        '{"tool_input": {"content": "bad \\x escape"}}',
+        '{"tool_input": {"content": "raw \x01 control"}}',
+        '{"tool_input": {"content": "unterminated}}',
+        '{"tool_name": "Write"} trailing',
+        '{"a": [1 2]}',
+        '{"a": tru}',
+        '{"a": 01}',
+        "\ufeff{}",
+    ]
+
+    def test_matches_json_loads(self):
+        for text in self.VALID:
+            with self.subTest(text=text):
+                self.assertEqual(parse_path_hook_input(text), _needed_fields(json.loads(text)))
+
+    def test_malformed_raises(self):
+        for text in self.MALFORMED:
+            with self.subTest(text=text):
+                with self.assertRaises(json.JSONDecodeError):
+                    json.loads(text)
+                with self.assertRaises(json.JSONDecodeError):
+                    parse_path_hook_input(text)
+
+    def test_escapes_across_windows(self):
+        bodies = ["\\\\" * 9, "a\\u00e9" * 5, "\\\"" * 7, "ab\\\\\\\"cd" * 3, "x\\u12", "x\\"]
+        for first, limit in [(1, 1), (2, 3), (3, 7), (5, 12)]:
+            with mock.patch.multiple(gu, _JSON_STRING_FIRST_WINDOW=first,
+                                     _JSON_STRING_WINDOW=limit):
+                for body in bodies:
+                    text = '{"tool_input": {"content": "' + body + '", "file_path": "/f"}}'
+                    with self.subTest(body=body, window=limit):
+                        try:
+                            want = _needed_fields(json.loads(text))
+                        except json.JSONDecodeError:
+                            with self.assertRaises(json.JSONDecodeError):
+                                parse_path_hook_input(text)
+                        else:
+                            self.assertEqual(parse_path_hook_input(text), want)
+
+    def test_large_payload_is_not_copied(self):
+        content = 'print("generated \\\\ code")\n' * 300_000  # ~8 MB
+        text = json.dumps({"tool_name": "Write",
+                           "tool_input": {"file_path": "/p/big.py", "content": content}})
+        tracemalloc.start()
+        try:
+            result = parse_path_hook_input(text)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(result["tool_input"], {"file_path": "/p/big.py"})
+        self.assertLess(peak, len(text) // 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""Tests for the tiered path classifier (PathClassifier / classify_path).
+
+Covers:
+  - Every tier agrees with the per-pattern match_path_pattern() loops
+    across the recommended config (exact, suffix, and residual buckets)
+  - match_* helpers and external_path_mode() keep their old answers
+  - Fail-closed behaviour for broken patterns and unresolvable paths
+  - Subtree summaries skip glob evaluation where no pattern can match
+  - classify_paths() classifies each distinct path once
+
+Run:
+    python -m pytest tests/core/test_path_classifier.py -v
+    python3 tests/core/test_path_classifier.py
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import _bootstrap  # noqa: F401, E402
+
+import _guardian_utils as gu
+
+REPO_ROOT = Path(_bootstrap._REPO_ROOT)
+
+
+def _reset_config_cache():
+    gu._config_cache = None
+    gu._using_fallback_config = False
+    gu._active_config_path = None
+    gu._compiled_config = None
+    gu._path_glob_cache.clear()
+    gu._path_classifier_cache.clear()
+
+
+def _legacy_tiers(config, path):
+    """The per-pattern loops the classifier replaces."""
+    tiers = set()
+    for tier, section in gu.PATH_TIERS.items():
+        patterns = config.get(section, [])
+        if tier in ("allowedExternalWrite", "allowedExternalRead"):
+            hit = any(gu.match_path_pattern(path, p) for p in patterns if isinstance(p, str))
+        else:
+            hit = any(gu.match_path_pattern(path, p, default_on_error=True) for p in patterns)
+        if hit:
+            tiers.add(tier)
+    return frozenset(tiers)
+
+
+class TestPathClassifier(unittest.TestCase):
+
+    def setUp(self):
+        self.project = tempfile.mkdtemp(prefix="path_classifier_")
+        (Path(self.project) / ".git").mkdir()
+        guardian_dir = Path(self.project) / ".claude" / "guardian"
+        guardian_dir.mkdir(parents=True)
+        self.config = json.loads((REPO_ROOT / "assets" / "guardian.recommended.json").read_text())
+        self.config["readOnlyPaths"] += ["src/gen/**", "docs/*.md", "build?/out[0-9].bin"]
+        self.config["allowedExternalWritePaths"] = ["/opt/shared/**", 42]
+        self.config["allowedExternalReadPaths"] = ["/opt/**", "~/notes/*.txt"]
+        (guardian_dir / "config.json").write_text(json.dumps(self.config))
+        self._saved_env = os.environ.get("CLAUDE_PROJECT_DIR")
+        os.environ["CLAUDE_PROJECT_DIR"] = self.project
+        _reset_config_cache()
+
+    def tearDown(self):
+        os.environ["CLAUDE_PROJECT_DIR"] = self._saved_env
+        _reset_config_cache()
+        shutil.rmtree(self.project, ignore_errors=True)
+
+    def _paths(self):
+        names = ["id_rsa", ".env", ".env.local", "key.pem", "KEY.PEM", "poetry.lock",
+                 "package-lock.json", "README.md", "main.py", "out3.bin", "a", ""]
+        dirs = [self.project, self.project + "/src", self.project + "/src/gen/deep",
+                self.project + "/docs", self.project + "/build1", self.project + "/.git",
+                self.project + "/node_modules/x", self.project + "/.claude/guardian",
+                "/opt", "/opt/shared/sub", "/etc", os.path.expanduser("~/notes"),
+                os.path.expanduser("~/.ssh")]
+        paths = [os.path.join(d, n) for d in dirs for n in names]
+        return paths + [self.project, "/", "relative/file.txt", "~/.aws/credentials"]
+
+    def test_matches_per_pattern_loops(self):
+        config = gu.load_guardian_config()
+        for path in self._paths():
+            with self.subTest(path=path):
+                self.assertEqual(gu.classify_path(path), _legacy_tiers(config, path))
+
+    def test_match_helpers_unchanged(self):
+        ssh_key = os.path.expanduser("~/.ssh/id_rsa")
+        self.assertTrue(gu.match_zero_access(ssh_key))
+        self.assertTrue(gu.match_read_only(self.project + "/src/gen/deep/a"))
+        self.assertFalse(gu.match_read_only(self.project + "/src/a"))
+        self.assertEqual(gu.match_allowed_external_path("/opt/shared/x"), "readwrite")
+        self.assertEqual(gu.match_allowed_external_path("/opt/x"), "read")
+        self.assertIsNone(gu.match_allowed_external_path("/etc/x"))
+        self.assertEqual(gu.external_path_mode(frozenset()), None)
+
+    def test_tier_restriction(self):
+        path = self.project + "/src/gen/.env"
+        self.assertEqual(gu.classify_path(path), frozenset({"zeroAccess", "readOnly"}))
+        self.assertEqual(gu.classify_path(path, ("readOnly",)), frozenset({"readOnly"}))
+
+    def test_unresolvable_path_fails_closed(self):
+        with mock.patch.object(gu, "expand_path", side_effect=OSError("boom")):
+            tiers = gu.classify_path(self.project + "/main.py")
+        self.assertIn("zeroAccess", tiers)
+        self.assertIn("readOnly", tiers)
+        self.assertNotIn("allowedExternalRead", tiers)
+
+    def test_broken_pattern_fails_closed(self):
+        classifier = gu.PathClassifier({"zeroAccess": [None], "allowedExternalRead": [None]})
+        self.assertEqual(classifier.classify(self.project + "/main.py"),
+                         frozenset({"zeroAccess"}))
+
+    def test_unreachable_subtree_skips_globs(self):
+        gu.classify_path(self.project + "/src/components/warm.tsx")
+        with mock.patch.object(gu, "_match_normalized", wraps=gu._match_normalized) as spy:
+            gu.classify_path(self.project + "/src/components/Button.tsx")
+            self.assertEqual(spy.call_count, 0)
+            self.assertEqual(gu.classify_path(self.project + "/src/gen/deep/a.py"),
+                             frozenset({"readOnly"}))
+            self.assertEqual(spy.call_count, 1)
+
+    def test_floating_patterns_indexed_by_tail(self):
+        classifier = gu.PathClassifier({"zeroAccess": ["**/secrets/*.key", "*token*"]})
+        with mock.patch.object(gu, "_match_normalized", wraps=gu._match_normalized) as spy:
+            self.assertEqual(classifier.classify(self.project + "/a/secrets/b.key"),
+                             frozenset({"zeroAccess"}))
+            self.assertEqual(spy.call_count, 2)
+            self.assertEqual(classifier.classify(self.project + "/a/my-token/x.txt"),
+                             frozenset({"zeroAccess"}))
+            self.assertEqual(classifier.classify(self.project + "/a/secrets/b.pem"),
+                             frozenset())
+
+    def test_classify_paths_dedups(self):
+        path = self.project + "/main.py"
+        with mock.patch.object(gu, "classify_path", wraps=gu.classify_path) as spy:
+            result = gu.classify_paths([path, Path(path), path])
+        self.assertEqual(list(result), [path])
+        self.assertEqual(spy.call_count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""Tests for the protected-file manifest (_guardian_manifest.py).
+
+Covers:
+  - Recorded entries and subtree counts agree with classify_path() on
+    every entry of the tree, including covered "<dir>/**" subtrees
+  - Incremental refresh: unchanged directories are not re-listed; added
+    and removed entries and directories are picked up
+  - Pattern changes rebuild the manifest
+  - Bash directory deletes ask when protected entries exist below the
+    target (only with protectedManifest.enabled)
+  - Recursive readers (grep -r, tar c, cp -r, ...) ask when zeroAccess
+    entries exist below their roots, or when refreshing the manifest
+    would exceed the globExpansion budget
+  - build/show CLI; protectedManifest config validation
+
+Run:
+    python -m pytest tests/core/test_protected_manifest.py -v
+    python3 tests/core/test_protected_manifest.py
+"""
+
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import _bootstrap  # noqa: F401, E402
+
+import _guardian_manifest as gm
+import _guardian_utils as gu
+from bash_guardian import recursive_read_roots
+
+SCRIPTS_DIR = Path(_bootstrap._SCRIPTS_DIR)
+REPO_ROOT = SCRIPTS_DIR.parent.parent
+
+
+def _reset_caches():
+    gu._config_cache = None
+    gu._using_fallback_config = False
+    gu._active_config_path = None
+    gu._compiled_config = None
+    gu._path_classifier_cache.clear()
+    gm._loaded_manifest = None
+
+
+def _age(root):
+    """Backdate every directory past the racy window so records are trusted."""
+    old = time.time() - 3600
+    for dirpath, _, _ in os.walk(root):
+        os.utime(dirpath, (old, old))
+
+
+@unittest.skipUnless(os.name == "posix", "symlink tree requires POSIX")
+class TestProtectedManifest(unittest.TestCase):
+
+    def setUp(self):
+        self.project = os.path.realpath(tempfile.mkdtemp(prefix="manifest_"))
+        root = Path(self.project)
+        for rel in (".git/objects/ab", "src/a", "src/a-b", "node_modules/pkg/test", "docs"):
+            (root / rel).mkdir(parents=True)
+        for rel in (".env", ".git/objects/ab/cd", "src/a/key.pem", "src/a/main.py",
+                    "src/a-b/id_rsa", "node_modules/pkg/index.js",
+                    "node_modules/pkg/test/server.pem", "docs/README.md", "poetry.lock"):
+            (root / rel).write_text("x")
+        (root / "src" / "link").symlink_to(root / ".env")
+        (root / "src" / "dirlink").symlink_to(root / "node_modules")
+        self.guardian_dir = root / ".claude" / "guardian"
+        self.guardian_dir.mkdir(parents=True)
+        self.config = json.loads((REPO_ROOT / "assets" / "guardian.recommended.json").read_text())
+        self.config["protectedManifest"] = {"enabled": True}
+        self._write_config()
+        self._saved_env = os.environ.get("CLAUDE_PROJECT_DIR")
+        os.environ["CLAUDE_PROJECT_DIR"] = self.project
+        _reset_caches()
+
+    def tearDown(self):
+        os.environ["CLAUDE_PROJECT_DIR"] = self._saved_env
+        _reset_caches()
+        shutil.rmtree(self.project, ignore_errors=True)
+
+    def _write_config(self):
+        (self.guardian_dir / "config.json").write_text(json.dumps(self.config))
+
+    def _build(self):
+        manifest = gm.load_manifest()
+        manifest.refresh()
+        gm.save_manifest(manifest)
+        return manifest
+
+    def _expected_counts(self, rel_dir):
+        """Brute force: classify every entry below rel_dir."""
+        counts = dict.fromkeys(gm.MANIFEST_TIERS, 0)
+        top = os.path.join(self.project, rel_dir)
+        for dirpath, dirnames, filenames in os.walk(top):
+            for name in dirnames + filenames:
+                tiers = gu.classify_path(os.path.join(dirpath, name))
+                for tier in gm.MANIFEST_TIERS:
+                    counts[tier] += tier in tiers
+        return counts
+
+    def test_counts_match_classify_path(self):
+        manifest = self._build()
+        manifest.refresh()  # Pick up the saved manifest file itself
+        for rel_dir in ("", "src", "src/a", "src/a-b", "node_modules", ".git", "docs"):
+            with self.subTest(rel_dir=rel_dir):
+                counts = manifest.subtree_counts(rel_dir)
+                self.assertEqual(counts.pop("unreadable"), 0)
+                self.assertEqual(counts, self._expected_counts(rel_dir))
+
+    def test_entries(self):
+        entries = dict(self._build().entries())
+        self.assertEqual(entries["src/a/key.pem"], ["zeroAccess"])
+        self.assertEqual(entries["src/link"], ["zeroAccess"])  # Classified by target
+        self.assertEqual(entries["node_modules/**"], ["readOnly"])
+        self.assertEqual(entries["node_modules/pkg/test/server.pem"], ["zeroAccess"])
+        self.assertNotIn("node_modules/pkg/index.js", entries)  # Counted, not listed
+        self.assertNotIn("src/dirlink/pkg/index.js", entries)  # Not followed
+
+    def test_unchanged_tree_is_not_relisted(self):
+        _age(self.project)
+        self._build()
+        self._build()  # Records the manifest file itself
+        gm._loaded_manifest = None  # Reload from disk
+        manifest = gm.load_manifest()
+        with mock.patch.object(gm, "_list_directory", wraps=gm._list_directory) as spy:
+            manifest.refresh()
+        relisted = {os.path.relpath(call.args[0], self.project) for call in spy.call_args_list}
+        self.assertLessEqual(relisted, {".claude/guardian"})  # Written by the save
+        self.assertFalse(manifest.changed)
+
+    def test_incremental_changes(self):
+        _age(self.project)
+        manifest = self._build()
+        root = Path(self.project)
+        (root / "src" / "a" / "new.key").write_text("x")
+        shutil.rmtree(root / "node_modules" / "pkg" / "test")
+        (root / "src" / "a" / "deep").mkdir()
+        (root / "src" / "a" / "deep" / ".env.local").write_text("x")
+        with mock.patch.object(gm, "_list_directory", wraps=gm._list_directory) as spy:
+            manifest.refresh()
+        relisted = {os.path.relpath(call.args[0], self.project) for call in spy.call_args_list}
+        relisted.discard(".claude/guardian")  # Written by the save
+        self.assertEqual(relisted, {"src/a", "src/a/deep", "node_modules/pkg"})
+        self.assertNotIn("node_modules/pkg/test", manifest.dirs)
+        for rel_dir in ("", "src/a", "node_modules"):
+            counts = manifest.subtree_counts(rel_dir)
+            del counts["unreadable"]
+            self.assertEqual(counts, self._expected_counts(rel_dir))
+
+    def test_pattern_change_rebuilds(self):
+        self._build()
+        self.config["zeroAccessPaths"].append("*.py")
+        self._write_config()
+        _reset_caches()
+        manifest = gm.load_manifest()
+        self.assertEqual(manifest.dirs, {})
+        manifest.refresh("src")
+        self.assertEqual(manifest.subtree_counts("src/a")["zeroAccess"], 2)
+
+    def _bash(self, command):
+        env = os.environ.copy()
+        env["CLAUDE_PROJECT_DIR"] = self.project
+        env["CLAUDE_PLUGIN_ROOT"] = str(REPO_ROOT)
+        env["CLAUDE_HOOK_DRY_RUN"] = "1"
+        payload = {"tool_name": "Bash", "tool_input": {"command": command}}
+        subprocess.run(
+            [sys.executable, str(SCRIPTS_DIR / "bash_guardian.py")],
+            input=json.dumps(payload), capture_output=True, text=True, timeout=30, env=env,
+        )
+        return (self.guardian_dir / "guardian.log").read_text()
+
+    def test_directory_delete_asks(self):
+        log = self._bash("rm -r src")
+        self.assertIn("Directory delete contains protected entries: src (3 zeroAccess)", log)
+
+    def test_directory_delete_clean_and_disabled(self):
+        self.assertNotIn("protected entries", self._bash("rm -r src/a-b/../a/main.py"))
+        self.config["protectedManifest"]["enabled"] = False
+        self._write_config()
+        self.assertNotIn("protected entries", self._bash("rm -r src"))
+
+    def test_recursive_read_asks(self):
+        log = self._bash("grep -rn TOKEN .")
+        self.assertIn("Recursive read covers protected entries:", log)
+        self.assertIn("(5 zeroAccess)", log)  # .env, link, key.pem, id_rsa, server.pem
+        self.assertIn("Recursive read covers protected entries: src (3 zeroAccess)",
+                      self._bash("tar -C . -czf /tmp/out.tgz src"))
+        self.assertIn("Recursive read covers protected entries: dirlink (1 zeroAccess)",
+                      self._bash("cp -r src/dirlink /tmp/x"))  # Root symlink followed
+
+    def test_recursive_read_clean(self):
+        log = self._bash("grep -r TOKEN docs; cp -r docs /tmp/x; grep TOKEN src")
+        self.assertNotIn("Recursive read covers", log)
+
+    def test_bounded_refresh_resumes(self):
+        manifest = gm.load_manifest()
+        self.assertFalse(manifest.refresh("", max_entries=3))
+        self.assertTrue(manifest.refresh())
+        self.assertEqual(manifest.subtree_counts("src")["zeroAccess"],
+                         self._expected_counts("src")["zeroAccess"])
+
+    def test_recursive_read_budget_asks(self):
+        for i in range(20):
+            (Path(self.project) / "docs" / f"page{i}.md").write_text("x")
+        self.config["globExpansion"] = {"maxEntries": 5}
+        self._write_config()
+        log = self._bash("grep -r TOKEN docs")
+        self.assertIn("Protected manifest refresh budget exceeded: docs", log)
+        self.config["globExpansion"] = {"maxEntries": 100}
+        self._write_config()
+        self.assertNotIn("budget exceeded", self._bash("grep -r TOKEN docs")[len(log):])
+
+    def test_cli(self):
+        out = io.StringIO()
+        with redirect_stdout(out):
+            self.assertEqual(gm.main(["build"]), 0)
+        self.assertIn("zeroAccess=", out.getvalue())
+        out = io.StringIO()
+        with redirect_stdout(out):
+            self.assertEqual(gm.main(["show"]), 0)
+        self.assertIn("src/a/key.pem", out.getvalue())
+        self.assertTrue((self.guardian_dir / gm.MANIFEST_NAME).exists())
+
+
+class TestRecursiveReadRoots(unittest.TestCase):
+
+    def test_roots(self):
+        cases = {
+            "grep -r TOKEN .": ["."],
+            "grep -rn TOKEN": ["."],
+            "egrep -rA3 -e x src docs": ["src", "docs"],
+            "grep -d recurse k lib": ["lib"],
+            "tar czf out.tgz .": ["."],
+            "tar -C src -czf out.tgz a": ["src/a"],
+            "zip -r out.zip src": ["src"],
+            "cp -r . /tmp/x": ["."],
+            "cp -a -t /tmp src lib": ["src", "lib"],
+            "sudo rsync -a ./ host:": ["./"],
+            "rsync -av host:/x ./y": [],
+            "scp -r src host:/tmp": ["src"],
+            "grep TOKEN src": [],
+            "tar xzf out.tgz": [],
+            "zip out.zip a": [],
+            "cp a b": [],
+            "rg TOKEN": [],
+        }
+        for command, roots in cases.items():
+            with self.subTest(command=command):
+                self.assertEqual(recursive_read_roots(command), roots)
+
+
+class TestProtectedManifestConfigValidation(unittest.TestCase):
+
+    BASE = {"bashToolPatterns": {"block": [], "ask": []}, "zeroAccessPaths": []}
+
+    def _errors(self, section):
+        return [e for e in gu.validate_guardian_config({**self.BASE, "protectedManifest": section})
+                if "protectedManifest" in e]
+
+    def test_validation(self):
+        self.assertEqual(self._errors({"enabled": True}), [])
+        self.assertEqual(len(self._errors({"enabled": "yes"})), 1)
+        self.assertEqual(len(self._errors([])), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""Tests for the optional Read verdict cache (.claude/guardian/read-cache.json).
+
+Covers:
+  - A repeated Read is answered from the cache
+  - Config edits, symlink changes, file changes and guardian code changes
+    (plugin upgrades) invalidate entries
+  - Denials are never cached; disabled config writes no cache
+  - LRU eviction at readCache.maxEntries
+  - The cache file is self-guarded; readCache config validation
+
+Run:
+    python -m pytest tests/core/test_read_cache.py -v
+    python3 tests/core/test_read_cache.py
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import _bootstrap  # noqa: F401, E402
+
+from _guardian_utils import READ_CACHE_NAME, validate_guardian_config
+
+SCRIPTS_DIR = Path(_bootstrap._SCRIPTS_DIR)
+REPO_ROOT = SCRIPTS_DIR.parent.parent
+
+
+class TestReadCache(unittest.TestCase):
+
+    def setUp(self):
+        self.project = tempfile.mkdtemp(prefix="read_cache_")
+        root = Path(self.project)
+        (root / ".git").mkdir()
+        (root / "src").mkdir()
+        (root / "src" / "app.py").write_text("print('hi')\n")
+        (root / "src" / "util.py").write_text("")
+        (root / "src" / "lib.py").write_text("")
+        self.guardian_dir = root / ".claude" / "guardian"
+        self.guardian_dir.mkdir(parents=True)
+        self.cache_path = self.guardian_dir / READ_CACHE_NAME
+        self.config = json.loads((REPO_ROOT / "assets" / "guardian.default.json").read_text())
+        self.config["readCache"] = {"enabled": True}
+        self._write_config()
+
+    def tearDown(self):
+        shutil.rmtree(self.project, ignore_errors=True)
+
+    def _write_config(self):
+        config_path = self.guardian_dir / "config.json"
+        config_path.write_text(json.dumps(self.config))
+        # Older than the racy window, like any config not edited this second
+        old = time.time() - 60 - len(self.config.get("zeroAccessPaths", []))
+        os.utime(config_path, (old, old))
+
+    def _read(self, rel_path, plugin_root=REPO_ROOT):
+        """Run the Read hook; return (decision, newly logged lines)."""
+        log_path = self.guardian_dir / "guardian.log"
+        before = log_path.read_text() if log_path.exists() else ""
+        env = os.environ.copy()
+        env["CLAUDE_PROJECT_DIR"] = self.project
+        env["CLAUDE_PLUGIN_ROOT"] = str(plugin_root)
+        env.pop("CLAUDE_HOOK_DRY_RUN", None)
+        payload = {"tool_name": "Read", "tool_input": {"file_path": f"{self.project}/{rel_path}"}}
+        result = subprocess.run(
+            [sys.executable, str(Path(plugin_root) / "hooks" / "scripts" / "read_guardian.py")],
+            input=json.dumps(payload), capture_output=True, text=True, timeout=30, env=env,
+        )
+        decision = "allow"
+        if result.stdout.strip():
+            decision = json.loads(result.stdout)["hookSpecificOutput"]["permissionDecision"]
+        return decision, log_path.read_text()[len(before):]
+
+    def _entries(self):
+        return json.loads(self.cache_path.read_text())["entries"]
+
+    def test_repeated_read_hits(self):
+        self.assertEqual(self._read("src/app.py")[0], "allow")
+        self.assertIn(f"{self.project}/src/app.py", self._entries())
+        decision, log = self._read("src/app.py")
+        self.assertEqual(decision, "allow")
+        self.assertIn("Read (cached):", log)
+        self.assertNotIn("Loaded config", log)
+
+    def test_config_change_invalidates(self):
+        self._read("src/app.py")
+        self.config["zeroAccessPaths"].append("src/app.py")
+        self._write_config()
+        decision, log = self._read("src/app.py")
+        self.assertEqual(decision, "deny")
+        self.assertNotIn("(cached)", log)
+
+    def test_symlink_change_invalidates(self):
+        root = Path(self.project)
+        (root / "secret").mkdir()
+        (root / "secret" / "app.py").write_text("")
+        self.config["zeroAccessPaths"].append("secret/**")
+        self._write_config()
+        (root / "cur").symlink_to("src")
+        self.assertEqual(self._read("cur/app.py")[0], "allow")
+        self.assertIn("(cached)", self._read("cur/app.py")[1])
+        (root / "cur").unlink()
+        (root / "cur").symlink_to("secret")
+        self.assertEqual(self._read("cur/app.py")[0], "deny")
+
+    def test_file_change_invalidates(self):
+        self._read("src/app.py")
+        path = Path(self.project) / "src" / "app.py"
+        st = path.stat()
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        decision, log = self._read("src/app.py")
+        self.assertEqual(decision, "allow")
+        self.assertNotIn("(cached)", log)
+
+    def test_code_change_invalidates(self):
+        plugin = Path(self.project) / "plugin"
+        shutil.copytree(SCRIPTS_DIR, plugin / "hooks" / "scripts",
+                        ignore=shutil.ignore_patterns("__pycache__"))
+        shutil.copytree(REPO_ROOT / "assets", plugin / "assets")
+        self._read("src/app.py", plugin)
+        self.assertIn("(cached)", self._read("src/app.py", plugin)[1])
+        with open(plugin / "hooks" / "scripts" / "_guardian_utils.py", "a") as f:
+            f.write("\n# upgraded\n")
+        decision, log = self._read("src/app.py", plugin)
+        self.assertEqual(decision, "allow")
+        self.assertNotIn("(cached)", log)
+
+    def test_deny_is_not_cached(self):
+        (Path(self.project) / ".env").write_text("SECRET=1")
+        self.assertEqual(self._read(".env")[0], "deny")
+        self.assertFalse(self.cache_path.exists())
+
+    def test_disabled_writes_no_cache(self):
+        self.config["readCache"] = {"enabled": False}
+        self._write_config()
+        self._read("src/app.py")
+        self.assertFalse(self.cache_path.exists())
+
+    def test_lru_eviction(self):
+        self.config["readCache"]["maxEntries"] = 2
+        self._write_config()
+        for name in ("app", "util", "lib"):
+            self._read(f"src/{name}.py")
+        self.assertEqual(len(self._entries()), 2)
+
+    def test_cache_file_is_self_guarded(self):
+        self._read("src/app.py")
+        self.assertEqual(self._read(f".claude/guardian/{READ_CACHE_NAME}")[0], "deny")
+
+
+class TestReadCacheConfigValidation(unittest.TestCase):
+
+    BASE = {"bashToolPatterns": {"block": [], "ask": []}, "zeroAccessPaths": []}
+
+    def _errors(self, read_cache):
+        return [e for e in validate_guardian_config({**self.BASE, "readCache": read_cache})
+                if "readCache" in e]
+
+    def test_valid(self):
+        self.assertEqual(self._errors({"enabled": True, "maxEntries": 100}), [])
+
+    def test_invalid(self):
+        self.assertEqual(len(self._errors({"enabled": "yes"})), 1)
+        self.assertEqual(len(self._errors({"maxEntries": 0})), 1)
+        self.assertEqual(len(self._errors({"maxEntries": True})), 1)
+        self.assertEqual(len(self._errors([])), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
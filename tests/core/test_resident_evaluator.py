@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""Tests for the optional resident evaluator and its thin hook client.
+
+Covers:
+  - _guardian_client fallback contract (no socket / untrusted socket)
+  - Hooks do not import the client at all while no socket exists
+  - Forwarded verdicts match in-process verdicts for all four hooks
+  - Config reload, refusal of foreign projects, lazy start and stop
+  - evaluator config validation
+
+Run:
+    python -m pytest tests/core/test_resident_evaluator.py -v
+    python3 tests/core/test_resident_evaluator.py
+"""
+
+import io
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import _bootstrap  # noqa: F401, E402
+
+import _guardian_client as client
+from _guardian_utils import validate_guardian_config
+
+SCRIPTS_DIR = Path(_bootstrap._SCRIPTS_DIR)
+REPO_ROOT = SCRIPTS_DIR.parent.parent
+HAS_UNIX_SOCKETS = hasattr(socket, "AF_UNIX") and os.name == "posix"
+
+
+def _make_project(evaluator=None):
+    """Create a temp project with a config enabling the evaluator."""
+    project = tempfile.mkdtemp(prefix="evaluator_test_")
+    (Path(project) / ".git").mkdir()
+    config_dir = Path(project) / ".claude" / "guardian"
+    config_dir.mkdir(parents=True)
+    config = json.loads((REPO_ROOT / "assets" / "guardian.default.json").read_text())
+    config["evaluator"] = evaluator if evaluator is not None else {"enabled": True}
+    (config_dir / "config.json").write_text(json.dumps(config))
+    return project
+
+
+def _set_enabled(project, enabled):
+    config_path = Path(project) / ".claude" / "guardian" / "config.json"
+    config = json.loads(config_path.read_text())
+    config["evaluator"]["enabled"] = enabled
+    config_path.write_text(json.dumps(config))
+
+
+def _env(project):
+    env = os.environ.copy()
+    env["CLAUDE_PROJECT_DIR"] = project
+    env["CLAUDE_PLUGIN_ROOT"] = str(REPO_ROOT)
+    env.pop("CLAUDE_HOOK_DRY_RUN", None)
+    return env
+
+
+def _run_hook(project, hook, payload):
+    result = subprocess.run(
+        [sys.executable, str(SCRIPTS_DIR / f"{hook}_guardian.py")],
+        input=json.dumps(payload),
+        capture_output=True,
+        text=True,
+        timeout=30,
+        env=_env(project),
+        cwd=project,
+    )
+    return result.stdout
+
+
+def _wait_for(predicate, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def _control(project, op):
+    result = subprocess.run(
+        [sys.executable, str(SCRIPTS_DIR / "_guardian_evaluator.py"), op],
+        capture_output=True,
+        text=True,
+        timeout=30,
+        env=_env(project),
+    )
+    return result.returncode
+
+
+class TestClientFallback(unittest.TestCase):
+    """The client must hand control back with stdin intact on any problem."""
+
+    def setUp(self):
+        self.project = _make_project()
+        self._saved_stdin = sys.stdin
+        self._saved_env = os.environ.get("CLAUDE_PROJECT_DIR")
+
+    def tearDown(self):
+        sys.stdin = self._saved_stdin
+        os.environ["CLAUDE_PROJECT_DIR"] = self._saved_env
+        shutil.rmtree(self.project, ignore_errors=True)
+
+    def test_no_socket_restores_stdin(self):
+        os.environ["CLAUDE_PROJECT_DIR"] = self.project
+        sys.stdin = io.StringIO('{"tool_name": "Read"}')
+        self.assertFalse(client.forward_to_evaluator("read"))
+        self.assertEqual(sys.stdin.read(), '{"tool_name": "Read"}')
+
+    def test_no_socket_skips_client_import(self):
+        _set_enabled(self.project, False)  # The default: nothing may start one either
+        for hook in ("bash", "read", "edit", "write"):
+            with self.subTest(hook=hook):
+                result = subprocess.run(
+                    [sys.executable, "-X", "importtime",
+                     str(SCRIPTS_DIR / f"{hook}_guardian.py")],
+                    input=json.dumps({"tool_name": hook.capitalize(), "tool_input": {}}),
+                    capture_output=True, text=True, timeout=30, env=_env(self.project),
+                )
+                self.assertNotIn("_guardian_client", result.stderr)
+
+    def test_regular_file_is_not_trusted(self):
+        path = client.get_socket_path(self.project)
+        Path(path).write_text("not a socket")
+        self.assertFalse(client.is_trusted_socket(path))
+        self.assertIsNone(client.connect(self.project))
+
+    @unittest.skipUnless(HAS_UNIX_SOCKETS, "requires Unix domain sockets")
+    def test_foreign_listener_is_not_trusted(self):
+        """A socket served by some other program is never used."""
+        path = client.get_socket_path(self.project)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o077)
+        try:
+            server.bind(path)
+        finally:
+            os.umask(old_umask)
+        server.listen(1)
+        try:
+            self.assertTrue(client.is_trusted_socket(path))
+            if sys.platform.startswith("linux"):
+                self.assertIsNone(client.connect(self.project))
+        finally:
+            server.close()
+
+
+@unittest.skipUnless(HAS_UNIX_SOCKETS, "requires Unix domain sockets")
+class TestResidentEvaluator(unittest.TestCase):
+    """End-to-end: forwarded verdicts are identical to in-process verdicts."""
+
+    CASES = [
+        ("bash", {"tool_name": "Bash", "tool_input": {"command": "rm -rf /"}}),
+        ("bash", {"tool_name": "Bash", "tool_input": {"command": "ls -la"}}),
+        ("read", {"tool_name": "Read", "tool_input": {"file_path": "{p}/.env"}}),
+        ("read", {"tool_name": "Read", "tool_input": {"file_path": "{p}/src/app.py"}}),
+        ("edit", {"tool_name": "Edit", "tool_input": {"file_path": "{p}/poetry.lock"}}),
+        ("write", {"tool_name": "Write", "tool_input": {"file_path": "/etc/passwd"}}),
+        ("write", {"tool_name": "Write", "tool_input": "not-a-dict"}),
+    ]
+
+    def setUp(self):
+        self.project = _make_project({"enabled": True, "idleTimeoutSeconds": 60})
+        self.server = None
+
+    def tearDown(self):
+        _control(self.project, "stop")
+        if self.server is not None:
+            try:
+                self.server.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.server.kill()
+        shutil.rmtree(self.project, ignore_errors=True)
+
+    def _payload(self, payload):
+        return json.loads(json.dumps(payload).replace("{p}", self.project))
+
+    def _start_server(self):
+        self.server = subprocess.Popen(
+            [sys.executable, str(SCRIPTS_DIR / "_guardian_evaluator.py"), "serve"],
+            env=_env(self.project),
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        self.assertTrue(_wait_for(lambda: _control(self.project, "status") == 0))
+
+    def _forward(self, hook, payload):
+        """Forward through the client in this process and return (ok, output)."""
+        saved = (sys.stdin, sys.stdout, os.environ.copy())
+        os.environ.update(_env(self.project))
+        sys.stdin = io.StringIO(json.dumps(payload))
+        sys.stdout = io.StringIO()
+        try:
+            ok = client.forward_to_evaluator(hook)
+            return ok, sys.stdout.getvalue()
+        finally:
+            sys.stdin, sys.stdout = saved[0], saved[1]
+            os.environ.clear()
+            os.environ.update(saved[2])
+
+    def test_verdicts_match_in_process(self):
+        # Disabled config: the hook scripts always evaluate in-process
+        _set_enabled(self.project, False)
+        expected = [
+            _run_hook(self.project, hook, self._payload(payload)) for hook, payload in self.CASES
+        ]
+        _set_enabled(self.project, True)
+        self._start_server()
+        for (hook, payload), want in zip(self.CASES, expected):
+            with self.subTest(hook=hook, payload=payload):
+                ok, got = self._forward(hook, self._payload(payload))
+                self.assertTrue(ok)
+                self.assertEqual(got, want)
+                self.assertEqual(_run_hook(self.project, hook, self._payload(payload)), want)
+
+    def test_deny_verdict_is_forwarded(self):
+        self._start_server()
+        ok, out = self._forward("bash", self._payload(self.CASES[0][1]))
+        self.assertTrue(ok)
+        self.assertEqual(json.loads(out)["hookSpecificOutput"]["permissionDecision"], "deny")
+
+    def test_config_change_is_picked_up(self):
+        self._start_server()
+        payload = self._payload(
+            {"tool_name": "Read", "tool_input": {"file_path": "{p}/notes.secret"}}
+        )
+        ok, out = self._forward("read", payload)
+        self.assertTrue(ok)
+        self.assertEqual(out, "")
+
+        config_path = Path(self.project) / ".claude" / "guardian" / "config.json"
+        config = json.loads(config_path.read_text())
+        config["zeroAccessPaths"].append("*.secret")
+        config_path.write_text(json.dumps(config))
+        os.utime(config_path, ns=(time.time_ns(), time.time_ns() + 1_000_000))
+
+        ok, out = self._forward("read", payload)
+        self.assertTrue(ok)
+        self.assertEqual(json.loads(out)["hookSpecificOutput"]["permissionDecision"], "deny")
+
+    def test_other_project_is_refused(self):
+        self._start_server()
+        other = _make_project()
+        try:
+            sock = client.connect(self.project)
+            self.assertIsNotNone(sock)
+            with sock:
+                sock.settimeout(10)
+                env = _env(other)
+                client.send_message(
+                    sock,
+                    {
+                        "v": client.PROTOCOL_VERSION,
+                        "op": "evaluate",
+                        "hook": "read",
+                        "stdin": "{}",
+                        "env": {k: env[k] for k in client.FORWARDED_ENV_VARS if k in env},
+                        "cwd": other,
+                        "scripts_dir": str(SCRIPTS_DIR),
+                    },
+                )
+                with self.assertRaises((ConnectionError, OSError)):
+                    client.recv_message(sock)
+        finally:
+            shutil.rmtree(other, ignore_errors=True)
+
+    def test_hook_lazily_starts_evaluator(self):
+        _run_hook(self.project, "read", self._payload(self.CASES[3][1]))
+        self.assertTrue(_wait_for(lambda: _control(self.project, "status") == 0))
+
+    def test_disabled_config_does_not_start_evaluator(self):
+        _set_enabled(self.project, False)
+        _run_hook(self.project, "read", self._payload(self.CASES[3][1]))
+        time.sleep(0.5)
+        self.assertEqual(_control(self.project, "status"), 1)
+
+    def test_stop_removes_socket(self):
+        self._start_server()
+        self.assertEqual(_control(self.project, "stop"), 0)
+        self.server.wait(timeout=10)
+        self.assertFalse(os.path.exists(client.get_socket_path(self.project)))
+
+
+class TestEvaluatorConfigValidation(unittest.TestCase):
+    """validate_guardian_config() checks the optional evaluator section."""
+
+    BASE = {"bashToolPatterns": {"block": [], "ask": []}, "zeroAccessPaths": []}
+
+    def _errors(self, evaluator):
+        return [e for e in validate_guardian_config({**self.BASE, "evaluator": evaluator})
+                if "evaluator" in e]
+
+    def test_valid(self):
+        self.assertEqual(self._errors({"enabled": True, "idleTimeoutSeconds": 300}), [])
+
+    def test_enabled_must_be_bool(self):
+        self.assertEqual(len(self._errors({"enabled": "yes"})), 1)
+
+    def test_idle_timeout_must_be_positive(self):
+        self.assertEqual(len(self._errors({"idleTimeoutSeconds": 0})), 1)
+        self.assertEqual(len(self._errors({"idleTimeoutSeconds": True})), 1)
+
+    def test_section_must_be_object(self):
+        self.assertEqual(len(self._errors([])), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""Tests for the shared shell command model (_guardian_shell.py).
+
+Covers:
+  - parse_command() sub-command boundaries match split_commands()
+  - argv words match shlex.split(), with quoting and offsets
+  - Redirections (fd, operator, target) skip quoted text
+  - QuoteContext agrees with _is_inside_quotes() and scales linearly
+  - Heredoc and substitution spans are attached to their sub-command
+  - Layer 3/4 detectors give the same answers for str and SubCommand input
+
+Run:
+    python -m pytest tests/core/test_shell_model.py -v
+    python3 tests/core/test_shell_model.py
+"""
+
+import shlex
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import _bootstrap  # noqa: F401, E402
+
+from _guardian_shell import (
+    QuoteContext,
+    SubCommand,
+    _is_inside_quotes,
+    parse_command,
+    split_commands,
+)
+from bash_guardian import (
+    extract_paths,
+    extract_redirection_targets,
+    is_delete_command,
+    is_write_command,
+)
+
+
+class TestParseCommand(unittest.TestCase):
+
+    COMMANDS = [
+        "ls -la",
+        "echo a; echo b && rm c || true | cat & sleep 1",
+        "cat <<EOF | grep x\nbody; rm -rf /\nEOF\necho done",
+        "echo $(cd /tmp; ls) `date; id` > out.txt",
+        "( cd sub && make ) ; { echo a; echo b; }",
+        "",
+        "   ",
+    ]
+
+    def test_boundaries_match_split_commands(self):
+        for cmd in self.COMMANDS:
+            with self.subTest(cmd=cmd):
+                parsed = parse_command(cmd)
+                self.assertEqual([s.text for s in parsed.sub_commands], split_commands(cmd))
+                for sub in parsed.sub_commands:
+                    self.assertEqual(cmd[sub.start:sub.end], sub.text)
+
+    def test_heredoc_attached_to_owner(self):
+        cmd = "cat <<EOF | grep x\nbody; rm -rf /\nEOF\necho <<-'END' ok\n\tline\n\tEND\n"
+        parsed = parse_command(cmd)
+        cat, grep, echo = parsed.sub_commands
+        self.assertEqual(len(cat.heredocs), 1)
+        self.assertEqual(grep.heredocs, [])
+        body = cat.heredocs[0]
+        self.assertEqual(body.delimiter, "EOF")
+        self.assertFalse(body.strip_tabs)
+        self.assertEqual(cmd[body.start:body.end], "body; rm -rf /\n")
+        self.assertEqual(echo.heredocs[0].delimiter, "END")
+        self.assertTrue(echo.heredocs[0].strip_tabs)
+        self.assertEqual(parsed.heredocs, [cat.heredocs[0], echo.heredocs[0]])
+
+    def test_substitutions(self):
+        sub = parse_command("echo $(cd /tmp; ls $(pwd)) `date` <(sort a) (x)").sub_commands[0]
+        self.assertEqual(
+            [(s.kind, sub.text[s.start:s.end]) for s in sub.substitutions],
+            [("$(", "$(cd /tmp; ls $(pwd))"), ("`", "`date`"),
+             ("<(", "<(sort a)"), ("(", "(x)")],
+        )
+
+    def test_unterminated_substitution_runs_to_end(self):
+        sub = parse_command("echo $(ls ; rm x").sub_commands[0]
+        self.assertEqual(len(sub.substitutions), 1)
+        self.assertEqual(sub.substitutions[0].end, len(sub.text))
+
+
+class TestWords(unittest.TestCase):
+
+    def test_argv_matches_shlex(self):
+        for text in [
+            "rm -rf 'my dir' \"a b\" c\\ d",
+            "echo \"x\\\"y\" 'a\\b' \"\\n\" ''",
+            "cp a\tb\r\nc",
+            "printf %s\\\\",
+        ]:
+            with self.subTest(text=text):
+                self.assertEqual(SubCommand(text).argv, shlex.split(text))
+
+    def test_word_offsets_and_quoting(self):
+        sub = SubCommand("rm  'a b' plain")
+        words = sub.words
+        self.assertEqual([sub.text[w.start:w.end] for w in words], ["rm", "'a b'", "plain"])
+        self.assertEqual([w.quoted for w in words], [False, True, False])
+
+    def test_unclosed_quote_falls_back(self):
+        sub = SubCommand("rm 'unterminated file")
+        self.assertEqual(sub.argv, ["rm", "'unterminated", "file"])
+        self.assertEqual(sub.word_error, "No closing quotation")
+
+
+class TestRedirections(unittest.TestCase):
+
+    def test_fields(self):
+        sub = SubCommand("cmd > out.txt 2>> err.log < in.txt &> all.log >| clob")
+        self.assertEqual(
+            [(r.fd, r.op, r.target) for r in sub.redirections],
+            [("", ">", "out.txt"), ("2", ">>", "err.log"), ("", "<", "in.txt"),
+             ("&", ">", "all.log"), ("", ">|", "clob")],
+        )
+
+    def test_quoted_redirection_skipped(self):
+        sub = SubCommand("echo 'a > b' \"c < d\" > real.txt")
+        self.assertEqual([r.target for r in sub.redirections], ["real.txt"])
+
+
+class TestQuoteContext(unittest.TestCase):
+
+    def test_matches_is_inside_quotes(self):
+        for text in [
+            "echo 'a > b' \"c > d\" > e",
+            "echo \\' > x",
+            "echo \"it's \\\" > y\" > z",
+            "'unterminated > x",
+            "trailing\\",
+            "",
+        ]:
+            with self.subTest(text=text):
+                ctx = QuoteContext(text)
+                for pos in range(len(text) + 1):
+                    self.assertEqual(ctx.is_quoted(pos), _is_inside_quotes(text, pos), pos)
+
+    def test_quote_type(self):
+        text = "a'b'\"c\"d"
+        ctx = QuoteContext(text)
+        self.assertEqual(
+            [ctx.quote_type(pos) for pos in range(len(text) + 1)],
+            ["", "", "'", "'", "", '"', '"', "", ""],
+        )
+
+    def test_100kb_command_with_thousands_of_redirections(self):
+        """Per-hit quote checks are O(1): 4x the input costs ~4x the time."""
+        project = Path(tempfile.gettempdir())
+
+        def run(repeat):
+            cmd = 'echo "' + "a > b " * repeat + '" > out.txt'
+            start = time.perf_counter()
+            self.assertTrue(is_write_command(cmd))
+            targets = extract_redirection_targets(cmd, project)
+            self.assertEqual([t.name for t in targets], ["out.txt"])
+            return time.perf_counter() - start
+
+        run(100)  # warm regex caches
+        small = run(4000)
+        large = run(16000)  # ~96 KB, 16000 quoted '>' hits
+        self.assertLess(large, 1.0)
+        self.assertLess(large, max(small, 0.005) * 16)
+
+
+class TestDetectorsAcceptModel(unittest.TestCase):
+    """Layer 3/4 helpers give identical answers for str and SubCommand."""
+
+    def test_same_answers(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            project = Path(tmpdir)
+            (project / "a.txt").write_text("x")
+            for text in ["rm a.txt", "echo '>' > b.txt", "cat < a.txt", "ls", "sed -i s/x/y/ a.txt"]:
+                with self.subTest(text=text):
+                    sub = SubCommand(text)
+                    self.assertEqual(is_write_command(sub), is_write_command(text))
+                    self.assertEqual(is_delete_command(sub), is_delete_command(text))
+                    self.assertEqual(
+                        extract_paths(sub, project, True), extract_paths(text, project, True)
+                    )
+                    self.assertEqual(
+                        extract_redirection_targets(sub, project),
+                        extract_redirection_targets(text, project),
+                    )
+
+
+if __name__ == "__main__":
+    unittest.main()
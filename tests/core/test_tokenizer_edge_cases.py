@@ -3,7 +3,8 @@
 
 These edge cases had ZERO test coverage in the organized test suite.
 Covers: split_commands() boundary inputs, nested construct depth tracking,
-feature interactions, and is_delete_command wrapper bypass patterns.
+feature interactions, split_command_spans() offsets, and is_delete_command
+wrapper bypass patterns.
 """
 import sys
 import unittest
@@ -13,6 +14,7 @@ sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 import _bootstrap  # noqa: F401, E402
 
 from bash_guardian import (
+    split_command_spans,
     split_commands,
     is_delete_command,
     is_write_command,
@@ -395,6 +397,40 @@ class TestWrapperBypass(unittest.TestCase):
 # 5. scan_protected_paths integration
 # ============================================================
 
+class TestSplitCommandSpans(unittest.TestCase):
+    """split_command_spans() reports offsets into the original command."""
+
+    def _slices(self, cmd):
+        spans, bodies = split_command_spans(cmd)
+        return [cmd[s:e] for s, e in spans], [cmd[s:e] for s, e in bodies]
+
+    def test_spans_match_split_commands(self):
+        cmd = "  echo a ;  ls -la | grep 'x;y'  && cat \"$(pwd; id)\"  "
+        subs, bodies = self._slices(cmd)
+        self.assertEqual(subs, split_commands(cmd))
+        self.assertEqual(bodies, [])
+
+    def test_heredoc_body_span(self):
+        cmd = "cat <<EOF > out\nline1\nline2\nEOF\necho done"
+        subs, bodies = self._slices(cmd)
+        self.assertEqual(subs, ["cat <<EOF > out", "echo done"])
+        self.assertEqual(bodies, ["line1\nline2\n"])
+
+    def test_multiple_and_unterminated_heredoc_bodies(self):
+        cmd = "cmd <<A <<-'B'\na body\nA\n\tb body\n\tB\ntail <<C\nnever closed"
+        subs, bodies = self._slices(cmd)
+        self.assertEqual(subs, ["cmd <<A <<-'B'", "tail <<C"])
+        self.assertEqual(bodies, ["a body\n", "\tb body\n", "never closed"])
+
+    def test_large_input_is_linear(self):
+        """100KB of quoted text and heredoc body splits without per-char work."""
+        body = "x = 'a;b' | y && z\n" * 5000
+        cmd = "cat <<'EOF'\n" + body + "EOF\necho '" + ("q" * 20000) + "' ; ls"
+        subs, bodies = self._slices(cmd)
+        self.assertEqual(subs, ["cat <<'EOF'", "echo '" + "q" * 20000 + "'", "ls"])
+        self.assertEqual(bodies, [body])
+
+
 class TestScanProtectedPathsEdgeCases(unittest.TestCase):
     """Edge cases for scan_protected_paths Layer 1 scanning."""
 
@@ -45,6 +45,9 @@ GUARDIAN_SCHEMA_PATH = (
 BASH_GUARDIAN_PATH = (
     str(_bootstrap._REPO_ROOT / "hooks" / "scripts" / "bash_guardian.py")
 )
+GUARDIAN_SHELL_PATH = (
+    str(_bootstrap._REPO_ROOT / "hooks" / "scripts" / "_guardian_shell.py")
+)
 
 # Standard scan config for Layer 1 tests
 SCAN_CONFIG = {
@@ -254,7 +257,8 @@ class TestF3_ClobberRedirection(unittest.TestCase):
 
     def test_regex_pattern_in_source(self):
         """Verify the updated regex in source handles >|."""
-        with open(BASH_GUARDIAN_PATH) as f:
+        # The redirection regex lives in the shared shell model
+        with open(GUARDIAN_SHELL_PATH) as f:
             content = f.read()
         # The regex should contain >|? or similar to handle clobber
         self.assertIn(r">\|?", content)